@@ -0,0 +1,189 @@
+# Created: 2026-10-16 19:43:44
+# Last Modified: 2026-10-16 19:43:44
+# Author: Scott Cadreau
+
+# core/access_tracker.py
+"""
+Decaying-LFU access tracking that drives cache warming.
+
+warm_cases_cache() warmed five fixed filter combinations and the user cases re-warm three,
+whether or not anyone asked for them. Request paths now record every cache lookup here:
+each key keeps an exponentially decaying access count (half-life CACHE_ACCESS_HALF_LIFE)
+together with the parameters needed to rebuild it, and the table is bounded to
+CACHE_ACCESS_CAPACITY keys by dropping the lowest scores. Warmers ask for candidates() -
+the top-N observed keys, topped up with their old fixed lists as seeds while little has
+been observed - and load them in score order until their time budget runs out.
+
+Warmers mark what they loaded with mark_warmed(), and record() notes whether each request
+found its key warm, so stats() and the cache_warm_accesses_total metric compare the hit
+rate of warmed keys with keys loaded on demand.
+
+Counts are per process: each worker warms from the traffic it has seen, and shares the
+result with the other workers through the L2 store when one is configured.
+"""
+import os
+import time
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+try:
+    from utils.monitoring import CACHE_WARM_ACCESSES, CACHE_WARM_KEYS
+except ImportError:
+    CACHE_WARM_ACCESSES = CACHE_WARM_KEYS = None
+
+ACCESS_HALF_LIFE = float(os.environ.get("CACHE_ACCESS_HALF_LIFE", "21600"))  # Seconds for an access to count half
+ACCESS_CAPACITY = int(os.environ.get("CACHE_ACCESS_CAPACITY", "10000"))  # Keys tracked per namespace
+
+
+class AccessTracker:
+    """
+    Bounded table of decaying access counts for one cache namespace.
+
+    Usage:
+        tracker = get_access_tracker("cases_by_status")
+        tracker.record(cache_key, {"status_list": [1, 2]}, hit=cached is not None)
+        for key, params, origin in tracker.candidates(10, seeds=DEFAULT_FILTERS):
+            load(params)
+            tracker.mark_warmed(key, origin)
+    """
+
+    def __init__(self, namespace: str, half_life: float = ACCESS_HALF_LIFE, capacity: int = ACCESS_CAPACITY):
+        self.namespace = namespace
+        self.half_life = half_life
+        self.capacity = max(1, capacity)
+        # key -> [score, updated_at, params, group]
+        self._entries: Dict[str, list] = {}
+        self._warmed: "OrderedDict[str, float]" = OrderedDict()
+        self._counts = {("warmed", "hit"): 0, ("warmed", "miss"): 0, ("on_demand", "hit"): 0, ("on_demand", "miss"): 0}
+        self._lock = threading.Lock()
+
+    def _decayed(self, entry: list, now: float) -> float:
+        return entry[0] * 0.5 ** ((now - entry[1]) / self.half_life)
+
+    def record(self, key: str, params: Any = None, hit: Optional[bool] = None, group: Optional[str] = None):
+        """
+        Count one request-path access to key. params is what a warmer needs to rebuild the entry;
+        group (e.g. the user ID) lets warmers ask for one user's keys; hit is the cache lookup result.
+        """
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._entries[key] = [1.0, now, params, group]
+                if len(self._entries) > self.capacity:
+                    self._prune(now)
+            else:
+                entry[0] = self._decayed(entry, now) + 1.0
+                entry[1] = now
+                if params is not None:
+                    entry[2] = params
+                if group is not None:
+                    entry[3] = group
+
+            if hit is None:
+                return
+            source = "warmed" if key in self._warmed else "on_demand"
+            result = "hit" if hit else "miss"
+            self._counts[(source, result)] += 1
+            if not hit:
+                # Loaded on demand from here on, until a warmer loads it again
+                self._warmed.pop(key, None)
+        if CACHE_WARM_ACCESSES:
+            CACHE_WARM_ACCESSES.labels(namespace=self.namespace, source=source, result=result).inc()
+
+    def _prune(self, now: float):
+        """Drop the lowest-scoring keys down to 90% of capacity. Caller holds the lock."""
+        keep = int(self.capacity * 0.9)
+        ranked = sorted(self._entries.items(), key=lambda item: self._decayed(item[1], now), reverse=True)
+        self._entries = dict(ranked[:keep])
+
+    def mark_warmed(self, key: str, origin: str = "observed"):
+        """Note that a warmer pre-loaded key (origin: "observed" from top(), or "seed")"""
+        with self._lock:
+            self._warmed.pop(key, None)
+            self._warmed[key] = time.time()
+            while len(self._warmed) > self.capacity:
+                self._warmed.popitem(last=False)
+        if CACHE_WARM_KEYS:
+            CACHE_WARM_KEYS.labels(namespace=self.namespace, origin=origin).inc()
+
+    def top(self, n: int, group: Optional[str] = None) -> List[Tuple[str, Any, float]]:
+        """The n most frequently accessed keys (optionally only group's) as (key, params, score)"""
+        now = time.time()
+        with self._lock:
+            scored = [
+                (key, entry[2], self._decayed(entry, now))
+                for key, entry in self._entries.items()
+                if group is None or entry[3] == group
+            ]
+        scored.sort(key=lambda item: item[2], reverse=True)
+        return scored[:n]
+
+    def candidates(self, n: int, seeds: Iterable[Tuple[str, Any]] = (), group: Optional[str] = None) -> List[Tuple[str, Any, str]]:
+        """
+        Keys to warm, most valuable first, as (key, params, origin): the top-n observed keys, then
+        seeds (key, params) not already among them until there are n. Seeds cover a cold start.
+        """
+        chosen = [(key, params, "observed") for key, params, _score in self.top(n, group)]
+        seen = {key for key, _params, _origin in chosen}
+        for key, params in seeds:
+            if len(chosen) >= n:
+                break
+            if key not in seen:
+                chosen.append((key, params, "seed"))
+                seen.add(key)
+        return chosen
+
+    def score(self, key: str) -> float:
+        """Current decayed access count for key (0 if untracked)"""
+        with self._lock:
+            entry = self._entries.get(key)
+            return self._decayed(entry, time.time()) if entry is not None else 0.0
+
+    def stats(self) -> Dict[str, Any]:
+        """Tracked keys, the hottest keys and hit rates of warmed vs on-demand keys"""
+        with self._lock:
+            counts = dict(self._counts)
+            tracked = len(self._entries)
+            warmed = len(self._warmed)
+
+        def rate(source: str) -> Dict[str, Any]:
+            hits, misses = counts[(source, "hit")], counts[(source, "miss")]
+            total = hits + misses
+            return {"hits": hits, "misses": misses, "hit_rate_percent": round(hits / total * 100, 1) if total else 0}
+
+        total_hits = counts[("warmed", "hit")] + counts[("on_demand", "hit")]
+        return {
+            "namespace": self.namespace,
+            "tracked_keys": tracked,
+            "capacity": self.capacity,
+            "half_life_seconds": self.half_life,
+            "warmed_keys": warmed,
+            "warmed": rate("warmed"),
+            "on_demand": rate("on_demand"),
+            # Share of all cache hits that landed on keys a warmer pre-loaded
+            "warm_hit_share_percent": round(counts[("warmed", "hit")] / total_hits * 100, 1) if total_hits else 0,
+            "top_keys": [{"key": key, "score": round(score, 2)} for key, _params, score in self.top(5)]
+        }
+
+
+_trackers: Dict[str, AccessTracker] = {}
+_trackers_lock = threading.Lock()
+
+
+def get_access_tracker(namespace: str) -> AccessTracker:
+    """Get (or create) the access tracker for a cache namespace"""
+    with _trackers_lock:
+        tracker = _trackers.get(namespace)
+        if tracker is None:
+            tracker = AccessTracker(namespace)
+            _trackers[namespace] = tracker
+        return tracker
+
+
+def get_all_access_stats() -> Dict[str, Any]:
+    """Access tracking stats for every namespace"""
+    with _trackers_lock:
+        trackers = list(_trackers.values())
+    return {tracker.namespace: tracker.stats() for tracker in trackers}
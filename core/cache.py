@@ -0,0 +1,598 @@
+# Created: 2026-10-16 19:12:36
+# Last Modified: 2026-10-16 20:37:18
+# Author: Scott Cadreau
+
+# core/cache.py
+"""
+Bounded in-process TTL/LRU cache shared by the endpoint and utility caches.
+
+The user cases, cases-by-status, user environment, secrets and procedure code auto-fix
+caches used to be plain module dicts with "{key}_time" sibling entries, so they grew
+with the number of users until the worker was recycled. Each now gets a namespace from
+get_cache(): its own TTL and byte budget (estimated size of the cached values), least
+recently used entries evicted first once the budget is reached, and optional tags such
+as "user:<id>" so all of a user's entries can be dropped in one call.
+
+Expired entries are not removed on read - get_entry() still returns them so callers can
+fall back to stale data when the source is unavailable - they simply age out of the LRU.
+
+Entries can carry caller metadata (such as the filter that produced a cached list) and be
+patched in place with update(), which keeps their age, tags and LRU position.
+
+Per-namespace budgets can be overridden with CACHE_MAX_MB_<NAMESPACE>
+(e.g. CACHE_MAX_MB_USER_CASES=256).
+
+Namespaces created with l2=True also write through to the shared second-level store
+(core/l2_cache.py) and check it on an L1 miss, so uvicorn workers share warmed entries.
+
+Namespaces created with stale_ttl > 0 support stale-while-revalidate: get_or_stale() keeps
+returning an entry for stale_ttl seconds past its TTL (flagged stale) so the caller can
+serve it immediately and refresh it in the background instead of blocking on a rebuild.
+"""
+import os
+import sys
+import time
+import asyncio
+import threading
+import concurrent.futures
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Iterable, Optional, Set, Tuple
+
+from core.l2_cache import get_l2_backend, serialize_entry, deserialize_entry
+
+try:
+    from utils.monitoring import CACHE_REQUESTS, CACHE_EVICTIONS, CACHE_BYTES, CACHE_ENTRIES, CACHE_COALESCED, logger
+except ImportError:
+    CACHE_REQUESTS = CACHE_EVICTIONS = CACHE_BYTES = CACHE_ENTRIES = CACHE_COALESCED = logger = None
+
+SINGLE_FLIGHT_TIMEOUT = float(os.environ.get("CACHE_SINGLE_FLIGHT_TIMEOUT", "30"))  # Max seconds to wait on another caller's load
+
+_SIZE_SAMPLE = 64  # Containers larger than this are sized from an evenly spaced sample
+
+
+def estimate_size(value: Any) -> int:
+    """Approximate deep size of a cached value in bytes (sampled for large containers)"""
+    if isinstance(value, (str, bytes, bytearray, int, float, bool)) or value is None:
+        return sys.getsizeof(value)
+    if isinstance(value, dict):
+        items = list(value.items())
+        size = sys.getsizeof(value)
+        if len(items) > _SIZE_SAMPLE:
+            step = len(items) / _SIZE_SAMPLE
+            sample = [items[int(i * step)] for i in range(_SIZE_SAMPLE)]
+            return size + int(sum(estimate_size(k) + estimate_size(v) for k, v in sample) * len(items) / _SIZE_SAMPLE)
+        return size + sum(estimate_size(k) + estimate_size(v) for k, v in items)
+    if isinstance(value, (list, tuple, set, frozenset)):
+        items = value if isinstance(value, (list, tuple)) else list(value)
+        size = sys.getsizeof(value)
+        if len(items) > _SIZE_SAMPLE:
+            step = len(items) / _SIZE_SAMPLE
+            sample = [items[int(i * step)] for i in range(_SIZE_SAMPLE)]
+            return size + int(sum(estimate_size(item) for item in sample) * len(items) / _SIZE_SAMPLE)
+        return size + sum(estimate_size(item) for item in items)
+    return sys.getsizeof(value)
+
+
+class CacheEntry:
+    """A cached value with its store time, estimated size, tags and caller metadata"""
+    __slots__ = ("value", "stored_at", "size", "tags", "meta")
+
+    def __init__(self, value: Any, size: int, tags: Set[str], meta: Any = None):
+        self.value = value
+        self.stored_at = time.time()
+        self.size = size
+        self.tags = tags
+        self.meta = meta
+
+    @property
+    def age(self) -> float:
+        return time.time() - self.stored_at
+
+
+class BoundedCache:
+    """
+    Thread-safe TTL cache with a byte budget and LRU eviction.
+
+    Usage:
+        cache = get_cache("user_cases", ttl=900, max_bytes=128 * 1024 * 1024)
+        cache.set(key, cases, tags=[f"user:{user_id}"])
+        cases = cache.get(key)              # None when missing or older than the TTL
+        value, stale = cache.get_or_stale(key)  # Also returns entries within stale_ttl past the TTL
+        cache.invalidate_tag(f"user:{user_id}")
+    """
+
+    def __init__(self, namespace: str, ttl: float, max_bytes: int, l2: Any = None, stale_ttl: float = 0):
+        self.namespace = namespace
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.max_bytes = max_bytes
+        self.l2 = l2
+        self._stale_hits = 0
+        self._l2_hits = 0
+        self._l2_errors = 0
+        self._entries: "OrderedDict[str, CacheEntry]" = OrderedDict()
+        self._tags: Dict[str, Set[str]] = {}
+        self._lock = threading.RLock()
+        self._bytes = 0
+        self._hits = 0
+        self._misses = 0
+        self._evictions: Dict[str, int] = {}
+
+    def get(self, key: str, default: Any = None, ttl: Optional[float] = None) -> Any:
+        """Return the cached value if present and younger than ttl (namespace TTL by default)"""
+        max_age = self.ttl if ttl is None else ttl
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.age < max_age:
+                self._entries.move_to_end(key)
+                self._hits += 1
+                if CACHE_REQUESTS:
+                    CACHE_REQUESTS.labels(namespace=self.namespace, result="hit").inc()
+                return entry.value
+
+        # L1 miss - another worker may already have loaded it into the shared store
+        if self.l2 is not None:
+            value = self._fill_from_l2(key, max_age)
+            if value is not None:
+                with self._lock:
+                    self._l2_hits += 1
+                if CACHE_REQUESTS:
+                    CACHE_REQUESTS.labels(namespace=self.namespace, result="l2_hit").inc()
+                return value
+
+        with self._lock:
+            self._misses += 1
+        if CACHE_REQUESTS:
+            CACHE_REQUESTS.labels(namespace=self.namespace, result="miss").inc()
+        return default
+
+    def get_or_stale(self, key: str) -> Tuple[Any, bool]:
+        """
+        Return (value, stale): a fresh value within the TTL, or an expired one that is still within
+        stale_ttl past it (stale=True, for the caller to refresh). (None, False) when there is neither.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.age < self.ttl + self.stale_ttl:
+                self._entries.move_to_end(key)
+                stale = entry.age >= self.ttl
+                if stale:
+                    self._stale_hits += 1
+                else:
+                    self._hits += 1
+                if CACHE_REQUESTS:
+                    CACHE_REQUESTS.labels(namespace=self.namespace, result="stale" if stale else "hit").inc()
+                return entry.value, stale
+
+        if self.l2 is not None:
+            value = self._fill_from_l2(key, self.ttl + self.stale_ttl)
+            if value is not None:
+                with self._lock:
+                    entry = self._entries.get(key)
+                    stale = entry is not None and entry.age >= self.ttl
+                    self._l2_hits += 1
+                if CACHE_REQUESTS:
+                    CACHE_REQUESTS.labels(namespace=self.namespace, result="l2_hit").inc()
+                return value, stale
+
+        with self._lock:
+            self._misses += 1
+        if CACHE_REQUESTS:
+            CACHE_REQUESTS.labels(namespace=self.namespace, result="miss").inc()
+        return None, False
+
+    def peek(self, key: str, ttl: Optional[float] = None) -> Any:
+        """Like get() but without counting a hit/miss or refreshing LRU position"""
+        max_age = self.ttl if ttl is None else ttl
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry.age >= max_age:
+                return None
+            return entry.value
+
+    def get_entry(self, key: str) -> Optional[CacheEntry]:
+        """Return the entry regardless of age (for stale fallback and diagnostics); not counted as a hit"""
+        with self._lock:
+            return self._entries.get(key)
+
+    def set(self, key: str, value: Any, tags: Optional[Iterable[str]] = None, meta: Any = None) -> bool:
+        """
+        Store a value, evicting least recently used entries to stay within the byte budget.
+        meta is kept with the entry for callers that patch it later (e.g. the filter that built a list).
+
+        Returns:
+            False if the value alone is larger than the budget and was not cached
+        """
+        entry = self._store(key, value, set(tags or ()), meta)
+        if entry is None:
+            return False
+        self._write_l2(key, entry)
+        return True
+
+    def _store(self, key: str, value: Any, tags: Set[str], meta: Any, stored_at: Optional[float] = None) -> Optional[CacheEntry]:
+        """Put an entry in L1 only; returns None if it is larger than the whole budget"""
+        size = estimate_size(value)
+        with self._lock:
+            self._remove(key)
+            if size > self.max_bytes:
+                self._record_eviction("oversize")
+                if logger:
+                    logger.warning(f"⚠️ Cache '{self.namespace}' skipped {key}: {size} bytes exceeds budget of {self.max_bytes}")
+                return None
+
+            entry = CacheEntry(value, size, tags, meta)
+            if stored_at is not None:
+                entry.stored_at = stored_at
+            self._entries[key] = entry
+            self._bytes += size
+            for tag in entry.tags:
+                self._tags.setdefault(tag, set()).add(key)
+
+            self._enforce_budget()
+            self._update_gauges()
+            return entry
+
+    def update(self, key: str, func: Callable[[Any, Any], Any]) -> bool:
+        """
+        Replace an entry's value with func(value, meta), keeping its age, tags, metadata and LRU position.
+        func runs under the cache lock so concurrent patches of one entry don't lose updates; it must
+        not block and should return a new value rather than mutate the old one (readers may hold it).
+        Returning None drops the entry.
+
+        Returns:
+            False if the key is not cached (or was dropped)
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return False
+            value = func(entry.value, entry.meta)
+            if value is None:
+                self._remove(key)
+                self._update_gauges()
+            else:
+                size = estimate_size(value)
+                self._bytes += size - entry.size
+                entry.value = value
+                entry.size = size
+                self._enforce_budget()
+                self._update_gauges()
+            kept = key in self._entries
+        if kept:
+            self._write_l2(key, entry)
+        elif self.l2 is not None:
+            self._l2_call("delete", key)
+        return kept
+
+    def delete(self, key: str) -> bool:
+        """Remove one entry; returns True if it existed"""
+        with self._lock:
+            removed = self._remove(key)
+            self._update_gauges()
+        if self.l2 is not None:
+            self._l2_call("delete", key)
+        return removed
+
+    def invalidate_tag(self, tag: str) -> int:
+        """Remove every entry carrying tag; returns the number removed"""
+        with self._lock:
+            keys = list(self._tags.get(tag, ()))
+            for key in keys:
+                self._remove(key)
+            self._tags.pop(tag, None)
+            self._update_gauges()
+        if self.l2 is not None:
+            self._l2_call("invalidate_tag", tag)
+        return len(keys)
+
+    def clear(self) -> int:
+        """Remove all entries; returns the number removed"""
+        with self._lock:
+            count = len(self._entries)
+            self._entries.clear()
+            self._tags.clear()
+            self._bytes = 0
+            self._update_gauges()
+        if self.l2 is not None:
+            self._l2_call("clear")
+        return count
+
+    def keys(self, tag: Optional[str] = None):
+        """List cached keys, or only those carrying tag"""
+        with self._lock:
+            if tag is not None:
+                return list(self._tags.get(tag, ()))
+            return list(self._entries.keys())
+
+    def __contains__(self, key: str) -> bool:
+        with self._lock:
+            return key in self._entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _remove(self, key: str) -> bool:
+        """Drop an entry and its tag index references. Caller holds the lock."""
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return False
+        self._bytes -= entry.size
+        for tag in entry.tags:
+            keys = self._tags.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tags[tag]
+        return True
+
+    def _fill_from_l2(self, key: str, max_age: float) -> Any:
+        """Load an entry another worker stored in L2 into L1, keeping its original store time"""
+        payload = self._l2_call("get", key)
+        if payload is None:
+            return None
+        try:
+            value, tags, meta, stored_at = deserialize_entry(payload)
+        except Exception as e:
+            self._l2_error("decode", e)
+            return None
+        if time.time() - stored_at >= max_age:
+            return None
+        self._store(key, value, set(tags), meta, stored_at=stored_at)
+        return value
+
+    def _write_l2(self, key: str, entry: CacheEntry):
+        """Write an entry through to L2 with the TTL (and stale window) it has left"""
+        if self.l2 is None:
+            return
+        remaining = self.ttl + self.stale_ttl - entry.age
+        if remaining <= 0:
+            return
+        try:
+            payload = serialize_entry(entry.value, entry.tags, entry.meta, entry.stored_at)
+        except (TypeError, ValueError) as e:
+            self._l2_error("encode", e)
+            return
+        self._l2_call("set", key, payload, remaining, entry.tags)
+
+    def _l2_call(self, method: str, *args):
+        """Call the L2 backend for this namespace; failures are counted and never raised"""
+        try:
+            return getattr(self.l2, method)(self.namespace, *args)
+        except Exception as e:
+            self._l2_error(method, e)
+            return None
+
+    def _l2_error(self, operation: str, error: Exception):
+        with self._lock:
+            self._l2_errors += 1
+            errors = self._l2_errors
+        # First failure and then every 100th, so an L2 outage doesn't flood the logs
+        if logger and (errors == 1 or errors % 100 == 0):
+            logger.warning(f"⚠️ L2 cache {operation} failed for '{self.namespace}' ({errors} errors): {str(error)}")
+
+    def _enforce_budget(self):
+        """Evict least recently used entries until within the byte budget. Caller holds the lock."""
+        while self._bytes > self.max_bytes and self._entries:
+            oldest_key = next(iter(self._entries))
+            self._remove(oldest_key)
+            self._record_eviction("size")
+
+    def _record_eviction(self, reason: str):
+        self._evictions[reason] = self._evictions.get(reason, 0) + 1
+        if CACHE_EVICTIONS:
+            CACHE_EVICTIONS.labels(namespace=self.namespace, reason=reason).inc()
+
+    def _update_gauges(self):
+        if CACHE_BYTES:
+            CACHE_BYTES.labels(namespace=self.namespace).set(self._bytes)
+        if CACHE_ENTRIES:
+            CACHE_ENTRIES.labels(namespace=self.namespace).set(len(self._entries))
+
+    def stats(self) -> Dict[str, Any]:
+        """Get size, hit rate and eviction counts for this namespace"""
+        with self._lock:
+            ages = [entry.age for entry in self._entries.values()]
+            requests = self._hits + self._misses
+            return {
+                "namespace": self.namespace,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "utilization_percent": round(self._bytes / self.max_bytes * 100, 1) if self.max_bytes else 0,
+                "ttl_seconds": self.ttl,
+                "stale_ttl_seconds": self.stale_ttl,
+                "expired_entries": sum(1 for age in ages if age >= self.ttl),
+                "tags": len(self._tags),
+                "hits": self._hits,
+                "stale_hits": self._stale_hits,
+                "misses": self._misses,
+                "hit_rate_percent": round(self._hits / requests * 100, 1) if requests else 0,
+                "evictions": dict(self._evictions),
+                "oldest_age_seconds": round(max(ages), 1) if ages else 0,
+                "newest_age_seconds": round(min(ages), 1) if ages else 0,
+                "l2": {"backend": self.l2.name, "hits": self._l2_hits, "errors": self._l2_errors} if self.l2 is not None else None
+            }
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent cache-miss loads for the same key.
+
+    The first caller for a key runs the load; callers arriving while it is in flight wait
+    for its result (or exception) instead of running the same query. Works across the sync
+    path (threads) and the async path (event loop) because the flight is a
+    concurrent.futures.Future that both can wait on.
+
+    Usage:
+        flight = SingleFlight("user_cases")
+        result = flight.do(cache_key, lambda: load_from_db(...), store=lambda r: cache.set(cache_key, r))
+        result = await flight.do_async(cache_key, lambda: load_from_db_async(...), store=...)
+
+    Loads can carry tags (like cache entries) so forget(tag=...) detaches only the flights
+    for one user instead of every load in the namespace.
+    """
+
+    def __init__(self, namespace: str, timeout: float = SINGLE_FLIGHT_TIMEOUT):
+        self.namespace = namespace
+        self.timeout = timeout
+        self._flights: Dict[str, concurrent.futures.Future] = {}
+        self._flight_tags: Dict[str, Set[str]] = {}  # tag -> keys of loads in flight
+        self._lock = threading.Lock()
+        self._leaders = 0
+        self._coalesced = 0
+
+    def _join(self, key: str, tags: Optional[Iterable[str]] = None):
+        """Return (flight, is_leader) for key"""
+        with self._lock:
+            flight = self._flights.get(key)
+            if flight is not None:
+                self._coalesced += 1
+                if CACHE_COALESCED:
+                    CACHE_COALESCED.labels(namespace=self.namespace).inc()
+                return flight, False
+            flight = concurrent.futures.Future()
+            self._flights[key] = flight
+            for tag in tags or ():
+                self._flight_tags.setdefault(tag, set()).add(key)
+            self._leaders += 1
+            return flight, True
+
+    def _land(self, key: str, flight: concurrent.futures.Future) -> bool:
+        """Remove the flight; returns False if it was forgotten (invalidated) while loading"""
+        with self._lock:
+            if self._flights.get(key) is flight:
+                self._detach(key)
+                return True
+            return False
+
+    def _detach(self, key: str):
+        """Drop a flight and its tag index references. Caller holds the lock."""
+        self._flights.pop(key, None)
+        for tag in [t for t, keys in self._flight_tags.items() if key in keys]:
+            keys = self._flight_tags[tag]
+            keys.discard(key)
+            if not keys:
+                del self._flight_tags[tag]
+
+    def do(self, key: str, load: Callable[[], Any], store: Optional[Callable[[Any], Any]] = None,
+           tags: Optional[Iterable[str]] = None) -> Any:
+        """
+        Run load() for key, or wait for the call already in flight (sync callers).
+        store(result) caches the result unless the key was invalidated while loading.
+        tags lets forget(tag=...) detach this load.
+        """
+        flight, leader = self._join(key, tags)
+        if not leader:
+            try:
+                return flight.result(timeout=self.timeout)
+            except (concurrent.futures.TimeoutError, concurrent.futures.CancelledError):
+                if logger:
+                    logger.warning(f"⚠️ Single-flight wait for {self.namespace}:{key} gave up - loading directly")
+                return load()
+
+        try:
+            result = load()
+        except BaseException as e:
+            self._land(key, flight)
+            flight.set_exception(e)
+            raise
+        if self._land(key, flight) and store is not None:
+            store(result)
+        flight.set_result(result)
+        return result
+
+    async def do_async(self, key: str, load: Callable[[], Awaitable[Any]],
+                       store: Optional[Callable[[Any], Any]] = None,
+                       tags: Optional[Iterable[str]] = None) -> Any:
+        """Await load() for key, or wait for the call already in flight (async callers); see do()"""
+        flight, leader = self._join(key, tags)
+        if not leader:
+            try:
+                # shield: a follower's client disconnecting must not cancel the shared flight
+                return await asyncio.wait_for(asyncio.shield(asyncio.wrap_future(flight)), self.timeout)
+            except asyncio.TimeoutError:
+                if logger:
+                    logger.warning(f"⚠️ Single-flight wait for {self.namespace}:{key} gave up - loading directly")
+                return await load()
+            except asyncio.CancelledError:
+                if not flight.cancelled():
+                    raise  # This request itself was cancelled
+                # The leader's request was cancelled before it finished - load for ourselves
+                return await load()
+
+        try:
+            result = await load()
+        except asyncio.CancelledError:
+            # Leader's request was cancelled - release followers so they load for themselves
+            self._land(key, flight)
+            flight.cancel()
+            raise
+        except BaseException as e:
+            self._land(key, flight)
+            flight.set_exception(e)
+            raise
+        if self._land(key, flight) and store is not None:
+            store(result)
+        flight.set_result(result)
+        return result
+
+    def forget(self, key: Optional[str] = None, tag: Optional[str] = None):
+        """
+        Detach in-flight loads (one key, those carrying tag, or all) so later callers start a fresh load.
+        Called on invalidation so requests after a write don't join a load that started before it.
+        """
+        with self._lock:
+            if key is not None:
+                self._detach(key)
+            elif tag is not None:
+                for tagged_key in list(self._flight_tags.get(tag, ())):
+                    self._detach(tagged_key)
+            else:
+                self._flights.clear()
+                self._flight_tags.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"in_flight": len(self._flights), "loads": self._leaders, "coalesced": self._coalesced}
+
+
+_caches: Dict[str, BoundedCache] = {}
+_caches_lock = threading.Lock()
+
+
+def get_cache(namespace: str, ttl: float, max_bytes: int, l2: bool = False, stale_ttl: float = 0) -> BoundedCache:
+    """
+    Get (or create) the cache for a namespace.
+
+    Args:
+        namespace: Cache name, used as the Prometheus label
+        ttl: Default time-to-live in seconds for reads
+        max_bytes: Byte budget; CACHE_MAX_MB_<NAMESPACE> overrides it
+        l2: Share entries through the second-level store when one is configured (CACHE_L2_BACKEND)
+        stale_ttl: Seconds past the TTL that get_or_stale() still returns an entry (stale-while-revalidate)
+
+    Returns:
+        The namespace's BoundedCache (the same instance on every call)
+    """
+    with _caches_lock:
+        cache = _caches.get(namespace)
+        if cache is None:
+            override = os.environ.get(f"CACHE_MAX_MB_{namespace.upper()}")
+            if override:
+                max_bytes = int(float(override) * 1024 * 1024)
+            cache = BoundedCache(namespace, ttl, max_bytes, l2=get_l2_backend() if l2 else None, stale_ttl=stale_ttl)
+            _caches[namespace] = cache
+        return cache
+
+
+def get_all_cache_stats() -> Dict[str, Any]:
+    """Get stats for every registered cache namespace plus totals"""
+    with _caches_lock:
+        caches = list(_caches.values())
+    namespaces = {cache.namespace: cache.stats() for cache in caches}
+    return {
+        "total_bytes": sum(stats["bytes"] for stats in namespaces.values()),
+        "total_max_bytes": sum(stats["max_bytes"] for stats in namespaces.values()),
+        "total_entries": sum(stats["entries"] for stats in namespaces.values()),
+        "namespaces": namespaces
+    }
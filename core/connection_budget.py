@@ -0,0 +1,343 @@
+# Created: 2026-10-16 19:05:12
+# Last Modified: 2026-10-16 20:32:15
+# Author: Scott Cadreau
+
+# core/connection_budget.py
+"""
+Host-wide database connection budget shared by every worker process on a node.
+
+Each uvicorn worker keeps its own connection pool, so without coordination N workers
+on M nodes can open N x M x (pool_size + max_overflow) connections and exceed Aurora's
+max_connections during a spike. This module caps the total per host.
+
+How it works:
+    - The budget is a directory of slot files (slot-0000.lock ... slot-NNNN.lock).
+      Holding an exclusive flock on a slot file = holding one connection slot.
+      The kernel drops flocks when a process dies, so crashed workers never leak slots.
+    - Each worker holds a flock on its own file in workers/; counting the locked files
+      gives the number of live workers, and each worker's adaptive share is
+      total_slots // max(live_workers, expected_workers) (never below min_worker_share).
+      expected_workers comes from WEB_CONCURRENCY, so the first worker to start does not
+      size long-lived reservations as if it were alone on the host.
+    - A worker past its share may still borrow a slot while the host has spare headroom.
+    - Waiters inside a process are served first-come first-served; when the budget is
+      used up the head waiter polls until a slot frees up or the timeout expires.
+
+The budget directory defaults to /tmp/surgicase_db_budget and can be pointed anywhere
+(DB_CONNECTION_BUDGET_DIR), which is how tests run several processes against a local stand-in.
+"""
+import os
+import time
+import random
+import threading
+from collections import deque
+from typing import Optional, Dict, Any
+
+try:
+    import fcntl
+except ImportError:
+    # Non-POSIX platform (developer machine) - budget is disabled, pools behave as before
+    fcntl = None
+
+# Import monitoring utilities
+try:
+    from utils.monitoring import logger, DB_BUDGET_WAIT, DB_BUDGET_EXHAUSTED, DB_BUDGET_SLOTS_HELD, DB_BUDGET_WORKER_SHARE
+except ImportError:
+    logger = None
+    DB_BUDGET_WAIT = DB_BUDGET_EXHAUSTED = DB_BUDGET_SLOTS_HELD = DB_BUDGET_WORKER_SHARE = None
+
+DEFAULT_BUDGET_DIR = os.environ.get("DB_CONNECTION_BUDGET_DIR", "/tmp/surgicase_db_budget")
+
+# Worker processes configured per host (uvicorn/gunicorn --workers default); shares are never sized for fewer
+DEFAULT_EXPECTED_WORKERS = int(os.environ.get("WEB_CONCURRENCY", "1"))
+
+# Poll interval for the head waiter when slots are held by other processes (no cross-process notify)
+_POLL_INTERVAL = 0.05
+
+
+class ConnectionBudgetExceeded(Exception):
+    """Raised when no connection budget slot became free within the wait timeout"""
+
+
+class ConnectionBudget:
+    """
+    Cross-process counting semaphore for database connections on one host.
+
+    Thread safe within a process; process safe via flock on slot files.
+    """
+
+    def __init__(self, name: str, total_slots: int, budget_dir: str = None,
+                 min_worker_share: int = 5, borrow_headroom: float = 0.1,
+                 worker_refresh_interval: float = 5.0, expected_workers: int = None):
+        """
+        Initialize the ConnectionBudget.
+
+        Args:
+            name: Budget name (one per database endpoint, e.g. "writer", "reader")
+            total_slots: Maximum connections across all workers on this host
+            budget_dir: Directory holding the slot and worker lock files
+            min_worker_share: Floor for each worker's share of the budget
+            borrow_headroom: Fraction of host slots that must stay free for a worker to exceed its share
+            worker_refresh_interval: Seconds between live-worker recounts
+            expected_workers: Configured workers per host (default: WEB_CONCURRENCY); the share
+                              is sized for at least this many even before they have all started
+        """
+        self.name = name
+        self.total_slots = total_slots
+        self.min_worker_share = min_worker_share
+        self.borrow_headroom = borrow_headroom
+        self.worker_refresh_interval = worker_refresh_interval
+        self.expected_workers = max(1, expected_workers if expected_workers is not None else DEFAULT_EXPECTED_WORKERS)
+        self.enabled = fcntl is not None and total_slots > 0
+
+        base_dir = os.path.join(budget_dir or DEFAULT_BUDGET_DIR, name)
+        self._slot_dir = os.path.join(base_dir, "slots")
+        self._worker_dir = os.path.join(base_dir, "workers")
+
+        self._cond = threading.Condition(threading.Lock())
+        self._waiters = deque()
+        self._held: Dict[int, int] = {}  # slot index -> open fd holding the flock
+        self._pid: Optional[int] = None
+        self._worker_fd: Optional[int] = None
+        self._worker_count = 1
+        self._worker_count_time = 0.0
+
+    def _slot_path(self, index: int) -> str:
+        return os.path.join(self._slot_dir, f"slot-{index:04d}.lock")
+
+    def _worker_path(self, pid: int) -> str:
+        return os.path.join(self._worker_dir, f"worker-{pid}.lock")
+
+    def _ensure_registered(self):
+        """Register this process as a live worker (re-registers after fork). Caller holds the lock."""
+        pid = os.getpid()
+        if self._pid == pid:
+            return
+
+        # Inherited from a parent process: the flocks belong to the parent, just drop our references
+        for fd in self._held.values():
+            try:
+                os.close(fd)
+            except OSError:
+                pass
+        self._held.clear()
+        if self._worker_fd is not None:
+            try:
+                os.close(self._worker_fd)
+            except OSError:
+                pass
+
+        os.makedirs(self._slot_dir, exist_ok=True)
+        os.makedirs(self._worker_dir, exist_ok=True)
+
+        # Held for the life of the process; released by the kernel on exit
+        self._worker_fd = os.open(self._worker_path(pid), os.O_RDWR | os.O_CREAT, 0o666)
+        fcntl.flock(self._worker_fd, fcntl.LOCK_EX)
+        self._pid = pid
+        self._worker_count_time = 0.0
+
+    def live_workers(self) -> int:
+        """Count worker processes currently registered on this host (cached briefly)"""
+        if not self.enabled:
+            return 1
+
+        now = time.time()
+        if now - self._worker_count_time < self.worker_refresh_interval:
+            return self._worker_count
+
+        own_file = os.path.basename(self._worker_path(os.getpid()))
+        count = 0
+        try:
+            entries = os.listdir(self._worker_dir)
+        except FileNotFoundError:
+            entries = []
+
+        for entry in entries:
+            if entry == own_file:
+                count += 1
+                continue
+            path = os.path.join(self._worker_dir, entry)
+            try:
+                fd = os.open(path, os.O_RDWR)
+            except OSError:
+                continue
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                # Locked by a live worker
+                count += 1
+            else:
+                # Nobody holds it - the worker exited, remove the leftover file
+                try:
+                    os.unlink(path)
+                except OSError:
+                    pass
+                fcntl.flock(fd, fcntl.LOCK_UN)
+            finally:
+                os.close(fd)
+
+        self._worker_count = max(count, 1)
+        self._worker_count_time = now
+        return self._worker_count
+
+    def worker_share(self) -> int:
+        """Adaptive share of the host budget for this worker"""
+        share = max(self.min_worker_share, self.total_slots // max(self.live_workers(), self.expected_workers))
+        share = min(share, self.total_slots)
+        if DB_BUDGET_WORKER_SHARE:
+            DB_BUDGET_WORKER_SHARE.labels(pool=self.name).set(share)
+        return share
+
+    def free_slots(self) -> int:
+        """Probe how many slots are currently free host-wide"""
+        if not self.enabled:
+            return self.total_slots
+
+        free = 0
+        for index in range(self.total_slots):
+            if index in self._held:
+                continue
+            try:
+                fd = os.open(self._slot_path(index), os.O_RDWR | os.O_CREAT, 0o666)
+            except OSError:
+                continue
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                pass
+            else:
+                free += 1
+                fcntl.flock(fd, fcntl.LOCK_UN)
+            finally:
+                os.close(fd)
+        return free
+
+    def _try_acquire_slot(self) -> Optional[int]:
+        """Lock any free slot file. Caller holds the lock."""
+        # Random start spreads workers across the slot files instead of all racing for slot 0
+        start = random.randrange(self.total_slots)
+        for offset in range(self.total_slots):
+            index = (start + offset) % self.total_slots
+            if index in self._held:
+                continue
+            try:
+                fd = os.open(self._slot_path(index), os.O_RDWR | os.O_CREAT, 0o666)
+            except OSError:
+                continue
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                os.close(fd)
+                continue
+            self._held[index] = fd
+            return index
+        return None
+
+    def _try_acquire_within_share(self) -> Optional[int]:
+        """Acquire a slot if this worker is under its share, or may borrow spare host headroom"""
+        if len(self._held) >= self.worker_share():
+            if self.free_slots() <= int(self.total_slots * self.borrow_headroom):
+                return None
+        return self._try_acquire_slot()
+
+    def acquire(self, timeout: float) -> Optional[int]:
+        """
+        Acquire one connection slot, waiting up to timeout seconds.
+
+        Returns:
+            Slot index to pass to release(), or None when the budget is disabled
+
+        Raises:
+            ConnectionBudgetExceeded: If no slot became free within the timeout
+        """
+        if not self.enabled:
+            return None
+
+        start_time = time.time()
+        deadline = start_time + max(timeout, 0)
+        waited = False
+        token = object()
+
+        with self._cond:
+            self._ensure_registered()
+            self._waiters.append(token)
+            try:
+                while True:
+                    # Fair wait: only the longest-waiting request in this process tries for a slot
+                    if self._waiters[0] is token:
+                        slot = self._try_acquire_within_share()
+                        if slot is not None:
+                            break
+
+                    remaining = deadline - time.time()
+                    if remaining <= 0:
+                        if DB_BUDGET_EXHAUSTED:
+                            DB_BUDGET_EXHAUSTED.labels(pool=self.name, outcome="timeout").inc()
+                        if DB_BUDGET_WAIT:
+                            DB_BUDGET_WAIT.labels(pool=self.name).observe(time.time() - start_time)
+                        if logger:
+                            logger.warning(f"⏳ Connection budget '{self.name}' exhausted: no slot within {timeout}s ({len(self._held)} held by this worker)")
+                        raise ConnectionBudgetExceeded(
+                            f"Connection budget '{self.name}' exhausted ({self.total_slots} slots per host)"
+                        )
+
+                    waited = True
+                    self._cond.wait(min(remaining, _POLL_INTERVAL))
+            finally:
+                self._waiters.remove(token)
+                self._cond.notify_all()
+
+            held = len(self._held)
+
+        if waited and DB_BUDGET_EXHAUSTED:
+            DB_BUDGET_EXHAUSTED.labels(pool=self.name, outcome="waited").inc()
+        if DB_BUDGET_WAIT:
+            DB_BUDGET_WAIT.labels(pool=self.name).observe(time.time() - start_time)
+        if DB_BUDGET_SLOTS_HELD:
+            DB_BUDGET_SLOTS_HELD.labels(pool=self.name).set(held)
+
+        return slot
+
+    def release(self, slot: Optional[int]):
+        """Release a slot returned by acquire()"""
+        if slot is None or not self.enabled:
+            return
+
+        with self._cond:
+            fd = self._held.pop(slot, None)
+            if fd is not None and self._pid == os.getpid():
+                try:
+                    fcntl.flock(fd, fcntl.LOCK_UN)
+                finally:
+                    os.close(fd)
+            held = len(self._held)
+            self._cond.notify_all()
+
+        if DB_BUDGET_SLOTS_HELD:
+            DB_BUDGET_SLOTS_HELD.labels(pool=self.name).set(held)
+
+    def held(self) -> int:
+        """Number of slots held by this worker"""
+        return len(self._held)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get budget statistics for monitoring.
+
+        Returns:
+            Dictionary with budget statistics
+        """
+        if not self.enabled:
+            return {"enabled": False, "name": self.name}
+
+        return {
+            "enabled": True,
+            "name": self.name,
+            "total_slots": self.total_slots,
+            "held_by_worker": self.held(),
+            "worker_share": self.worker_share(),
+            "live_workers": self.live_workers(),
+            "expected_workers": self.expected_workers,
+            "free_slots": self.free_slots(),
+            "waiting": len(self._waiters)
+        }
@@ -1,24 +1,41 @@
 # Created: 2025-07-15 09:20:13
-# Last Modified: 2025-10-20 13:01:00
+# Last Modified: 2026-10-16 20:32:15
 # Author: Scott Cadreau
 
 # core/database.py
 import pymysql
 import pymysql.cursors
+import aiomysql
+import asyncio
 import os
 import time
 import threading
-from typing import Optional, Dict, Any
+from contextlib import asynccontextmanager
+from typing import Optional, Dict, Any, List
 from queue import Queue, Empty
+from core.connection_budget import ConnectionBudget, ConnectionBudgetExceeded
+from fastapi import HTTPException
+from core.query_telemetry import record_query, resolve_fingerprint, should_explain, is_explainable, capture_slow_query
 
 # Import monitoring utilities
 try:
-    from utils.monitoring import db_monitor, logger, track_database_operation
+    from utils.monitoring import (
+        db_monitor, logger, track_database_operation,
+        DB_PING_SKIPPED, DB_DEAD_CONNECTION_RETRIES, DB_CHECKOUT_WAIT, DB_CHECKOUT_SHED
+    )
 except ImportError:
     # Fallback if monitoring is not available
     db_monitor = None
     logger = None
     track_database_operation = lambda operation, table="unknown": lambda func: func
+    DB_PING_SKIPPED = DB_DEAD_CONNECTION_RETRIES = DB_CHECKOUT_WAIT = DB_CHECKOUT_SHED = None
+
+# Database endpoint configuration
+# Hardcoded values (optimization: eliminates one secrets call)
+_DB_HOST = "dev1-metoray-aurora-a98fdy.cluster-cahckueig7sf.us-east-1.rds.amazonaws.com"
+_DB_READER_HOST = "dev1-metoray-aurora-a98fdy.cluster-ro-cahckueig7sf.us-east-1.rds.amazonaws.com"
+_DB_NAME = "allstars"
+_DB_SECRET_NAME = "arn:aws:secretsmanager:us-east-1:002118831669:secret:rds!cluster-9376049b-abee-46d9-9cdb-95b95d6cdda0-fjhTNH"
 
 # Global connection pool
 _connection_pool: Optional[Queue] = None
@@ -27,6 +44,67 @@ _pool_lock = threading.Lock()
 _connection_metadata: Dict[int, Dict[str, float]] = {}  # Track connection creation/last_used times
 _secrets_health: Dict[str, Any] = {"last_success": time.time(), "consecutive_failures": 0}  # Track secrets manager health
 
+# Host-wide connection budgets (shared by all worker processes on this node, see core/connection_budget.py)
+# Size per node so that budget x node count stays under Aurora max_connections for each instance.
+_HOST_CONNECTION_BUDGETS = {
+    "writer": int(os.environ.get("DB_HOST_CONNECTION_BUDGET", "150")),
+    "reader": int(os.environ.get("DB_HOST_READER_CONNECTION_BUDGET", "90"))
+}
+_connection_budgets: Dict[str, ConnectionBudget] = {}
+_connection_budgets_lock = threading.Lock()
+_connection_slots: Dict[int, tuple] = {}  # id(connection) -> (budget, slot) for sync connections
+_async_pool_slots: Dict[int, tuple] = {}  # id(pool) -> (budget, [slots]) reserved by async pools
+
+# Reader (replica) connection pool
+# Read-only report, dashboard and list queries go to the Aurora reader endpoint so they
+# don't compete with case writes on the writer instance.
+_reader_pool: Optional[Queue] = None
+_reader_pool_config: Dict[str, Any] = {}
+_reader_connection_ids: set = set()  # id() of connections that belong to the reader pool
+_reader_health: Dict[str, Any] = {"lag_ms": None, "last_check": 0.0, "healthy": True, "consecutive_failures": 0}
+_reader_health_lock = threading.Lock()
+
+# Read-your-writes guard
+# After a user's case write commits, their reads are pinned to the writer for a short window
+# so they never see a replica that hasn't caught up yet. Pins are per process.
+READ_YOUR_WRITES_WINDOW = 5        # Seconds a user's reads stay on the writer after a write
+REPLICA_MAX_LAG_MS = 1000          # Route reads back to the writer when replica lag exceeds this
+REPLICA_LAG_CHECK_INTERVAL = 15    # Seconds between replica lag checks
+_writer_pins: Dict[str, float] = {}  # user_id -> pin expiry timestamp
+_writer_pins_lock = threading.Lock()
+
+# Ping-free checkout
+# Pinging every pooled connection on checkout costs a network round trip per request.
+# Connections used within the idle threshold are handed out without a ping; if one turns
+# out to be dead anyway, its first statement reconnects and retries transparently.
+CONNECTION_PING_IDLE_THRESHOLD = float(os.environ.get("DB_PING_IDLE_THRESHOLD", "30"))  # Seconds idle before checkout pings
+_DEAD_CONNECTION_ERRORS = (2006, 2013, 2055)  # CR_SERVER_GONE_ERROR, CR_SERVER_LOST, CR_SERVER_LOST_EXTENDED
+_checkout_stats: Dict[str, int] = {"pings_skipped": 0, "pings_performed": 0, "dead_connection_retries": 0}
+
+# Checkout admission control
+# A checkout waits a bounded time for one of the pool's pool_size + max_overflow slots, then is
+# shed with a 503 + Retry-After instead of piling more queries onto the database. Report and
+# export endpoints get a smaller share of the pool and a shorter wait, so they are shed first
+# and interactive case endpoints can still get connections during a burst.
+PRIORITY_INTERACTIVE = "interactive"
+PRIORITY_REPORT = "report"
+_ADMISSION_CLASSES: Dict[str, Dict[str, float]] = {
+    PRIORITY_INTERACTIVE: {"capacity_share": 1.0, "max_wait": 3.0},
+    PRIORITY_REPORT: {"capacity_share": 0.6, "max_wait": 1.0}
+}
+CHECKOUT_RETRY_AFTER = 2  # Seconds clients are told to back off when shed
+_admission_cond = threading.Condition()
+_admission_in_use: Dict[str, int] = {"writer": 0, "reader": 0}
+_admission_shed: Dict[str, int] = {PRIORITY_INTERACTIVE: 0, PRIORITY_REPORT: 0}
+_admitted_connections: Dict[int, str] = {}  # id(connection) -> pool the admission slot was taken from
+
+# Aurora MySQL reports per-replica lag in replica_host_status (the writer row has a NULL/0 lag)
+_REPLICA_LAG_SQL = """
+    SELECT MAX(replica_lag_in_milliseconds) AS lag_ms
+    FROM information_schema.replica_host_status
+    WHERE session_id != 'MASTER_SESSION_ID'
+"""
+
 def get_db_credentials(secret_name: str) -> Dict[str, Any]:
     """
     Function to fetch database credentials from AWS Secrets Manager using centralized secrets manager.
@@ -59,30 +137,34 @@ def drain_connection_pool():
     """
     global _connection_pool, _connection_metadata
     
-    if not _connection_pool:
+    if not _connection_pool and not _reader_pool:
         return
         
     drained_count = 0
     with _pool_lock:
-        # Drain all connections from pool
-        while not _connection_pool.empty():
-            try:
-                conn = _connection_pool.get_nowait()
-                conn_id = id(conn)
-                
-                # Clean up metadata
-                if conn_id in _connection_metadata:
-                    del _connection_metadata[conn_id]
-                
-                # Close the connection
+        # Drain all connections from both pools (writer and reader share credentials)
+        for pool in (_connection_pool, _reader_pool):
+            if pool is None:
+                continue
+            while not pool.empty():
                 try:
-                    conn.close()
-                    drained_count += 1
-                except Exception:
-                    pass  # Ignore close errors for stale connections
+                    conn = pool.get_nowait()
+                    conn_id = id(conn)
+                    
+                    # Clean up metadata
+                    if conn_id in _connection_metadata:
+                        del _connection_metadata[conn_id]
+                    _reader_connection_ids.discard(conn_id)
                     
-            except Exception:
-                break  # Queue is empty
+                    # Close the connection
+                    try:
+                        _close_connection(conn)
+                        drained_count += 1
+                    except Exception:
+                        pass  # Ignore close errors for stale connections
+                        
+                except Exception:
+                    break  # Queue is empty
     
     if logger and drained_count > 0:
         logger.info(f"🔄 Drained {drained_count} connections from pool due to credential rotation")
@@ -95,8 +177,7 @@ def _rewarm_secrets_and_pool():
     try:
         # Rewarm the database credentials cache
         from utils.secrets_manager import get_secret
-        secret_name = "arn:aws:secretsmanager:us-east-1:002118831669:secret:rds!cluster-9376049b-abee-46d9-9cdb-95b95d6cdda0-fjhTNH"
-        get_secret(secret_name, cache_ttl=14400)  # Rewarm with normal TTL
+        get_secret(_DB_SECRET_NAME, cache_ttl=14400)  # Rewarm with normal TTL
         
         if logger:
             logger.info("🔥 Database credentials cache rewarmed")
@@ -109,7 +190,7 @@ def _rewarm_secrets_and_pool():
             for _ in range(target_connections):
                 try:
                     if not _connection_pool.full():
-                        conn = _create_connection()
+                        conn = _create_connection(budget_timeout=0)
                         _connection_pool.put(conn, block=False)
                         
                         # Track connection metadata
@@ -134,12 +215,127 @@ def _rewarm_secrets_and_pool():
         if logger:
             logger.error(f"❌ Error during background rewarm: {e}")
 
-def _create_connection() -> pymysql.Connection:
-    """Create a new database connection with automatic credential rotation handling"""
-    # Hardcoded values (optimization: eliminates one secrets call)
-    rds_host = "dev1-metoray-aurora-a98fdy.cluster-cahckueig7sf.us-east-1.rds.amazonaws.com"
-    db_name = "allstars"
-    secret_name = "arn:aws:secretsmanager:us-east-1:002118831669:secret:rds!cluster-9376049b-abee-46d9-9cdb-95b95d6cdda0-fjhTNH"
+def _get_connection_budget(rds_host: str) -> ConnectionBudget:
+    """Get the host-wide connection budget for a database endpoint"""
+    name = "reader" if rds_host == _DB_READER_HOST else "writer"
+    budget = _connection_budgets.get(name)
+    if budget is None:
+        with _connection_budgets_lock:
+            budget = _connection_budgets.get(name)
+            if budget is None:
+                budget = ConnectionBudget(name, _HOST_CONNECTION_BUDGETS[name])
+                _connection_budgets[name] = budget
+    return budget
+
+def _close_connection(connection: Optional[pymysql.Connection]):
+    """Close a sync connection and give its budget slot back"""
+    if not connection:
+        return
+    try:
+        connection.close()
+    finally:
+        budget_slot = _connection_slots.pop(id(connection), None)
+        if budget_slot:
+            budget, slot = budget_slot
+            budget.release(slot)
+
+def _create_connection(rds_host: str = _DB_HOST, budget_timeout: Optional[float] = None) -> pymysql.Connection:
+    """
+    Create a new database connection within the host connection budget.
+    
+    Args:
+        rds_host: Database endpoint (writer or reader)
+        budget_timeout: Seconds to wait for a budget slot (default: pool_timeout);
+                        0 for background warmers that should not queue behind requests
+    
+    Raises:
+        ConnectionBudgetExceeded: If the host budget stayed exhausted for budget_timeout
+    """
+    if budget_timeout is None:
+        budget_timeout = _pool_config.get("pool_timeout", 3)
+    
+    budget = _get_connection_budget(rds_host)
+    slot = budget.acquire(timeout=budget_timeout)
+    try:
+        connection = _open_connection(rds_host)
+    except Exception:
+        budget.release(slot)
+        raise
+    
+    if slot is not None:
+        _connection_slots[id(connection)] = (budget, slot)
+    return connection
+
+class _PooledConnection(pymysql.connections.Connection):
+    """
+    pymysql connection that recovers from a dead socket on the first statement after
+    a ping-free checkout. Every cursor type goes through query(), so callers see no change.
+    """
+    _unverified = False  # Set by checkout when the validation ping was skipped
+    
+    def query(self, sql, unbuffered=False):
+        if not self._unverified:
+            return super().query(sql, unbuffered)
+        
+        self._unverified = False
+        try:
+            return super().query(sql, unbuffered)
+        except (pymysql.OperationalError, pymysql.InterfaceError) as e:
+            if isinstance(e, pymysql.OperationalError) and e.args and e.args[0] not in _DEAD_CONNECTION_ERRORS:
+                raise
+            
+            # First statement since checkout, so reconnecting loses no transaction state
+            pool_name = "reader" if id(self) in _reader_connection_ids else "writer"
+            _checkout_stats["dead_connection_retries"] += 1
+            if DB_DEAD_CONNECTION_RETRIES:
+                DB_DEAD_CONNECTION_RETRIES.labels(pool=pool_name).inc()
+            if logger:
+                logger.info(f"🔄 Pooled {pool_name} connection was dead at first execute - reconnecting: {e}")
+            
+            self.ping(reconnect=True)
+            return super().query(sql, unbuffered)
+    
+    def cursor(self, cursor=None):
+        # Every cursor type (DictCursor, SSCursor, ...) gets query telemetry, see core/query_telemetry.py
+        return _telemetry_cursor_class(cursor or self.cursorclass)(self)
+
+class _TelemetryCursorMixin:
+    """Records per-fingerprint latency and rows for every execute(); EXPLAINs slow reads"""
+    
+    def execute(self, query, args=None):
+        start_time = time.perf_counter()
+        result = super().execute(query, args)
+        duration = time.perf_counter() - start_time
+        
+        rows = self.rowcount if self.rowcount is not None and self.rowcount >= 0 else None
+        # Unbuffered cursors still have rows pending on the socket - can't run EXPLAIN beside them
+        explain = None if isinstance(self, pymysql.cursors.SSCursor) else self._explain_executed
+        record_query(query, duration, rows, explain=explain)
+        return result
+    
+    def _explain_executed(self):
+        # Plain cursor so the EXPLAIN itself isn't recorded
+        with pymysql.cursors.DictCursor(self.connection) as cursor:
+            cursor.execute("EXPLAIN " + self._executed)
+            return list(cursor.fetchall())
+
+_telemetry_cursor_classes: Dict[type, type] = {}
+
+def _telemetry_cursor_class(cursor_class: type) -> type:
+    """Get (or build once) the telemetry subclass of a pymysql cursor class"""
+    wrapped = _telemetry_cursor_classes.get(cursor_class)
+    if wrapped is None:
+        if issubclass(cursor_class, _TelemetryCursorMixin):
+            wrapped = cursor_class
+        else:
+            wrapped = type(f"Telemetry{cursor_class.__name__}", (_TelemetryCursorMixin, cursor_class), {})
+        _telemetry_cursor_classes[cursor_class] = wrapped
+    return wrapped
+
+def _open_connection(rds_host: str = _DB_HOST) -> pymysql.Connection:
+    """Open a new database connection with automatic credential rotation handling"""
+    db_name = _DB_NAME
+    secret_name = _DB_SECRET_NAME
     
     try:
         # Fetch credentials from Secrets Manager (cached)
@@ -148,7 +344,7 @@ def _create_connection() -> pymysql.Connection:
         db_pass = secretdb["password"]
         
         # Create connection with autocommit=False for transaction control
-        connection = pymysql.connect(
+        connection = _PooledConnection(
             host=rds_host, 
             user=db_user, 
             password=db_pass, 
@@ -187,7 +383,7 @@ def _create_connection() -> pymysql.Connection:
                 db_user = secretdb["username"]
                 db_pass = secretdb["password"]
                 
-                connection = pymysql.connect(
+                connection = _PooledConnection(
                     host=rds_host, 
                     user=db_user, 
                     password=db_pass, 
@@ -232,34 +428,287 @@ def _initialize_pool():
         _connection_pool = Queue(maxsize=pool_size + _pool_config["max_overflow"])
         
         # Pre-populate with initial connections - more aggressive for dedicated server
-        for _ in range(min(pool_size, 50)):  # Start with 50 connections
+        # Capped at this worker's share of the host connection budget, less what the async pool will reserve
+        prepopulate = min(pool_size, 50, _sync_budget_share(_get_connection_budget(_DB_HOST)))
+        for _ in range(prepopulate):
             try:
-                conn = _create_connection()
+                conn = _create_connection(budget_timeout=0)
                 _connection_pool.put(conn, block=False)
             except Exception as e:
                 if logger:
                     logger.warning(f"Failed to pre-populate connection pool: {e}")
                 break
 
-def get_db_connection():
+def _initialize_reader_pool():
+    """Initialize the reader (replica) connection pool"""
+    global _reader_pool, _reader_pool_config
+    
+    with _pool_lock:
+        if _reader_pool is not None:
+            return
+        
+        # Reader pool is smaller and filled lazily - read traffic is bursty (reports, dashboards)
+        _reader_pool_config = {
+            "pool_size": 30,           # Base pool size
+            "max_overflow": 30,        # Additional connections during report/dashboard bursts
+            "pool_timeout": 1,         # Short wait - falls back to creating a connection
+            "prepopulate": 10          # Connections opened on first use
+        }
+        _reader_pool = Queue(maxsize=_reader_pool_config["pool_size"] + _reader_pool_config["max_overflow"])
+        
+        for _ in range(_reader_pool_config["prepopulate"]):
+            try:
+                conn = _create_connection(_DB_READER_HOST, budget_timeout=0)
+                _track_reader_connection(conn)
+                _reader_pool.put(conn, block=False)
+            except Exception as e:
+                if logger:
+                    logger.warning(f"Failed to pre-populate reader pool: {e}")
+                break
+
+def _track_reader_connection(connection: pymysql.Connection):
+    """Record metadata for a new reader connection so it is returned to the reader pool"""
+    conn_id = id(connection)
+    current_time = time.time()
+    _connection_metadata[conn_id] = {
+        "created_at": current_time,
+        "last_used": current_time
+    }
+    _reader_connection_ids.add(conn_id)
+
+def pin_user_to_writer(user_id: Optional[str], seconds: Optional[float] = None):
+    """
+    Pin a user's reads to the writer for a short window after a committed write (read-your-writes).
+    Called after create_case/update_case commits.
+    """
+    if not user_id:
+        return
+    
+    window = READ_YOUR_WRITES_WINDOW if seconds is None else seconds
+    with _writer_pins_lock:
+        _writer_pins[user_id] = time.time() + window
+
+def is_user_pinned_to_writer(user_id: Optional[str]) -> bool:
+    """Check whether a user's reads are currently pinned to the writer"""
+    if not user_id:
+        return False
+    
+    with _writer_pins_lock:
+        expiry = _writer_pins.get(user_id)
+        if expiry is None:
+            return False
+        if time.time() >= expiry:
+            del _writer_pins[user_id]
+            return False
+        return True
+
+def _should_use_reader(user_id: Optional[str]) -> bool:
+    """Decide whether a read-only request may be served by the replica"""
+    if is_user_pinned_to_writer(user_id):
+        return False
+    if _reader_health["healthy"]:
+        return True
+    # Unhealthy: allow a probe once the check interval has passed so the reader can recover
+    return time.time() - _reader_health["last_check"] >= REPLICA_LAG_CHECK_INTERVAL
+
+def _claim_reader_lag_check() -> bool:
+    """Return True for exactly one caller once the lag check interval has elapsed"""
+    with _reader_health_lock:
+        if time.time() - _reader_health["last_check"] < REPLICA_LAG_CHECK_INTERVAL:
+            return False
+        _reader_health["last_check"] = time.time()
+        return True
+
+def _record_reader_lag(lag_ms: Optional[float]):
+    """Update replica health from a lag measurement (None = lag not reported)"""
+    with _reader_health_lock:
+        _reader_health["lag_ms"] = lag_ms
+        _reader_health["consecutive_failures"] = 0
+        was_healthy = _reader_health["healthy"]
+        _reader_health["healthy"] = lag_ms is None or lag_ms <= REPLICA_MAX_LAG_MS
+    
+    if logger and was_healthy != _reader_health["healthy"]:
+        if _reader_health["healthy"]:
+            logger.info(f"✅ Replica lag recovered ({lag_ms}ms) - read-only queries routed to reader")
+        else:
+            logger.warning(f"⚠️ Replica lag {lag_ms}ms exceeds {REPLICA_MAX_LAG_MS}ms - read-only queries routed to writer")
+
+def _record_reader_failure(error: Exception):
+    """Mark the reader unhealthy after a connection failure; re-checked after the lag interval"""
+    with _reader_health_lock:
+        _reader_health["consecutive_failures"] += 1
+        _reader_health["healthy"] = False
+        _reader_health["last_check"] = time.time()
+    
+    if logger:
+        logger.warning(f"⚠️ Reader endpoint unavailable - falling back to writer: {error}")
+
+def _check_reader_lag(connection: pymysql.Connection):
+    """Measure replica lag on a reader connection"""
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(_REPLICA_LAG_SQL)
+            row = cursor.fetchone()
+        _record_reader_lag(row["lag_ms"] if row else None)
+    except Exception as e:
+        # Not an Aurora cluster (or no privilege) - don't block reads on a missing metric
+        _record_reader_lag(None)
+        if logger:
+            logger.debug(f"Replica lag check unavailable: {e}")
+
+def _get_reader_connection() -> Optional[pymysql.Connection]:
+    """
+    Check out a connection from the reader pool, creating one if the pool is empty.
+    Returns None when the replica is lagging so the caller falls back to the writer.
+    """
+    if _reader_pool is None:
+        _initialize_reader_pool()
+    
+    connection = None
+    try:
+        connection = _reader_pool.get(block=False)
+        if not _is_checkout_valid(connection, "reader"):
+            _reader_connection_ids.discard(id(connection))
+            _connection_metadata.pop(id(connection), None)
+            _close_connection(connection)
+            connection = None
+    except Empty:
+        pass
+    
+    if connection is None:
+        # Don't queue on the reader budget - the writer is the fallback
+        connection = _create_connection(_DB_READER_HOST, budget_timeout=0)
+        _track_reader_connection(connection)
+    else:
+        conn_id = id(connection)
+        if conn_id in _connection_metadata:
+            _connection_metadata[conn_id]["last_used"] = time.time()
+    
+    if _claim_reader_lag_check():
+        _check_reader_lag(connection)
+    
+    if not _reader_health["healthy"]:
+        # Never handed out, so no connection_created() was recorded - skip the monitor on release too
+        _return_or_close(connection, _reader_pool)
+        return None
+    
+    if db_monitor:
+        db_monitor.connection_created()
+    
+    return connection
+
+class DatabaseOverloaded(HTTPException):
+    """Raised when a checkout is shed by admission control; FastAPI returns it as 503 + Retry-After"""
+    
+    def __init__(self, pool_name: str, priority: str, retry_after: int = None):
+        retry_after = retry_after or CHECKOUT_RETRY_AFTER
+        super().__init__(
+            status_code=503,
+            detail=f"Database is busy ({pool_name} pool saturated for {priority} requests), retry in {retry_after}s",
+            headers={"Retry-After": str(retry_after)}
+        )
+        self.pool_name = pool_name
+        self.priority = priority
+
+def _pool_capacity(pool_name: str) -> int:
+    """Maximum concurrent checkouts for a pool (pool_size + max_overflow)"""
+    if pool_name == "reader":
+        return _reader_pool_config.get("pool_size", 30) + _reader_pool_config.get("max_overflow", 30)
+    return _pool_config.get("pool_size", 50) + _pool_config.get("max_overflow", 50)
+
+def _record_shed(pool_name: str, priority: str):
+    """Count a shed checkout"""
+    with _admission_cond:
+        _admission_shed[priority] = _admission_shed.get(priority, 0) + 1
+    if DB_CHECKOUT_SHED:
+        DB_CHECKOUT_SHED.labels(pool=pool_name, priority=priority).inc()
+    if logger:
+        logger.warning(f"🚦 Shedding {priority} database checkout: {pool_name} pool saturated")
+
+def _admit_checkout(pool_name: str, priority: str, wait: bool = True) -> bool:
+    """
+    Take an admission slot for a checkout, waiting up to the priority's max_wait.
+    
+    Returns:
+        True when admitted; False when wait=False and no slot is free
+    
+    Raises:
+        DatabaseOverloaded: When wait=True and no slot freed up in time
+    """
+    admission = _ADMISSION_CLASSES.get(priority, _ADMISSION_CLASSES[PRIORITY_INTERACTIVE])
+    limit = max(1, int(_pool_capacity(pool_name) * admission["capacity_share"]))
+    start_time = time.time()
+    deadline = start_time + (admission["max_wait"] if wait else 0)
+    
+    with _admission_cond:
+        while _admission_in_use[pool_name] >= limit:
+            remaining = deadline - time.time()
+            if remaining <= 0:
+                break
+            _admission_cond.wait(remaining)
+        admitted = _admission_in_use[pool_name] < limit
+        if admitted:
+            _admission_in_use[pool_name] += 1
+    
+    if DB_CHECKOUT_WAIT and (admitted or wait):
+        DB_CHECKOUT_WAIT.labels(pool=pool_name, priority=priority).observe(time.time() - start_time)
+    
+    if not admitted and wait:
+        _record_shed(pool_name, priority)
+        raise DatabaseOverloaded(pool_name, priority)
+    return admitted
+
+def _release_checkout(pool_name: str):
+    """Give back an admission slot and wake one waiter"""
+    with _admission_cond:
+        _admission_in_use[pool_name] = max(0, _admission_in_use[pool_name] - 1)
+        _admission_cond.notify()
+
+def get_db_connection(readonly: bool = False, user_id: Optional[str] = None, priority: str = PRIORITY_INTERACTIVE):
     """
     Helper function to establish database connection with connection pooling
+    
+    Args:
+        readonly: Route to the Aurora reader endpoint when the replica is healthy.
+                  Only use for queries that never write.
+        user_id: User the read is for; users with a recent write are kept on the writer
+                 (read-your-writes) even when readonly=True.
+        priority: Admission class (PRIORITY_INTERACTIVE or PRIORITY_REPORT). Report and export
+                  endpoints pass PRIORITY_REPORT so they are shed first when the pool is saturated.
+    
+    Raises:
+        DatabaseOverloaded: No connection became available within the priority's bounded wait (503)
     """
     global _connection_pool
     start_time = time.time()
     
+    if readonly and _should_use_reader(user_id):
+        # Reader only if a slot is free right now - otherwise the writer is the fallback
+        if _admit_checkout("reader", priority, wait=False):
+            try:
+                connection = _get_reader_connection()
+            except Exception as e:
+                connection = None
+                _record_reader_failure(e)
+            if connection is not None:
+                _admitted_connections[id(connection)] = "reader"
+                return connection
+            _release_checkout("reader")
+    
+    _admit_checkout("writer", priority)
+    
     try:
         # Initialize pool if needed
         if _connection_pool is None:
             _initialize_pool()
         
-        # Try to get connection from pool
+        # Try to get connection from pool (admission already bounded the wait, so don't block here)
         connection = None
         try:
-            connection = _connection_pool.get(timeout=_pool_config["pool_timeout"])
+            connection = _connection_pool.get(block=False)
             
-            # Validate connection
-            if is_connection_valid(connection):
+            # Validate connection (pings only if idle past the threshold)
+            if _is_checkout_valid(connection):
                 # Update last_used time
                 conn_id = id(connection)
                 if conn_id in _connection_metadata:
@@ -271,21 +720,27 @@ def get_db_connection():
                     duration = time.time() - start_time
                     if logger:
                         logger.debug("database_connection_from_pool", duration=duration)
+                _admitted_connections[conn_id] = "writer"
                 return connection
             else:
                 # Connection is stale, create new one
                 if logger:
                     logger.debug("database_connection_invalid_replacing")
-                connection.close() if connection else None
+                _connection_metadata.pop(id(connection), None)
+                _close_connection(connection)
                 connection = None
                 
         except Empty:
-            # Pool is empty, create new connection if under max limit
+            # Pool is empty, create new connection (admission keeps us within pool_size + max_overflow)
             if logger:
                 logger.debug("database_connection_pool_empty_creating_new")
         
         # Create new connection if pool empty or connection invalid
-        connection = _create_connection()
+        try:
+            connection = _create_connection()
+        except ConnectionBudgetExceeded:
+            _record_shed("writer", priority)
+            raise DatabaseOverloaded("writer", priority)
         
         # Track connection metadata
         conn_id = id(connection)
@@ -302,19 +757,42 @@ def get_db_connection():
             if logger:
                 logger.debug("database_connection_established", duration=duration)
         
+        _admitted_connections[conn_id] = "writer"
         return connection
         
     except Exception as e:
+        _release_checkout("writer")
         duration = time.time() - start_time
         
         # Track connection errors
-        if db_monitor:
+        if db_monitor and not isinstance(e, DatabaseOverloaded):
             db_monitor.connection_created()  # This will increment the error counter
             if logger:
                 logger.error("database_connection_failed", duration=duration, error=str(e))
         
         raise
 
+def _is_checkout_valid(connection: Optional[pymysql.Connection], pool_name: str = "writer") -> bool:
+    """
+    Validate a pooled connection on checkout, pinging only when it has been idle
+    longer than CONNECTION_PING_IDLE_THRESHOLD.
+    """
+    if not connection or not connection.open:
+        return False
+    
+    metadata = _connection_metadata.get(id(connection))
+    if (metadata and isinstance(connection, _PooledConnection) and
+        time.time() - metadata["last_used"] < CONNECTION_PING_IDLE_THRESHOLD):
+        # Recently used - skip the round trip, first execute retries if it turns out dead
+        connection._unverified = True
+        _checkout_stats["pings_skipped"] += 1
+        if DB_PING_SKIPPED:
+            DB_PING_SKIPPED.labels(pool=pool_name).inc()
+        return True
+    
+    _checkout_stats["pings_performed"] += 1
+    return is_connection_valid(connection)
+
 def is_connection_valid(connection: Optional[pymysql.Connection]) -> bool:
     """
     Check if a database connection is valid and open
@@ -329,20 +807,17 @@ def is_connection_valid(connection: Optional[pymysql.Connection]) -> bool:
     except Exception:
         return False
 
-def close_db_connection(connection: Optional[pymysql.Connection]):
+def _return_or_close(connection: pymysql.Connection, pool) -> Optional[str]:
     """
-    Helper function to return connection to pool or close it
+    Put a connection back in its pool, or close it if it cannot be reused.
+    Returns "pooled" or "closed", or None if closing failed. No db_monitor accounting.
     """
-    global _connection_pool
-    
-    if not connection:
-        return
-        
     try:
-        # If connection is valid and pool isn't full, return to pool
-        if (is_connection_valid(connection) and 
-            _connection_pool is not None and 
-            not _connection_pool.full()):
+        # If connection is still open and pool isn't full, return to pool.
+        # No ping here: it was just used, and checkout re-validates it if it sits idle.
+        if (connection.open and 
+            pool is not None and 
+            not pool.full()):
             
             # Reset connection state for reuse
             if not connection.get_autocommit():
@@ -351,14 +826,12 @@ def close_db_connection(connection: Optional[pymysql.Connection]):
                 except Exception:
                     pass  # Ignore rollback errors
             
-            _connection_pool.put(connection, block=False)
+            conn_id = id(connection)
+            if conn_id in _connection_metadata:
+                _connection_metadata[conn_id]["last_used"] = time.time()
             
-            # Track connection returned to pool
-            if db_monitor:
-                db_monitor.connection_closed()
-                if logger:
-                    logger.debug("database_connection_returned_to_pool")
-            return
+            pool.put(connection, block=False)
+            return "pooled"
             
     except Exception as e:
         if logger:
@@ -370,20 +843,38 @@ def close_db_connection(connection: Optional[pymysql.Connection]):
         conn_id = id(connection)
         if conn_id in _connection_metadata:
             del _connection_metadata[conn_id]
+        _reader_connection_ids.discard(conn_id)
             
-        connection.close()
-        
-        # Track connection closure
-        if db_monitor:
-            db_monitor.connection_closed()
-            if logger:
-                logger.debug("database_connection_closed")
+        _close_connection(connection)
+        return "closed"
             
     except Exception as e:
         if logger:
             logger.error("database_connection_close_failed", error=str(e))
         # Don't raise the exception for connection close failures
-        pass
+        return None
+
+def close_db_connection(connection: Optional[pymysql.Connection]):
+    """
+    Helper function to return connection to pool or close it
+    """
+    if not connection:
+        return
+    
+    # Free the admission slot taken at checkout
+    admitted_pool = _admitted_connections.pop(id(connection), None)
+    if admitted_pool:
+        _release_checkout(admitted_pool)
+    
+    # Return reader connections to the reader pool
+    pool = _reader_pool if id(connection) in _reader_connection_ids else _connection_pool
+    outcome = _return_or_close(connection, pool)
+    
+    # Track connection returned to pool / closed
+    if outcome and db_monitor:
+        db_monitor.connection_closed()
+        if logger:
+            logger.debug("database_connection_returned_to_pool" if outcome == "pooled" else "database_connection_closed")
 
 def cleanup_stale_connections() -> Dict[str, Any]:
     """
@@ -398,7 +889,7 @@ def cleanup_stale_connections() -> Dict[str, Any]:
     """
     global _connection_pool, _connection_metadata, _secrets_health
     
-    if not _connection_pool:
+    if not _connection_pool and not _reader_pool:
         return {"status": "no_pool", "cleaned": 0}
     
     current_time = time.time()
@@ -421,44 +912,49 @@ def cleanup_stale_connections() -> Dict[str, Any]:
     stale_connections = []
     
     with _pool_lock:
-        # Create a new queue to hold valid connections
-        temp_connections = []
-        
-        # Check all connections in pool
-        while not _connection_pool.empty():
-            try:
-                connection = _connection_pool.get_nowait()
-                conn_id = id(connection)
-                
-                # Check if connection has metadata
-                if conn_id not in _connection_metadata:
-                    # No metadata, assume stale
-                    stale_connections.append(connection)
-                    continue
-                
-                metadata = _connection_metadata[conn_id]
-                age = current_time - metadata["created_at"]
-                idle_time = current_time - metadata["last_used"]
-                
-                # Check if connection is stale
-                if age > max_lifetime or idle_time > max_idle:
-                    stale_connections.append(connection)
-                elif not is_connection_valid(connection):
-                    stale_connections.append(connection)
-                else:
-                    # Connection is still good
-                    temp_connections.append(connection)
+        # Check writer and reader pools with the same TTL rules
+        for pool in (_connection_pool, _reader_pool):
+            if pool is None:
+                continue
+            
+            # Create a new queue to hold valid connections
+            temp_connections = []
+            
+            # Check all connections in pool
+            while not pool.empty():
+                try:
+                    connection = pool.get_nowait()
+                    conn_id = id(connection)
                     
-            except Exception:
-                break
-        
-        # Put valid connections back in pool
-        for conn in temp_connections:
-            try:
-                _connection_pool.put_nowait(conn)
-            except Exception:
-                # Pool full, close excess connection
-                stale_connections.append(conn)
+                    # Check if connection has metadata
+                    if conn_id not in _connection_metadata:
+                        # No metadata, assume stale
+                        stale_connections.append(connection)
+                        continue
+                    
+                    metadata = _connection_metadata[conn_id]
+                    age = current_time - metadata["created_at"]
+                    idle_time = current_time - metadata["last_used"]
+                    
+                    # Check if connection is stale
+                    if age > max_lifetime or idle_time > max_idle:
+                        stale_connections.append(connection)
+                    elif not is_connection_valid(connection):
+                        stale_connections.append(connection)
+                    else:
+                        # Connection is still good
+                        temp_connections.append(connection)
+                        
+                except Exception:
+                    break
+            
+            # Put valid connections back in pool
+            for conn in temp_connections:
+                try:
+                    pool.put_nowait(conn)
+                except Exception:
+                    # Pool full, close excess connection
+                    stale_connections.append(conn)
     
     # Close stale connections
     for conn in stale_connections:
@@ -466,7 +962,8 @@ def cleanup_stale_connections() -> Dict[str, Any]:
             conn_id = id(conn)
             if conn_id in _connection_metadata:
                 del _connection_metadata[conn_id]
-            conn.close()
+            _reader_connection_ids.discard(conn_id)
+            _close_connection(conn)
             cleaned_connections += 1
         except Exception as e:
             if logger:
@@ -479,6 +976,7 @@ def cleanup_stale_connections() -> Dict[str, Any]:
         "status": "success",
         "cleaned": cleaned_connections,
         "remaining_in_pool": _connection_pool.qsize() if _connection_pool else 0,
+        "remaining_in_reader_pool": _reader_pool.qsize() if _reader_pool else 0,
         "tracked_connections": len(_connection_metadata),
         "secrets_degraded": secrets_degraded,
         "extended_lifetimes": secrets_degraded
@@ -502,6 +1000,9 @@ def prewarm_connection_pool(target_connections: int = None) -> Dict[str, Any]:
     if target_connections is None:
         target_connections = _pool_config.get("pool_size", 50)
     
+    # Never pre-warm past this worker's share of the host connection budget
+    target_connections = min(target_connections, _sync_budget_share(_get_connection_budget(_DB_HOST)))
+    
     current_size = _connection_pool.qsize()
     connections_needed = max(0, target_connections - current_size)
     
@@ -520,7 +1021,7 @@ def prewarm_connection_pool(target_connections: int = None) -> Dict[str, Any]:
             if _connection_pool.full():
                 break
                 
-            conn = _create_connection()
+            conn = _create_connection(budget_timeout=0)
             
             # Track connection metadata
             conn_id = id(conn)
@@ -577,10 +1078,349 @@ def get_pool_stats() -> Dict[str, Any]:
         stats["connection_ages"].append(age)
         stats["idle_times"].append(idle_time)
     
+    # Reader pool and read-your-writes routing state
+    with _writer_pins_lock:
+        pinned_users = sum(1 for expiry in _writer_pins.values() if expiry > current_time)
+    stats["reader_pool"] = {
+        "pool_size": _reader_pool.qsize() if _reader_pool else 0,
+        "max_pool_size": _reader_pool_config.get("pool_size", 30),
+        "tracked_connections": len(_reader_connection_ids),
+        "healthy": _reader_health["healthy"],
+        "replica_lag_ms": _reader_health["lag_ms"],
+        "consecutive_failures": _reader_health["consecutive_failures"],
+        "pinned_users": pinned_users
+    }
+    
+    # Admission control: in-use checkouts per pool and shed counts per priority
+    with _admission_cond:
+        stats["admission"] = {
+            "in_use": dict(_admission_in_use),
+            "capacity": {name: _pool_capacity(name) for name in _admission_in_use},
+            "shed": dict(_admission_shed),
+            "classes": _ADMISSION_CLASSES
+        }
+    
+    # Checkout validation: pings_skipped is the number of network round trips saved
+    stats["checkout"] = dict(_checkout_stats, ping_idle_threshold=CONNECTION_PING_IDLE_THRESHOLD)
+    
+    # Host-wide connection budgets shared with the other workers on this node
+    stats["connection_budget"] = {
+        name: budget.get_stats() for name, budget in _connection_budgets.items()
+    }
+    
     if stats["connection_ages"]:
         stats["avg_connection_age"] = sum(stats["connection_ages"]) / len(stats["connection_ages"])
         stats["max_connection_age"] = max(stats["connection_ages"])
         stats["avg_idle_time"] = sum(stats["idle_times"]) / len(stats["idle_times"])
         stats["max_idle_time"] = max(stats["idle_times"])
     
-    return stats
\ No newline at end of file
+    return stats
+
+# Async connection pool (aiomysql)
+# Read-heavy endpoints declared with ``async def`` use this pool so that a slow
+# query parks a coroutine instead of pinning one of Starlette's threadpool
+# workers. The sync pool above remains the path for transactional writes.
+
+_async_pool: Optional[aiomysql.Pool] = None
+_async_reader_pool: Optional[aiomysql.Pool] = None
+_async_pool_lock: Optional[asyncio.Lock] = None
+_async_pool_config: Dict[str, Any] = {
+    "minsize": 10,             # Connections opened when the pool is created
+    "maxsize": 200,            # Coroutines are cheap, so allow more in-flight queries than threads
+    "reader_minsize": 5,       # Reader pool opened lazily on first read-only request
+    "reader_maxsize": 100,
+    "pool_recycle": 3600,      # Recycle connections idle > 1 hour
+    "acquire_timeout": 3       # Connection acquisition timeout (seconds), matches sync pool_timeout
+}
+
+class _AsyncTelemetryCursor(aiomysql.DictCursor):
+    """aiomysql DictCursor that records per-fingerprint query telemetry"""
+    
+    async def execute(self, query, args=None):
+        start_time = time.perf_counter()
+        result = await super().execute(query, args)
+        duration = time.perf_counter() - start_time
+        
+        rows = self.rowcount if self.rowcount is not None and self.rowcount >= 0 else None
+        record_query(query, duration, rows)
+        
+        if is_explainable(query) and should_explain(resolve_fingerprint(query)[0], duration):
+            try:
+                async with self.connection.cursor(aiomysql.DictCursor) as cursor:
+                    await cursor.execute("EXPLAIN " + self._executed)
+                    plan = list(await cursor.fetchall())
+            except Exception as e:
+                plan = [{"error": str(e)}]
+            capture_slow_query(query, duration, rows, plan)
+        return result
+
+async def _create_async_pool(host: str = _DB_HOST, minsize: int = None, maxsize: int = None) -> aiomysql.Pool:
+    """Create an aiomysql pool with automatic credential rotation handling"""
+    minsize = minsize if minsize is not None else _async_pool_config["minsize"]
+    maxsize = maxsize if maxsize is not None else _async_pool_config["maxsize"]
+    
+    # Reserve the pool's connections up front from the host budget (aiomysql has no
+    # per-connection hook); the pool is sized down to whatever was available
+    budget, slots = await asyncio.to_thread(_reserve_async_budget, host, maxsize)
+    if budget.enabled:
+        maxsize = len(slots)
+        minsize = min(minsize, maxsize)
+    
+    # Secrets lookup is blocking (boto3), keep it off the event loop
+    secretdb = await asyncio.to_thread(get_db_credentials, _DB_SECRET_NAME)
+    
+    pool_kwargs = dict(
+        host=host,
+        db=_DB_NAME,
+        minsize=minsize,
+        maxsize=maxsize,
+        pool_recycle=_async_pool_config["pool_recycle"],
+        autocommit=True,  # Async path is read-only; no transaction state to reset on release
+        charset='utf8mb4',
+        cursorclass=_AsyncTelemetryCursor
+    )
+    
+    try:
+        pool = await aiomysql.create_pool(
+            user=secretdb["username"],
+            password=secretdb["password"],
+            **pool_kwargs
+        )
+        _async_pool_slots[id(pool)] = (budget, slots)
+        return pool
+    except pymysql.OperationalError as e:
+        if "Access denied" in str(e) or "authentication" in str(e).lower():
+            if logger:
+                logger.warning("🔄 Async pool authentication failed - credential rotation detected")
+            
+            from utils.secrets_manager import secrets_manager
+            secrets_manager.clear_cache(_DB_SECRET_NAME)
+            
+            secretdb = await asyncio.to_thread(get_db_credentials, _DB_SECRET_NAME)
+            pool = await aiomysql.create_pool(
+                user=secretdb["username"],
+                password=secretdb["password"],
+                **pool_kwargs
+            )
+            
+            if logger:
+                logger.info("✅ Async database pool recovered after credential rotation")
+            _async_pool_slots[id(pool)] = (budget, slots)
+            return pool
+        _release_async_budget(budget, slots)
+        raise
+    except Exception:
+        _release_async_budget(budget, slots)
+        raise
+
+def _async_budget_share(budget: ConnectionBudget) -> int:
+    """Slots an async pool reserves for its lifetime: half of this worker's share of the host budget"""
+    return max(1, budget.worker_share() // 2)
+
+def _sync_budget_share(budget: ConnectionBudget) -> int:
+    """Slots the sync pool may pre-warm: this worker's share less the async pool's reservation"""
+    return max(1, budget.worker_share() - _async_budget_share(budget))
+
+def _reserve_async_budget(host: str, maxsize: int) -> tuple:
+    """
+    Reserve host budget slots for an async pool without blocking.
+    
+    The async pools get at most half of this worker's share so the sync pool
+    (transactional writes) always keeps the rest. The share is sized for the configured
+    worker count (WEB_CONCURRENCY), so workers that start later find their half free.
+    
+    Raises:
+        ConnectionBudgetExceeded: If no slot at all is free
+    """
+    budget = _get_connection_budget(host)
+    if not budget.enabled:
+        return budget, []
+    
+    target = min(maxsize, _async_budget_share(budget))
+    slots = []
+    for _ in range(target):
+        try:
+            slots.append(budget.acquire(timeout=0))
+        except ConnectionBudgetExceeded:
+            break
+    
+    if not slots:
+        raise ConnectionBudgetExceeded(f"No connection budget available for async pool on {host}")
+    if len(slots) < maxsize and logger:
+        logger.info(f"📉 Async pool for {host} sized to {len(slots)} connections by host connection budget (requested {maxsize})")
+    return budget, slots
+
+def _release_async_budget(budget: ConnectionBudget, slots: list):
+    """Give back budget slots reserved by an async pool"""
+    for slot in slots:
+        budget.release(slot)
+
+async def get_async_db_pool(readonly: bool = False) -> aiomysql.Pool:
+    """
+    Get the process-wide aiomysql pool (writer, or reader when readonly=True), creating it on first use.
+    """
+    global _async_pool, _async_reader_pool, _async_pool_lock
+    
+    current = _async_reader_pool if readonly else _async_pool
+    if current is not None and not current.closed:
+        return current
+    
+    if _async_pool_lock is None:
+        _async_pool_lock = asyncio.Lock()
+    
+    async with _async_pool_lock:
+        if readonly:
+            if _async_reader_pool is None or _async_reader_pool.closed:
+                _async_reader_pool = await _create_async_pool(
+                    _DB_READER_HOST,
+                    minsize=_async_pool_config["reader_minsize"],
+                    maxsize=_async_pool_config["reader_maxsize"]
+                )
+                if logger:
+                    logger.info(f"🔥 Async reader pool created (minsize={_async_pool_config['reader_minsize']}, maxsize={_async_pool_config['reader_maxsize']})")
+            return _async_reader_pool
+        
+        if _async_pool is None or _async_pool.closed:
+            _async_pool = await _create_async_pool()
+            if logger:
+                logger.info(f"🔥 Async database pool created (minsize={_async_pool_config['minsize']}, maxsize={_async_pool_config['maxsize']})")
+        return _async_pool
+
+async def _check_reader_lag_async(connection):
+    """Measure replica lag on an async reader connection"""
+    try:
+        async with connection.cursor() as cursor:
+            await cursor.execute(_REPLICA_LAG_SQL)
+            row = await cursor.fetchone()
+        _record_reader_lag(row["lag_ms"] if row else None)
+    except Exception as e:
+        _record_reader_lag(None)
+        if logger:
+            logger.debug(f"Replica lag check unavailable: {e}")
+
+async def _acquire_async_connection(readonly: bool):
+    """Acquire a connection from the writer or reader async pool; returns (pool, connection)"""
+    pool = await get_async_db_pool(readonly=readonly)
+    connection = await asyncio.wait_for(pool.acquire(), timeout=_async_pool_config["acquire_timeout"])
+    return pool, connection
+
+@asynccontextmanager
+async def get_async_db_connection(readonly: bool = False, user_id: Optional[str] = None):
+    """
+    Async context manager yielding a pooled aiomysql connection.
+    
+    readonly/user_id follow the same routing rules as get_db_connection(): read-only
+    requests use the reader endpoint unless the replica is lagging or the user has
+    a recent write pinned to the writer.
+    
+    Usage:
+        async with get_async_db_connection(readonly=True, user_id=user_id) as conn:
+            async with conn.cursor() as cursor:
+                await cursor.execute(sql, params)
+                rows = await cursor.fetchall()
+    """
+    start_time = time.time()
+    pool = connection = None
+    
+    if readonly and _should_use_reader(user_id):
+        try:
+            pool, connection = await _acquire_async_connection(readonly=True)
+            if _claim_reader_lag_check():
+                await _check_reader_lag_async(connection)
+            if not _reader_health["healthy"]:
+                # Replica is lagging - hand the connection back and use the writer
+                pool.release(connection)
+                pool = connection = None
+        except Exception as e:
+            if pool is not None and connection is not None:
+                pool.release(connection)
+            pool = connection = None
+            _record_reader_failure(e)
+    
+    if connection is None:
+        try:
+            pool, connection = await _acquire_async_connection(readonly=False)
+        except (asyncio.TimeoutError, ConnectionBudgetExceeded):
+            # Pool stayed saturated for acquire_timeout - shed instead of queueing further
+            _record_shed("async_writer", PRIORITY_INTERACTIVE)
+            raise DatabaseOverloaded("async_writer", PRIORITY_INTERACTIVE)
+        except Exception as e:
+            if logger:
+                logger.error("async_database_connection_failed", duration=time.time() - start_time, error=str(e))
+            raise
+    
+    if db_monitor:
+        db_monitor.connection_created()
+        if logger:
+            logger.debug("async_database_connection_from_pool", duration=time.time() - start_time)
+    
+    try:
+        yield connection
+    finally:
+        pool.release(connection)
+        if db_monitor:
+            db_monitor.connection_closed()
+
+async def async_fetch_all(sql: str, params: Optional[tuple] = None, readonly: bool = False, user_id: Optional[str] = None) -> List[Dict[str, Any]]:
+    """
+    Run a read query on the async pool and return all rows as dicts.
+    """
+    async with get_async_db_connection(readonly=readonly, user_id=user_id) as conn:
+        async with conn.cursor() as cursor:
+            await cursor.execute(sql, params)
+            return list(await cursor.fetchall())
+
+async def async_fetch_one(sql: str, params: Optional[tuple] = None, readonly: bool = False, user_id: Optional[str] = None) -> Optional[Dict[str, Any]]:
+    """
+    Run a read query on the async pool and return the first row as a dict (or None).
+    """
+    async with get_async_db_connection(readonly=readonly, user_id=user_id) as conn:
+        async with conn.cursor() as cursor:
+            await cursor.execute(sql, params)
+            return await cursor.fetchone()
+
+async def close_async_db_pool():
+    """
+    Close the async pools and wait for in-flight connections to be released.
+    Called from the application shutdown hook.
+    """
+    global _async_pool, _async_reader_pool
+    
+    pools = [p for p in (_async_pool, _async_reader_pool) if p is not None]
+    _async_pool = None
+    _async_reader_pool = None
+    
+    for pool in pools:
+        pool.close()
+        await pool.wait_closed()
+        reserved = _async_pool_slots.pop(id(pool), None)
+        if reserved:
+            _release_async_budget(*reserved)
+    
+    if logger and pools:
+        logger.info("🔌 Async database pool closed")
+
+def _async_pool_summary(pool: Optional[aiomysql.Pool]) -> Dict[str, Any]:
+    """Summarize a single aiomysql pool"""
+    if pool is None:
+        return {"status": "no_pool"}
+    
+    return {
+        "status": "closed" if pool.closed else "active",
+        "size": pool.size,
+        "free": pool.freesize,
+        "in_use": pool.size - pool.freesize,
+        "minsize": pool.minsize,
+        "maxsize": pool.maxsize
+    }
+
+def get_async_pool_stats() -> Dict[str, Any]:
+    """
+    Get current async connection pool statistics.
+    
+    Returns:
+        Dict with async pool statistics (writer pool at top level, reader pool under "reader")
+    """
+    stats = _async_pool_summary(_async_pool)
+    stats["reader"] = _async_pool_summary(_async_reader_pool)
+    return stats
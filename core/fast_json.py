@@ -0,0 +1,77 @@
+# Created: 2026-10-16 19:32:13
+# Last Modified: 2026-10-16 19:32:13
+# Author: Scott Cadreau
+
+# core/fast_json.py
+"""
+Fast JSON encoding for large list and export responses.
+
+FastAPI's default path runs a returned dict through jsonable_encoder, which walks every
+row, datetime, Decimal and nested procedure-code dict in pure Python, then json.dumps
+walks it all again. For trusted DB rows neither pass is needed: orjson encodes dicts,
+lists, str/int/float, date and datetime natively in C, and the few types it doesn't know
+(Decimal, bytes, sets, timedelta) go through default() with the same results as
+jsonable_encoder - Decimal becomes an int or float, bytes are decoded, sets become lists.
+
+Usage:
+    # Skips jsonable_encoder and response_model validation - only for trusted DB rows
+    return FastJSONResponse(response_data)
+
+    # Or opt a route in (FastAPI still runs jsonable_encoder first)
+    @router.get("/users", response_class=FastJSONResponse)
+
+orjson is optional: without it dumps() falls back to json.dumps with the same default().
+"""
+import json
+from decimal import Decimal
+from datetime import date, datetime, time as dt_time, timedelta
+from enum import Enum
+from typing import Any
+from uuid import UUID
+
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:  # Optional dependency - stdlib json produces the same output, just slower
+    orjson = None
+
+_ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS if orjson else 0
+
+
+def _default(value: Any):
+    """Encode the types orjson/json don't handle natively the way jsonable_encoder does"""
+    if isinstance(value, Decimal):
+        # Same rule as pydantic's decimal_encoder: integral values stay ints
+        return int(value) if value.as_tuple().exponent >= 0 else float(value)
+    if isinstance(value, (datetime, date, dt_time)):
+        return value.isoformat()
+    if isinstance(value, (bytes, bytearray)):
+        return bytes(value).decode()
+    if isinstance(value, (set, frozenset, tuple)):
+        return list(value)
+    if isinstance(value, timedelta):
+        return value.total_seconds()
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, UUID):
+        return str(value)
+    if hasattr(value, "model_dump"):
+        return value.model_dump(mode="json")
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(content: Any) -> bytes:
+    """Encode content to compact UTF-8 JSON (the same wire format as FastAPI's JSONResponse)"""
+    if orjson is not None:
+        return orjson.dumps(content, default=_default, option=_ORJSON_OPTIONS)
+    return json.dumps(
+        content, default=_default, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")
+    ).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse rendered with dumps(): Decimal, date and datetime are encoded without jsonable_encoder"""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
@@ -0,0 +1,194 @@
+# Created: 2026-10-16 20:02:47
+# Last Modified: 2026-10-16 20:02:47
+# Author: Scott Cadreau
+
+# core/import_profile.py
+"""
+Import-time profiler for cold starts.
+
+Installs a sys.meta_path finder that wraps each module's loader and times exec_module,
+so we get per-module cumulative and self milliseconds without running under
+`python -X importtime`. main.py starts it before importing the routers and stops it
+once they are included; the summary is exposed in the /ready payload.
+
+CLI (profiles a fresh interpreter import of a module, main by default):
+    python -m core.import_profile [module] [--top N]
+"""
+import sys
+import time
+import threading
+from typing import Dict, Any, Optional, List
+
+_records: Dict[str, Dict[str, Any]] = {}
+_records_lock = threading.Lock()
+_local = threading.local()
+_finder = None
+_started_at: Optional[float] = None
+_stopped_at: Optional[float] = None
+
+
+class _TimedLoader:
+    """Proxy around the real loader that times exec_module"""
+
+    def __init__(self, loader):
+        self._loader = loader
+
+    def __getattr__(self, name):
+        return getattr(self._loader, name)
+
+    def exec_module(self, module):
+        stack = getattr(_local, "stack", None)
+        if stack is None:
+            stack = _local.stack = []
+        name = module.__name__
+        parent = stack[-1]["name"] if stack else None
+        frame = {"name": name, "children_ms": 0.0}
+        stack.append(frame)
+        start = time.perf_counter()
+        try:
+            self._loader.exec_module(module)
+        finally:
+            elapsed = (time.perf_counter() - start) * 1000
+            stack.pop()
+            if stack:
+                stack[-1]["children_ms"] += elapsed
+            with _records_lock:
+                _records[name] = {
+                    "module": name,
+                    "cumulative_ms": round(elapsed, 2),
+                    "self_ms": round(max(elapsed - frame["children_ms"], 0.0), 2),
+                    "parent": parent
+                }
+            # Hand the real loader back so nothing downstream sees the proxy
+            if getattr(module, "__loader__", None) is self:
+                module.__loader__ = self._loader
+            spec = getattr(module, "__spec__", None)
+            if spec is not None and spec.loader is self:
+                spec.loader = self._loader
+
+
+class _TimingFinder:
+    """Meta path finder that asks the remaining finders and wraps the loader they return"""
+
+    def find_spec(self, fullname, path, target=None):
+        if getattr(_local, "finding", False):
+            return None
+        _local.finding = True
+        try:
+            for finder in sys.meta_path:
+                if finder is self or not hasattr(finder, "find_spec"):
+                    continue
+                spec = finder.find_spec(fullname, path, target)
+                if spec is not None:
+                    if spec.loader is not None and hasattr(spec.loader, "exec_module"):
+                        spec.loader = _TimedLoader(spec.loader)
+                    return spec
+            return None
+        finally:
+            _local.finding = False
+
+
+def start():
+    """Start recording import times (idempotent)"""
+    global _finder, _started_at, _stopped_at
+    if _finder is not None:
+        return
+    _finder = _TimingFinder()
+    sys.meta_path.insert(0, _finder)
+    _started_at = time.perf_counter()
+    _stopped_at = None
+
+
+def stop():
+    """Stop recording; already-collected timings are kept for summary()"""
+    global _finder, _stopped_at
+    if _finder is None:
+        return
+    try:
+        sys.meta_path.remove(_finder)
+    except ValueError:
+        pass
+    _finder = None
+    _stopped_at = time.perf_counter()
+
+
+def reset():
+    """Clear collected timings"""
+    with _records_lock:
+        _records.clear()
+
+
+def summary(top: int = 20) -> Dict[str, Any]:
+    """
+    Get the import-time profile.
+
+    Args:
+        top: Number of modules / packages to list
+
+    Returns:
+        Dictionary with total wall time, slowest modules by cumulative time and
+        self time aggregated per top-level package
+    """
+    with _records_lock:
+        records: List[Dict[str, Any]] = list(_records.values())
+
+    packages: Dict[str, float] = {}
+    for record in records:
+        package = record["module"].split(".")[0]
+        packages[package] = packages.get(package, 0.0) + record["self_ms"]
+
+    if _started_at is None:
+        wall_ms = None
+    else:
+        wall_ms = round(((_stopped_at or time.perf_counter()) - _started_at) * 1000, 2)
+
+    return {
+        "enabled": _finder is not None or bool(records),
+        "recording": _finder is not None,
+        "wall_ms": wall_ms,
+        "module_count": len(records),
+        "top_level_ms": round(sum(r["cumulative_ms"] for r in records if r["parent"] is None), 2),
+        "slowest_modules": sorted(records, key=lambda r: r["cumulative_ms"], reverse=True)[:top],
+        "packages": [
+            {"package": name, "self_ms": round(ms, 2)}
+            for name, ms in sorted(packages.items(), key=lambda item: item[1], reverse=True)[:top]
+        ]
+    }
+
+
+def _main(argv: List[str]) -> int:
+    import argparse
+    import importlib
+    import os
+
+    parser = argparse.ArgumentParser(description="Profile per-module import time")
+    parser.add_argument("module", nargs="?", default="main", help="Module to import (default: main)")
+    parser.add_argument("--top", type=int, default=25, help="Number of modules to show")
+    args = parser.parse_args(argv)
+
+    sys.path.insert(0, os.getcwd())
+    start()
+    error = None
+    try:
+        importlib.import_module(args.module)
+    except Exception as e:
+        error = e
+    finally:
+        stop()
+
+    report = summary(top=args.top)
+    print(f"Imported {report['module_count']} modules in {report['wall_ms']:.1f} ms ({args.module})")
+    print(f"\n{'cumulative ms':>14} {'self ms':>10}  module")
+    for record in report["slowest_modules"]:
+        print(f"{record['cumulative_ms']:>14.1f} {record['self_ms']:>10.1f}  {record['module']}")
+    print(f"\n{'self ms':>14}  package")
+    for package in report["packages"]:
+        print(f"{package['self_ms']:>14.1f}  {package['package']}")
+    if error is not None:
+        print(f"\n❌ Import of {args.module} failed: {type(error).__name__}: {error}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(_main(sys.argv[1:]))
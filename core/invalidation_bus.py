@@ -0,0 +1,311 @@
+# Created: 2026-10-16 19:24:30
+# Last Modified: 2026-10-16 19:24:30
+# Author: Scott Cadreau
+
+# core/invalidation_bus.py
+"""
+Cluster-wide cache invalidation bus.
+
+The user cases, cases-by-status and user environment caches live in each API node's
+memory, so clearing them only affected the node that handled the write - the other nodes
+behind the load balancer kept serving stale lists for up to the cache TTL (15 minutes,
+12 hours for user environment). Cache clear functions now also publish an invalidation
+(namespace + scope, e.g. "user_cases" / "<user_id>" or "*" for everything) here, and every
+node polls for invalidations published by the other nodes and evicts the matching keys.
+
+Transports:
+    db     change-sequence table cache_invalidation_log (created on start); each node reads
+           rows with seq > the last one it saw every CACHE_INVALIDATION_POLL seconds
+    local  in-process stand-in with the same sequence semantics (single node and tests)
+    off    publish and subscribe are no-ops
+
+Events published by a node are skipped by that node (it has already updated its own cache).
+Old rows are pruned after CACHE_INVALIDATION_RETENTION seconds.
+
+Environment:
+    CACHE_INVALIDATION_BUS        transport: db (default), local or off
+    CACHE_INVALIDATION_POLL       seconds between polls (default 0.5)
+    CACHE_INVALIDATION_RETENTION  seconds to keep published events (default 3600)
+    CACHE_NODE_ID                 node identifier (default <hostname>:<pid>)
+"""
+import os
+import time
+import socket
+import threading
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+try:
+    from utils.monitoring import CACHE_INVALIDATIONS, CACHE_INVALIDATION_LAG, logger
+except ImportError:
+    CACHE_INVALIDATIONS = CACHE_INVALIDATION_LAG = logger = None
+
+INVALIDATION_TRANSPORT = os.environ.get("CACHE_INVALIDATION_BUS", "db").lower()
+INVALIDATION_POLL_INTERVAL = float(os.environ.get("CACHE_INVALIDATION_POLL", "0.5"))
+INVALIDATION_RETENTION = int(os.environ.get("CACHE_INVALIDATION_RETENTION", "3600"))
+NODE_ID = os.environ.get("CACHE_NODE_ID") or f"{socket.gethostname()}:{os.getpid()}"
+
+_POLL_BATCH = 500
+_PRUNE_INTERVAL = 300
+_GAP_TIMEOUT = 5.0  # Seconds to keep re-reading a skipped sequence number (insert not yet committed)
+_MAX_GAP = 1000  # Larger jumps are auto-increment gaps, not in-flight inserts
+
+# (seq, origin node, namespace, scope, published_at epoch seconds)
+Event = Tuple[int, str, str, str, float]
+
+
+class LocalTransport:
+    """In-process stand-in for the change-sequence table: buses sharing one instance see each other's events"""
+
+    def __init__(self):
+        self._events: List[Event] = []
+        self._seq = 0
+        self._lock = threading.Lock()
+
+    def ensure_schema(self):
+        pass
+
+    def append(self, origin: str, namespace: str, scope: str) -> int:
+        with self._lock:
+            self._seq += 1
+            self._events.append((self._seq, origin, namespace, scope, time.time()))
+            return self._seq
+
+    def read_since(self, seq: int, limit: int) -> List[Event]:
+        with self._lock:
+            return [event for event in self._events if event[0] > seq][:limit]
+
+    def last_seq(self) -> int:
+        with self._lock:
+            return self._seq
+
+    def prune(self, retention: float) -> int:
+        cutoff = time.time() - retention
+        with self._lock:
+            before = len(self._events)
+            self._events = [event for event in self._events if event[4] >= cutoff]
+            return before - len(self._events)
+
+
+class DatabaseTransport:
+    """Change-sequence table in the application database"""
+
+    def _run(self, sql: str, params: tuple = (), fetch: bool = False, commit: bool = False):
+        # Imported here: core.database pulls in utils, which would be circular at module load
+        import pymysql.cursors
+        from core.database import get_db_connection, close_db_connection
+        conn = get_db_connection()
+        try:
+            with conn.cursor(pymysql.cursors.DictCursor) as cursor:
+                cursor.execute(sql, params)
+                result = cursor.fetchall() if fetch else cursor.rowcount
+                if commit:
+                    conn.commit()
+                return result
+        finally:
+            close_db_connection(conn)
+
+    def ensure_schema(self):
+        self._run("""
+            CREATE TABLE IF NOT EXISTS cache_invalidation_log (
+                seq BIGINT UNSIGNED AUTO_INCREMENT PRIMARY KEY,
+                namespace VARCHAR(64) NOT NULL,
+                scope VARCHAR(255) NOT NULL,
+                origin VARCHAR(128) NOT NULL,
+                created_at TIMESTAMP(3) NOT NULL DEFAULT CURRENT_TIMESTAMP(3),
+                INDEX idx_created_at (created_at)
+            ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
+            COMMENT='Cache invalidations published by API nodes (core/invalidation_bus.py)'
+        """, commit=True)
+
+    def append(self, origin: str, namespace: str, scope: str) -> int:
+        return self._run(
+            "INSERT INTO cache_invalidation_log (namespace, scope, origin) VALUES (%s, %s, %s)",
+            (namespace, scope, origin), commit=True
+        )
+
+    def read_since(self, seq: int, limit: int) -> List[Event]:
+        rows = self._run("""
+            SELECT seq, origin, namespace, scope, UNIX_TIMESTAMP(created_at) AS published_at
+            FROM cache_invalidation_log
+            WHERE seq > %s
+            ORDER BY seq
+            LIMIT %s
+        """, (seq, limit), fetch=True)
+        return [(int(row["seq"]), row["origin"], row["namespace"], row["scope"], float(row["published_at"])) for row in rows]
+
+    def last_seq(self) -> int:
+        rows = self._run("SELECT COALESCE(MAX(seq), 0) AS seq FROM cache_invalidation_log", fetch=True)
+        return int(rows[0]["seq"]) if rows else 0
+
+    def prune(self, retention: float) -> int:
+        return self._run(
+            "DELETE FROM cache_invalidation_log WHERE created_at < NOW(3) - INTERVAL %s SECOND LIMIT 10000",
+            (int(retention),), commit=True
+        )
+
+
+class InvalidationBus:
+    """
+    Publishes cache invalidations to the other nodes and applies theirs locally.
+
+    Usage:
+        invalidation_bus.subscribe("user_cases", lambda scope: clear_user_cases_cache(None if scope == "*" else scope, broadcast=False))
+        invalidation_bus.publish("user_cases", user_id)   # after clearing the local cache
+        invalidation_bus.start()                           # on application startup
+    """
+
+    def __init__(self, transport: Any = None, node_id: str = NODE_ID,
+                 poll_interval: float = INVALIDATION_POLL_INTERVAL, retention: float = INVALIDATION_RETENTION):
+        self.transport = transport
+        self.node_id = node_id
+        self.poll_interval = poll_interval
+        self.retention = retention
+        self._handlers: Dict[str, List[Callable[[str], Any]]] = {}
+        self._last_seq: Optional[int] = None
+        self._gaps: Dict[int, float] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._last_prune = 0.0
+        self._last_error: Optional[str] = None
+        self._counts = {"published": 0, "received": 0, "publish_failed": 0, "handler_failed": 0}
+
+    @property
+    def started(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def subscribe(self, namespace: str, handler: Callable[[str], Any]):
+        """Register handler(scope) to evict this node's keys when another node publishes for namespace"""
+        with self._lock:
+            self._handlers.setdefault(namespace, []).append(handler)
+
+    def publish(self, namespace: str, scope: str = "*") -> bool:
+        """
+        Tell the other nodes to evict namespace keys for scope ("*" for everything).
+        No-op until start(); failures are logged, never raised (the write has already committed).
+        """
+        if self.transport is None or not self.started:
+            return False
+        try:
+            self.transport.append(self.node_id, namespace, str(scope))
+        except Exception as e:
+            self._counts["publish_failed"] += 1
+            if logger:
+                logger.error(f"❌ Failed to publish cache invalidation {namespace}:{scope}: {str(e)}")
+            return False
+        self._counts["published"] += 1
+        if CACHE_INVALIDATIONS:
+            CACHE_INVALIDATIONS.labels(namespace=namespace, direction="published").inc()
+        return True
+
+    def start(self) -> bool:
+        """Create the change-sequence table if needed and start polling (idempotent)"""
+        if self.transport is None:
+            if logger:
+                logger.info("Cache invalidation bus disabled (CACHE_INVALIDATION_BUS=off)")
+            return False
+        if self.started:
+            return True
+        try:
+            self.transport.ensure_schema()
+            self._last_seq = self.transport.last_seq()
+        except Exception as e:
+            # Keep going - the poller initializes once the database is reachable
+            self._last_error = str(e)
+            if logger:
+                logger.error(f"❌ Cache invalidation bus could not read the change log yet: {str(e)}")
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="cache-invalidation-bus", daemon=True)
+        self._thread.start()
+        if logger:
+            logger.info(f"✅ Cache invalidation bus started on node {self.node_id} (poll every {self.poll_interval}s)")
+        return True
+
+    def stop(self, timeout: float = 5.0):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout)
+        self._thread = None
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                if self._last_seq is None:
+                    self.transport.ensure_schema()
+                    self._last_seq = self.transport.last_seq()
+                while self.poll_once() >= _POLL_BATCH:
+                    pass
+                if time.time() - self._last_prune > _PRUNE_INTERVAL:
+                    self._last_prune = time.time()
+                    self.transport.prune(self.retention)
+                self._last_error = None
+            except Exception as e:
+                if self._last_error != str(e) and logger:
+                    logger.error(f"❌ Cache invalidation bus poll failed: {str(e)}")
+                self._last_error = str(e)
+            self._stop.wait(self.poll_interval)
+
+    def poll_once(self) -> int:
+        """Read and apply new events; returns the number of rows read"""
+        if self._last_seq is None:
+            self._last_seq = self.transport.last_seq()
+        # Re-read sequence numbers skipped earlier: an insert may commit after a later one
+        floor = min(self._gaps) - 1 if self._gaps else self._last_seq
+        events = self.transport.read_since(floor, _POLL_BATCH)
+        now = time.time()
+        for seq, origin, namespace, scope, published_at in events:
+            if seq <= self._last_seq and seq not in self._gaps:
+                continue  # Already applied
+            self._gaps.pop(seq, None)
+            if seq > self._last_seq:
+                if seq - self._last_seq <= _MAX_GAP:
+                    for missing in range(self._last_seq + 1, seq):
+                        self._gaps[missing] = now
+                self._last_seq = seq
+            if origin != self.node_id:
+                self._deliver(namespace, scope, published_at)
+        # Sequence numbers that never appear belonged to rolled-back inserts
+        self._gaps = {seq: seen for seq, seen in self._gaps.items() if now - seen < _GAP_TIMEOUT}
+        return len(events)
+
+    def _deliver(self, namespace: str, scope: str, published_at: float):
+        with self._lock:
+            handlers = list(self._handlers.get(namespace, ()))
+        for handler in handlers:
+            try:
+                handler(scope)
+            except Exception as e:
+                self._counts["handler_failed"] += 1
+                if logger:
+                    logger.error(f"❌ Cache invalidation handler for {namespace}:{scope} failed: {str(e)}")
+        self._counts["received"] += 1
+        if CACHE_INVALIDATIONS:
+            CACHE_INVALIDATIONS.labels(namespace=namespace, direction="received").inc()
+        if CACHE_INVALIDATION_LAG:
+            CACHE_INVALIDATION_LAG.observe(max(0.0, time.time() - published_at))
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get transport, position in the change log and event counts for this node"""
+        return {
+            "node_id": self.node_id,
+            "transport": type(self.transport).__name__ if self.transport else None,
+            "started": self.started,
+            "poll_interval_seconds": self.poll_interval,
+            "last_seq": self._last_seq,
+            "pending_gaps": len(self._gaps),
+            "subscribed_namespaces": sorted(self._handlers),
+            "last_error": self._last_error,
+            **self._counts
+        }
+
+
+def _default_transport():
+    if INVALIDATION_TRANSPORT == "off":
+        return None
+    if INVALIDATION_TRANSPORT == "local":
+        return LocalTransport()
+    return DatabaseTransport()
+
+
+# Application-wide invalidation bus
+invalidation_bus = InvalidationBus(_default_transport())
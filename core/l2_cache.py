@@ -0,0 +1,310 @@
+# Created: 2026-10-16 19:31:12
+# Last Modified: 2026-10-16 20:14:28
+# Author: Scott Cadreau
+
+# core/l2_cache.py
+"""
+Shared second-level (L2) cache behind the in-process BoundedCache namespaces.
+
+Every uvicorn worker used to warm and hold its own copy of the user environment, user
+cases and global cases caches, so warming queries and memory grew with the worker count.
+Namespaces created with get_cache(..., l2=True) now write entries through to a shared
+store, and an L1 miss checks the store before the caller queries Aurora - a cold worker
+fills its L1 from entries another worker already loaded.
+
+Backends (CACHE_L2_BACKEND):
+    off     no L2 (default)
+    sqlite  on-host file shared by the workers on one node (CACHE_L2_PATH)
+    redis   Redis-compatible server shared by every node (CACHE_L2_URL, needs the redis package)
+    local   in-process stand-in with the same interface (tests)
+
+Entries are serialized as JSON with tagged Decimal/date/datetime values (no pickle, so a
+shared store can't inject code), keep their original store time so L1 TTLs aren't
+extended by a refill, and carry their tags so invalidate_tag() clears them in L2 too.
+The DEK cache is deliberately not shared: plaintext data keys stay in process memory.
+"""
+import os
+import json
+import time
+import base64
+import sqlite3
+import threading
+from decimal import Decimal
+from datetime import date, datetime
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+try:
+    from utils.monitoring import logger
+except ImportError:
+    logger = None
+
+L2_BACKEND = os.environ.get("CACHE_L2_BACKEND", "off").lower()
+L2_PATH = os.environ.get("CACHE_L2_PATH", "/tmp/surgicase_l2_cache.sqlite3")
+L2_URL = os.environ.get("CACHE_L2_URL", "redis://localhost:6379/0")
+
+# (value, tags, meta, stored_at)
+L2Entry = Tuple[Any, list, Any, float]
+
+
+def _encode_default(value: Any):
+    """Tag the non-JSON types that appear in case lists and user environment payloads"""
+    if isinstance(value, Decimal):
+        return {"__l2__": "decimal", "v": str(value)}
+    if isinstance(value, datetime):
+        return {"__l2__": "datetime", "v": value.isoformat()}
+    if isinstance(value, date):
+        return {"__l2__": "date", "v": value.isoformat()}
+    if isinstance(value, (bytes, bytearray)):
+        return {"__l2__": "bytes", "v": base64.b64encode(bytes(value)).decode("ascii")}
+    if isinstance(value, (set, frozenset, tuple)):
+        return list(value)
+    raise TypeError(f"{type(value).__name__} is not L2-serializable")
+
+
+def _decode_hook(obj: Dict[str, Any]):
+    kind = obj.get("__l2__")
+    if kind is None:
+        return obj
+    if kind == "decimal":
+        return Decimal(obj["v"])
+    if kind == "datetime":
+        return datetime.fromisoformat(obj["v"])
+    if kind == "date":
+        return date.fromisoformat(obj["v"])
+    if kind == "bytes":
+        return base64.b64decode(obj["v"])
+    return obj
+
+
+def serialize_entry(value: Any, tags: Iterable[str] = (), meta: Any = None, stored_at: Optional[float] = None) -> bytes:
+    """Serialize a cache entry for the shared store (raises TypeError for unsupported values)"""
+    return json.dumps(
+        {"value": value, "tags": sorted(tags), "meta": meta, "stored_at": stored_at or time.time()},
+        default=_encode_default, separators=(",", ":")
+    ).encode("utf-8")
+
+
+def deserialize_entry(payload: bytes) -> L2Entry:
+    data = json.loads(payload.decode("utf-8") if isinstance(payload, (bytes, bytearray)) else payload,
+                      object_hook=_decode_hook)
+    return data["value"], data["tags"], data["meta"], float(data["stored_at"])
+
+
+class LocalL2:
+    """In-process stand-in for a shared store: BoundedCaches given the same instance share entries"""
+
+    name = "local"
+
+    def __init__(self):
+        self._entries: Dict[Tuple[str, str], Tuple[bytes, float]] = {}
+        self._tags: Dict[Tuple[str, str], set] = {}
+        self._lock = threading.Lock()
+
+    def get(self, namespace: str, key: str) -> Optional[bytes]:
+        with self._lock:
+            item = self._entries.get((namespace, key))
+            if item is None:
+                return None
+            payload, expires_at = item
+            if expires_at <= time.time():
+                del self._entries[(namespace, key)]
+                return None
+            return payload
+
+    def set(self, namespace: str, key: str, payload: bytes, ttl: float, tags: Iterable[str] = ()):
+        with self._lock:
+            self._entries[(namespace, key)] = (payload, time.time() + ttl)
+            for tag in tags:
+                self._tags.setdefault((namespace, tag), set()).add(key)
+
+    def delete(self, namespace: str, key: str):
+        with self._lock:
+            self._entries.pop((namespace, key), None)
+
+    def invalidate_tag(self, namespace: str, tag: str):
+        with self._lock:
+            for key in self._tags.pop((namespace, tag), ()):
+                self._entries.pop((namespace, key), None)
+
+    def clear(self, namespace: str):
+        with self._lock:
+            for item in [item for item in self._entries if item[0] == namespace]:
+                del self._entries[item]
+            for item in [item for item in self._tags if item[0] == namespace]:
+                del self._tags[item]
+
+
+class SQLiteL2:
+    """On-host shared store: one SQLite file (WAL mode) used by every worker process on the node"""
+
+    name = "sqlite"
+
+    def __init__(self, path: str = L2_PATH):
+        self.path = path
+        self._local = threading.local()
+        # Entries can hold patient names - keep the file private to the service user
+        if not os.path.exists(path):
+            os.close(os.open(path, os.O_CREAT | os.O_WRONLY, 0o600))
+        conn = self._conn()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS l2_entries (
+                namespace TEXT NOT NULL, key TEXT NOT NULL, payload BLOB NOT NULL, expires_at REAL NOT NULL,
+                PRIMARY KEY (namespace, key)
+            )
+        """)
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS l2_tags (
+                namespace TEXT NOT NULL, tag TEXT NOT NULL, key TEXT NOT NULL,
+                PRIMARY KEY (namespace, tag, key)
+            )
+        """)
+        # Tag rows orphaned by older versions, which purged expired entries but not their tags
+        conn.execute("""
+            DELETE FROM l2_tags WHERE NOT EXISTS (
+                SELECT 1 FROM l2_entries e WHERE e.namespace = l2_tags.namespace AND e.key = l2_tags.key
+            )
+        """)
+        conn.commit()
+
+    def _conn(self) -> sqlite3.Connection:
+        """One connection per thread (sqlite3 connections can't be shared across threads)"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=2.0, isolation_level=None)
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, namespace: str, key: str) -> Optional[bytes]:
+        row = self._conn().execute(
+            "SELECT payload FROM l2_entries WHERE namespace = ? AND key = ? AND expires_at > ?",
+            (namespace, key, time.time())
+        ).fetchone()
+        return row[0] if row else None
+
+    def set(self, namespace: str, key: str, payload: bytes, ttl: float, tags: Iterable[str] = ()):
+        conn = self._conn()
+        with conn:
+            conn.execute("BEGIN")
+            conn.execute(
+                "INSERT OR REPLACE INTO l2_entries (namespace, key, payload, expires_at) VALUES (?, ?, ?, ?)",
+                (namespace, key, sqlite3.Binary(payload), time.time() + ttl)
+            )
+            conn.executemany(
+                "INSERT OR IGNORE INTO l2_tags (namespace, tag, key) VALUES (?, ?, ?)",
+                [(namespace, tag, key) for tag in tags]
+            )
+            # Expired rows and their tags are removed opportunistically so the file doesn't grow without bound
+            purge_before = time.time() - 60
+            conn.execute("""
+                DELETE FROM l2_tags WHERE (namespace, key) IN (
+                    SELECT namespace, key FROM l2_entries WHERE expires_at < ?
+                )
+            """, (purge_before,))
+            conn.execute("DELETE FROM l2_entries WHERE expires_at < ?", (purge_before,))
+
+    def delete(self, namespace: str, key: str):
+        conn = self._conn()
+        with conn:
+            conn.execute("BEGIN")
+            conn.execute("DELETE FROM l2_entries WHERE namespace = ? AND key = ?", (namespace, key))
+            conn.execute("DELETE FROM l2_tags WHERE namespace = ? AND key = ?", (namespace, key))
+
+    def invalidate_tag(self, namespace: str, tag: str):
+        conn = self._conn()
+        with conn:
+            conn.execute("BEGIN")
+            conn.execute("""
+                DELETE FROM l2_entries WHERE namespace = ? AND key IN (
+                    SELECT key FROM l2_tags WHERE namespace = ? AND tag = ?
+                )
+            """, (namespace, namespace, tag))
+            # Drop every tag row of the removed keys, not just this tag's, so none are left pointing at nothing
+            conn.execute("""
+                DELETE FROM l2_tags WHERE namespace = ? AND key IN (
+                    SELECT key FROM l2_tags WHERE namespace = ? AND tag = ?
+                )
+            """, (namespace, namespace, tag))
+
+    def clear(self, namespace: str):
+        conn = self._conn()
+        with conn:
+            conn.execute("BEGIN")
+            conn.execute("DELETE FROM l2_entries WHERE namespace = ?", (namespace,))
+            conn.execute("DELETE FROM l2_tags WHERE namespace = ?", (namespace,))
+
+
+class RedisL2:
+    """Redis-compatible shared store (ElastiCache, Valkey, ...) used by every node"""
+
+    name = "redis"
+
+    def __init__(self, url: str = L2_URL):
+        import redis  # Optional dependency, only needed when CACHE_L2_BACKEND=redis
+        self._redis = redis.Redis.from_url(url, socket_timeout=0.5, socket_connect_timeout=0.5)
+
+    @staticmethod
+    def _key(namespace: str, key: str) -> str:
+        return f"l2:{namespace}:{key}"
+
+    @staticmethod
+    def _tag_key(namespace: str, tag: str) -> str:
+        return f"l2tag:{namespace}:{tag}"
+
+    def get(self, namespace: str, key: str) -> Optional[bytes]:
+        return self._redis.get(self._key(namespace, key))
+
+    def set(self, namespace: str, key: str, payload: bytes, ttl: float, tags: Iterable[str] = ()):
+        pipe = self._redis.pipeline()
+        pipe.set(self._key(namespace, key), payload, ex=max(1, int(ttl)))
+        for tag in tags:
+            pipe.sadd(self._tag_key(namespace, tag), key)
+            pipe.expire(self._tag_key(namespace, tag), max(1, int(ttl)))
+        pipe.execute()
+
+    def delete(self, namespace: str, key: str):
+        self._redis.delete(self._key(namespace, key))
+
+    def invalidate_tag(self, namespace: str, tag: str):
+        tag_key = self._tag_key(namespace, tag)
+        keys = [self._key(namespace, k.decode() if isinstance(k, bytes) else k) for k in self._redis.smembers(tag_key)]
+        self._redis.delete(tag_key, *keys)
+
+    def clear(self, namespace: str):
+        for pattern in (f"l2:{namespace}:*", f"l2tag:{namespace}:*"):
+            batch = []
+            for key in self._redis.scan_iter(match=pattern, count=500):
+                batch.append(key)
+                if len(batch) >= 500:
+                    self._redis.delete(*batch)
+                    batch = []
+            if batch:
+                self._redis.delete(*batch)
+
+
+_backend = None
+_backend_lock = threading.Lock()
+_backend_resolved = False
+
+
+def get_l2_backend():
+    """Get the configured shared store (None when CACHE_L2_BACKEND=off or it could not be opened)"""
+    global _backend, _backend_resolved
+    with _backend_lock:
+        if not _backend_resolved:
+            _backend_resolved = True
+            try:
+                if L2_BACKEND == "sqlite":
+                    _backend = SQLiteL2()
+                elif L2_BACKEND == "redis":
+                    _backend = RedisL2()
+                elif L2_BACKEND == "local":
+                    _backend = LocalL2()
+                if _backend is not None and logger:
+                    logger.info(f"✅ L2 cache backend: {_backend.name}")
+            except Exception as e:
+                _backend = None
+                if logger:
+                    logger.error(f"❌ L2 cache backend '{L2_BACKEND}' unavailable, using in-process caches only: {str(e)}")
+        return _backend
@@ -0,0 +1,222 @@
+# Created: 2026-10-16 19:26:40
+# Last Modified: 2026-10-16 19:26:40
+# Author: Scott Cadreau
+
+# core/query_telemetry.py
+"""
+Per-SQL-fingerprint query telemetry.
+
+Every statement executed through the database cursors (installed by core/database.py) is
+normalized to a fingerprint - literals replaced with ?, IN lists collapsed, whitespace
+squashed - so the many hand-written queries can be compared by shape rather than by value.
+
+For each fingerprint we keep Prometheus latency and row-count histograms plus local totals,
+and statements slower than DB_SLOW_QUERY_THRESHOLD get their EXPLAIN plan captured into a
+ring buffer that /admin/db/slow-queries reads.
+
+Only fingerprints are stored (never the executed SQL), so PHI in query parameters never
+ends up in metrics, logs or the slow-query buffer.
+"""
+import os
+import re
+import time
+import hashlib
+import threading
+from collections import deque
+from typing import Dict, Any, Optional, List, Callable
+
+try:
+    from utils.monitoring import logger, DB_SQL_DURATION, DB_SQL_ROWS
+except ImportError:
+    logger = None
+    DB_SQL_DURATION = DB_SQL_ROWS = None
+
+SLOW_QUERY_THRESHOLD = float(os.environ.get("DB_SLOW_QUERY_THRESHOLD", "0.5"))  # Seconds
+SLOW_QUERY_BUFFER_SIZE = 200        # Slow-query captures kept in the ring buffer
+EXPLAIN_INTERVAL = 600              # Re-EXPLAIN a given fingerprint at most every 10 minutes
+MAX_FINGERPRINTS = 500              # Cap on distinct fingerprints (bounds Prometheus label cardinality)
+_OVERFLOW_FINGERPRINT = "other"
+
+# Normalization patterns (order matters: strings first so '#' or '--' inside a literal is not a comment)
+_PARAM_RE = re.compile(r"%\(\w+\)s|%s")
+_COMMENT_RE = re.compile(r"(/\*.*?\*/)|(--[^\n]*)|(#[^\n]*)", re.DOTALL)
+_STRING_RE = re.compile(r"'(?:[^'\\]|\\.|'')*'|\"(?:[^\"\\]|\\.)*\"")
+_HEX_RE = re.compile(r"\b0x[0-9a-f]+\b", re.IGNORECASE)
+_NUMBER_RE = re.compile(r"(?<![\w.])-?\d+(?:\.\d+)?(?:e[+-]?\d+)?\b", re.IGNORECASE)
+_IN_LIST_RE = re.compile(r"\bIN\s*\(\s*\?(?:\s*,\s*\?)*\s*\)", re.IGNORECASE)
+_VALUES_RE = re.compile(r"\bVALUES\s*\(\s*\?(?:\s*,\s*\?)*\s*\)(?:\s*,\s*\(\s*\?(?:\s*,\s*\?)*\s*\))*", re.IGNORECASE)
+_WHITESPACE_RE = re.compile(r"\s+")
+
+_lock = threading.Lock()
+_fingerprints: Dict[str, Dict[str, Any]] = {}   # fingerprint id -> stats
+_slow_queries: deque = deque(maxlen=SLOW_QUERY_BUFFER_SIZE)
+_last_explain: Dict[str, float] = {}            # fingerprint id -> last EXPLAIN time
+_fingerprint_cache: Dict[str, tuple] = {}       # raw SQL template -> (id, fingerprint)
+
+def fingerprint_sql(sql: str) -> str:
+    """
+    Normalize a SQL statement to its fingerprint.
+
+    Example:
+        "SELECT * FROM cases WHERE user_id = 'abc' AND case_status IN (1, 2, 3)"
+        -> "SELECT * FROM cases WHERE user_id = ? AND case_status IN (?+)"
+    """
+    if isinstance(sql, bytes):
+        sql = sql.decode("utf-8", errors="replace")
+
+    normalized = _STRING_RE.sub("?", sql)
+    normalized = _COMMENT_RE.sub(" ", normalized)
+    normalized = _PARAM_RE.sub("?", normalized)
+    normalized = _HEX_RE.sub("?", normalized)
+    normalized = _NUMBER_RE.sub("?", normalized)
+    normalized = _WHITESPACE_RE.sub(" ", normalized).strip()
+    normalized = _IN_LIST_RE.sub("IN (?+)", normalized)
+    normalized = _VALUES_RE.sub("VALUES (?+)", normalized)
+    return normalized.rstrip(";").strip()
+
+def _fingerprint_id(fingerprint: str) -> str:
+    """Short stable id for a fingerprint, used as the Prometheus label"""
+    return hashlib.md5(fingerprint.encode("utf-8")).hexdigest()[:12]
+
+def resolve_fingerprint(sql_template: str) -> tuple:
+    """
+    Get (fingerprint id, fingerprint) for a statement, caching by the unformatted template.
+
+    Callers pass the SQL before parameters are bound so that the cache key is the
+    template and the normalization cost is paid once per distinct query in the code.
+    """
+    cached = _fingerprint_cache.get(sql_template)
+    if cached:
+        return cached
+
+    fingerprint = fingerprint_sql(sql_template)
+    resolved = (_fingerprint_id(fingerprint), fingerprint)
+    if len(_fingerprint_cache) < MAX_FINGERPRINTS * 4:
+        _fingerprint_cache[sql_template] = resolved
+    return resolved
+
+def should_explain(fingerprint_id: str, duration: float) -> bool:
+    """True when a statement is slow and its fingerprint hasn't been EXPLAINed recently"""
+    if duration < SLOW_QUERY_THRESHOLD:
+        return False
+
+    now = time.time()
+    with _lock:
+        if now - _last_explain.get(fingerprint_id, 0) < EXPLAIN_INTERVAL:
+            return False
+        _last_explain[fingerprint_id] = now
+    return True
+
+def is_explainable(sql: str) -> bool:
+    """Only plain reads are EXPLAINed - never re-run anything that writes"""
+    head = sql.lstrip()[:10].upper() if isinstance(sql, str) else ""
+    return head.startswith("SELECT") or head.startswith("WITH")
+
+def record_query(sql_template: str, duration: float, rows: Optional[int],
+                 explain: Optional[Callable[[], List[Dict[str, Any]]]] = None):
+    """
+    Record one executed statement.
+
+    Args:
+        sql_template: SQL as passed to cursor.execute() (before parameters are bound)
+        duration: Execution time in seconds
+        rows: Rows returned (SELECT) or affected (DML); None if unknown
+        explain: Optional callable returning the EXPLAIN rows; only called for slow statements
+    """
+    try:
+        fingerprint_id, fingerprint = resolve_fingerprint(sql_template)
+
+        with _lock:
+            stats = _fingerprints.get(fingerprint_id)
+            if stats is None:
+                if len(_fingerprints) >= MAX_FINGERPRINTS:
+                    fingerprint_id, fingerprint = _OVERFLOW_FINGERPRINT, "(fingerprint limit reached)"
+                    stats = _fingerprints.get(fingerprint_id)
+                if stats is None:
+                    stats = {
+                        "fingerprint": fingerprint,
+                        "count": 0,
+                        "total_seconds": 0.0,
+                        "max_seconds": 0.0,
+                        "total_rows": 0,
+                        "slow_count": 0,
+                        "last_seen": 0.0
+                    }
+                    _fingerprints[fingerprint_id] = stats
+
+            stats["count"] += 1
+            stats["total_seconds"] += duration
+            stats["max_seconds"] = max(stats["max_seconds"], duration)
+            stats["total_rows"] += rows or 0
+            stats["last_seen"] = time.time()
+            if duration >= SLOW_QUERY_THRESHOLD:
+                stats["slow_count"] += 1
+
+        if DB_SQL_DURATION:
+            DB_SQL_DURATION.labels(fingerprint=fingerprint_id).observe(duration)
+        if DB_SQL_ROWS and rows is not None:
+            DB_SQL_ROWS.labels(fingerprint=fingerprint_id).observe(rows)
+
+        if explain is not None and is_explainable(sql_template) and should_explain(fingerprint_id, duration):
+            try:
+                plan = explain()
+            except Exception as e:
+                plan = [{"error": str(e)}]
+            capture_slow_query(sql_template, duration, rows, plan)
+    except Exception as e:
+        # Telemetry must never break a query
+        if logger:
+            logger.debug(f"Query telemetry failed: {e}")
+
+def capture_slow_query(sql_template: str, duration: float, rows: Optional[int], plan: List[Dict[str, Any]]):
+    """
+    Add a slow statement and its EXPLAIN plan to the ring buffer.
+    Called directly by the async cursor, which has to await its EXPLAIN.
+    """
+    fingerprint_id, fingerprint = resolve_fingerprint(sql_template)
+    entry = {
+        "timestamp": time.time(),
+        "fingerprint_id": fingerprint_id,
+        "fingerprint": fingerprint,
+        "duration_seconds": round(duration, 4),
+        "rows": rows,
+        "explain": plan
+    }
+    with _lock:
+        _slow_queries.append(entry)
+
+    if logger:
+        logger.warning(f"🐢 Slow query {fingerprint_id} ({duration:.2f}s, {rows} rows): {fingerprint[:200]}")
+
+def get_query_stats(limit: int = 50, sort_by: str = "total_seconds") -> List[Dict[str, Any]]:
+    """
+    Get per-fingerprint statistics, hottest first.
+
+    Args:
+        limit: Maximum fingerprints to return
+        sort_by: total_seconds, count, max_seconds, avg_seconds, total_rows or slow_count
+    """
+    with _lock:
+        items = [dict(stats, fingerprint_id=fp_id) for fp_id, stats in _fingerprints.items()]
+
+    for item in items:
+        item["avg_seconds"] = item["total_seconds"] / item["count"] if item["count"] else 0.0
+        item["avg_rows"] = item["total_rows"] / item["count"] if item["count"] else 0.0
+
+    items.sort(key=lambda item: item.get(sort_by, 0), reverse=True)
+    return items[:limit]
+
+def get_slow_queries(limit: int = 50, fingerprint_id: Optional[str] = None) -> List[Dict[str, Any]]:
+    """Get the most recent slow-query captures (newest first)"""
+    with _lock:
+        entries = list(_slow_queries)
+    if fingerprint_id:
+        entries = [entry for entry in entries if entry["fingerprint_id"] == fingerprint_id]
+    return list(reversed(entries))[:limit]
+
+def reset_query_stats():
+    """Clear all fingerprint statistics and slow-query captures"""
+    with _lock:
+        _fingerprints.clear()
+        _slow_queries.clear()
+        _last_explain.clear()
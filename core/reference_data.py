@@ -0,0 +1,321 @@
+# Created: 2026-10-16 19:35:01
+# Last Modified: 2026-10-16 19:35:01
+# Author: Scott Cadreau
+
+# core/reference_data.py
+"""
+Versioned in-process snapshots of the reference (lookup) tables.
+
+Case status descriptions were re-queried on every user/group cases cache miss, and the
+list endpoints (/case_statuses, /user_types, /user_doc_types, /faqs, /pay_tiers,
+/cpt_codes, /timezones, /doctypes) read their tables on every call. The registry loads
+each table once per process and serves every reader from memory.
+
+Each table has a version number kept in reference_data_version, so every API node
+reports the same number for the same data:
+    - add_to_lists.py calls record_change(name) after committing; it bumps the version,
+      drops the local snapshot and tells the other nodes through the invalidation bus
+    - snapshots are also reloaded after REFERENCE_DATA_TTL seconds; a reload that finds
+      changed rows under an unchanged version (a table loaded by a script) bumps it too
+
+Reloads diff the old and new rows, so changes_since(name, version) can return only the
+rows added/changed and the keys removed since a version the client already has (the
+?since_version= parameter on /cpt_codes and /timezones). When the node doesn't have the
+history back to that version the full table is returned instead.
+
+Rows are shared between requests - treat them as read-only.
+"""
+import os
+import time
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+from fastapi.concurrency import run_in_threadpool
+
+from core.invalidation_bus import invalidation_bus
+
+try:
+    from utils.monitoring import logger
+except ImportError:
+    logger = None
+
+REFERENCE_DATA_TTL = float(os.environ.get("REFERENCE_DATA_TTL", "900"))
+_RETRY_AFTER = 30  # Seconds to keep serving the old snapshot after a failed reload
+_MAX_HISTORY = 50  # Version transitions kept per table for changes_since()
+
+# name -> (query, key columns)
+REFERENCE_TABLES: Dict[str, Tuple[str, Tuple[str, ...]]] = {
+    "case_statuses": ("SELECT case_status, case_status_desc FROM case_status_list ORDER BY case_status", ("case_status",)),
+    "user_types": ("SELECT user_type, user_type_desc, user_max_case_status FROM user_type_list WHERE user_type < 1000 ORDER BY user_type", ("user_type",)),
+    "user_doc_types": ("SELECT doc_type, doc_prefix FROM user_doc_type_list ORDER BY doc_type", ("doc_type",)),
+    "faqs": ("SELECT user_type, faq_header, faq_text, display_order FROM faq_list ORDER BY user_type, display_order", ("user_type", "faq_header")),
+    "pay_tiers": ("SELECT code_bucket, tier, pay_amount FROM procedure_code_buckets2 ORDER BY tier, pay_amount", ("code_bucket", "tier")),
+    "cpt_codes": ("SELECT cpt_code, cpt_description FROM cpt_codes ORDER BY cpt_code", ("cpt_code",)),
+    "timezones": ("SELECT tz_identifier, utc_offset FROM user_timezones ORDER BY tz_identifier", ("tz_identifier",)),
+}
+
+
+class Snapshot:
+    """One loaded version of a table"""
+    __slots__ = ("version", "rows", "loaded_at", "indexes")
+
+    def __init__(self, version: int, rows: List[dict]):
+        self.version = version
+        self.rows = rows
+        self.loaded_at = time.time()
+        self.indexes: Dict[Tuple[str, str], dict] = {}
+
+
+class ReferenceDataRegistry:
+    """
+    Loads reference tables on first use and serves them from memory.
+
+    Usage:
+        rows = reference_data.get("cpt_codes")
+        descriptions = reference_data.mapping("case_statuses", "case_status", "case_status_desc")
+        delta = reference_data.changes_since("timezones", since_version)
+        reference_data.record_change("case_statuses")   # after committing a write
+    """
+
+    def __init__(self, tables: Dict[str, Tuple[str, Tuple[str, ...]]] = REFERENCE_TABLES, ttl: float = REFERENCE_DATA_TTL):
+        self.tables = tables
+        self.ttl = ttl
+        self._snapshots: Dict[str, Snapshot] = {}
+        self._stale: set = set()
+        self._retry_at: Dict[str, float] = {}
+        # (from_version, to_version, upserted rows, removed keys), oldest first
+        self._history: Dict[str, List[Tuple[int, int, List[dict], List[dict]]]] = {}
+        self._locks = {name: threading.Lock() for name in tables}
+        self._lock = threading.Lock()
+        self._schema_ready = False
+        self._loads: Dict[str, int] = {}
+
+    # --- Reading ---
+
+    def _is_fresh(self, name: str, snapshot: Optional[Snapshot]) -> bool:
+        if snapshot is None or name in self._stale:
+            return False
+        return time.time() - snapshot.loaded_at < self.ttl or time.time() < self._retry_at.get(name, 0)
+
+    def snapshot(self, name: str) -> Snapshot:
+        """Current snapshot of a table, loading it if missing, invalidated or older than the TTL"""
+        if name not in self.tables:
+            raise KeyError(f"Unknown reference table: {name}")
+        current = self._snapshots.get(name)
+        if self._is_fresh(name, current):
+            return current
+
+        lock = self._locks[name]
+        if current is not None and not lock.acquire(blocking=False):
+            return current  # Another thread is reloading - serve the previous version meanwhile
+        if current is None:
+            lock.acquire()
+        try:
+            current = self._snapshots.get(name)
+            if self._is_fresh(name, current):
+                return current
+            try:
+                return self._load(name)
+            except Exception as e:
+                if current is None:
+                    raise
+                # Keep serving what we have; try again shortly
+                self._retry_at[name] = time.time() + _RETRY_AFTER
+                if logger:
+                    logger.error(f"❌ Failed to reload reference data {name}, serving version {current.version}: {str(e)}")
+                return current
+        finally:
+            lock.release()
+
+    def get(self, name: str) -> List[dict]:
+        return self.snapshot(name).rows
+
+    def version(self, name: str) -> int:
+        return self.snapshot(name).version
+
+    async def snapshot_async(self, name: str) -> Snapshot:
+        """snapshot() for async endpoints: served from memory, loads run in the threadpool"""
+        current = self._snapshots.get(name)
+        if self._is_fresh(name, current):
+            return current
+        return await run_in_threadpool(self.snapshot, name)
+
+    async def get_async(self, name: str) -> List[dict]:
+        return (await self.snapshot_async(name)).rows
+
+    def mapping(self, name: str, key: str, value: str, snapshot: Optional[Snapshot] = None) -> dict:
+        """{row[key]: row[value]} for a table, built once per loaded version"""
+        snapshot = snapshot or self.snapshot(name)
+        index = snapshot.indexes.get((key, value))
+        if index is None:
+            index = {row[key]: row[value] for row in snapshot.rows}
+            snapshot.indexes[(key, value)] = index
+        return index
+
+    async def mapping_async(self, name: str, key: str, value: str) -> dict:
+        return self.mapping(name, key, value, await self.snapshot_async(name))
+
+    def changes_since(self, name: str, since_version: Optional[int]) -> Dict[str, Any]:
+        """
+        Rows changed since a version the client already has.
+
+        Returns:
+            {"version", "delta": True, "rows": added/changed rows, "removed": removed keys} when the
+            history reaches back to since_version, otherwise {"version", "delta": False, "rows": all rows}
+        """
+        snapshot = self.snapshot(name)
+        if since_version is not None:
+            if since_version == snapshot.version:
+                return {"version": snapshot.version, "delta": True, "rows": [], "removed": []}
+            with self._lock:
+                history = list(self._history.get(name, ()))
+            start = next((i for i, step in enumerate(history) if step[0] == since_version), None)
+            if start is not None and history[-1][1] == snapshot.version:
+                key_columns = self.tables[name][1]
+                upserts: Dict[tuple, dict] = {}
+                removed: Dict[tuple, dict] = {}
+                for _, _, step_upserts, step_removed in history[start:]:
+                    for row in step_upserts:
+                        key = tuple(row[c] for c in key_columns)
+                        upserts[key] = row
+                        removed.pop(key, None)
+                    for key_row in step_removed:
+                        key = tuple(key_row[c] for c in key_columns)
+                        removed[key] = key_row
+                        upserts.pop(key, None)
+                return {"version": snapshot.version, "delta": True, "rows": list(upserts.values()), "removed": list(removed.values())}
+        return {"version": snapshot.version, "delta": False, "rows": snapshot.rows}
+
+    # --- Loading ---
+
+    def _run(self, statements: List[Tuple[str, tuple]], commit: bool = False) -> List[List[dict]]:
+        # Imported here: core.database pulls in utils, which would be circular at module load
+        import pymysql.cursors
+        from core.database import get_db_connection, close_db_connection
+        conn = get_db_connection()
+        try:
+            results = []
+            with conn.cursor(pymysql.cursors.DictCursor) as cursor:
+                for sql, params in statements:
+                    cursor.execute(sql, params)
+                    results.append(list(cursor.fetchall()))
+            if commit:
+                conn.commit()
+            return results
+        finally:
+            close_db_connection(conn)
+
+    def _ensure_schema(self):
+        if self._schema_ready:
+            return
+        self._run([("""
+            CREATE TABLE IF NOT EXISTS reference_data_version (
+                table_name VARCHAR(64) PRIMARY KEY,
+                version BIGINT UNSIGNED NOT NULL DEFAULT 0,
+                updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+            ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
+            COMMENT='Reference data versions served by the API (core/reference_data.py)'
+        """, ())], commit=True)
+        self._schema_ready = True
+
+    def _bump_version(self, name: str) -> int:
+        self._ensure_schema()
+        _, rows = self._run([
+            ("INSERT INTO reference_data_version (table_name, version) VALUES (%s, 1) "
+             "ON DUPLICATE KEY UPDATE version = version + 1", (name,)),
+            ("SELECT version FROM reference_data_version WHERE table_name = %s", (name,)),
+        ], commit=True)
+        return int(rows[0]["version"])
+
+    def _load(self, name: str) -> Snapshot:
+        """Read the version then the rows (a write in between is picked up by the next reload)"""
+        self._ensure_schema()
+        query, key_columns = self.tables[name]
+        version_rows, rows = self._run([
+            ("SELECT version FROM reference_data_version WHERE table_name = %s", (name,)),
+            (query, ()),
+        ])
+        version = int(version_rows[0]["version"]) if version_rows else 0
+
+        previous = self._snapshots.get(name)
+        if previous is not None:
+            upserts, removed = self._diff(previous.rows, rows, key_columns)
+            if (upserts or removed) and version == previous.version:
+                # Changed outside record_change() (e.g. a load script) - give clients a new version
+                version = self._bump_version(name)
+            if version != previous.version:
+                with self._lock:
+                    history = self._history.setdefault(name, [])
+                    history.append((previous.version, version, upserts, removed))
+                    del history[:-_MAX_HISTORY]
+        return self._install(name, version, rows)
+
+    def _install(self, name: str, version: int, rows: List[dict]) -> Snapshot:
+        snapshot = Snapshot(version, rows)
+        with self._lock:
+            self._snapshots[name] = snapshot
+            self._stale.discard(name)
+            self._retry_at.pop(name, None)
+            self._loads[name] = self._loads.get(name, 0) + 1
+        if logger:
+            logger.info(f"✅ Loaded reference data {name} v{version} ({len(rows)} rows)")
+        return snapshot
+
+    @staticmethod
+    def _diff(old_rows: List[dict], new_rows: List[dict], key_columns: Tuple[str, ...]) -> Tuple[List[dict], List[dict]]:
+        """Rows added or changed, and the keys of rows removed"""
+        old = {tuple(row[c] for c in key_columns): row for row in old_rows}
+        new = {tuple(row[c] for c in key_columns): row for row in new_rows}
+        upserts = [row for key, row in new.items() if old.get(key) != row]
+        removed = [{c: old[key][c] for c in key_columns} for key in old if key not in new]
+        return upserts, removed
+
+    def set_rows(self, name: str, rows: List[dict], version: int = 0):
+        """Install a snapshot directly (tests and preloaded data) without touching the database"""
+        with self._lock:
+            self._history.pop(name, None)
+        self._install(name, version, rows)
+
+    # --- Writes ---
+
+    def invalidate(self, name: Optional[str] = None, broadcast: bool = True):
+        """Reload a table (or every table) on next read; broadcast tells the other nodes too"""
+        with self._lock:
+            self._stale.update([name] if name else self.tables)
+        if broadcast:
+            invalidation_bus.publish("reference_data", name or "*")
+
+    def record_change(self, name: str) -> Optional[int]:
+        """
+        Call after committing a write to a reference table: bumps its version and reloads it everywhere.
+        Failures are logged, never raised (the write has already committed); the TTL reload catches up.
+        """
+        version = None
+        try:
+            version = self._bump_version(name)
+        except Exception as e:
+            if logger:
+                logger.error(f"❌ Failed to bump reference data version for {name}: {str(e)}")
+        self.invalidate(name)
+        return version
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                name: {
+                    "version": snapshot.version,
+                    "rows": len(snapshot.rows),
+                    "age_seconds": round(time.time() - snapshot.loaded_at, 1),
+                    "stale": name in self._stale,
+                    "loads": self._loads.get(name, 0),
+                    "history": len(self._history.get(name, ()))
+                }
+                for name, snapshot in self._snapshots.items()
+            }
+
+
+# Application-wide registry
+reference_data = ReferenceDataRegistry()
+
+# Changes recorded on other nodes reload this node's snapshot (without re-publishing)
+invalidation_bus.subscribe("reference_data", lambda scope: reference_data.invalidate(None if scope == "*" else scope, broadcast=False))
@@ -0,0 +1,132 @@
+# Created: 2026-10-16 19:29:18
+# Last Modified: 2026-10-16 19:40:16
+# Author: Scott Cadreau
+
+# core/response_cache.py
+"""
+Pre-serialized JSON response bodies with ETag / If-None-Match support.
+
+/case_filter, /cases_by_status and /user_environment serve lists straight from their
+caches, but FastAPI still ran every hit through jsonable_encoder and json.dumps, and
+clients polling for changes downloaded the full list each time. json_response() encodes
+a response once, keeps the bytes and a content hash (the ETag) in the "response_bodies"
+cache namespace, and answers a matching If-None-Match with an empty 304.
+
+A stored body is only reused while the endpoint cache still returns the very same
+object it was encoded from: patch_*_cache(), invalidations and reloads all replace the
+cached list, so the next request re-encodes it and gets a new ETag. Responses built
+without a cache (e.g. /group_cases) are encoded per request but still get ETag/304.
+"""
+import hashlib
+import threading
+from typing import Any, Dict, Optional
+
+from fastapi import Request, Response
+
+from core.cache import get_cache
+from core.fast_json import dumps
+
+# Bodies are only reused while their source object is still cached, so the TTL is just a backstop
+_response_bodies = get_cache("response_bodies", ttl=12 * 3600, max_bytes=128 * 1024 * 1024)
+_counts = {"encoded": 0, "reused": 0, "not_modified": 0}
+_counts_lock = threading.Lock()
+
+# Clients should revalidate every time; a matching ETag costs an empty 304
+CACHE_CONTROL = "private, no-cache"
+
+
+class EncodedBody:
+    """An encoded response body, its ETag and the cached object it was encoded from"""
+    __slots__ = ("source", "body", "etag")
+
+    def __init__(self, source: Any, body: bytes, etag: str):
+        self.source = source
+        self.body = body
+        self.etag = etag
+
+    def __sizeof__(self) -> int:
+        # Only the bytes count against the budget - source is the endpoint cache's own object
+        return len(self.body) + 128
+
+
+def encode_json(content: Any) -> bytes:
+    """Encode content in the same wire format as FastAPI's default JSONResponse (core/fast_json.py)"""
+    return dumps(content)
+
+
+def make_etag(body: bytes) -> str:
+    return '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """If-None-Match uses weak comparison: W/"x" matches "x", and * matches anything"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return any(candidate.strip().removeprefix("W/") == etag for candidate in if_none_match.split(","))
+
+
+def _count(name: str):
+    with _counts_lock:
+        _counts[name] += 1
+
+
+def encode_response(content: Any, cache_key: Optional[str] = None, source: Any = None,
+                    tags: Optional[list] = None) -> EncodedBody:
+    """
+    Encode content, reusing the stored body when source is the object it was last encoded from.
+
+    Args:
+        content: The response payload
+        cache_key: Identifies the response (endpoint + everything the payload depends on); None disables reuse
+        source: The cached object content is built from (defaults to content itself)
+        tags: Tags for drop_response_bodies(), e.g. the endpoint cache's namespace and "user:<id>"
+    """
+    source = content if source is None else source
+    if cache_key is not None:
+        stored = _response_bodies.get(cache_key)
+        if stored is not None and stored.source is source:
+            _count("reused")
+            return stored
+
+    body = encode_json(content)
+    encoded = EncodedBody(source, body, make_etag(body))
+    _count("encoded")
+    if cache_key is not None:
+        _response_bodies.set(cache_key, encoded, tags=tags)
+    return encoded
+
+
+def json_response(request: Request, content: Any, cache_key: Optional[str] = None, source: Any = None,
+                  tags: Optional[list] = None) -> Response:
+    """
+    Build the JSON response for content with an ETag, or an empty 304 if the client already has it.
+
+    The returned response's body is the encoded payload (empty for a 304), so callers can log it
+    without serializing the payload again.
+    """
+    encoded = encode_response(content, cache_key, source, tags)
+    headers = {"ETag": encoded.etag, "Cache-Control": CACHE_CONTROL}
+    if etag_matches(request.headers.get("if-none-match"), encoded.etag):
+        _count("not_modified")
+        return Response(status_code=304, headers=headers)
+    return Response(content=encoded.body, media_type="application/json", headers=headers)
+
+
+def drop_response_bodies(tag: Optional[str] = None):
+    """
+    Drop stored bodies when their endpoint cache is cleared (all of them if tag is None).
+    Not needed for correctness - a replaced source is never reused - but frees the old lists sooner.
+    """
+    if tag is None:
+        _response_bodies.clear()
+    else:
+        _response_bodies.invalidate_tag(tag)
+
+
+def get_response_cache_stats() -> Dict[str, Any]:
+    """Bodies encoded vs reused and 304s served by this worker"""
+    with _counts_lock:
+        counts = dict(_counts)
+    return {**counts, "cache": _response_bodies.stats()}
@@ -0,0 +1,161 @@
+# Created: 2026-10-16 20:58:12
+# Last Modified: 2026-10-16 20:58:12
+# Author: Scott Cadreau
+
+# core/rewarm.py
+"""
+Coalesced background cache re-warming.
+
+Writes (create/update/delete case, bulk status updates) clear the cases caches and used
+to start a new thread per re-warm, each opening its own DB connection - a bulk update
+touching 200 users started 200 threads. Re-warms are now queued here by key
+("cases_by_status", "user_cases:<user_id>", ...) and run by a small fixed pool of worker
+threads after a debounce window. Requests for a key that is already queued collapse into
+the queued re-warm; a request for a key that is currently running queues one more run so
+the latest write is always reflected.
+
+Environment:
+    CACHE_REWARM_WORKERS      worker threads (default 4)
+    CACHE_REWARM_DEBOUNCE     seconds to wait before running a queued re-warm (default 2)
+    CACHE_REWARM_MAX_PENDING  queued keys before new re-warms are dropped (default 1000)
+"""
+import os
+import time
+import threading
+from typing import Any, Callable, Dict, Optional, Tuple
+
+try:
+    from utils.monitoring import REWARM_REQUESTS, REWARM_QUEUE_DEPTH, REWARM_DURATION, logger
+except ImportError:
+    REWARM_REQUESTS = REWARM_QUEUE_DEPTH = REWARM_DURATION = logger = None
+
+REWARM_WORKERS = int(os.environ.get("CACHE_REWARM_WORKERS", "4"))
+REWARM_DEBOUNCE = float(os.environ.get("CACHE_REWARM_DEBOUNCE", "2"))
+REWARM_MAX_PENDING = int(os.environ.get("CACHE_REWARM_MAX_PENDING", "1000"))
+
+
+class RewarmScheduler:
+    """
+    Debounced, de-duplicated re-warm queue served by a bounded worker pool.
+
+    Usage:
+        rewarm_scheduler.schedule("user_cases:123", rewarm_user, "123", kind="user_cases")
+    """
+
+    def __init__(self, workers: int = REWARM_WORKERS, debounce: float = REWARM_DEBOUNCE,
+                 max_pending: int = REWARM_MAX_PENDING):
+        self.workers = max(1, workers)
+        self.debounce = debounce
+        self.max_pending = max_pending
+        # key -> (due_time, kind, func, args)
+        self._pending: Dict[str, Tuple[float, str, Callable, tuple]] = {}
+        self._running: Dict[str, float] = {}
+        self._cond = threading.Condition()
+        self._threads = []
+        self._counts = {"scheduled": 0, "collapsed": 0, "dropped": 0, "completed": 0, "failed": 0}
+
+    def schedule(self, key: str, func: Callable[..., Any], *args, kind: str = "default") -> str:
+        """
+        Queue func(*args) to run after the debounce window unless key is already queued.
+
+        Returns:
+            "scheduled", "collapsed" (merged into the queued re-warm) or "dropped" (queue full)
+        """
+        with self._cond:
+            if key in self._pending:
+                outcome = "collapsed"
+            elif len(self._pending) >= self.max_pending:
+                outcome = "dropped"
+            else:
+                self._pending[key] = (time.time() + self.debounce, kind, func, args)
+                outcome = "scheduled"
+                self._ensure_workers()
+                self._cond.notify_all()
+            self._counts[outcome] += 1
+            self._update_depth()
+
+        if REWARM_REQUESTS:
+            REWARM_REQUESTS.labels(kind=kind, outcome=outcome).inc()
+        if outcome == "dropped" and logger:
+            logger.warning(f"⚠️ Re-warm queue full ({self.max_pending}) - dropped {key}, it will load on demand")
+        return outcome
+
+    def _ensure_workers(self):
+        """Start the worker pool on first use. Caller holds the condition."""
+        while len(self._threads) < self.workers:
+            thread = threading.Thread(target=self._worker, name=f"cache-rewarm-{len(self._threads)}", daemon=True)
+            self._threads.append(thread)
+            thread.start()
+
+    def _next_due(self) -> Tuple[Optional[str], Optional[float]]:
+        """Pick the earliest due key that isn't already running. Caller holds the condition."""
+        best_key, best_due = None, None
+        for key, (due, _kind, _func, _args) in self._pending.items():
+            if key in self._running:
+                continue
+            if best_due is None or due < best_due:
+                best_key, best_due = key, due
+        return best_key, best_due
+
+    def _worker(self):
+        while True:
+            with self._cond:
+                while True:
+                    key, due = self._next_due()
+                    if key is not None and due <= time.time():
+                        break
+                    self._cond.wait(None if key is None else due - time.time())
+                _due, kind, func, args = self._pending.pop(key)
+                self._running[key] = time.time()
+                self._update_depth()
+
+            start = time.time()
+            try:
+                func(*args)
+                outcome = "completed"
+            except Exception as e:
+                outcome = "failed"
+                if logger:
+                    logger.error(f"❌ Cache re-warm {key} failed: {str(e)}")
+            duration = time.time() - start
+            if REWARM_DURATION:
+                REWARM_DURATION.labels(kind=kind).observe(duration)
+            if REWARM_REQUESTS:
+                REWARM_REQUESTS.labels(kind=kind, outcome=outcome).inc()
+
+            with self._cond:
+                self._running.pop(key, None)
+                self._counts[outcome] += 1
+                # A re-warm for this key may have been queued while we ran
+                self._cond.notify_all()
+
+    def _update_depth(self):
+        if REWARM_QUEUE_DEPTH:
+            REWARM_QUEUE_DEPTH.set(len(self._pending))
+
+    def wait_idle(self, timeout: float = 30.0) -> bool:
+        """Block until nothing is queued or running (tests and shutdown)"""
+        deadline = time.time() + timeout
+        with self._cond:
+            while self._pending or self._running:
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    return False
+                self._cond.wait(min(remaining, 0.05))
+            return True
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get queue depth, running re-warms and lifetime outcome counts"""
+        with self._cond:
+            return {
+                "workers": self.workers,
+                "debounce_seconds": self.debounce,
+                "max_pending": self.max_pending,
+                "queue_depth": len(self._pending),
+                "running": sorted(self._running),
+                **self._counts
+            }
+
+
+# Application-wide re-warm scheduler
+rewarm_scheduler = RewarmScheduler()
@@ -0,0 +1,238 @@
+# Created: 2026-10-16 19:41:05
+# Last Modified: 2026-10-16 19:41:05
+# Author: Scott Cadreau
+
+# core/startup.py
+"""
+Staged, parallel application startup.
+
+main.py used to run every warmer (secrets, DB pool, cases cache, DEKs, ...) one after
+another at import time, so a worker restart blocked on dozens of KMS / Secrets Manager /
+database calls before it could answer anything. The orchestrator instead runs each warmer
+as a phase in its own background thread as soon as the phases it depends on are done,
+with a per-phase timeout, and records how long every phase took.
+
+Phases marked critical gate readiness: /ready returns 503 until they have all succeeded, so
+the load balancer only adds the node once the critical caches are warm. If a critical phase
+fails or times out, the node still becomes ready (degraded) after STARTUP_READY_GRACE seconds
+so a broken warmer can't keep the whole fleet out of rotation - every cache loads on demand.
+"""
+import os
+import time
+import threading
+from typing import Callable, Dict, Any, List, Optional
+
+try:
+    from utils.monitoring import logger
+except ImportError:
+    logger = None
+
+STARTUP_READY_GRACE = float(os.environ.get("STARTUP_READY_GRACE", "120"))  # Seconds before a failed critical phase stops blocking readiness
+
+# Phase states
+PENDING = "pending"
+RUNNING = "running"
+SUCCESS = "success"
+FAILED = "failed"
+TIMEOUT = "timeout"
+SKIPPED = "skipped"
+_DONE_STATES = (SUCCESS, FAILED, TIMEOUT, SKIPPED)
+
+
+class StartupOrchestrator:
+    """
+    Runs startup warmers concurrently, respecting dependencies and timeouts.
+
+    Usage:
+        startup = StartupOrchestrator()
+        startup.add_phase("secrets", warm_all_secrets, timeout=20, critical=True)
+        startup.add_phase("db_pool", prewarm_connection_pool, depends_on=["secrets"], critical=True)
+        startup.start()   # returns immediately
+    """
+
+    def __init__(self, ready_grace: float = STARTUP_READY_GRACE):
+        self.ready_grace = ready_grace
+        self._phases: Dict[str, Dict[str, Any]] = {}
+        self._order: List[str] = []
+        self._cond = threading.Condition()
+        self._started_at: Optional[float] = None
+        self._ready_at: Optional[float] = None
+
+    def add_phase(self, name: str, func: Callable[[], Any], timeout: float = 30.0,
+                  critical: bool = False, depends_on: Optional[List[str]] = None,
+                  summarize: Optional[Callable[[Any], Any]] = None):
+        """
+        Register a startup phase.
+
+        Args:
+            name: Phase name shown in /ready
+            func: Warmer to run (no arguments); its return value is passed to summarize
+            timeout: Seconds to wait for the phase before marking it timed out
+            critical: Whether readiness waits for this phase
+            depends_on: Phases that must finish (any outcome) before this one starts
+            summarize: Optional callable turning the warmer's result into a short detail for /ready
+        """
+        for dependency in depends_on or []:
+            if dependency not in self._phases:
+                raise ValueError(f"Startup phase '{name}' depends on unknown phase '{dependency}'")
+
+        self._phases[name] = {
+            "func": func,
+            "timeout": timeout,
+            "critical": critical,
+            "depends_on": list(depends_on or []),
+            "summarize": summarize,
+            "status": PENDING,
+            "started_at": None,
+            "finished_at": None,
+            "duration_seconds": None,
+            "detail": None,
+            "error": None
+        }
+        self._order.append(name)
+
+    def start(self) -> threading.Thread:
+        """Start all phases in the background; returns the coordinator thread"""
+        self._started_at = time.time()
+        coordinator = threading.Thread(target=self._run, name="startup-orchestrator", daemon=True)
+        coordinator.start()
+        return coordinator
+
+    def _run(self):
+        """Launch each phase once its dependencies are done, and enforce timeouts"""
+        if logger:
+            logger.info(f"🚀 Startup orchestrator running {len(self._order)} phases in parallel")
+
+        with self._cond:
+            while True:
+                now = time.time()
+                for name in self._order:
+                    phase = self._phases[name]
+                    if phase["status"] == PENDING and all(
+                        self._phases[dep]["status"] in _DONE_STATES for dep in phase["depends_on"]
+                    ):
+                        self._launch(name, phase)
+                    elif phase["status"] == RUNNING and now - phase["started_at"] >= phase["timeout"]:
+                        # Can't kill the thread - stop waiting for it and let it finish in the background
+                        self._finish(phase, TIMEOUT, error=f"Timed out after {phase['timeout']}s")
+                        if logger:
+                            logger.warning(f"⏱️ Startup phase '{name}' timed out after {phase['timeout']}s - continuing without it")
+
+                if all(phase["status"] in _DONE_STATES for phase in self._phases.values()):
+                    break
+                self._cond.wait(0.1)
+
+        self._update_ready()
+        if logger:
+            summary = ", ".join(f"{name}={self._phases[name]['status']} ({self._phases[name]['duration_seconds']}s)" for name in self._order)
+            logger.info(f"✅ Startup phases finished in {time.time() - self._started_at:.2f}s: {summary}")
+
+    def _launch(self, name: str, phase: Dict[str, Any]):
+        """Start one phase thread. Caller holds the condition."""
+        phase["status"] = RUNNING
+        phase["started_at"] = time.time()
+        threading.Thread(target=self._run_phase, args=(name, phase), name=f"startup-{name}", daemon=True).start()
+
+    def _run_phase(self, name: str, phase: Dict[str, Any]):
+        """Thread body: run the warmer and record its outcome"""
+        try:
+            result = phase["func"]()
+            detail = phase["summarize"](result) if phase["summarize"] else None
+            with self._cond:
+                if phase["status"] == RUNNING:
+                    self._finish(phase, SUCCESS, detail=detail)
+                self._cond.notify_all()
+        except Exception as e:
+            if logger:
+                logger.error(f"Startup phase '{name}' failed: {str(e)}")
+            with self._cond:
+                if phase["status"] == RUNNING:
+                    self._finish(phase, FAILED, error=str(e))
+                self._cond.notify_all()
+        self._update_ready()
+
+    def _finish(self, phase: Dict[str, Any], status: str, detail: Any = None, error: Optional[str] = None):
+        """Record a phase outcome. Caller holds the condition."""
+        phase["status"] = status
+        phase["finished_at"] = time.time()
+        phase["duration_seconds"] = round(phase["finished_at"] - phase["started_at"], 3)
+        phase["detail"] = detail
+        phase["error"] = error
+
+    def record_phase(self, name: str, started_at: float, status: str = SUCCESS,
+                     critical: bool = False, detail: Any = None, error: Optional[str] = None):
+        """
+        Record a phase that ran outside the orchestrator (e.g. the async DB pool, which has
+        to be opened on the serving event loop in the FastAPI startup hook).
+        """
+        with self._cond:
+            phase = self._phases.get(name)
+            if phase is None:
+                phase = {"func": None, "timeout": None, "critical": critical, "depends_on": [], "summarize": None}
+                self._phases[name] = phase
+                self._order.append(name)
+            phase["started_at"] = started_at
+            self._finish(phase, status, detail=detail, error=error)
+            self._cond.notify_all()
+        self._update_ready()
+
+    def _critical_phases(self) -> List[Dict[str, Any]]:
+        return [phase for phase in self._phases.values() if phase["critical"]]
+
+    def _update_ready(self):
+        """Latch the ready time once every critical phase has succeeded"""
+        if self._ready_at is None and self._started_at is not None:
+            if all(phase["status"] == SUCCESS for phase in self._critical_phases()):
+                self._ready_at = time.time()
+                if logger:
+                    logger.info(f"🟢 Critical startup phases warm - ready for traffic after {self._ready_at - self._started_at:.2f}s")
+
+    def is_ready(self) -> bool:
+        """True once critical phases are warm (or they have all finished and the grace period is over)"""
+        if self._started_at is None:
+            return False
+        self._update_ready()
+        if self._ready_at is not None:
+            return True
+
+        critical = self._critical_phases()
+        all_done = all(phase["status"] in _DONE_STATES for phase in critical)
+        return all_done and time.time() - self._started_at >= self.ready_grace
+
+    def get_status(self) -> Dict[str, Any]:
+        """
+        Get the startup report for /ready.
+
+        Returns:
+            Dictionary with overall readiness and per-phase status and durations
+        """
+        with self._cond:
+            phases = {
+                name: {
+                    "status": phase["status"],
+                    "critical": phase["critical"],
+                    "duration_seconds": phase["duration_seconds"] if phase["status"] in _DONE_STATES
+                                        else (round(time.time() - phase["started_at"], 3) if phase["started_at"] else None),
+                    "depends_on": phase["depends_on"],
+                    "detail": phase["detail"],
+                    "error": phase["error"]
+                }
+                for name, phase in ((name, self._phases[name]) for name in self._order)
+            }
+
+        ready = self.is_ready()
+        degraded = ready and any(
+            phase["status"] != SUCCESS for phase in self._critical_phases()
+        )
+        return {
+            "status": "ready" if ready else "starting",
+            "ready": ready,
+            "degraded": degraded,
+            "uptime_seconds": round(time.time() - self._started_at, 3) if self._started_at else 0,
+            "time_to_ready_seconds": round(self._ready_at - self._started_at, 3) if self._ready_at else None,
+            "phases": phases
+        }
+
+
+# Application-wide orchestrator, populated and started by main.py
+startup_orchestrator = StartupOrchestrator()
@@ -0,0 +1,40 @@
+-- Created: 2026-10-16 20:07:30
+-- Last Modified: 2026-10-16 20:07:30
+-- Author: Scott Cadreau
+--
+-- PHI Binary Storage Database Schema
+-- Adds VARBINARY columns holding encrypted PHI as a versioned binary envelope (see utils/phi_encryption.py):
+--   format byte (0x01 = AES-256-GCM) | iv (12 bytes) | ciphertext | auth tag (16 bytes)
+-- This is about a quarter smaller than the legacy base64 text and needs no base64 decode on read.
+-- When a <field>_enc column is set its text column is NULL; readers prefer <field>_enc and fall back
+-- to the text column, so legacy rows keep working until utils/migrate_phi_binary.py has converted them.
+
+-- Binary envelope columns on cases
+-- Note: deleted_cases gets the same columns in the same order because archiving copies rows with INSERT ... SELECT *
+SET @column_check = (
+    SELECT COUNT(*) FROM information_schema.COLUMNS
+    WHERE TABLE_SCHEMA = DATABASE()
+    AND TABLE_NAME = 'cases'
+    AND COLUMN_NAME = 'patient_first_enc'
+);
+
+SET @sql = IF(@column_check = 0,
+    'ALTER TABLE cases ADD COLUMN patient_first_enc VARBINARY(512) NULL COMMENT ''Encrypted patient_first as a binary envelope (format | iv | ciphertext | tag)'', ADD COLUMN patient_last_enc VARBINARY(512) NULL COMMENT ''Encrypted patient_last as a binary envelope (format | iv | ciphertext | tag)'', ADD COLUMN ins_provider_enc VARBINARY(1024) NULL COMMENT ''Encrypted ins_provider as a binary envelope (format | iv | ciphertext | tag)''',
+    'SELECT ''Binary envelope columns already exist in cases'' AS message');
+PREPARE stmt FROM @sql;
+EXECUTE stmt;
+DEALLOCATE PREPARE stmt;
+
+SET @column_check = (
+    SELECT COUNT(*) FROM information_schema.COLUMNS
+    WHERE TABLE_SCHEMA = DATABASE()
+    AND TABLE_NAME = 'deleted_cases'
+    AND COLUMN_NAME = 'patient_first_enc'
+);
+
+SET @sql = IF(@column_check = 0,
+    'ALTER TABLE deleted_cases ADD COLUMN patient_first_enc VARBINARY(512) NULL COMMENT ''Encrypted patient_first as a binary envelope (format | iv | ciphertext | tag)'', ADD COLUMN patient_last_enc VARBINARY(512) NULL COMMENT ''Encrypted patient_last as a binary envelope (format | iv | ciphertext | tag)'', ADD COLUMN ins_provider_enc VARBINARY(1024) NULL COMMENT ''Encrypted ins_provider as a binary envelope (format | iv | ciphertext | tag)''',
+    'SELECT ''Binary envelope columns already exist in deleted_cases'' AS message');
+PREPARE stmt FROM @sql;
+EXECUTE stmt;
+DEALLOCATE PREPARE stmt;
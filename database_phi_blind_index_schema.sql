@@ -0,0 +1,86 @@
+-- Created: 2026-10-16 19:52:00
+-- Last Modified: 2026-10-16 19:52:00
+-- Author: Scott Cadreau
+--
+-- PHI Blind Index Database Schema
+-- Adds keyed HMAC blind index columns for encrypted patient names (see utils/phi_encryption.py)
+-- so duplicate checks and name lookups on encrypted cases are index seeks instead of decrypting.
+-- Run utils/backfill_phi_blind_index.py afterwards to fill the columns for existing encrypted cases
+-- (with --recompute for users whose key was rotated before encrypted_bidx_key existed).
+
+-- Blind index key per user, sealed under the current DEK (format | iv | ciphertext | tag)
+-- NULL until the user's first key rotation: until then the key is derived from the DEK. Rotations
+-- carry it over to the new DEK so blind indexes stay valid across key versions.
+SET @column_check = (
+    SELECT COUNT(*) FROM information_schema.COLUMNS 
+    WHERE TABLE_SCHEMA = DATABASE() 
+    AND TABLE_NAME = 'user_encryption_keys' 
+    AND COLUMN_NAME = 'encrypted_bidx_key'
+);
+
+SET @sql = IF(@column_check = 0,
+    'ALTER TABLE user_encryption_keys ADD COLUMN encrypted_bidx_key VARBINARY(64) NULL COMMENT ''Blind index HMAC key sealed under the current DEK; stable across DEK rotations'' AFTER encrypted_dek',
+    'SELECT ''Column encrypted_bidx_key already exists in user_encryption_keys'' AS message');
+PREPARE stmt FROM @sql;
+EXECUTE stmt;
+DEALLOCATE PREPARE stmt;
+
+-- Blind index columns on cases
+-- Note: deleted_cases gets the same columns in the same order because archiving copies rows with INSERT ... SELECT *
+SET @column_check = (
+    SELECT COUNT(*) FROM information_schema.COLUMNS 
+    WHERE TABLE_SCHEMA = DATABASE() 
+    AND TABLE_NAME = 'cases' 
+    AND COLUMN_NAME = 'patient_first_bidx'
+);
+
+SET @sql = IF(@column_check = 0,
+    'ALTER TABLE cases ADD COLUMN patient_first_bidx CHAR(64) NULL COMMENT ''HMAC-SHA256 blind index of normalized patient_first (per-user key derived from DEK)'', ADD COLUMN patient_last_bidx CHAR(64) NULL COMMENT ''HMAC-SHA256 blind index of normalized patient_last (per-user key derived from DEK)''',
+    'SELECT ''Blind index columns already exist in cases'' AS message');
+PREPARE stmt FROM @sql;
+EXECUTE stmt;
+DEALLOCATE PREPARE stmt;
+
+SET @column_check = (
+    SELECT COUNT(*) FROM information_schema.COLUMNS 
+    WHERE TABLE_SCHEMA = DATABASE() 
+    AND TABLE_NAME = 'deleted_cases' 
+    AND COLUMN_NAME = 'patient_first_bidx'
+);
+
+SET @sql = IF(@column_check = 0,
+    'ALTER TABLE deleted_cases ADD COLUMN patient_first_bidx CHAR(64) NULL COMMENT ''HMAC-SHA256 blind index of normalized patient_first (per-user key derived from DEK)'', ADD COLUMN patient_last_bidx CHAR(64) NULL COMMENT ''HMAC-SHA256 blind index of normalized patient_last (per-user key derived from DEK)''',
+    'SELECT ''Blind index columns already exist in deleted_cases'' AS message');
+PREPARE stmt FROM @sql;
+EXECUTE stmt;
+DEALLOCATE PREPARE stmt;
+
+-- Composite index for duplicate checks: user + date + name
+SET @index_check = (
+    SELECT COUNT(*) FROM information_schema.STATISTICS 
+    WHERE TABLE_SCHEMA = DATABASE() 
+    AND TABLE_NAME = 'cases' 
+    AND INDEX_NAME = 'idx_cases_user_date_bidx'
+);
+
+SET @sql = IF(@index_check = 0,
+    'ALTER TABLE cases ADD INDEX idx_cases_user_date_bidx (user_id, case_date, patient_last_bidx, patient_first_bidx)',
+    'SELECT ''Index idx_cases_user_date_bidx already exists on cases'' AS message');
+PREPARE stmt FROM @sql;
+EXECUTE stmt;
+DEALLOCATE PREPARE stmt;
+
+-- Composite index for patient name lookups across dates
+SET @index_check = (
+    SELECT COUNT(*) FROM information_schema.STATISTICS 
+    WHERE TABLE_SCHEMA = DATABASE() 
+    AND TABLE_NAME = 'cases' 
+    AND INDEX_NAME = 'idx_cases_user_last_bidx'
+);
+
+SET @sql = IF(@index_check = 0,
+    'ALTER TABLE cases ADD INDEX idx_cases_user_last_bidx (user_id, patient_last_bidx, patient_first_bidx)',
+    'SELECT ''Index idx_cases_user_last_bidx already exists on cases'' AS message');
+PREPARE stmt FROM @sql;
+EXECUTE stmt;
+DEALLOCATE PREPARE stmt;
@@ -0,0 +1,50 @@
+-- Created: 2026-10-16 19:56:03
+-- Last Modified: 2026-10-16 20:35:32
+-- Author: Scott Cadreau
+--
+-- PHI Key Rotation and Bulk Encryption Database Schema
+-- Keeps every version of a user's DEK so rotation never orphans existing ciphertext, and
+-- stores checkpoints for the resumable bulk encryption / re-encryption job (utils/phi_bulk_encryption.py).
+
+-- All key versions per user; user_encryption_keys keeps pointing at the current one
+CREATE TABLE IF NOT EXISTS user_encryption_key_versions (
+    user_id VARCHAR(100) NOT NULL,
+    key_version INT NOT NULL COMMENT 'Matches user_encryption_keys.key_version when this version was current',
+    encrypted_dek TEXT NOT NULL COMMENT 'Base64-encoded DEK encrypted by AWS KMS master key',
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP COMMENT 'When this key version was generated',
+    retired_at TIMESTAMP NULL COMMENT 'Set once re-encryption has moved every case off this version',
+    PRIMARY KEY (user_id, key_version),
+    FOREIGN KEY (user_id) REFERENCES user_profile(user_id) ON DELETE CASCADE
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci
+COMMENT='Every DEK version per user, so cases encrypted before a rotation stay readable';
+
+-- Record the keys in use today as their current version
+INSERT IGNORE INTO user_encryption_key_versions (user_id, key_version, encrypted_dek, created_at)
+SELECT user_id, key_version, encrypted_dek, COALESCE(rotated_at, created_at)
+FROM user_encryption_keys;
+
+-- Checkpoints for bulk encryption (legacy plaintext cases) and re-encryption (after rotation)
+CREATE TABLE IF NOT EXISTS phi_encryption_jobs (
+    job_id VARCHAR(36) PRIMARY KEY,
+    job_type VARCHAR(20) NOT NULL COMMENT 'encrypt = plaintext cases, reencrypt = cases on an earlier key version',
+    user_id VARCHAR(100) NOT NULL COMMENT 'Owner whose cases the job processes',
+    status VARCHAR(20) NOT NULL DEFAULT 'pending' COMMENT 'pending, running, pausing (pause requested), paused, completed, failed',
+    rotate_key TINYINT DEFAULT 0 COMMENT 'Generate a new key version before re-encrypting',
+    key_version INT NULL COMMENT 'Key version the job encrypts to (fixed when the job first runs)',
+    last_case_id VARCHAR(100) NOT NULL DEFAULT '' COMMENT 'Checkpoint: every case up to this case_id is done',
+    rows_scanned INT NOT NULL DEFAULT 0,
+    rows_updated INT NOT NULL DEFAULT 0,
+    rows_skipped INT NOT NULL DEFAULT 0 COMMENT 'Already current, or changed by the application while the job ran',
+    rows_failed INT NOT NULL DEFAULT 0,
+    chunk_size INT NOT NULL DEFAULT 200,
+    rows_per_sec DECIMAL(10,2) NOT NULL DEFAULT 500 COMMENT 'Throttle target',
+    created_by VARCHAR(100) NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    started_at TIMESTAMP NULL,
+    updated_at TIMESTAMP NULL,
+    finished_at TIMESTAMP NULL,
+    error TEXT NULL,
+    INDEX idx_user_status (user_id, status),
+    INDEX idx_created_at (created_at)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci
+COMMENT='Resumable bulk PHI encryption and key rotation jobs';
@@ -1,5 +1,5 @@
 # Created: 2025-09-11 
-# Last Modified: 2025-09-11 22:54:16
+# Last Modified: 2026-10-16 19:45:37
 # Author: Scott Cadreau
 
 # endpoints/admin/cache_management.py
@@ -396,6 +396,12 @@ def get_comprehensive_cache_stats(request: Request) -> Dict[str, Any]:
     **Response:**
     - `timestamp`: ISO timestamp of the statistics
     - `caches`: Object containing stats for each cache type
+    - `bounded_caches`: Bytes used vs budget, hit rate and evictions per cache namespace
+    - `rewarm_queue`: Queued/running background re-warms and how many were collapsed or dropped
+    - `invalidation_bus`: This node's position in the cluster invalidation log and events published/received
+    - `response_bodies`: Encoded response bodies reused vs re-encoded and 304 Not Modified responses served
+    - `reference_data`: Version, row count and age of each in-memory lookup table snapshot
+    - `access_tracking`: Most requested keys per cache and hit rates of warmed vs on-demand keys
     - `overall_health`: Summary of cache system health
     
     **Example Response:**
@@ -421,6 +427,21 @@ def get_comprehensive_cache_stats(request: Request) -> Dict[str, Any]:
                 }
             }
         },
+        "bounded_caches": {
+            "total_bytes": 18874368,
+            "total_max_bytes": 272629760,
+            "total_entries": 412,
+            "namespaces": {
+                "user_cases": {
+                    "entries": 310,
+                    "bytes": 15728640,
+                    "max_bytes": 134217728,
+                    "ttl_seconds": 900,
+                    "hit_rate_percent": 91.4,
+                    "evictions": {"size": 0}
+                }
+            }
+        },
         "overall_health": "healthy"
     }
     ```
@@ -458,6 +479,54 @@ def get_comprehensive_cache_stats(request: Request) -> Dict[str, Any]:
             logger.warning(f"Failed to get user environment cache stats: {str(e)}")
             stats["caches"]["user_environment"] = {"error": str(e)}
         
+        # Size, hit rate and evictions for every bounded cache namespace (core/cache.py)
+        try:
+            from core.cache import get_all_cache_stats
+            stats["bounded_caches"] = get_all_cache_stats()
+        except Exception as e:
+            logger.warning(f"Failed to get bounded cache stats: {str(e)}")
+            stats["bounded_caches"] = {"error": str(e)}
+        
+        # Background re-warm queue (core/rewarm.py)
+        try:
+            from core.rewarm import rewarm_scheduler
+            stats["rewarm_queue"] = rewarm_scheduler.get_stats()
+        except Exception as e:
+            logger.warning(f"Failed to get re-warm queue stats: {str(e)}")
+            stats["rewarm_queue"] = {"error": str(e)}
+        
+        # Cluster-wide invalidation bus (core/invalidation_bus.py)
+        try:
+            from core.invalidation_bus import invalidation_bus
+            stats["invalidation_bus"] = invalidation_bus.get_stats()
+        except Exception as e:
+            logger.warning(f"Failed to get invalidation bus stats: {str(e)}")
+            stats["invalidation_bus"] = {"error": str(e)}
+        
+        # Pre-encoded list responses and 304s (core/response_cache.py)
+        try:
+            from core.response_cache import get_response_cache_stats
+            stats["response_bodies"] = get_response_cache_stats()
+        except Exception as e:
+            logger.warning(f"Failed to get response body cache stats: {str(e)}")
+            stats["response_bodies"] = {"error": str(e)}
+        
+        # Reference data snapshots and their versions (core/reference_data.py)
+        try:
+            from core.reference_data import reference_data
+            stats["reference_data"] = reference_data.get_stats()
+        except Exception as e:
+            logger.warning(f"Failed to get reference data stats: {str(e)}")
+            stats["reference_data"] = {"error": str(e)}
+        
+        # Decaying-LFU access counts and warmed vs on-demand hit rates (core/access_tracker.py)
+        try:
+            from core.access_tracker import get_all_access_stats
+            stats["access_tracking"] = get_all_access_stats()
+        except Exception as e:
+            logger.warning(f"Failed to get access tracking stats: {str(e)}")
+            stats["access_tracking"] = {"error": str(e)}
+        
         # Determine overall health
         healthy_caches = 0
         total_caches = len([k for k in stats["caches"].keys() if not stats["caches"][k].get("error")])
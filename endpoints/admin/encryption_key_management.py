@@ -1,5 +1,5 @@
 # Created: 2025-10-19
-# Last Modified: 2025-10-19 23:40:46
+# Last Modified: 2026-10-16 20:35:12
 # Author: Scott Cadreau
 
 # endpoints/admin/encryption_key_management.py
@@ -16,6 +16,17 @@ from utils.phi_encryption import (
     get_cache_stats,
     clear_dek_cache
 )
+from utils.phi_bulk_encryption import (
+    create_job,
+    claim_job,
+    get_job,
+    is_job_running_here,
+    request_pause,
+    start_job_thread,
+    JOB_TYPES,
+    DEFAULT_CHUNK_SIZE,
+    DEFAULT_ROWS_PER_SEC
+)
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
@@ -567,3 +578,341 @@ def get_encryption_audit_log(
         if conn:
             close_db_connection(conn)
 
+
+
+def _format_job(job: Dict[str, Any]) -> Dict[str, Any]:
+    """Job row as a JSON-friendly dict"""
+    job = dict(job)
+    for field in ('created_at', 'started_at', 'updated_at', 'finished_at'):
+        if job.get(field):
+            job[field] = job[field].isoformat()
+    if job.get('rows_per_sec') is not None:
+        job['rows_per_sec'] = float(job['rows_per_sec'])
+    job['rotate_key'] = bool(job.get('rotate_key'))
+    return job
+
+
+@router.post("/admin/encryption/bulk-jobs")
+@track_business_operation("admin", "encryption_bulk_job_start")
+def start_bulk_encryption_job(
+    request: Request,
+    user_id: str = Query(..., description="The user whose cases the job processes"),
+    admin_user_id: str = Query(..., description="Admin user ID performing this operation"),
+    mode: str = Query(..., description="encrypt (plaintext cases) or reencrypt (cases on an earlier key version)"),
+    rotate_key: bool = Query(False, description="Generate a new key version before re-encrypting"),
+    rows_per_sec: float = Query(DEFAULT_ROWS_PER_SEC, description="Throttle target", gt=0, le=10000),
+    chunk_size: int = Query(DEFAULT_CHUNK_SIZE, description="Cases per chunk/commit", ge=1, le=5000)
+) -> Dict[str, Any]:
+    """
+    Start a resumable bulk encryption or key rotation job - administrative endpoint.
+    
+    The job runs in the background on this server (utils/phi_bulk_encryption.py): it walks
+    the user's cases in case_id order, commits each chunk together with a checkpoint, and
+    is throttled to `rows_per_sec` so interactive traffic is not affected.
+    
+    **Administrative Access Required:**
+    - Requesting user must have user_type >= 100
+    - Operation is logged for HIPAA compliance
+    
+    **Parameters:**
+    - `user_id`: The user whose cases the job processes (required)
+    - `admin_user_id`: Admin user ID performing this operation (required)
+    - `mode`: `encrypt` or `reencrypt` (required)
+    - `rotate_key`: Rotate the user's key first (reencrypt only, default: false)
+    - `rows_per_sec`: Throttle target (default: 500)
+    - `chunk_size`: Cases per chunk/commit (default: 200)
+    
+    **Example Response:**
+    ```json
+    {
+        "success": true,
+        "job": {
+            "job_id": "0f8c...",
+            "job_type": "reencrypt",
+            "user_id": "USER123",
+            "status": "pending",
+            "rotate_key": true,
+            "last_case_id": "",
+            "rows_scanned": 0
+        },
+        "message": "Job started - poll GET /admin/encryption/bulk-jobs/{job_id} for progress"
+    }
+    ```
+    
+    **HTTP Status Codes:**
+    - `200`: Success - Job started
+    - `400`: Bad Request - Invalid parameters
+    - `403`: Forbidden - Insufficient privileges
+    - `404`: Not Found - User not found
+    - `409`: Conflict - The user already has an active job
+    - `500`: Internal server error - Job could not be started
+    
+    **Notes:**
+    - Pause with POST `/admin/encryption/bulk-jobs/{job_id}/pause`, continue with `/resume`
+    - A job interrupted by a restart is resumed the same way, from its last checkpoint
+    - A completed re-encryption retires the user's earlier key versions
+    """
+    conn = None
+    
+    try:
+        # Input validation
+        if not user_id or not user_id.strip():
+            raise HTTPException(status_code=400, detail={"error": "Invalid user_id parameter"})
+        if not admin_user_id or not admin_user_id.strip():
+            raise HTTPException(status_code=400, detail={"error": "Invalid admin_user_id parameter"})
+        if mode not in JOB_TYPES:
+            raise HTTPException(status_code=400, detail={"error": f"mode must be one of: {', '.join(JOB_TYPES)}"})
+        if rotate_key and mode != 'reencrypt':
+            raise HTTPException(status_code=400, detail={"error": "rotate_key requires mode=reencrypt"})
+        
+        user_id = user_id.strip()
+        admin_user_id = admin_user_id.strip()
+        
+        # Connect to database
+        conn = get_db_connection()
+        
+        # Validate admin access
+        validate_admin_access(admin_user_id, conn)
+        
+        # Validate target user exists
+        with conn.cursor(pymysql.cursors.DictCursor) as cursor:
+            cursor.execute(
+                "SELECT user_id FROM user_profile WHERE user_id = %s AND active = 1",
+                (user_id,)
+            )
+            if not cursor.fetchone():
+                raise HTTPException(status_code=404, detail={"error": f"Target user not found: {user_id}"})
+        
+        try:
+            job = create_job(conn, user_id, mode, rotate_key=rotate_key, chunk_size=chunk_size,
+                             rows_per_sec=rows_per_sec, created_by=admin_user_id)
+        except ValueError as e:
+            raise HTTPException(status_code=409, detail={"error": str(e)})
+        
+        logger.info(f"Admin {admin_user_id} started {mode} job {job['job_id']} for user {user_id}")
+        start_job_thread(job['job_id'])
+        
+        return {
+            "success": True,
+            "job": _format_job(job),
+            "message": f"Job started - poll GET /admin/encryption/bulk-jobs/{job['job_id']} for progress"
+        }
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error starting bulk encryption job for user {user_id}: {str(e)}")
+        raise HTTPException(
+            status_code=500,
+            detail={"error": f"Failed to start bulk encryption job: {str(e)}"}
+        )
+    finally:
+        if conn:
+            close_db_connection(conn)
+
+
+@router.get("/admin/encryption/bulk-jobs/{job_id}")
+@track_business_operation("admin", "encryption_bulk_job_status")
+def get_bulk_encryption_job(
+    request: Request,
+    job_id: str,
+    admin_user_id: str = Query(..., description="Admin user ID requesting job status")
+) -> Dict[str, Any]:
+    """
+    Get the progress of a bulk encryption job - administrative endpoint.
+    
+    **Administrative Access Required:**
+    - Requesting user must have user_type >= 100
+    
+    **Parameters:**
+    - `job_id`: The job to report on (path)
+    - `admin_user_id`: Admin user ID requesting job status (required)
+    
+    **Response:**
+    - `job`: The job row - status, key_version, last_case_id checkpoint and the
+      rows_scanned / rows_updated / rows_skipped / rows_failed counters
+    - `running_here`: Whether this server is executing the job
+    
+    **HTTP Status Codes:**
+    - `200`: Success - Job returned
+    - `403`: Forbidden - Insufficient privileges
+    - `404`: Not Found - Job not found
+    - `500`: Internal server error - Failed to read the job
+    """
+    conn = None
+    
+    try:
+        # Input validation
+        if not admin_user_id or not admin_user_id.strip():
+            raise HTTPException(status_code=400, detail={"error": "Invalid admin_user_id parameter"})
+        
+        admin_user_id = admin_user_id.strip()
+        
+        # Connect to database
+        conn = get_db_connection()
+        
+        # Validate admin access
+        validate_admin_access(admin_user_id, conn)
+        
+        job = get_job(conn, job_id)
+        if not job:
+            raise HTTPException(status_code=404, detail={"error": f"Job not found: {job_id}"})
+        
+        return {
+            "job": _format_job(job),
+            "running_here": is_job_running_here(job_id)
+        }
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error retrieving bulk encryption job {job_id}: {str(e)}")
+        raise HTTPException(
+            status_code=500,
+            detail={"error": f"Failed to retrieve bulk encryption job: {str(e)}"}
+        )
+    finally:
+        if conn:
+            close_db_connection(conn)
+
+
+@router.post("/admin/encryption/bulk-jobs/{job_id}/pause")
+@track_business_operation("admin", "encryption_bulk_job_pause")
+def pause_bulk_encryption_job(
+    request: Request,
+    job_id: str,
+    admin_user_id: str = Query(..., description="Admin user ID performing this operation")
+) -> Dict[str, Any]:
+    """
+    Pause a running bulk encryption job after its current chunk - administrative endpoint.
+    
+    **Administrative Access Required:**
+    - Requesting user must have user_type >= 100
+    
+    **Parameters:**
+    - `job_id`: The job to pause (path)
+    - `admin_user_id`: Admin user ID performing this operation (required)
+    
+    **HTTP Status Codes:**
+    - `200`: Success - Pause requested
+    - `403`: Forbidden - Insufficient privileges
+    - `404`: Not Found - Job not found
+    - `409`: Conflict - The job is not pending or running
+    - `500`: Internal server error - Pause failed
+    
+    **Notes:**
+    - The request is recorded on the job, so it works whichever server runs the job
+    - Everything up to the last committed chunk stays done; resume continues from there
+    """
+    conn = None
+    
+    try:
+        # Input validation
+        if not admin_user_id or not admin_user_id.strip():
+            raise HTTPException(status_code=400, detail={"error": "Invalid admin_user_id parameter"})
+        
+        admin_user_id = admin_user_id.strip()
+        
+        # Connect to database
+        conn = get_db_connection()
+        
+        # Validate admin access
+        validate_admin_access(admin_user_id, conn)
+        
+        job = get_job(conn, job_id)
+        if not job:
+            raise HTTPException(status_code=404, detail={"error": f"Job not found: {job_id}"})
+        
+        if not request_pause(conn, job_id):
+            raise HTTPException(status_code=409, detail={"error": f"Job {job_id} is not running (status: {job['status']})"})
+        
+        logger.info(f"Admin {admin_user_id} paused bulk encryption job {job_id}")
+        return {
+            "success": True,
+            "job_id": job_id,
+            "message": "Pause requested - the job stops after its current chunk"
+        }
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error pausing bulk encryption job {job_id}: {str(e)}")
+        raise HTTPException(
+            status_code=500,
+            detail={"error": f"Failed to pause bulk encryption job: {str(e)}"}
+        )
+    finally:
+        if conn:
+            close_db_connection(conn)
+
+
+@router.post("/admin/encryption/bulk-jobs/{job_id}/resume")
+@track_business_operation("admin", "encryption_bulk_job_resume")
+def resume_bulk_encryption_job(
+    request: Request,
+    job_id: str,
+    admin_user_id: str = Query(..., description="Admin user ID performing this operation")
+) -> Dict[str, Any]:
+    """
+    Resume a paused, failed or interrupted bulk encryption job - administrative endpoint.
+    
+    The job continues after its last committed chunk (the `last_case_id` checkpoint).
+    
+    **Administrative Access Required:**
+    - Requesting user must have user_type >= 100
+    
+    **Parameters:**
+    - `job_id`: The job to resume (path)
+    - `admin_user_id`: Admin user ID performing this operation (required)
+    
+    **HTTP Status Codes:**
+    - `200`: Success - Job resumed
+    - `403`: Forbidden - Insufficient privileges
+    - `404`: Not Found - Job not found
+    - `409`: Conflict - The job is completed or still running
+    - `500`: Internal server error - Resume failed
+    """
+    conn = None
+    
+    try:
+        # Input validation
+        if not admin_user_id or not admin_user_id.strip():
+            raise HTTPException(status_code=400, detail={"error": "Invalid admin_user_id parameter"})
+        
+        admin_user_id = admin_user_id.strip()
+        
+        # Connect to database
+        conn = get_db_connection()
+        
+        # Validate admin access
+        validate_admin_access(admin_user_id, conn)
+        
+        job = get_job(conn, job_id)
+        if not job:
+            raise HTTPException(status_code=404, detail={"error": f"Job not found: {job_id}"})
+        if job['status'] == 'completed':
+            raise HTTPException(status_code=409, detail={"error": f"Job {job_id} is already completed"})
+        # Atomic claim: of two concurrent resumes (on any servers) only one gets the job
+        if not claim_job(conn, job_id):
+            raise HTTPException(status_code=409, detail={"error": f"Job {job_id} is still running"})
+        
+        logger.info(f"Admin {admin_user_id} resuming bulk encryption job {job_id} after {job['last_case_id']!r}")
+        start_job_thread(job_id, claimed=True)
+        
+        return {
+            "success": True,
+            "job": _format_job(job),
+            "message": "Job resumed from its checkpoint"
+        }
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error resuming bulk encryption job {job_id}: {str(e)}")
+        raise HTTPException(
+            status_code=500,
+            detail={"error": f"Failed to resume bulk encryption job: {str(e)}"}
+        )
+    finally:
+        if conn:
+            close_db_connection(conn)
@@ -0,0 +1,174 @@
+# Created: 2026-10-16 19:34:18
+# Last Modified: 2026-10-16 19:34:18
+# Author: Scott Cadreau
+
+# endpoints/admin/query_telemetry.py
+from fastapi import APIRouter, HTTPException, Query, Request
+from typing import Dict, Any, Optional
+import time
+import logging
+
+from utils.monitoring import track_business_operation
+from core.query_telemetry import (
+    get_query_stats, get_slow_queries, reset_query_stats,
+    SLOW_QUERY_THRESHOLD, EXPLAIN_INTERVAL
+)
+
+router = APIRouter()
+logger = logging.getLogger(__name__)
+
+_SORT_FIELDS = ("total_seconds", "count", "max_seconds", "avg_seconds", "total_rows", "avg_rows", "slow_count")
+
+@router.get("/admin/db/queries")
+@track_business_operation("admin", "db_query_stats")
+def get_db_query_stats(
+    request: Request,
+    limit: int = Query(50, ge=1, le=500, description="Maximum number of fingerprints to return"),
+    sort_by: str = Query("total_seconds", description="Sort field: total_seconds, count, max_seconds, avg_seconds, total_rows, avg_rows, slow_count")
+) -> Dict[str, Any]:
+    """
+    Get per-SQL-fingerprint query statistics - administrative endpoint.
+
+    Every statement executed through the database cursors is normalized to a
+    fingerprint (literal values replaced with `?`, IN lists collapsed) and timed.
+    This endpoint lists the fingerprints hottest first, showing which of the
+    hand-written queries actually consume database time in this worker.
+
+    **Administrative Access Required:**
+    - This endpoint is intended for administrative use
+    - Fingerprints never contain parameter values (no PHI)
+
+    **Query Parameters:**
+    - `limit`: Maximum number of fingerprints to return (default 50)
+    - `sort_by`: Sort field (default `total_seconds` - total time spent in the query)
+
+    **Response:**
+    - `timestamp`: Time of the snapshot
+    - `slow_query_threshold_seconds`: Statements slower than this are EXPLAINed
+    - `queries`: Array of fingerprint statistics
+
+    **Example Response:**
+    ```json
+    {
+        "timestamp": 1760640000.0,
+        "slow_query_threshold_seconds": 0.5,
+        "sort_by": "total_seconds",
+        "queries": [
+            {
+                "fingerprint_id": "3f2a9c1b7d4e",
+                "fingerprint": "SELECT c.case_id, ... FROM cases c ... WHERE c.user_id = ? AND c.active = ? ...",
+                "count": 1840,
+                "total_seconds": 92.4,
+                "avg_seconds": 0.0502,
+                "max_seconds": 1.31,
+                "total_rows": 51200,
+                "avg_rows": 27.8,
+                "slow_count": 12,
+                "last_seen": 1760639998.2
+            }
+        ]
+    }
+    ```
+
+    **HTTP Status Codes:**
+    - `200`: Success - Statistics retrieved
+    - `400`: Bad request - Unknown sort field
+    - `500`: Internal server error
+
+    **Notes:**
+    - Statistics are per worker process and reset on restart
+    - The same fingerprint ids label the `database_sql_duration_seconds` and
+      `database_sql_rows` Prometheus histograms
+    """
+    if sort_by not in _SORT_FIELDS:
+        raise HTTPException(status_code=400, detail={"error": f"Invalid sort_by. Use one of: {', '.join(_SORT_FIELDS)}"})
+
+    try:
+        return {
+            "timestamp": time.time(),
+            "slow_query_threshold_seconds": SLOW_QUERY_THRESHOLD,
+            "sort_by": sort_by,
+            "queries": get_query_stats(limit=limit, sort_by=sort_by)
+        }
+    except Exception as e:
+        logger.error(f"Failed to get query stats: {str(e)}")
+        raise HTTPException(status_code=500, detail={"error": f"Failed to get query stats: {str(e)}"})
+
+@router.get("/admin/db/slow-queries")
+@track_business_operation("admin", "db_slow_queries")
+def get_db_slow_queries(
+    request: Request,
+    limit: int = Query(50, ge=1, le=200, description="Maximum number of captures to return"),
+    fingerprint_id: Optional[str] = Query(None, description="Only return captures for this fingerprint")
+) -> Dict[str, Any]:
+    """
+    Get recent slow-query captures with EXPLAIN plans - administrative endpoint.
+
+    When a read statement runs longer than the slow-query threshold, its EXPLAIN
+    output is captured into a ring buffer (at most once per fingerprint every
+    EXPLAIN interval). Use this to see why a hot query is slow, e.g. a
+    `DATE(submitted_ts)` filter that can't use an index.
+
+    **Administrative Access Required:**
+    - This endpoint is intended for administrative use
+
+    **Query Parameters:**
+    - `limit`: Maximum number of captures to return, newest first (default 50)
+    - `fingerprint_id`: Optional filter for a single fingerprint
+
+    **Example Response:**
+    ```json
+    {
+        "timestamp": 1760640000.0,
+        "slow_query_threshold_seconds": 0.5,
+        "explain_interval_seconds": 600,
+        "slow_queries": [
+            {
+                "timestamp": 1760639990.1,
+                "fingerprint_id": "3f2a9c1b7d4e",
+                "fingerprint": "SELECT ... FROM cases WHERE DATE(submitted_ts) BETWEEN ? AND ?",
+                "duration_seconds": 1.3104,
+                "rows": 812,
+                "explain": [
+                    {"id": 1, "select_type": "SIMPLE", "table": "cases", "type": "ALL", "key": null, "rows": 48211, "Extra": "Using where"}
+                ]
+            }
+        ]
+    }
+    ```
+
+    **HTTP Status Codes:**
+    - `200`: Success - Captures retrieved
+    - `500`: Internal server error
+    """
+    try:
+        return {
+            "timestamp": time.time(),
+            "slow_query_threshold_seconds": SLOW_QUERY_THRESHOLD,
+            "explain_interval_seconds": EXPLAIN_INTERVAL,
+            "slow_queries": get_slow_queries(limit=limit, fingerprint_id=fingerprint_id)
+        }
+    except Exception as e:
+        logger.error(f"Failed to get slow queries: {str(e)}")
+        raise HTTPException(status_code=500, detail={"error": f"Failed to get slow queries: {str(e)}"})
+
+@router.post("/admin/db/queries/reset")
+@track_business_operation("admin", "db_query_stats_reset")
+def reset_db_query_stats(request: Request) -> Dict[str, Any]:
+    """
+    Reset query fingerprint statistics and slow-query captures - administrative endpoint.
+
+    Useful before a load test or after deploying a query/index change so the
+    numbers reflect only the new behavior. Prometheus histograms are not reset.
+
+    **HTTP Status Codes:**
+    - `200`: Success - Statistics cleared
+    - `500`: Internal server error
+    """
+    try:
+        reset_query_stats()
+        logger.info("Query telemetry statistics reset")
+        return {"timestamp": time.time(), "status": "success", "action": "reset_query_stats"}
+    except Exception as e:
+        logger.error(f"Failed to reset query stats: {str(e)}")
+        raise HTTPException(status_code=500, detail={"error": f"Failed to reset query stats: {str(e)}"})
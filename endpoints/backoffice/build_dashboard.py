@@ -1,5 +1,5 @@
 # Created: 2025-07-30 22:59:57
-# Last Modified: 2025-11-11 16:39:07
+# Last Modified: 2026-10-16 18:50:58
 # Author: Scott Cadreau
 
 # endpoints/backoffice/build_dashboard.py
@@ -268,7 +268,7 @@ def build_dashboard(
     
     try:
         # First verify user permissions and get max pay tier
-        conn = get_db_connection()
+        conn = get_db_connection(readonly=True)
         max_pay_tier = 0
         
         try:
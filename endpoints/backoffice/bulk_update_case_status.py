@@ -1,5 +1,5 @@
 # Created: 2025-07-27 02:00:40
-# Last Modified: 2025-11-01 01:11:27
+# Last Modified: 2026-10-16 19:17:59
 # Author: Scott Cadreau
 
 # endpoints/backoffice/bulk_update_case_status.py
@@ -7,7 +7,6 @@ from fastapi import APIRouter, HTTPException, Body, Request
 import pymysql.cursors
 import logging
 import time
-import threading
 from typing import List, Dict, Any, Tuple
 from core.database import get_db_connection, close_db_connection
 from core.models import BulkCaseStatusUpdate
@@ -218,17 +217,13 @@ def bulk_update_case_status(request: Request, update_request: BulkCaseStatusUpda
                 if result["total_updated"] > 0:
                     try:
                         # 1. Clear and re-warm global cases cache (affects admin dashboard)
-                        from endpoints.backoffice.get_cases_by_status import clear_cases_cache, warm_cases_cache
+                        from endpoints.backoffice.get_cases_by_status import clear_cases_cache, schedule_cases_cache_rewarm
                         clear_cases_cache()  # Clear all cached data
                         logger.info(f"Cleared global cases cache after bulk status update of {result['total_updated']} cases")
                         
-                        # Spawn background thread to re-warm global cache
-                        threading.Thread(
-                            target=warm_cases_cache,
-                            daemon=True,
-                            name="bulk_update_cache_rewarm_global"
-                        ).start()
-                        logger.info("Started background re-warming of global cases cache")
+                        # Queue a debounced re-warm of the global cache on the shared re-warm pool
+                        schedule_cases_cache_rewarm()
+                        logger.info("Queued background re-warming of global cases cache")
                         
                         # 2. Get unique user_ids from updated cases and invalidate their caches
                         from endpoints.case.filter_cases import invalidate_and_rewarm_user_cache
@@ -246,7 +241,8 @@ def bulk_update_case_status(request: Request, update_request: BulkCaseStatusUpda
                             
                             affected_users = cursor.fetchall()
                             
-                            # Invalidate and re-warm cache for each affected user
+                            # Invalidate each affected user's cache; re-warms are queued on the
+                            # bounded re-warm pool rather than a thread per user
                             for user_row in affected_users:
                                 user_id = user_row['user_id']
                                 invalidate_and_rewarm_user_cache(user_id)
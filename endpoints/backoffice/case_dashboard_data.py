@@ -1,5 +1,5 @@
 # Created: 2025-07-27 02:29:13
-# Last Modified: 2025-11-11 17:22:36
+# Last Modified: 2026-10-16 18:50:58
 # Author: Scott Cadreau
 
 # endpoints/backoffice/case_dashboard_data.py
@@ -196,7 +196,7 @@ def case_dashboard_data(
     error_message = None
     
     try:
-        conn = get_db_connection()
+        conn = get_db_connection(readonly=True)
         
         try:
             with conn.cursor(pymysql.cursors.DictCursor) as cursor:
@@ -1,5 +1,5 @@
 # Created: 2025-11-11 14:09:38
-# Last Modified: 2025-11-11 17:22:38
+# Last Modified: 2026-10-16 18:50:58
 # Author: Scott Cadreau
 
 # endpoints/backoffice/case_submitted_analytics.py
@@ -305,7 +305,7 @@ def case_submitted_analytics(
     error_message = None
     
     try:
-        conn = get_db_connection()
+        conn = get_db_connection(readonly=True)
         
         try:
             with conn.cursor(pymysql.cursors.DictCursor) as cursor:
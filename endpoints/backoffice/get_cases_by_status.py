@@ -1,25 +1,38 @@
 # Created: 2025-07-15 11:54:13
-# Last Modified: 2025-11-13 05:55:45
+# Last Modified: 2026-10-16 20:09:10
 # Author: Scott Cadreau
 
 # endpoints/backoffice/get_cases_by_status.py
 from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi.concurrency import run_in_threadpool
 import pymysql.cursors
-from core.database import get_db_connection, close_db_connection
+from core.database import get_db_connection, close_db_connection, get_async_db_connection
+from core.cache import get_cache, SingleFlight
+from core.access_tracker import get_access_tracker
+from core.rewarm import rewarm_scheduler
+from core.invalidation_bus import invalidation_bus
+from core.response_cache import json_response, drop_response_bodies
 from utils.monitoring import track_business_operation, business_metrics
 from utils.text_formatting import capitalize_name_field
+import os
 import time
 from datetime import datetime, timedelta
 import json
 import logging
-import threading
 import hashlib
 
 router = APIRouter()
 
-# Global cache for cases data following established patterns
-_cases_cache = {}
-_cases_cache_lock = threading.Lock()
+# Bounded cases cache (core/cache.py): 15 minute TTL shared by the admin dashboard filters
+# Shared across uvicorn workers through the L2 store when one is configured (core/l2_cache.py)
+CASES_CACHE_TTL = 900
+_cases_cache = get_cache("cases_by_status", ttl=CASES_CACHE_TTL, max_bytes=64 * 1024 * 1024, l2=True)
+# Concurrent misses for the same key (e.g. every dashboard right after a bulk update) share one query
+_cases_flight = SingleFlight("cases_by_status")
+# Which filters admins actually request (core/access_tracker.py) - warm_cases_cache loads the most frequent
+_cases_access = get_access_tracker("cases_by_status")
+CASES_WARM_TOP_N = int(os.environ.get("CASES_WARM_TOP_N", "10"))
+CASES_WARM_TIME_BUDGET = float(os.environ.get("CASES_WARM_TIME_BUDGET", "60"))  # Startup phase timeout is 90s
 
 def _generate_cache_key(status_list, parsed_start_date, parsed_end_date) -> str:
     """Generate a consistent cache key for the given parameters"""
@@ -32,58 +45,49 @@ def _generate_cache_key(status_list, parsed_start_date, parsed_end_date) -> str:
     cache_input = f"{status_str}:{start_str}:{end_str}"
     return hashlib.md5(cache_input.encode()).hexdigest()
 
-def _is_cache_valid(cache_key: str, cache_ttl: int = 900) -> bool:
-    """Check if cached results are still valid (15 minutes = 900 seconds)"""
-    time_key = f"{cache_key}_time"
-    
-    if cache_key not in _cases_cache or time_key not in _cases_cache:
-        return False
-    
-    return time.time() - _cases_cache[time_key] < cache_ttl
-
 def _get_cached_cases(cache_key: str):
     """Get cached cases data if valid"""
-    with _cases_cache_lock:
-        if _is_cache_valid(cache_key):
-            logging.debug(f"Returning cached cases data: {cache_key}")
-            return _cases_cache[cache_key]
-    return None
+    cached = _cases_cache.get(cache_key)
+    if cached is not None:
+        logging.debug(f"Returning cached cases data: {cache_key}")
+    return cached
 
-def _cache_cases_data(cache_key: str, data):
-    """Cache the cases data with timestamp"""
-    with _cases_cache_lock:
-        time_key = f"{cache_key}_time"
-        _cases_cache[cache_key] = data
-        _cases_cache[time_key] = time.time()
+def _cache_cases_data(cache_key: str, data, filter_meta: dict = None):
+    """
+    Cache the cases data.
+    filter_meta (status_list, start_date, end_date) lets patch_cases_cache update the list in place.
+    """
+    if _cases_cache.set(cache_key, data, meta=filter_meta):
         logging.debug(f"Successfully cached cases data: {cache_key}")
 
-def clear_cases_cache(cache_key: str = None) -> None:
-    """Clear cached cases data - for future invalidation use"""
-    with _cases_cache_lock:
-        if cache_key:
-            time_key = f"{cache_key}_time"
-            _cases_cache.pop(cache_key, None)
-            _cases_cache.pop(time_key, None)
-            logging.info(f"Cleared cache for cases key: {cache_key}")
-        else:
-            _cases_cache.clear()
-            logging.info("Cleared all cached cases data")
-
-def warm_cases_cache() -> dict:
+def clear_cases_cache(cache_key: str = None, broadcast: bool = True) -> None:
     """
-    Warm cache for common case filter combinations on server startup.
-    
-    Pre-loads frequently accessed case queries to eliminate cold start latency
-    for admin dashboard operations.
-    
-    Returns:
-        Dictionary with warming results including success/failure counts and timing
+    Clear cached cases data - a single key, or everything.
+    broadcast publishes the invalidation so the other API nodes evict too (core/invalidation_bus.py).
     """
-    start_time = time.time()
-    logging.info("Starting cases cache warming for optimal performance")
-    
-    # Define common filter combinations that admins frequently use
-    common_filters = [
+    # Requests after a write must not join a load that started before it
+    _cases_flight.forget(cache_key)
+    if cache_key:
+        _cases_cache.delete(cache_key)
+        drop_response_bodies(f"cases_by_status:{cache_key}")
+        logging.info(f"Cleared cache for cases key: {cache_key}")
+    else:
+        _cases_cache.clear()
+        drop_response_bodies("cases_by_status")
+        logging.info("Cleared all cached cases data")
+    if broadcast:
+        invalidation_bus.publish("cases_by_status", cache_key or "*")
+
+# Invalidations published by other nodes evict this node's copies (without re-publishing)
+invalidation_bus.subscribe("cases_by_status", lambda scope: clear_cases_cache(None if scope == "*" else scope, broadcast=False))
+
+def schedule_cases_cache_rewarm() -> str:
+    """Queue a debounced background re-warm of the global cases cache (collapses repeated writes)"""
+    return rewarm_scheduler.schedule("cases_by_status", warm_cases_cache, kind="cases_by_status")
+
+def _seed_case_filters() -> list:
+    """Filters warmed before any requests have been observed (cold start), as (cache_key, filter)"""
+    seeds = [
         # All cases - most common admin query
         {"status_list": "all", "start_date": None, "end_date": None},
         
@@ -99,11 +103,31 @@ def warm_cases_cache() -> dict:
         # Current month cases - common reporting period
         {"status_list": "all", "start_date": datetime.now().replace(day=1).date(), "end_date": None}
     ]
+    return [(_generate_cache_key(f["status_list"], f["start_date"], f["end_date"]), f) for f in seeds]
+
+def warm_cases_cache(top_n: int = CASES_WARM_TOP_N, time_budget: float = CASES_WARM_TIME_BUDGET) -> dict:
+    """
+    Warm cache for the case filters admins request most, on startup and after writes.
+    
+    Pre-loads the top_n most frequently requested filters (decaying access counts from
+    core/access_tracker.py), most frequent first, until time_budget seconds have passed.
+    Until enough requests have been observed the list is topped up with the common
+    dashboard filters from _seed_case_filters().
+    
+    Returns:
+        Dictionary with warming results including success/failure counts and timing
+    """
+    start_time = time.time()
+    logging.info("Starting cases cache warming for optimal performance")
+    
+    candidates = _cases_access.candidates(top_n, seeds=_seed_case_filters())
     
     results = {
-        "total_queries": len(common_filters),
+        "total_queries": len(candidates),
         "successful": 0,
         "failed": 0,
+        "skipped_time_budget": 0,
+        "observed": sum(1 for _key, _filter, origin in candidates if origin == "observed"),
         "details": [],
         "duration_seconds": 0
     }
@@ -114,7 +138,12 @@ def warm_cases_cache() -> dict:
         conn = get_db_connection()
         
         with conn.cursor(pymysql.cursors.DictCursor) as cursor:
-            for i, filter_config in enumerate(common_filters):
+            for i, (cache_key, filter_config, origin) in enumerate(candidates):
+                if time.time() - start_time >= time_budget:
+                    # Least frequent filters are last - leave them to load on demand
+                    results["skipped_time_budget"] = len(candidates) - i
+                    logging.warning(f"⚠️ Cases cache warming hit its {time_budget}s budget, skipped {len(candidates) - i} filters")
+                    break
                 try:
                     query_start = time.time()
                     
@@ -125,6 +154,7 @@ def warm_cases_cache() -> dict:
                         parsed_start_date=filter_config["start_date"],
                         parsed_end_date=filter_config["end_date"]
                     )
+                    _cases_access.mark_warmed(cache_key, origin)
                     
                     query_duration = time.time() - query_start
                     case_count = len(result) if result else 0
@@ -134,11 +164,12 @@ def warm_cases_cache() -> dict:
                         "query_index": i + 1,
                         "status": "success",
                         "filter": filter_config,
+                        "origin": origin,
                         "case_count": case_count,
                         "duration_ms": round(query_duration * 1000, 2)
                     })
                     
-                    logging.debug(f"Warmed cache query {i+1}/{len(common_filters)}: {case_count} cases in {query_duration*1000:.1f}ms")
+                    logging.debug(f"Warmed cache query {i+1}/{len(candidates)} ({origin}): {case_count} cases in {query_duration*1000:.1f}ms")
                     
                 except Exception as e:
                     results["failed"] += 1
@@ -146,13 +177,14 @@ def warm_cases_cache() -> dict:
                         "query_index": i + 1,
                         "status": "failed",
                         "filter": filter_config,
+                        "origin": origin,
                         "error": str(e)
                     })
                     logging.error(f"Failed to warm cache query {i+1}: {str(e)}")
                     
     except Exception as e:
         logging.error(f"Failed to establish database connection for cache warming: {str(e)}")
-        results["failed"] = len(common_filters)
+        results["failed"] = len(candidates)
         
     finally:
         if conn:
@@ -163,35 +195,27 @@ def warm_cases_cache() -> dict:
     # Log warming summary
     if results["failed"] == 0:
         total_cases = sum(detail.get("case_count", 0) for detail in results["details"] if detail["status"] == "success")
-        logging.info(f"✅ Cases cache warming successful: {results['successful']} queries warmed ({total_cases} total cases) in {results['duration_seconds']:.2f}s")
+        logging.info(
+            f"✅ Cases cache warming successful: {results['successful']} queries warmed ({results['observed']} observed, "
+            f"{total_cases} total cases) in {results['duration_seconds']:.2f}s"
+        )
     else:
         logging.warning(f"⚠️ Cases cache warming partial: {results['successful']}/{results['total_queries']} queries warmed in {results['duration_seconds']:.2f}s")
     
     return results
 
-def _get_cases_optimized(cursor, status_list, parsed_start_date, parsed_end_date):
+def _build_cases_query(status_list, parsed_start_date, parsed_end_date, case_id=None):
     """
-    Experimental optimized single query implementation using JSON_ARRAYAGG with caching.
-    Returns results in the same format as the original method.
+    Build the single-query SQL and parameters for the admin case list
+    (or just one case when case_id is given, for patching cached lists)
     """
-    # Generate cache key for this request
-    cache_key = _generate_cache_key(status_list, parsed_start_date, parsed_end_date)
-    
-    # Check cache first
-    cached_result = _get_cached_cases(cache_key)
-    if cached_result is not None:
-        return cached_result
-    
-    # Cache miss - execute query
-    logging.info(f"Cache miss for cases query: {cache_key}")
-    
     # Build optimized single query with JSON aggregation
     sql = """
         SELECT 
             c.user_id, c.case_id, c.case_date, c.patient_first, c.patient_last, 
             c.ins_provider, c.surgeon_id, c.facility_id, c.case_status, 
             csl.case_status_desc,
-            c.demo_file, c.note_file, c.misc_file, c.pay_amount, c.phi_encrypted,
+            c.demo_file, c.note_file, c.misc_file, c.pay_amount, c.phi_encrypted, c.patient_first_enc, c.patient_last_enc, c.ins_provider_enc,
             up.first_name as provider_first_name,
             up.last_name as provider_last_name,
             f.facility_state, c.pay_category,
@@ -217,6 +241,10 @@ def _get_cases_optimized(cursor, status_list, parsed_start_date, parsed_end_date
     """
     params = []
     
+    if case_id is not None:
+        sql += " AND c.case_id = %s"
+        params.append(case_id)
+    
     # Only add status filter if not "all"
     if status_list != "all" and status_list:
         placeholders = ",".join(["%s"] * len(status_list))
@@ -237,56 +265,97 @@ def _get_cases_optimized(cursor, status_list, parsed_start_date, parsed_end_date
         GROUP BY 
             c.case_id, c.user_id, c.case_date, c.patient_first, c.patient_last,
             c.ins_provider, c.surgeon_id, c.facility_id, c.case_status,
-            csl.case_status_desc, c.demo_file, c.note_file, c.misc_file, c.pay_amount, c.phi_encrypted,
+            csl.case_status_desc, c.demo_file, c.note_file, c.misc_file, c.pay_amount, c.phi_encrypted, c.patient_first_enc, c.patient_last_enc, c.ins_provider_enc,
             up.first_name, up.last_name, f.facility_state, c.pay_category
         ORDER BY case_date DESC, up.first_name, up.last_name, c.case_id DESC
     """
     
-    cursor.execute(sql, params)
-    cases = cursor.fetchall()
+    return sql, params
+
+def _case_matches(case_data, status_list, parsed_start_date, parsed_end_date) -> bool:
+    """Python mirror of the status and date filters in _build_cases_query, for one raw case row"""
+    if status_list != "all" and status_list and int(case_data["case_status"]) not in [int(s) for s in status_list]:
+        return False
+    case_date = case_data.get("case_date")
+    if isinstance(case_date, datetime):
+        case_date = case_date.date()
+    if parsed_start_date and (case_date is None or case_date < parsed_start_date):
+        return False
+    if parsed_end_date and (case_date is None or case_date > parsed_end_date):
+        return False
+    return True
 
-    # Get database connection for decryption operations
-    conn = cursor.connection
+def _sorts_before(case_data, other) -> bool:
+    """Approximate ORDER BY case_date DESC, provider name for processed rows (NULL dates last)"""
+    date, other_date = case_data.get("case_date"), other.get("case_date")
+    if date != other_date:
+        return other_date is None or (date is not None and date > other_date)
+    return (case_data.get("provider_name") or "").lower() < (other.get("provider_name") or "").lower()
+
+def patch_cases_cache(cursor, case_id: str) -> int:
+    """
+    Re-read one case and upsert it into (or remove it from) each cached admin case list
+    according to the status and date filters each list was built with, instead of
+    clearing the cache. Lists cached without their filter are dropped.
+    
+    Returns:
+        Number of cached lists patched
+    """
+    # A load that started before the write must not land on top of the patched lists
+    _cases_flight.forget()
+    keys = _cases_cache.keys()
+    if not keys:
+        return 0
     
+    sql, params = _build_cases_query("all", None, None, case_id=case_id)
+    cursor.execute(sql, params)
+    row = cursor.fetchone()  # None when the case was deleted
+    if row is not None and _needs_cases_decryption([row]):
+        _decrypt_cases([row], cursor.connection)
+    processed = _process_cases([dict(row)])[0] if row is not None else None
+    
+    def patch(cases, meta):
+        if meta is None:
+            return None
+        remaining = [case_data for case_data in cases if case_data.get("case_id") != case_id]
+        if row is None or not _case_matches(row, meta["status_list"], meta["start_date"], meta["end_date"]):
+            return remaining
+        position = next((i for i, case_data in enumerate(remaining) if _sorts_before(processed, case_data)), len(remaining))
+        remaining.insert(position, dict(processed))
+        return remaining
+    
+    patched = sum(1 for key in keys if _cases_cache.update(key, patch))
+    logging.info(f"Patched case {case_id} into {patched}/{len(keys)} cached admin case lists")
+    return patched
+
+def _needs_cases_decryption(cases) -> bool:
+    """Check whether any case in the list has encrypted PHI owned by a user whose list view is decrypted"""
     # TEST USER DECRYPTION: Only decrypt for test user
     TEST_USER_ID = '54d8e448-0091-7031-86bb-d66da5e8f7e0'
+    return any(case_data.get('phi_encrypted') == 1 and case_data.get('user_id') == TEST_USER_ID for case_data in cases)
+
+def _decrypt_cases(cases, conn=None):
+    """
+    Decrypt patient names in place for the admin list view, fetching each case owner's DEK once.
+    When conn is None a pooled sync connection is borrowed only for DEKs that are not cached
+    (async callers run this through run_in_threadpool).
+    """
+    from utils.phi_encryption import decrypt_rows, LIST_VIEW_PHI_FIELDS
+    TEST_USER_ID = '54d8e448-0091-7031-86bb-d66da5e8f7e0'
     
-    # Cache to track which user DEKs we've already loaded (in addition to the module-level cache)
-    decryption_attempted_users = set()
+    # Only decrypt first and last name for admin list view
+    test_user_cases = [case_data for case_data in cases if case_data.get('user_id') == TEST_USER_ID]
+    decrypt_rows(test_user_cases, conn, fields=LIST_VIEW_PHI_FIELDS)
+    return cases
 
+def _process_cases(cases):
+    """Apply date formatting, provider name capitalization and procedure code parsing to raw case rows"""
+    from utils.phi_encryption import fold_encrypted_columns
+    
+    # Ciphertext of rows that were not decrypted goes out in its legacy text form
+    fold_encrypted_columns(cases)
     result = []
     for case_data in cases:
-        # Decrypt PHI fields if needed (check each case's owner user_id)
-        case_owner_user_id = case_data.get('user_id')
-        if case_data.get('phi_encrypted') == 1 and case_owner_user_id == TEST_USER_ID:
-            try:
-                from utils.phi_encryption import PHIEncryption, get_user_dek
-                
-                # Get the case owner's DEK for decryption (cached if we've seen this user before)
-                dek = get_user_dek(case_owner_user_id, conn)
-                phi_crypto = PHIEncryption()
-                
-                # Only decrypt first and last name for admin list view
-                for field in ['patient_first', 'patient_last']:
-                    if field in case_data and case_data[field] is not None:
-                        field_value = str(case_data[field])
-                        # Skip if too short to be encrypted
-                        if len(field_value) >= 28:
-                            try:
-                                case_data[field] = phi_crypto.decrypt_field(case_data[field], dek)
-                            except Exception as field_error:
-                                logging.warning(f"[DECRYPT] Could not decrypt {field} for case {case_data.get('case_id')}, leaving as-is")
-                                pass
-                
-                # Track that we've attempted decryption for this user
-                if case_owner_user_id not in decryption_attempted_users:
-                    decryption_attempted_users.add(case_owner_user_id)
-                    logging.info(f"[DECRYPT] Decrypting cases for user: {case_owner_user_id}")
-                    
-            except Exception as decrypt_error:
-                logging.error(f"[DECRYPT] Failed to decrypt case {case_data.get('case_id')} for user {case_owner_user_id}: {str(decrypt_error)}")
-                # Continue processing - return encrypted data rather than failing
-        
         # Convert datetime to ISO format if it's a datetime object
         if case_data["case_date"] and hasattr(case_data["case_date"], 'isoformat'):
             case_data["case_date"] = case_data["case_date"].isoformat()
@@ -333,14 +402,93 @@ def _get_cases_optimized(cursor, status_list, parsed_start_date, parsed_end_date
         
         result.append(case_data)
     
-    # Cache the result before returning
-    _cache_cases_data(cache_key, result)
-    
     return result
 
+def _get_cases_optimized(cursor, status_list, parsed_start_date, parsed_end_date):
+    """
+    Experimental optimized single query implementation using JSON_ARRAYAGG with caching.
+    Returns results in the same format as the original method.
+    Sync variant used by warm_cases_cache and the background re-warm threads.
+    """
+    # Generate cache key for this request
+    cache_key = _generate_cache_key(status_list, parsed_start_date, parsed_end_date)
+    
+    # Check cache first
+    cached_result = _get_cached_cases(cache_key)
+    if cached_result is not None:
+        return cached_result
+    
+    # Cache miss - execute query (once for all concurrent callers of this key)
+    logging.info(f"Cache miss for cases query: {cache_key}")
+    
+    def load():
+        # Another caller may have filled the cache between our miss and taking the flight
+        cached = _cases_cache.peek(cache_key)
+        if cached is not None:
+            return cached
+        
+        sql, params = _build_cases_query(status_list, parsed_start_date, parsed_end_date)
+        cursor.execute(sql, params)
+        cases = cursor.fetchall()
+
+        # Decrypt using the caller's connection
+        if _needs_cases_decryption(cases):
+            _decrypt_cases(cases, cursor.connection)
+        
+        return _process_cases(cases)
+    
+    # Cache the result unless the key was invalidated while the query ran
+    return _cases_flight.do(
+        cache_key, load,
+        store=lambda result: _cache_cases_data(cache_key, result, {"status_list": status_list, "start_date": parsed_start_date, "end_date": parsed_end_date})
+    )
+
+async def _get_cases_optimized_async(cursor, status_list, parsed_start_date, parsed_end_date):
+    """
+    Async variant of _get_cases_optimized for the /cases_by_status endpoint.
+    Shares the cache, query builder and row processing with the sync path.
+    Only this request path counts accesses for warming - warm loads don't inflate their own scores.
+    """
+    # Generate cache key for this request
+    cache_key = _generate_cache_key(status_list, parsed_start_date, parsed_end_date)
+    
+    # Check cache first
+    cached_result = _get_cached_cases(cache_key)
+    _cases_access.record(
+        cache_key, {"status_list": status_list, "start_date": parsed_start_date, "end_date": parsed_end_date},
+        hit=cached_result is not None
+    )
+    if cached_result is not None:
+        return cached_result
+    
+    # Cache miss - execute query (once for all concurrent callers of this key)
+    logging.info(f"Cache miss for cases query: {cache_key}")
+    
+    async def load():
+        # Another caller may have filled the cache between our miss and taking the flight
+        cached = _cases_cache.peek(cache_key)
+        if cached is not None:
+            return cached
+        
+        sql, params = _build_cases_query(status_list, parsed_start_date, parsed_end_date)
+        await cursor.execute(sql, params)
+        cases = list(await cursor.fetchall())
+
+        # DEK lookup and KMS calls are blocking - run them off the event loop
+        if _needs_cases_decryption(cases):
+            await run_in_threadpool(_decrypt_cases, cases)
+        
+        return _process_cases(cases)
+    
+    # Cache the result unless the key was invalidated while the query ran
+    return await _cases_flight.do_async(
+        cache_key, load,
+        store=lambda result: _cache_cases_data(cache_key, result, {"status_list": status_list, "start_date": parsed_start_date, "end_date": parsed_end_date})
+    )
+
 @router.get("/cases_by_status")
 @track_business_operation("get", "cases_by_status")
-def get_cases_by_status(
+async def get_cases_by_status(
     request: Request, 
     user_id: str = Query(..., description="The user ID making the request (must be user_type >= 10)"), 
     filter: str = Query("", description="Comma-separated list of case_status values (e.g. 0,1,2) or 'all' to get all cases"),
@@ -533,12 +681,13 @@ def get_cases_by_status(
         - Administrative users should use this for case management and oversight
         - Filtering enables targeted analysis and workflow management
         - Results can be large for "all" filter - consider pagination for production use
+        - Cached lists are served as pre-encoded JSON with an ETag; send If-None-Match to get 304 Not Modified
         - Status descriptions provide human-readable context for case progression
     """
-    conn = None
     start_time = time.time()
     response_status = 200
     response_data = None
+    response_body = None
     error_message = None
     
     try:
@@ -570,13 +719,11 @@ def get_cases_by_status(
                 error_message = "Invalid end_date format. Use YYYY-MM-DD format."
                 raise HTTPException(status_code=400, detail="Invalid end_date format. Use YYYY-MM-DD format.")
 
-        conn = get_db_connection()
-        
-        try:
-            with conn.cursor(pymysql.cursors.DictCursor) as cursor:
+        async with get_async_db_connection() as conn:
+            async with conn.cursor() as cursor:
                 # Check user_type for the requesting user
-                cursor.execute("SELECT user_type FROM user_profile WHERE user_id = %s", (user_id,))
-                user_row = cursor.fetchone()
+                await cursor.execute("SELECT user_type FROM user_profile WHERE user_id = %s", (user_id,))
+                user_row = await cursor.fetchone()
                 if not user_row or user_row.get("user_type", 0) < 10:
                     # Record failed access (permission denied)
                     business_metrics.record_utility_operation("get_cases_by_status", "permission_denied")
@@ -585,13 +732,10 @@ def get_cases_by_status(
                     raise HTTPException(status_code=403, detail="User does not have permission to access all cases.")
 
                 # Use optimized single query implementation
-                result = _get_cases_optimized(cursor, status_list, parsed_start_date, parsed_end_date)
+                result = await _get_cases_optimized_async(cursor, status_list, parsed_start_date, parsed_end_date)
 
                 # Record successful cases retrieval
                 business_metrics.record_utility_operation("get_cases_by_status", "success")
-                
-        finally:
-            close_db_connection(conn)
             
         response_data = {
             "cases": result,
@@ -599,7 +743,16 @@ def get_cases_by_status(
             "start_date": start_date,
             "end_date": end_date
         }
-        return response_data
+        # Cache hits reuse the encoded body; a matching If-None-Match gets an empty 304
+        cache_key = _generate_cache_key(status_list, parsed_start_date, parsed_end_date)
+        response = json_response(
+            request, response_data,
+            cache_key=f"cases_by_status:{cache_key}:{start_date}:{end_date}",
+            source=result, tags=["cases_by_status", f"cases_by_status:{cache_key}"]
+        )
+        response_status = response.status_code
+        response_body = response.body
+        return response
 
     except HTTPException as http_error:
         # Re-raise HTTP exceptions and capture error details
@@ -611,9 +764,6 @@ def get_cases_by_status(
         response_status = 500
         error_message = str(e)
         business_metrics.record_utility_operation("get_cases_by_status", "error")
-        
-        if 'conn' in locals():
-            close_db_connection(conn)
         raise HTTPException(status_code=500, detail={"error": str(e)})
         
     finally:
@@ -622,11 +772,13 @@ def get_cases_by_status(
         
         # Log request details for monitoring using the utility function
         from endpoints.utility.log_request import log_request_from_endpoint
-        log_request_from_endpoint(
+        await run_in_threadpool(
+            log_request_from_endpoint,
             request=request,
             execution_time_ms=execution_time_ms,
             response_status=response_status,
             user_id=user_id,
             response_data=response_data,
-            error_message=error_message
+            error_message=error_message,
+            response_body=response_body
         ) 
\ No newline at end of file
@@ -1,11 +1,12 @@
 # Created: 2025-07-22 12:20:56
-# Last Modified: 2025-10-03 18:52:38
+# Last Modified: 2026-10-16 19:32:38
 # Author: Scott Cadreau
 
 # endpoints/backoffice/get_users.py
 from fastapi import APIRouter, HTTPException, Query, Request
 import pymysql.cursors
 from core.database import get_db_connection, close_db_connection
+from core.fast_json import FastJSONResponse
 from utils.monitoring import track_business_operation, business_metrics
 import time
 
@@ -164,6 +165,7 @@ def get_users(request: Request, user_id: str = Query(..., description="The user
         - Document information includes metadata only (files stored separately)
         - Timestamp fields provide audit trail for account management
         - User tier information affects feature access and billing
+        - Rows are encoded directly with FastJSONResponse (no jsonable_encoder pass over trusted DB rows)
         - Professional licensing information is critical for healthcare compliance
         - Referral chains can be traced through referred_by_user relationships
         - Administrative users should use this endpoint for user management tasks
@@ -172,6 +174,7 @@ def get_users(request: Request, user_id: str = Query(..., description="The user
     start_time = time.time()
     response_status = 200
     response_data = None
+    response_body = None
     error_message = None
     
     try:
@@ -220,7 +223,10 @@ def get_users(request: Request, user_id: str = Query(..., description="The user
             "users": result,
             "total_count": len(result)
         }
-        return response_data
+        # Trusted DB rows: encode timestamps natively and skip jsonable_encoder
+        response = FastJSONResponse(response_data)
+        response_body = response.body
+        return response
 
     except HTTPException as http_error:
         # Re-raise HTTP exceptions and capture error details
@@ -249,5 +255,6 @@ def get_users(request: Request, user_id: str = Query(..., description="The user
             response_status=response_status,
             user_id=user_id,
             response_data=response_data,
-            error_message=error_message
+            error_message=error_message,
+            response_body=response_body
         ) 
\ No newline at end of file
@@ -1,5 +1,5 @@
 # Created: 2025-07-30 20:18:11
-# Last Modified: 2025-08-27 06:09:51
+# Last Modified: 2026-10-16 18:50:58
 # Author: Scott Cadreau
 
 # endpoints/backoffice/user_dashboard_data.py
@@ -166,7 +166,7 @@ def user_dashboard_data(
     error_message = None
     
     try:
-        conn = get_db_connection()
+        conn = get_db_connection(readonly=True)
         
         try:
             with conn.cursor(pymysql.cursors.DictCursor) as cursor:
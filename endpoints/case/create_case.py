@@ -1,12 +1,12 @@
 # Created: 2025-07-15 09:20:13
-# Last Modified: 2025-11-01 02:47:34
+# Last Modified: 2026-10-16 20:09:10
 # Author: Scott Cadreau
 
 # endpoints/case/create_case.py
 from fastapi import APIRouter, HTTPException, Request
 from fastapi import Depends
 import pymysql.cursors
-from core.database import get_db_connection, close_db_connection, is_connection_valid
+from core.database import get_db_connection, close_db_connection, is_connection_valid, pin_user_to_writer
 from core.models import CaseCreate
 from utils.case_status import update_case_status
 from utils.pay_amount_calculator import update_case_pay_amount_v2
@@ -15,7 +15,6 @@ from utils.monitoring import track_business_operation, business_metrics
 from utils.text_formatting import capitalize_name_field
 import logging
 import time
-import threading
 
 logger = logging.getLogger(__name__)
 
@@ -39,46 +38,52 @@ def check_duplicate_case(user_id: str, case_date: str, patient_first: str, patie
     Check if a case with the same user_id, date and patient name already exists.
     Returns dict with 'is_duplicate' boolean and 'existing_case_id' if found.
     
+    Encrypted cases are matched on their patient name blind indexes (an index seek on
+    idx_cases_user_date_bidx); unencrypted cases on the normalized plaintext names.
+    
     Note: For encrypted cases, this function decrypts patient names before returning them.
     """
+    # TEST USER ENCRYPTION: Only the test user has encrypted cases
+    TEST_USER_ID = '54d8e448-0091-7031-86bb-d66da5e8f7e0'
+    
+    result = None
     with conn.cursor(pymysql.cursors.DictCursor) as cursor:
-        cursor.execute("""
-            SELECT case_id, patient_first, patient_last, case_date, user_id, phi_encrypted
-            FROM cases 
-            WHERE user_id = %s
-            AND case_date = %s 
-            AND LOWER(TRIM(patient_first)) = LOWER(TRIM(%s))
-            AND LOWER(TRIM(patient_last)) = LOWER(TRIM(%s))
-            AND active = 1
-            LIMIT 1
-        """, (user_id, case_date, patient_first, patient_last))
+        if user_id == TEST_USER_ID:
+            from utils.phi_encryption import compute_blind_indexes
+            blind_indexes = compute_blind_indexes({'patient_first': patient_first, 'patient_last': patient_last}, user_id, conn)
+            cursor.execute("""
+                SELECT case_id, patient_first, patient_last, patient_first_enc, patient_last_enc, case_date, user_id, phi_encrypted
+                FROM cases 
+                WHERE user_id = %s
+                AND case_date = %s 
+                AND patient_last_bidx = %s
+                AND patient_first_bidx = %s
+                AND phi_encrypted = 1
+                AND active = 1
+                LIMIT 1
+            """, (user_id, case_date, blind_indexes['patient_last_bidx'], blind_indexes['patient_first_bidx']))
+            result = cursor.fetchone()
+        
+        if not result:
+            # Unencrypted (legacy) cases still compare plaintext names
+            cursor.execute("""
+                SELECT case_id, patient_first, patient_last, case_date, user_id, phi_encrypted
+                FROM cases 
+                WHERE user_id = %s
+                AND case_date = %s 
+                AND LOWER(TRIM(patient_first)) = LOWER(TRIM(%s))
+                AND LOWER(TRIM(patient_last)) = LOWER(TRIM(%s))
+                AND active = 1
+                LIMIT 1
+            """, (user_id, case_date, patient_first, patient_last))
+            result = cursor.fetchone()
         
-        result = cursor.fetchone()
         if result:
             # Decrypt patient names if needed (for duplicate check response)
-            TEST_USER_ID = '54d8e448-0091-7031-86bb-d66da5e8f7e0'
-            if result.get('phi_encrypted') == 1 and result['user_id'] == TEST_USER_ID:
-                try:
-                    from utils.phi_encryption import PHIEncryption, get_user_dek
-                    
-                    # Get user's DEK for decryption
-                    dek = get_user_dek(result['user_id'], conn)
-                    phi_crypto = PHIEncryption()
-                    
-                    # Decrypt patient names for the duplicate check response
-                    for field in ['patient_first', 'patient_last']:
-                        if field in result and result[field]:
-                            field_value = str(result[field])
-                            # Skip if too short to be encrypted
-                            if len(field_value) >= 28:
-                                try:
-                                    result[field] = phi_crypto.decrypt_field(result[field], dek)
-                                except Exception as field_error:
-                                    logger.warning(f"[DECRYPT] Could not decrypt {field} for duplicate check, leaving as-is")
-                                    pass
-                except Exception as decrypt_error:
-                    logger.error(f"[DECRYPT] Failed to decrypt duplicate case data: {str(decrypt_error)}")
-                    # Continue with encrypted names rather than failing
+            if result['user_id'] == TEST_USER_ID:
+                from utils.phi_encryption import decrypt_rows, LIST_VIEW_PHI_FIELDS
+                # Decrypt patient names for the duplicate check response (left encrypted on failure)
+                decrypt_rows([result], conn, fields=LIST_VIEW_PHI_FIELDS)
             
             return {
                 "is_duplicate": True,
@@ -113,7 +118,7 @@ def create_case_with_procedures(case: CaseCreate, conn) -> dict:
     
     if use_encryption:
         logger.info(f"[ENCRYPTION TEST] Encrypting PHI for test user: {case.user_id}")
-        from utils.phi_encryption import encrypt_patient_data
+        from utils.phi_encryption import encrypt_patient_data, compute_blind_indexes
         
         # Prepare patient data for encryption (names and insurance only, not DOB)
         patient_data = {
@@ -122,13 +127,17 @@ def create_case_with_procedures(case: CaseCreate, conn) -> dict:
             'ins_provider': case.patient.ins_provider
         }
         
+        # Blind indexes from the plaintext names, so duplicate checks can match without decrypting
+        blind_indexes = compute_blind_indexes(patient_data, case.user_id, conn)
+        
         # Encrypt the data
         encrypt_patient_data(patient_data, case.user_id, conn)
         
-        # Use encrypted values for names/insurance, unencrypted for DOB
+        # Use encrypted values for names/insurance (binary envelopes go to the <field>_enc columns), unencrypted for DOB
         formatted_patient_first = patient_data['patient_first']
         formatted_patient_last = patient_data['patient_last']
         encrypted_ins_provider = patient_data['ins_provider']
+        encrypted_columns = {field: value for field, value in patient_data.items() if field.endswith('_enc')}
         encrypted_patient_dob = case.patient_dob  # DOB stays unencrypted (DATE column)
         phi_encrypted_flag = 1
         
@@ -138,18 +147,23 @@ def create_case_with_procedures(case: CaseCreate, conn) -> dict:
         encrypted_patient_dob = case.patient_dob
         encrypted_ins_provider = case.patient.ins_provider
         phi_encrypted_flag = 0
+        blind_indexes = {}
+        encrypted_columns = {}
     
     with conn.cursor(pymysql.cursors.DictCursor) as cursor:
         # Insert into cases table
         cursor.execute("""
             INSERT INTO cases (
                 case_id, user_id, case_date, patient_first, patient_last, 
-                ins_provider, surgeon_id, facility_id, demo_file, note_file, misc_file, dupe_flag, patient_dob, phi_encrypted
-            ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+                ins_provider, surgeon_id, facility_id, demo_file, note_file, misc_file, dupe_flag, patient_dob, phi_encrypted,
+                patient_first_bidx, patient_last_bidx, patient_first_enc, patient_last_enc, ins_provider_enc
+            ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
         """, (
             case.case_id, case.user_id, case.case_date, formatted_patient_first, 
             formatted_patient_last, encrypted_ins_provider, case.surgeon_id, 
-            case.facility_id, case.demo_file, case.note_file, case.misc_file, dupe_flag, encrypted_patient_dob, phi_encrypted_flag
+            case.facility_id, case.demo_file, case.note_file, case.misc_file, dupe_flag, encrypted_patient_dob, phi_encrypted_flag,
+            blind_indexes.get('patient_first_bidx'), blind_indexes.get('patient_last_bidx'),
+            encrypted_columns.get('patient_first_enc'), encrypted_columns.get('patient_last_enc'), encrypted_columns.get('ins_provider_enc')
         ))
 
         # Auto-fix variables already initialized at function level
@@ -221,7 +235,7 @@ def add_case(case: CaseCreate, request: Request):
     - Pay amount calculation based on procedure codes
     - Case status updates when applicable
     - Automatic file validation for uploaded documents (PDF/JPEG)
-    - Intelligent cache invalidation and rewarming
+    - Incremental patching of cached case lists
     - Full monitoring and logging integration
     - Prometheus metrics tracking
     
@@ -293,9 +307,10 @@ def add_case(case: CaseCreate, request: Request):
         - Typical validation time: ~120ms for 4MB files (includes S3 download)
     
     Cache Management:
-        - Automatically clears global cases cache (get_cases_by_status) after successful creation
-        - Spawns background thread to re-warm global cache with common filter combinations
-        - Invalidates and re-warms user-specific case cache (filter_cases) for the case owner
+        - Emits a case-changed event after commit (utils/case_cache_events.py)
+        - The new case is patched into each cached admin list (get_cases_by_status) and each of the
+          owner's cached lists (filter_cases) whose status/date filter it matches - no full re-query
+        - Falls back to clearing and re-warming the caches if patching fails
         - Cache operations are non-blocking and won't fail the main operation if they encounter errors
         - Ensures both admin dashboard and user dashboard show the new case immediately
         - Comprehensive logging of all cache operations for monitoring and debugging
@@ -407,27 +422,13 @@ def add_case(case: CaseCreate, request: Request):
         # Record successful case creation before commit
         business_metrics.record_case_operation("create", "success", case.case_id)
         
-        # Clear caches BEFORE commit to prevent race conditions
-        logger.info(f"🔄 STARTING cache invalidation for case creation: {case.case_id}")
-        try:
-            # 1. Clear global cases cache (affects admin dashboard) - but don't re-warm yet
-            from endpoints.backoffice.get_cases_by_status import clear_cases_cache
-            clear_cases_cache()  # Clear all cached data
-            logger.info(f"✅ CLEARED global cases cache before commit for case creation: {case.case_id}")
-            
-            # 2. Clear user cases cache - but don't re-warm yet
-            from endpoints.case.filter_cases import clear_user_cases_cache
-            clear_user_cases_cache(case.user_id)  # Clear all cache entries for this user
-            logger.info(f"✅ CLEARED user cases cache for user: {case.user_id}")
-            
-        except Exception as e:
-            # Don't fail the main operation if cache invalidation fails
-            logger.error(f"❌ Failed to invalidate caches before commit for case creation {case.case_id}: {str(e)}", exc_info=True)
-        
         # Commit all changes at once
         conn.commit()
         logger.info(f"✅ COMMITTED database changes for case creation: {case.case_id}")
         
+        # Read-your-writes: keep this user's reads on the writer until replicas catch up
+        pin_user_to_writer(case.user_id)
+        
         # INPUT VALIDATION -- Validate uploaded files after successful DB commit
         file_validation_errors = []
         file_fields_to_validate = []
@@ -479,30 +480,15 @@ def add_case(case: CaseCreate, request: Request):
                 else:
                     logger.info(f"✅ File validation successful for {field_name}: {filename}")
         
-        # Re-warm caches after successful commit
+        # Patch the new case into the cached case lists (after file validation, which may have cleared file fields)
         try:
-            # Re-warm global cases cache in background
-            from endpoints.backoffice.get_cases_by_status import warm_cases_cache
-            threading.Thread(
-                target=warm_cases_cache,
-                daemon=True,
-                name="create_case_cache_rewarm_global"
-            ).start()
-            logger.info(f"🔄 Started background re-warming of global cases cache after case creation: {case.case_id}")
-            
-            # Re-warm user cache
-            from endpoints.case.filter_cases import _rewarm_user_cases_cache_background
-            threading.Thread(
-                target=_rewarm_user_cases_cache_background,
-                args=(case.user_id,),
-                daemon=True,
-                name=f"create_case_cache_rewarm_user_{case.user_id}"
-            ).start()
-            logger.info(f"🔄 Started background re-warming of user cases cache for user: {case.user_id}")
+            from utils.case_cache_events import emit_case_changed
+            cache_outcome = emit_case_changed(case.case_id, case.user_id, conn=conn)
+            logger.info(f"🔄 Case caches {cache_outcome} after case creation: {case.case_id}")
             
         except Exception as e:
-            # Don't fail the main operation if cache re-warming fails
-            logger.error(f"❌ Failed to re-warm caches after case creation {case.case_id}: {str(e)}", exc_info=True)
+            # Don't fail the main operation if cache maintenance fails
+            logger.error(f"❌ Failed to update caches after case creation {case.case_id}: {str(e)}", exc_info=True)
         
         response_status = 201
         response_data = {
@@ -1,5 +1,5 @@
 # Created: 2025-07-15 09:20:13
-# Last Modified: 2025-08-21 17:39:01
+# Last Modified: 2026-10-16 19:22:23
 # Author: Scott Cadreau
 
 # endpoints/case/delete_case.py
@@ -198,26 +198,9 @@ def delete_case(request: Request, case_id: str = Query(..., description="The cas
 
             print(f"SUCCESS: Case soft deleted (deactivated) - case_id: {case_id}, rows affected: {cursor.rowcount}")
 
-            # Clear caches BEFORE commit to prevent race conditions
             user_id = case_data.get('user_id') if case_data else None
-            print(f"🔄 STARTING cache invalidation for case deletion: {case_id}")
-            try:
-                # 1. Clear global cases cache (affects admin dashboard) - but don't re-warm yet
-                from endpoints.backoffice.get_cases_by_status import clear_cases_cache
-                clear_cases_cache()  # Clear all cached data
-                print(f"✅ CLEARED global cases cache before commit for case deletion: {case_id}")
-                
-                # 2. Clear user cases cache - but don't re-warm yet
-                if user_id:
-                    from endpoints.case.filter_cases import clear_user_cases_cache
-                    clear_user_cases_cache(user_id)  # Clear all cache entries for this user
-                    print(f"✅ CLEARED user cases cache for user: {user_id}")
-                else:
-                    print(f"⚠️ Could not determine user_id for cache invalidation, case: {case_id}")
-                    
-            except Exception as e:
-                # Don't fail the main operation if cache invalidation fails
-                print(f"❌ Failed to invalidate caches before commit for case deletion {case_id}: {str(e)}")
+            if not user_id:
+                print(f"⚠️ Could not determine user_id for cache maintenance, case: {case_id}")
 
             # Commit the transaction
             conn.commit()
@@ -226,32 +209,15 @@ def delete_case(request: Request, case_id: str = Query(..., description="The cas
             # Record successful case deletion
             business_metrics.record_case_operation("delete", "success", case_id)
 
-            # Re-warm caches after successful deletion
+            # Remove the case from the cached case lists (no full re-query)
             try:
-                # Re-warm global cases cache in background
-                from endpoints.backoffice.get_cases_by_status import warm_cases_cache
-                import threading
-                threading.Thread(
-                    target=warm_cases_cache,
-                    daemon=True,
-                    name="delete_case_cache_rewarm_global"
-                ).start()
-                print(f"🔄 Started background re-warming of global cases cache after case deletion: {case_id}")
-                
-                # Re-warm user cache if we have a user_id
-                if user_id:
-                    from endpoints.case.filter_cases import _rewarm_user_cases_cache_background
-                    threading.Thread(
-                        target=_rewarm_user_cases_cache_background,
-                        args=(user_id,),
-                        daemon=True,
-                        name=f"delete_case_cache_rewarm_user_{user_id}"
-                    ).start()
-                    print(f"🔄 Started background re-warming of user cases cache for user: {user_id}")
+                from utils.case_cache_events import emit_case_changed
+                cache_outcome = emit_case_changed(case_id, user_id, conn=conn)
+                print(f"🔄 Case caches {cache_outcome} after case deletion: {case_id}")
                 
             except Exception as e:
-                # Don't fail the main operation if cache re-warming fails
-                print(f"❌ Failed to re-warm caches after case deletion {case_id}: {str(e)}")
+                # Don't fail the main operation if cache maintenance fails
+                print(f"❌ Failed to update caches after case deletion {case_id}: {str(e)}")
 
             # Archive the deleted case
             # Note: This includes S3 file movement and will raise exceptions on failure
@@ -265,29 +231,16 @@ def delete_case(request: Request, case_id: str = Query(..., description="The cas
                 try:
                     cursor.execute("""UPDATE cases SET active = 1 WHERE case_id = %s""", (case_id,))
                     
-                    # Clear caches again since we're restoring the case
-                    print(f"🔄 STARTING cache invalidation for case restoration: {case_id}")
-                    try:
-                        clear_cases_cache()  # Clear global cache again
-                        print(f"✅ CLEARED global cases cache for case restoration: {case_id}")
-                        
-                        if user_id:
-                            clear_user_cases_cache(user_id)  # Clear user cache again
-                            print(f"✅ CLEARED user cases cache for case restoration, user: {user_id}")
-                    except Exception as cache_error:
-                        print(f"❌ Failed to clear caches during case restoration {case_id}: {str(cache_error)}")
-                    
                     conn.commit()
                     print(f"INFO: Rolled back case soft delete due to archive failure - case_id: {case_id}")
                     
-                    # Re-warm caches after restoration
+                    # Patch the restored case back into the cached case lists
                     try:
-                        threading.Thread(target=warm_cases_cache, daemon=True, name="restore_case_cache_rewarm_global").start()
-                        if user_id:
-                            threading.Thread(target=_rewarm_user_cases_cache_background, args=(user_id,), daemon=True, name=f"restore_case_cache_rewarm_user_{user_id}").start()
-                        print(f"🔄 Started cache re-warming after case restoration: {case_id}")
-                    except Exception as rewarm_error:
-                        print(f"❌ Failed to re-warm caches after case restoration {case_id}: {str(rewarm_error)}")
+                        from utils.case_cache_events import emit_case_changed
+                        emit_case_changed(case_id, user_id, conn=conn)
+                        print(f"🔄 Restored case patched back into caches: {case_id}")
+                    except Exception as cache_error:
+                        print(f"❌ Failed to update caches after case restoration {case_id}: {str(cache_error)}")
                         
                 except Exception as rollback_error:
                     print(f"CRITICAL: Failed to rollback case soft delete - case_id: {case_id}, error: {str(rollback_error)}")
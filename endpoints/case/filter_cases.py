@@ -1,26 +1,38 @@
 # Created: 2025-07-15 09:20:13
-# Last Modified: 2025-10-22 15:35:11
+# Last Modified: 2026-10-16 20:37:18
 # Author: Scott Cadreau
 
 # endpoints/case/filter_cases.py
 from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi.concurrency import run_in_threadpool
 import pymysql.cursors
-from core.database import get_db_connection, close_db_connection
+from core.database import get_db_connection, close_db_connection, get_async_db_connection, pin_user_to_writer
+from core.cache import get_cache, SingleFlight
+from core.access_tracker import get_access_tracker
+from core.rewarm import rewarm_scheduler
+from core.invalidation_bus import invalidation_bus
+from core.response_cache import json_response, drop_response_bodies
+from core.reference_data import reference_data
 from utils.monitoring import track_business_operation, business_metrics
+import os
 import time
 import json
 import logging
-import threading
 import hashlib
 from datetime import timedelta
 
 router = APIRouter()
 
-# Global cache for user cases data following established patterns
-_user_cases_cache = {}
-_user_cases_cache_lock = threading.Lock()
-# Track which cache keys belong to which users for efficient invalidation
-_user_cache_keys = {}  # user_id -> set of cache_keys
+# Bounded user cases cache (core/cache.py): 15 minute TTL, entries tagged "user:<id>" for invalidation
+# Shared across uvicorn workers through the L2 store when one is configured (core/l2_cache.py)
+USER_CASES_CACHE_TTL = 900
+_user_cases_cache = get_cache("user_cases", ttl=USER_CASES_CACHE_TTL, max_bytes=128 * 1024 * 1024, l2=True)
+# Concurrent misses for the same key wait for one query instead of each running it
+_user_cases_flight = SingleFlight("user_cases")
+# Which filters each user actually requests (core/access_tracker.py) - re-warms load the user's most frequent
+_user_cases_access = get_access_tracker("user_cases")
+USER_CASES_WARM_TOP_N = int(os.environ.get("USER_CASES_WARM_TOP_N", "3"))
+USER_CASES_WARM_TIME_BUDGET = float(os.environ.get("USER_CASES_WARM_TIME_BUDGET", "10"))
 
 def _generate_user_cases_cache_key(user_id, status_list) -> str:
     """Generate a consistent cache key for user cases"""
@@ -28,85 +40,67 @@ def _generate_user_cases_cache_key(user_id, status_list) -> str:
     cache_input = f"user_cases:{user_id}:{status_str}"
     return hashlib.md5(cache_input.encode()).hexdigest()
 
-def _is_user_cases_cache_valid(cache_key: str, cache_ttl: int = 900) -> bool:
-    """Check if cached user cases are still valid (15 minutes = 900 seconds)"""
-    time_key = f"{cache_key}_time"
-    
-    if cache_key not in _user_cases_cache or time_key not in _user_cases_cache:
-        return False
-    
-    return time.time() - _user_cases_cache[time_key] < cache_ttl
-
 def _get_cached_user_cases(cache_key: str):
     """Get cached user cases data if valid"""
-    with _user_cases_cache_lock:
-        if _is_user_cases_cache_valid(cache_key):
-            logging.debug(f"Returning cached user cases data: {cache_key}")
-            return _user_cases_cache[cache_key]
-    return None
+    cached = _user_cases_cache.get(cache_key)
+    if cached is not None:
+        logging.debug(f"Returning cached user cases data: {cache_key}")
+    return cached
 
-def _cache_user_cases_data(cache_key: str, data, user_id: str = None):
-    """Cache the user cases data with timestamp and track user association"""
-    with _user_cases_cache_lock:
-        time_key = f"{cache_key}_time"
-        _user_cases_cache[cache_key] = data
-        _user_cases_cache[time_key] = time.time()
-        
-        # Track which user this cache key belongs to for efficient invalidation
-        if user_id:
-            if user_id not in _user_cache_keys:
-                _user_cache_keys[user_id] = set()
-            _user_cache_keys[user_id].add(cache_key)
-        
+def _cache_user_cases_data(cache_key: str, data, user_id: str = None, filter_meta: dict = None):
+    """
+    Cache the user cases data, tagged with the user for efficient invalidation.
+    filter_meta (status_list, max_case_status) lets patch_user_cases_cache update the list in place.
+    """
+    tags = [f"user:{user_id}"] if user_id else None
+    if _user_cases_cache.set(cache_key, data, tags=tags, meta=filter_meta):
         logging.debug(f"Successfully cached user cases data: {cache_key}")
 
-def clear_user_cases_cache(user_id: str = None) -> None:
-    """Clear cached user cases data - for future invalidation use"""
-    with _user_cases_cache_lock:
-        if user_id:
-            # Use the user cache key tracking for efficient invalidation
-            if user_id in _user_cache_keys:
-                keys_to_remove = list(_user_cache_keys[user_id])
-                removed_count = 0
-                
-                # Remove all cache keys and their corresponding time keys
-                for cache_key in keys_to_remove:
-                    time_key = f"{cache_key}_time"
-                    
-                    # Remove data key
-                    if _user_cases_cache.pop(cache_key, None) is not None:
-                        removed_count += 1
-                    
-                    # Remove time key
-                    if _user_cases_cache.pop(time_key, None) is not None:
-                        removed_count += 1
-                
-                # Clear the user's key tracking
-                del _user_cache_keys[user_id]
-                
-                logging.info(f"Cleared {removed_count} cache entries for user: {user_id}")
-            else:
-                logging.info(f"No cache entries found for user: {user_id}")
+def clear_user_cases_cache(user_id: str = None, broadcast: bool = True) -> None:
+    """
+    Clear cached user cases data for one user, or all users.
+    broadcast publishes the invalidation so the other API nodes evict too (core/invalidation_bus.py).
+    """
+    # Requests after a write must not join a load that started before it
+    _user_cases_flight.forget(tag=f"user:{user_id}" if user_id else None)
+    if user_id:
+        removed_count = _user_cases_cache.invalidate_tag(f"user:{user_id}")
+        drop_response_bodies(f"user_cases:user:{user_id}")
+        if removed_count:
+            logging.info(f"Cleared {removed_count} cache entries for user: {user_id}")
         else:
-            cache_count = len(_user_cases_cache)
-            _user_cases_cache.clear()
-            _user_cache_keys.clear()
-            logging.info(f"Cleared all cached user cases data ({cache_count} entries)")
+            logging.info(f"No cache entries found for user: {user_id}")
+    else:
+        cache_count = _user_cases_cache.clear()
+        drop_response_bodies("user_cases")
+        logging.info(f"Cleared all cached user cases data ({cache_count} entries)")
+    if broadcast:
+        invalidation_bus.publish("user_cases", user_id or "*")
+
+# Invalidations published by other nodes evict this node's copies (without re-publishing)
+invalidation_bus.subscribe("user_cases", lambda scope: clear_user_cases_cache(None if scope == "*" else scope, broadcast=False))
 
 def _rewarm_user_cases_cache_background(user_id: str):
     """
     Background thread function to re-warm user cases cache after invalidation.
-    Pre-loads common filter combinations that users frequently access.
+    Pre-loads the filters this user requests most (core/access_tracker.py), most frequent first,
+    within USER_CASES_WARM_TIME_BUDGET; common filters fill in for users with no observed requests.
     """
     try:
         logging.info(f"Starting background cache re-warming for user: {user_id}")
+        start_time = time.time()
         
-        # Common filter combinations users typically access
-        common_filters = [
+        # Common filter combinations users typically access (used until the user's own are observed)
+        seed_filters = [
             ["all"],           # All cases - most common
             [1, 2, 3],        # Active/pending cases
             []                # Empty filter (same as all)
         ]
+        candidates = _user_cases_access.candidates(
+            USER_CASES_WARM_TOP_N,
+            seeds=[(_generate_user_cases_cache_key(user_id, status_list), {"status_list": status_list}) for status_list in seed_filters],
+            group=user_id
+        )
         
         # Get separate database connection for background operation
         conn = get_db_connection()
@@ -123,18 +117,23 @@ def _rewarm_user_cases_cache_background(user_id: str):
                 max_case_status = user_profile["max_case_status"] if user_profile else 20
                 max_case_status = max_case_status or 20
                 
-                # Re-warm each common filter combination
+                # Re-warm each filter, most frequently requested first
                 warmed_count = 0
-                for status_list in common_filters:
+                for cache_key, params, origin in candidates:
+                    if time.time() - start_time >= USER_CASES_WARM_TIME_BUDGET:
+                        logging.warning(f"⚠️ Re-warm for user {user_id} hit its {USER_CASES_WARM_TIME_BUDGET}s budget")
+                        break
+                    status_list = params["status_list"]
                     try:
                         result = _get_user_cases_optimized(cursor, user_id, status_list, max_case_status)
+                        _user_cases_access.mark_warmed(cache_key, origin)
                         case_count = len(result) if result else 0
                         warmed_count += 1
-                        logging.debug(f"Re-warmed user {user_id} filter {status_list}: {case_count} cases")
+                        logging.debug(f"Re-warmed user {user_id} filter {status_list} ({origin}): {case_count} cases")
                     except Exception as e:
                         logging.error(f"Failed to re-warm user {user_id} filter {status_list}: {str(e)}")
                 
-                logging.info(f"Background cache re-warming completed for user {user_id}: {warmed_count}/{len(common_filters)} filters warmed")
+                logging.info(f"Background cache re-warming completed for user {user_id}: {warmed_count}/{len(candidates)} filters warmed")
                 
         finally:
             close_db_connection(conn)
@@ -142,47 +141,36 @@ def _rewarm_user_cases_cache_background(user_id: str):
     except Exception as e:
         logging.error(f"Background cache re-warming failed for user {user_id}: {str(e)}")
 
+def schedule_user_cases_rewarm(user_id: str) -> str:
+    """Queue a debounced background re-warm of a user's cases cache (collapses repeated writes)"""
+    return rewarm_scheduler.schedule(f"user_cases:{user_id}", _rewarm_user_cases_cache_background, user_id, kind="user_cases")
+
 def invalidate_and_rewarm_user_cache(user_id: str):
     """
-    Invalidate user cases cache and spawn background thread to re-warm it.
+    Invalidate user cases cache and queue a background re-warm.
     Called after case create/update operations to ensure fresh data.
     """
-    # Clear the user's cache immediately
+    # Clear the user's cache immediately and keep their reads on the writer until replicas catch up
     clear_user_cases_cache(user_id)
+    pin_user_to_writer(user_id)
     
-    # Spawn background thread to re-warm cache
-    threading.Thread(
-        target=_rewarm_user_cases_cache_background,
-        args=(user_id,),
-        daemon=True,
-        name=f"cache_rewarm_{user_id}"
-    ).start()
+    # Re-warm on the shared re-warm pool (core/rewarm.py) instead of a thread per invalidation
+    outcome = schedule_user_cases_rewarm(user_id)
     
-    logging.info(f"Initiated cache invalidation and re-warming for user: {user_id}")
+    logging.info(f"Initiated cache invalidation and re-warming for user: {user_id} ({outcome})")
 
-def _get_user_cases_optimized(cursor, user_id, status_list, max_case_status):
+def _build_user_cases_query(user_id, status_list, max_case_status, case_id=None):
     """
-    Experimental optimized single query implementation for user case filtering.
-    Eliminates N+1 queries and unnecessary JOINs.
+    Build the single-query SQL and parameters for a user's filtered case list
+    (or just one case when case_id is given, for patching cached lists)
     """
-    # Generate cache key for this request
-    cache_key = _generate_user_cases_cache_key(user_id, status_list)
-    
-    # Check cache first
-    cached_result = _get_cached_user_cases(cache_key)
-    if cached_result is not None:
-        return cached_result
-    
-    # Cache miss - execute optimized query
-    logging.info(f"Cache miss for user cases query: {cache_key}")
-    
     # Build optimized single query with JSON aggregation (no surgeon/facility JOINs)
     sql = """
         SELECT 
             c.user_id, c.case_id, c.case_date, c.patient_first, c.patient_last, 
             c.ins_provider, c.surgeon_id, c.facility_id, c.case_status, 
             csl.case_status_desc,
-            c.demo_file, c.note_file, c.misc_file, c.pay_amount, c.paid_to_provider_ts, c.phi_encrypted,
+            c.demo_file, c.note_file, c.misc_file, c.pay_amount, c.paid_to_provider_ts, c.phi_encrypted, c.patient_first_enc, c.patient_last_enc, c.ins_provider_enc,
             COALESCE(
                 JSON_ARRAYAGG(
                     CASE 
@@ -204,6 +192,10 @@ def _get_user_cases_optimized(cursor, user_id, status_list, max_case_status):
     """
     params = [user_id]
     
+    if case_id is not None:
+        sql += " AND c.case_id = %s"
+        params.append(case_id)
+    
     # Add status filtering logic (same as original)
     # Manual override: Always include cases with status >= 400 regardless of filter
     if status_list and status_list != ["all"]:
@@ -231,52 +223,93 @@ def _get_user_cases_optimized(cursor, user_id, status_list, max_case_status):
         GROUP BY 
             c.case_id, c.user_id, c.case_date, c.patient_first, c.patient_last,
             c.ins_provider, c.surgeon_id, c.facility_id, c.case_status,
-            csl.case_status_desc, c.demo_file, c.note_file, c.misc_file, c.pay_amount, c.paid_to_provider_ts, c.phi_encrypted
+            csl.case_status_desc, c.demo_file, c.note_file, c.misc_file, c.pay_amount, c.paid_to_provider_ts, c.phi_encrypted, c.patient_first_enc, c.patient_last_enc, c.ins_provider_enc
         ORDER BY c.case_id DESC
     """
     
-    cursor.execute(sql, params)
-    cases = cursor.fetchall()
+    return sql, params
 
-    # Pre-fetch all case status descriptions to avoid N+1 queries
-    # This eliminates the need for individual queries in the loop below
-    cursor.execute("SELECT case_status, case_status_desc FROM case_status_list")
-    status_descriptions = {row["case_status"]: row["case_status_desc"] for row in cursor.fetchall()}
+def _user_case_matches(case_status, status_list, max_case_status) -> bool:
+    """Python mirror of the status filter in _build_user_cases_query, for one case"""
+    if not status_list or status_list == ["all"] or status_list == "all":
+        return True
+    status = int(case_status)
+    # Manual override: cases with status >= 400 are always included
+    if status >= 400:
+        return True
+    if status in [int(s) for s in status_list]:
+        return True
+    # max_case_status in the filter means "max_case_status and above"
+    return max_case_status in status_list and status >= int(max_case_status)
 
-    # Get database connection for decryption operations (passed from caller context)
-    # Note: cursor parameter provides access to the connection
-    conn = cursor.connection
+def patch_user_cases_cache(cursor, user_id: str, case_id: str) -> int:
+    """
+    Re-read one case and upsert it into (or remove it from) each of the user's cached case lists
+    according to the filter each list was built with, instead of dropping them all.
+    Lists cached without their filter are dropped.
+    
+    Returns:
+        Number of cached lists patched
+    """
+    # A load that started before the write must not land on top of the patched lists
+    _user_cases_flight.forget(tag=f"user:{user_id}")
+    keys = _user_cases_cache.keys(tag=f"user:{user_id}")
+    if not keys:
+        return 0
+    
+    sql, params = _build_user_cases_query(user_id, ["all"], None, case_id=case_id)
+    cursor.execute(sql, params)
+    row = cursor.fetchone()  # None when the case was deleted
+    
+    status_descriptions = {}
+    if row is not None:
+        status_descriptions = reference_data.mapping("case_statuses", "case_status", "case_status_desc")
+        if _needs_user_cases_decryption(user_id, [row]):
+            _decrypt_user_cases([row], user_id, cursor.connection)
     
+    def patch(cases, meta):
+        if meta is None:
+            return None
+        remaining = [case_data for case_data in cases if case_data.get("case_id") != case_id]
+        if row is None or not _user_case_matches(row["case_status"], meta["status_list"], meta["max_case_status"]):
+            return remaining
+        # Each list caps status with its own max_case_status, so process a fresh copy of the row
+        processed = _process_user_cases([dict(row)], status_descriptions, meta["max_case_status"])[0]
+        # Keep ORDER BY c.case_id DESC
+        position = next((i for i, case_data in enumerate(remaining) if str(case_data.get("case_id")) < str(case_id)), len(remaining))
+        remaining.insert(position, processed)
+        return remaining
+    
+    patched = sum(1 for key in keys if _user_cases_cache.update(key, patch))
+    logging.info(f"Patched case {case_id} into {patched}/{len(keys)} cached case lists for user: {user_id}")
+    return patched
+
+def _needs_user_cases_decryption(user_id, cases) -> bool:
+    """Check whether any case in the list has encrypted PHI that this user's list view should decrypt"""
     # TEST USER DECRYPTION: Only decrypt for test user
     TEST_USER_ID = '54d8e448-0091-7031-86bb-d66da5e8f7e0'
-    needs_decryption = (user_id == TEST_USER_ID)
+    return user_id == TEST_USER_ID and any(case_data.get('phi_encrypted') == 1 for case_data in cases)
+
+def _decrypt_user_cases(cases, user_id, conn=None):
+    """
+    Decrypt patient names in place for the list view, fetching the user's DEK once.
+    When conn is None a pooled sync connection is borrowed only if the DEK is not cached
+    (async callers run this through run_in_threadpool).
+    """
+    from utils.phi_encryption import decrypt_rows, LIST_VIEW_PHI_FIELDS
+    
+    # Only decrypt first and last name for list view (not ins_provider or dob)
+    decrypt_rows(cases, conn, fields=LIST_VIEW_PHI_FIELDS, user_id=user_id)
+    return cases
+
+def _process_user_cases(cases, status_descriptions, max_case_status):
+    """Apply status visibility, date formatting and procedure code parsing to raw case rows"""
+    from utils.phi_encryption import fold_encrypted_columns
     
+    # Ciphertext of rows that were not decrypted goes out in its legacy text form
+    fold_encrypted_columns(cases)
     result = []
     for case_data in cases:
-        # Decrypt PHI fields if needed (only patient names for list view)
-        if needs_decryption and case_data.get('phi_encrypted') == 1:
-            try:
-                from utils.phi_encryption import PHIEncryption, get_user_dek
-                
-                # Get user's DEK for decryption
-                dek = get_user_dek(user_id, conn)
-                phi_crypto = PHIEncryption()
-                
-                # Only decrypt first and last name for list view (not ins_provider or dob)
-                for field in ['patient_first', 'patient_last']:
-                    if field in case_data and case_data[field] is not None:
-                        field_value = str(case_data[field])
-                        # Skip if too short to be encrypted
-                        if len(field_value) >= 28:
-                            try:
-                                case_data[field] = phi_crypto.decrypt_field(case_data[field], dek)
-                            except Exception as field_error:
-                                logging.warning(f"[DECRYPT] Could not decrypt {field} for case {case_data.get('case_id')}, leaving as-is")
-                                pass
-            except Exception as decrypt_error:
-                logging.error(f"[DECRYPT] Failed to decrypt case {case_data.get('case_id')}: {str(decrypt_error)}")
-                # Continue processing - return encrypted data rather than failing
-        
         # Apply case status visibility restriction
         # Manual override: If case_status >= 400, display it regardless of max_case_status
         original_case_status = case_data["case_status"]
@@ -311,14 +344,98 @@ def _get_user_cases_optimized(cursor, user_id, status_list, max_case_status):
         
         result.append(case_data)
     
-    # Cache the result before returning
-    _cache_user_cases_data(cache_key, result, user_id)
-    
     return result
 
+def _get_user_cases_optimized(cursor, user_id, status_list, max_case_status):
+    """
+    Experimental optimized single query implementation for user case filtering.
+    Eliminates N+1 queries and unnecessary JOINs.
+    Sync variant used by the background cache re-warming threads.
+    """
+    # Generate cache key for this request
+    cache_key = _generate_user_cases_cache_key(user_id, status_list)
+    
+    # Check cache first
+    cached_result = _get_cached_user_cases(cache_key)
+    if cached_result is not None:
+        return cached_result
+    
+    # Cache miss - execute optimized query (once for all concurrent callers of this key)
+    logging.info(f"Cache miss for user cases query: {cache_key}")
+    
+    def load():
+        # Another caller may have filled the cache between our miss and taking the flight
+        cached = _user_cases_cache.peek(cache_key)
+        if cached is not None:
+            return cached
+        
+        sql, params = _build_user_cases_query(user_id, status_list, max_case_status)
+        cursor.execute(sql, params)
+        cases = cursor.fetchall()
+
+        # Status descriptions come from the in-memory reference data snapshot (core/reference_data.py)
+        status_descriptions = reference_data.mapping("case_statuses", "case_status", "case_status_desc")
+
+        # Decrypt using the caller's connection (cursor parameter provides access to it)
+        if _needs_user_cases_decryption(user_id, cases):
+            _decrypt_user_cases(cases, user_id, cursor.connection)
+        
+        return _process_user_cases(cases, status_descriptions, max_case_status)
+    
+    # Cache the result unless the key was invalidated while the query ran
+    return _user_cases_flight.do(
+        cache_key, load,
+        store=lambda result: _cache_user_cases_data(cache_key, result, user_id, {"status_list": status_list, "max_case_status": max_case_status}),
+        tags=[f"user:{user_id}"]
+    )
+
+async def _get_user_cases_optimized_async(cursor, user_id, status_list, max_case_status):
+    """
+    Async variant of _get_user_cases_optimized for the /case_filter endpoint.
+    Shares the cache, query builder and row processing with the sync path.
+    Only this request path counts accesses for warming - re-warm loads don't inflate their own scores.
+    """
+    # Generate cache key for this request
+    cache_key = _generate_user_cases_cache_key(user_id, status_list)
+    
+    # Check cache first
+    cached_result = _get_cached_user_cases(cache_key)
+    _user_cases_access.record(cache_key, {"status_list": status_list}, hit=cached_result is not None, group=user_id)
+    if cached_result is not None:
+        return cached_result
+    
+    # Cache miss - execute optimized query (once for all concurrent callers of this key)
+    logging.info(f"Cache miss for user cases query: {cache_key}")
+    
+    async def load():
+        # Another caller may have filled the cache between our miss and taking the flight
+        cached = _user_cases_cache.peek(cache_key)
+        if cached is not None:
+            return cached
+        
+        sql, params = _build_user_cases_query(user_id, status_list, max_case_status)
+        await cursor.execute(sql, params)
+        cases = list(await cursor.fetchall())
+
+        # Status descriptions come from the in-memory reference data snapshot (core/reference_data.py)
+        status_descriptions = await reference_data.mapping_async("case_statuses", "case_status", "case_status_desc")
+
+        # DEK lookup and KMS calls are blocking - run them off the event loop
+        if _needs_user_cases_decryption(user_id, cases):
+            await run_in_threadpool(_decrypt_user_cases, cases, user_id)
+        
+        return _process_user_cases(cases, status_descriptions, max_case_status)
+    
+    # Cache the result unless the key was invalidated while the query ran
+    return await _user_cases_flight.do_async(
+        cache_key, load,
+        store=lambda result: _cache_user_cases_data(cache_key, result, user_id, {"status_list": status_list, "max_case_status": max_case_status}),
+        tags=[f"user:{user_id}"]
+    )
+
 @router.get("/case_filter")
 @track_business_operation("filter", "case")
-def get_cases(
+async def get_cases(
     request: Request, 
     user_id: str = Query(..., description="The user ID to retrieve cases for"), 
     filter: str = Query("", description="Comma-separated list of case_status values (e.g. 0,1,2) or 'all' for all statuses"), 
@@ -412,11 +529,13 @@ def get_cases(
         - Success/failure metrics with user identification
     
     Performance Features:
+        - Async endpoint on the aiomysql pool: waiting on the database does not hold a threadpool worker
         - Optimized queries with proper JOIN usage
         - Batch procedure code fetching
         - Efficient duplicate removal for procedure codes
         - Cases ordered by case_id DESC for most recent first
         - Only active cases retrieved (active = 1)
+        - Cached lists are served as pre-encoded JSON with an ETag; send If-None-Match to get 304 Not Modified
     
     Example Usage:
         GET /case_filter?user_id=USER123&filter=1,2,20
@@ -465,10 +584,10 @@ def get_cases(
         - Date fields are converted to ISO format for consistent API responses
         - User profile determines maximum visible case status level
     """
-    conn = None
     start_time = time.time()
     response_status = 200
     response_data = None
+    response_body = None
     error_message = None
     
     try:
@@ -480,17 +599,16 @@ def get_cases(
         else:
             status_list = []
 
-        conn = get_db_connection()
-        
-        try:
-            with conn.cursor(pymysql.cursors.DictCursor) as cursor:
+        # Read-only: served by the reader endpoint unless this user just wrote a case
+        async with get_async_db_connection(readonly=True, user_id=user_id) as conn:
+            async with conn.cursor() as cursor:
                 # Get user's max_case_status from user_profile
-                cursor.execute("""
+                await cursor.execute("""
                     SELECT max_case_status 
                     FROM user_profile 
                     WHERE user_id = %s AND active = 1
                 """, (user_id,))
-                user_profile = cursor.fetchone()
+                user_profile = await cursor.fetchone()
                 
                 if not user_profile:
                     # If user profile not found, use default max_case_status of 20
@@ -499,20 +617,25 @@ def get_cases(
                     max_case_status = user_profile["max_case_status"] or 20
                 
                 # Use optimized single query implementation
-                result = _get_user_cases_optimized(cursor, user_id, status_list, max_case_status)
+                result = await _get_user_cases_optimized_async(cursor, user_id, status_list, max_case_status)
                 
                 # Record successful case filtering
                 business_metrics.record_case_operation("filter", "success", f"user_{user_id}")
             
-        finally:
-            close_db_connection(conn)
-            
         response_data = {
             "cases": result,
             "user_id": user_id,
             "filter": status_list
         }
-        return response_data
+        # Cache hits reuse the encoded body; a matching If-None-Match gets an empty 304
+        response = json_response(
+            request, response_data,
+            cache_key=f"case_filter:{_generate_user_cases_cache_key(user_id, status_list)}",
+            source=result, tags=["user_cases", f"user_cases:user:{user_id}"]
+        )
+        response_status = response.status_code
+        response_body = response.body
+        return response
 
     except HTTPException as http_error:
         # Re-raise HTTP exceptions and capture error details
@@ -530,11 +653,13 @@ def get_cases(
         
         # Log request details for monitoring using the utility function
         from endpoints.utility.log_request import log_request_from_endpoint
-        log_request_from_endpoint(
+        await run_in_threadpool(
+            log_request_from_endpoint,
             request=request,
             execution_time_ms=execution_time_ms,
             response_status=response_status,
             user_id=user_id,
             response_data=response_data,
-            error_message=error_message
+            error_message=error_message,
+            response_body=response_body
         )
\ No newline at end of file
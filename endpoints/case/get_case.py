@@ -1,11 +1,11 @@
 # Created: 2025-07-15 09:20:13
-# Last Modified: 2025-10-22 14:53:53
+# Last Modified: 2026-10-16 20:09:10
 # Author: Scott Cadreau
 
 # endpoints/case/get_case.py
 from fastapi import APIRouter, HTTPException, Query, Request
-import pymysql.cursors
-from core.database import get_db_connection, close_db_connection
+from fastapi.concurrency import run_in_threadpool
+from core.database import get_db_connection, close_db_connection, get_async_db_connection
 from utils.monitoring import track_business_operation, business_metrics
 import time
 import json
@@ -14,17 +14,32 @@ import logging
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
-def _get_case_optimized(cursor, case_id, calling_user_id):
+def _decrypt_case_phi(case_data, user_id):
+    """
+    Decrypt PHI fields of a case in place using a pooled sync connection for the DEK lookup.
+    Called via run_in_threadpool so KMS/DB work stays off the event loop.
+    """
+    from utils.phi_encryption import decrypt_patient_data
+    
+    conn = get_db_connection()
+    try:
+        decrypt_patient_data(case_data, user_id, conn)
+    finally:
+        close_db_connection(conn)
+    return case_data
+
+async def _get_case_optimized(cursor, case_id, calling_user_id):
     """
     Experimental optimized single query implementation for case retrieval.
     Combines case data, user profiles, and procedure codes in one query.
+    Runs on the async (aiomysql) pool.
     """
     # Single optimized query with all necessary JOINs and JSON aggregation
     sql = """
         SELECT 
             c.user_id, c.case_id, c.case_date, c.patient_first, c.patient_last, 
             c.ins_provider, c.surgeon_id, c.facility_id, c.case_status, 
-            c.demo_file, c.note_file, c.misc_file, c.admin_file, c.pay_amount, c.pay_category, c.patient_dob, c.phi_encrypted,
+            c.demo_file, c.note_file, c.misc_file, c.admin_file, c.pay_amount, c.pay_category, c.patient_dob, c.phi_encrypted, c.patient_first_enc, c.patient_last_enc, c.ins_provider_enc,
             CONCAT(s.first_name, ' ', s.last_name) as surgeon_name,
             f.facility_name, f.facility_state, f.facility_npi, s.surgeon_npi,
             up.max_case_status as owner_max_case_status,
@@ -66,8 +81,8 @@ def _get_case_optimized(cursor, case_id, calling_user_id):
     """
     
     # Execute with parameters (calling_user_id appears 3 times in the query)
-    cursor.execute(sql, (calling_user_id, calling_user_id, calling_user_id, case_id))
-    case_data = cursor.fetchone()
+    await cursor.execute(sql, (calling_user_id, calling_user_id, calling_user_id, case_id))
+    case_data = await cursor.fetchone()
     
     if not case_data:
         return None
@@ -125,7 +140,7 @@ def _get_case_optimized(cursor, case_id, calling_user_id):
 
 @router.get("/case")
 @track_business_operation("read", "case")
-def get_case(
+async def get_case(
     request: Request, 
     case_id: str = Query(..., description="The case ID to retrieve"), 
     calling_user_id: str = Query(None, description="Optional user ID to check max_case_status against (for permission-based visibility)"), 
@@ -227,6 +242,7 @@ def get_case(
         - All database queries use parameterized statements
     
     Performance Optimizations:
+        - Async endpoint on the aiomysql pool: waiting on the database does not hold a threadpool worker
         - Single transaction for all database operations
         - Efficient JOIN operations for related data
         - Proper connection management with automatic cleanup
@@ -289,7 +305,6 @@ def get_case(
         - When calling_user_id is provided, it takes precedence over case owner's permissions
         - Usage of calling_user_id parameter is tracked in response logging for monitoring
     """
-    conn = None
     start_time = time.time()
     response_status = 200
     response_data = None
@@ -303,12 +318,10 @@ def get_case(
             error_message = "Missing case_id parameter"
             raise HTTPException(status_code=400, detail="Missing case_id parameter")
 
-        conn = get_db_connection()
-
-        try:
-            with conn.cursor(pymysql.cursors.DictCursor) as cursor:
+        async with get_async_db_connection() as conn:
+            async with conn.cursor() as cursor:
                 # Use optimized single query implementation
-                result = _get_case_optimized(cursor, case_id, calling_user_id)
+                result = await _get_case_optimized(cursor, case_id, calling_user_id)
                 if result is None:
                     # Case not found
                     business_metrics.record_case_operation("read", "not_found", case_id)
@@ -329,22 +342,22 @@ def get_case(
                 if case_data.get('phi_encrypted') == 1:
                     if user_id == TEST_USER_ID:
                         logger.info(f"[ENCRYPTION TEST] Decrypting PHI for test user case: {case_id}")
-                        from utils.phi_encryption import decrypt_patient_data
                         
                         # Decrypt the PHI fields in place
-                        decrypt_patient_data(case_data, user_id, conn)
+                        await run_in_threadpool(_decrypt_case_phi, case_data, user_id)
                         
                         logger.info(f"[ENCRYPTION TEST] PHI decrypted successfully for case: {case_id}")
                     else:
                         # This shouldn't happen (only test user should have encrypted cases)
                         logger.warning(f"[ENCRYPTION] Encrypted case found for non-test user: {user_id}")
-                
+
+                # Ciphertext that was not decrypted goes out in its legacy text form
+                from utils.phi_encryption import fold_encrypted_columns
+                fold_encrypted_columns([case_data])
+
                 # Record successful case read operation
                 business_metrics.record_case_operation("read", "success", case_id)
 
-        finally:
-            close_db_connection(conn)
-
         response_data = {
             "case": case_data,
             "user_id": case_data["user_id"],
@@ -373,7 +386,8 @@ def get_case(
         if response_data and using_calling_user_id:
             response_data["calling_user_id_used"] = calling_user_id
         
-        log_request_from_endpoint(
+        await run_in_threadpool(
+            log_request_from_endpoint,
             request=request,
             execution_time_ms=execution_time_ms,
             response_status=response_status,
@@ -1,19 +1,20 @@
 # Created: 2025-08-26 23:50:11
-# Last Modified: 2025-11-14 17:21:44
+# Last Modified: 2026-10-16 20:38:16
 # Author: Scott Cadreau
 
 # endpoints/case/group_cases.py
 from fastapi import APIRouter, HTTPException, Query, Request
-import pymysql.cursors
-from core.database import get_db_connection, close_db_connection
+from fastapi.concurrency import run_in_threadpool
+from core.database import get_async_db_connection
+from core.response_cache import json_response
+from core.reference_data import reference_data
 from utils.monitoring import track_business_operation, business_metrics
 import time
 import json
-import logging
 
 router = APIRouter()
 
-def _validate_group_admin_access(requesting_user_id: str, target_user_id: str, cursor) -> bool:
+async def _validate_group_admin_access(requesting_user_id: str, target_user_id: str, cursor) -> bool:
     """
     Validate if requesting user can access cases for target user through group admin privileges.
     
@@ -30,7 +31,7 @@ def _validate_group_admin_access(requesting_user_id: str, target_user_id: str, c
         return True
     
     # Check if requesting user is a group admin for any group containing target user
-    cursor.execute("""
+    await cursor.execute("""
         SELECT 1 
         FROM provider_groups pg
         JOIN provider_group_members pgm ON pg.id = pgm.group_id
@@ -40,9 +41,9 @@ def _validate_group_admin_access(requesting_user_id: str, target_user_id: str, c
         LIMIT 1
     """, (requesting_user_id, target_user_id))
     
-    return cursor.fetchone() is not None
+    return await cursor.fetchone() is not None
 
-def _get_group_users(requesting_user_id: str, cursor) -> list:
+async def _get_group_users(requesting_user_id: str, cursor) -> list:
     """
     Get all users that the requesting user can access through group admin privileges.
     
@@ -54,14 +55,14 @@ def _get_group_users(requesting_user_id: str, cursor) -> list:
         list: List of user_ids that the requesting user can access
     """
     # Get all users in groups where requesting user is an admin
-    cursor.execute("""
+    await cursor.execute("""
         SELECT DISTINCT pgm.user_id
         FROM provider_groups pg
         JOIN provider_group_members pgm ON pg.id = pgm.group_id
         WHERE pg.admin_user_id = %s AND pg.active = 1
     """, (requesting_user_id,))
     
-    group_users = [row["user_id"] for row in cursor.fetchall()]
+    group_users = [row["user_id"] for row in await cursor.fetchall()]
     
     # Always include the requesting user themselves
     if requesting_user_id not in group_users:
@@ -69,13 +70,33 @@ def _get_group_users(requesting_user_id: str, cursor) -> list:
     
     return group_users
 
-def _get_group_cases_optimized(cursor, requesting_user_id: str, target_user_id: str, status_list, max_case_status):
+def _needs_group_cases_decryption(cases) -> bool:
+    """Check whether any case in the list has encrypted PHI owned by a user whose list view is decrypted"""
+    # TEST USER DECRYPTION: Only decrypt for test user
+    TEST_USER_ID = '54d8e448-0091-7031-86bb-d66da5e8f7e0'
+    return any(case_data.get('phi_encrypted') == 1 and case_data.get('user_id') == TEST_USER_ID for case_data in cases)
+
+def _decrypt_group_cases(cases, conn=None):
+    """
+    Decrypt patient names in place for the group list view, fetching each case owner's DEK once.
+    When conn is None a pooled sync connection is borrowed only for DEKs that are not cached
+    (async callers run this through run_in_threadpool).
+    """
+    from utils.phi_encryption import decrypt_rows, LIST_VIEW_PHI_FIELDS
+    TEST_USER_ID = '54d8e448-0091-7031-86bb-d66da5e8f7e0'
+    
+    # Only decrypt first and last name for group list view
+    test_user_cases = [case_data for case_data in cases if case_data.get('user_id') == TEST_USER_ID]
+    decrypt_rows(test_user_cases, conn, fields=LIST_VIEW_PHI_FIELDS)
+    return cases
+
+async def _get_group_cases_optimized(cursor, requesting_user_id: str, target_user_id: str, status_list, max_case_status):
     """
     Optimized query implementation for group admin case filtering.
     Based on the original _get_user_cases_optimized but adapted for group access.
     """
     # Validate access permission
-    if not _validate_group_admin_access(requesting_user_id, target_user_id, cursor):
+    if not await _validate_group_admin_access(requesting_user_id, target_user_id, cursor):
         raise HTTPException(status_code=403, detail="Access denied: User not authorized to view these cases")
     
     # Build optimized single query with JSON aggregation and provider name
@@ -84,7 +105,7 @@ def _get_group_cases_optimized(cursor, requesting_user_id: str, target_user_id:
             c.user_id, c.case_id, c.case_date, c.patient_first, c.patient_last, 
             c.ins_provider, c.surgeon_id, c.facility_id, c.case_status, 
             csl.case_status_desc,
-            c.demo_file, c.note_file, c.misc_file, c.pay_amount, c.phi_encrypted,
+            c.demo_file, c.note_file, c.misc_file, c.pay_amount, c.phi_encrypted, c.patient_first_enc, c.patient_last_enc, c.ins_provider_enc,
             CONCAT(COALESCE(up.first_name, ''), ' ', COALESCE(up.last_name, '')) as provider_name,
             COALESCE(
                 JSON_ARRAYAGG(
@@ -134,51 +155,26 @@ def _get_group_cases_optimized(cursor, requesting_user_id: str, target_user_id:
         GROUP BY 
             c.case_id, c.user_id, c.case_date, c.patient_first, c.patient_last,
             c.ins_provider, c.surgeon_id, c.facility_id, c.case_status,
-            csl.case_status_desc, c.demo_file, c.note_file, c.misc_file, c.pay_amount, c.phi_encrypted,
+            csl.case_status_desc, c.demo_file, c.note_file, c.misc_file, c.pay_amount, c.phi_encrypted, c.patient_first_enc, c.patient_last_enc, c.ins_provider_enc,
             up.first_name, up.last_name
         ORDER BY c.case_id DESC
     """
     
-    cursor.execute(sql, params)
-    cases = cursor.fetchall()
+    await cursor.execute(sql, params)
+    cases = list(await cursor.fetchall())
 
-    # Pre-fetch all case status descriptions to avoid N+1 queries
-    cursor.execute("SELECT case_status, case_status_desc FROM case_status_list")
-    status_descriptions = {row["case_status"]: row["case_status_desc"] for row in cursor.fetchall()}
+    # Status descriptions come from the in-memory reference data snapshot (core/reference_data.py)
+    status_descriptions = await reference_data.mapping_async("case_statuses", "case_status", "case_status_desc")
 
-    # Get database connection for decryption operations
-    conn = cursor.connection
-    
-    # TEST USER DECRYPTION: Only decrypt for test user
-    TEST_USER_ID = '54d8e448-0091-7031-86bb-d66da5e8f7e0'
-    needs_decryption = (target_user_id == TEST_USER_ID)
+    # DEK lookup and KMS calls are blocking - run them off the event loop
+    if _needs_group_cases_decryption(cases):
+        await run_in_threadpool(_decrypt_group_cases, cases)
+    # Ciphertext of rows that were not decrypted goes out in its legacy text form
+    from utils.phi_encryption import fold_encrypted_columns
+    fold_encrypted_columns(cases)
 
     result = []
     for case_data in cases:
-        # Decrypt PHI fields if needed (only patient names for list view)
-        if needs_decryption and case_data.get('phi_encrypted') == 1:
-            try:
-                from utils.phi_encryption import PHIEncryption, get_user_dek
-                
-                # Get user's DEK for decryption
-                dek = get_user_dek(target_user_id, conn)
-                phi_crypto = PHIEncryption()
-                
-                # Only decrypt first and last name for list view
-                for field in ['patient_first', 'patient_last']:
-                    if field in case_data and case_data[field] is not None:
-                        field_value = str(case_data[field])
-                        # Skip if too short to be encrypted
-                        if len(field_value) >= 28:
-                            try:
-                                case_data[field] = phi_crypto.decrypt_field(case_data[field], dek)
-                            except Exception as field_error:
-                                logging.warning(f"[DECRYPT] Could not decrypt {field} for case {case_data.get('case_id')}, leaving as-is")
-                                pass
-            except Exception as decrypt_error:
-                logging.error(f"[DECRYPT] Failed to decrypt case {case_data.get('case_id')}: {str(decrypt_error)}")
-                # Continue processing - return encrypted data rather than failing
-        
         # Apply case status visibility restriction
         original_case_status = case_data["case_status"]
         if original_case_status > max_case_status:
@@ -214,12 +210,12 @@ def _get_group_cases_optimized(cursor, requesting_user_id: str, target_user_id:
     
     return result
 
-def _get_all_group_cases_optimized(cursor, requesting_user_id: str, status_list, max_case_status):
+async def _get_all_group_cases_optimized(cursor, requesting_user_id: str, status_list, max_case_status):
     """
     Get cases for all users in groups where requesting user is an admin.
     """
     # Get all accessible users
-    accessible_users = _get_group_users(requesting_user_id, cursor)
+    accessible_users = await _get_group_users(requesting_user_id, cursor)
     
     if not accessible_users:
         return []
@@ -230,7 +226,7 @@ def _get_all_group_cases_optimized(cursor, requesting_user_id: str, status_list,
             c.user_id, c.case_id, c.case_date, c.patient_first, c.patient_last, 
             c.ins_provider, c.surgeon_id, c.facility_id, c.case_status, 
             csl.case_status_desc,
-            c.demo_file, c.note_file, c.misc_file, c.pay_amount, c.phi_encrypted,
+            c.demo_file, c.note_file, c.misc_file, c.pay_amount, c.phi_encrypted, c.patient_first_enc, c.patient_last_enc, c.ins_provider_enc,
             CONCAT(COALESCE(up.first_name, ''), ' ', COALESCE(up.last_name, '')) as provider_name,
             COALESCE(
                 JSON_ARRAYAGG(
@@ -281,60 +277,26 @@ def _get_all_group_cases_optimized(cursor, requesting_user_id: str, status_list,
         GROUP BY 
             c.case_id, c.user_id, c.case_date, c.patient_first, c.patient_last,
             c.ins_provider, c.surgeon_id, c.facility_id, c.case_status,
-            csl.case_status_desc, c.demo_file, c.note_file, c.misc_file, c.pay_amount, c.phi_encrypted,
+            csl.case_status_desc, c.demo_file, c.note_file, c.misc_file, c.pay_amount, c.phi_encrypted, c.patient_first_enc, c.patient_last_enc, c.ins_provider_enc,
             up.first_name, up.last_name
         ORDER BY c.case_id DESC
     """
     
-    cursor.execute(sql, params)
-    cases = cursor.fetchall()
+    await cursor.execute(sql, params)
+    cases = list(await cursor.fetchall())
 
-    # Pre-fetch all case status descriptions to avoid N+1 queries
-    cursor.execute("SELECT case_status, case_status_desc FROM case_status_list")
-    status_descriptions = {row["case_status"]: row["case_status_desc"] for row in cursor.fetchall()}
+    # Status descriptions come from the in-memory reference data snapshot (core/reference_data.py)
+    status_descriptions = await reference_data.mapping_async("case_statuses", "case_status", "case_status_desc")
 
-    # Get database connection for decryption operations
-    conn = cursor.connection
-    
-    # TEST USER DECRYPTION: Only decrypt for test user
-    TEST_USER_ID = '54d8e448-0091-7031-86bb-d66da5e8f7e0'
-    
-    # Cache to track which user DEKs we've already loaded
-    decryption_attempted_users = set()
+    # DEK lookup and KMS calls are blocking - run them off the event loop
+    if _needs_group_cases_decryption(cases):
+        await run_in_threadpool(_decrypt_group_cases, cases)
+    # Ciphertext of rows that were not decrypted goes out in its legacy text form
+    from utils.phi_encryption import fold_encrypted_columns
+    fold_encrypted_columns(cases)
 
     result = []
     for case_data in cases:
-        # Decrypt PHI fields if needed (check each case's owner user_id)
-        case_owner_user_id = case_data.get('user_id')
-        if case_data.get('phi_encrypted') == 1 and case_owner_user_id == TEST_USER_ID:
-            try:
-                from utils.phi_encryption import PHIEncryption, get_user_dek
-                
-                # Get the case owner's DEK for decryption (cached if we've seen this user before)
-                dek = get_user_dek(case_owner_user_id, conn)
-                phi_crypto = PHIEncryption()
-                
-                # Only decrypt first and last name for group list view
-                for field in ['patient_first', 'patient_last']:
-                    if field in case_data and case_data[field] is not None:
-                        field_value = str(case_data[field])
-                        # Skip if too short to be encrypted
-                        if len(field_value) >= 28:
-                            try:
-                                case_data[field] = phi_crypto.decrypt_field(case_data[field], dek)
-                            except Exception as field_error:
-                                logging.warning(f"[DECRYPT] Could not decrypt {field} for case {case_data.get('case_id')}, leaving as-is")
-                                pass
-                
-                # Track that we've attempted decryption for this user
-                if case_owner_user_id not in decryption_attempted_users:
-                    decryption_attempted_users.add(case_owner_user_id)
-                    logging.info(f"[DECRYPT] Decrypting group cases for user: {case_owner_user_id}")
-                    
-            except Exception as decrypt_error:
-                logging.error(f"[DECRYPT] Failed to decrypt case {case_data.get('case_id')} for user {case_owner_user_id}: {str(decrypt_error)}")
-                # Continue processing - return encrypted data rather than failing
-        
         # Apply case status visibility restriction
         original_case_status = case_data["case_status"]
         if original_case_status > max_case_status:
@@ -372,7 +334,7 @@ def _get_all_group_cases_optimized(cursor, requesting_user_id: str, status_list,
 
 @router.get("/group_cases")
 @track_business_operation("filter", "group_cases")
-def get_group_cases(
+async def get_group_cases(
     request: Request, 
     requesting_user_id: str = Query(..., description="The user ID making the request (must be group admin)"), 
     target_user_id: str = Query(None, description="Specific user ID to retrieve cases for (optional - if not provided, returns all group cases)"), 
@@ -486,12 +448,14 @@ def get_group_cases(
         - Access control violation logging for security monitoring
     
     Performance Features:
+        - Async endpoint on the aiomysql pool: waiting on the database does not hold a threadpool worker
         - Optimized queries with proper JOIN usage
         - Batch procedure code fetching with JSON aggregation
         - Efficient duplicate removal for procedure codes
         - Cases ordered by case_id DESC for most recent first
         - Only active cases retrieved (active = 1)
         - Single query for multiple user access when target_user_id not specified
+        - Responses carry an ETag; send If-None-Match to get 304 Not Modified when nothing changed
     
     Example Usage:
         # Get all cases for users in requesting user's managed groups
@@ -557,10 +521,10 @@ def get_group_cases(
         - Provider names are fetched from user_profile table for easy identification
         - Surgeon and facility names are null in list view for performance
     """
-    conn = None
     start_time = time.time()
     response_status = 200
     response_data = None
+    response_body = None
     error_message = None
     
     try:
@@ -572,17 +536,15 @@ def get_group_cases(
         else:
             status_list = []
 
-        conn = get_db_connection()
-        
-        try:
-            with conn.cursor(pymysql.cursors.DictCursor) as cursor:
+        async with get_async_db_connection() as conn:
+            async with conn.cursor() as cursor:
                 # Get requesting user's max_case_status from user_profile
-                cursor.execute("""
+                await cursor.execute("""
                     SELECT max_case_status 
                     FROM user_profile 
                     WHERE user_id = %s AND active = 1
                 """, (requesting_user_id,))
-                user_profile = cursor.fetchone()
+                user_profile = await cursor.fetchone()
                 
                 if not user_profile:
                     # If user profile not found, use default max_case_status of 20
@@ -593,19 +555,16 @@ def get_group_cases(
                 # Determine which cases to retrieve
                 if target_user_id:
                     # Get cases for specific user (with permission validation)
-                    result = _get_group_cases_optimized(cursor, requesting_user_id, target_user_id, status_list, max_case_status)
-                    accessible_users = _get_group_users(requesting_user_id, cursor)
+                    result = await _get_group_cases_optimized(cursor, requesting_user_id, target_user_id, status_list, max_case_status)
+                    accessible_users = await _get_group_users(requesting_user_id, cursor)
                 else:
                     # Get cases for all users in requesting user's managed groups
-                    result = _get_all_group_cases_optimized(cursor, requesting_user_id, status_list, max_case_status)
-                    accessible_users = _get_group_users(requesting_user_id, cursor)
+                    result = await _get_all_group_cases_optimized(cursor, requesting_user_id, status_list, max_case_status)
+                    accessible_users = await _get_group_users(requesting_user_id, cursor)
                 
                 # Record successful group case filtering
                 business_metrics.record_case_operation("group_filter", "success", f"requesting_user_{requesting_user_id}")
             
-        finally:
-            close_db_connection(conn)
-            
         response_data = {
             "cases": result,
             "requesting_user_id": requesting_user_id,
@@ -613,7 +572,11 @@ def get_group_cases(
             "accessible_users": accessible_users,
             "filter": status_list
         }
-        return response_data
+        # Group lists aren't cached, but polling clients still get an empty 304 when nothing changed
+        response = json_response(request, response_data)
+        response_status = response.status_code
+        response_body = response.body
+        return response
 
     except HTTPException as http_error:
         # Re-raise HTTP exceptions and capture error details
@@ -633,11 +596,13 @@ def get_group_cases(
         
         # Log request details for monitoring using the utility function
         from endpoints.utility.log_request import log_request_from_endpoint
-        log_request_from_endpoint(
+        await run_in_threadpool(
+            log_request_from_endpoint,
             request=request,
             execution_time_ms=execution_time_ms,
             response_status=response_status,
             user_id=requesting_user_id,
             response_data=response_data,
-            error_message=error_message
+            error_message=error_message,
+            response_body=response_body
         )
@@ -1,5 +1,5 @@
 # Created: 2025-07-15 09:20:13
-# Last Modified: 2025-11-01 02:47:34
+# Last Modified: 2026-10-16 20:09:10
 # Author: Scott Cadreau
 
 # endpoints/case/update_case.py
@@ -7,7 +7,7 @@ from fastapi import APIRouter, HTTPException, Body, Request
 import pymysql.cursors
 import logging
 import time
-from core.database import get_db_connection, close_db_connection, is_connection_valid
+from core.database import get_db_connection, close_db_connection, is_connection_valid, pin_user_to_writer
 from core.models import CaseUpdate
 from utils.case_status import update_case_status
 from utils.pay_amount_calculator import update_case_pay_amount_v2
@@ -233,9 +233,10 @@ def update_case(request: Request, case: CaseUpdate = Body(...)):
         conn = get_db_connection()
         
         with conn.cursor(pymysql.cursors.DictCursor) as cursor:
-            # Check if case exists
-            cursor.execute("SELECT case_id FROM cases WHERE case_id = %s", (case.case_id,))
-            if not cursor.fetchone():
+            # Check if case exists (and remember its status - a status change rebuilds the case caches)
+            cursor.execute("SELECT case_id, case_status FROM cases WHERE case_id = %s", (case.case_id,))
+            existing_case = cursor.fetchone()
+            if not existing_case:
                 # Record failed case update (not found)
                 business_metrics.record_case_operation("update", "not_found", case.case_id)
                 response_status = 404
@@ -259,7 +260,7 @@ def update_case(request: Request, case: CaseUpdate = Body(...)):
                 
                 if use_encryption:
                     logger.info(f"[ENCRYPTION TEST] Encrypting updated PHI fields for test user case: {case.case_id}")
-                    from utils.phi_encryption import encrypt_patient_data
+                    from utils.phi_encryption import encrypt_patient_data, compute_blind_indexes
                     
                     # Prepare patient data for encryption (only the fields being updated)
                     # Note: patient_dob is NOT encrypted (DATE column cannot store encrypted text)
@@ -272,15 +273,19 @@ def update_case(request: Request, case: CaseUpdate = Body(...)):
                         patient_data['ins_provider'] = update_fields['ins_provider']
                     # patient_dob stays in update_fields as-is (not encrypted)
                     
+                    # Blind indexes for updated names, computed from the plaintext before encryption
+                    blind_indexes = compute_blind_indexes(patient_data, case_owner_user_id, conn)
+                    
                     # Encrypt the data
                     encrypt_patient_data(patient_data, case_owner_user_id, conn)
                     
-                    # Update the update_fields dict with encrypted values
+                    # Update the update_fields dict with encrypted values (text and binary <field>_enc columns)
                     for field, encrypted_value in patient_data.items():
                         update_fields[field] = encrypted_value
                     
-                    # Add phi_encrypted flag to update
+                    # Add phi_encrypted flag and blind indexes to update
                     update_fields['phi_encrypted'] = 1
+                    update_fields.update(blind_indexes)
                     
                     logger.info(f"[ENCRYPTION TEST] PHI fields encrypted successfully for case: {case.case_id}")
                 
@@ -290,7 +295,8 @@ def update_case(request: Request, case: CaseUpdate = Body(...)):
                 sql = f"UPDATE cases SET {set_clause} WHERE case_id = %s"
                 cursor.execute(sql, values)
                 if cursor.rowcount > 0:
-                    updated_fields.extend(update_fields.keys())
+                    # Blind index and binary ciphertext columns are internal, not fields the client updated
+                    updated_fields.extend(field for field in update_fields if not field.endswith(('_bidx', '_enc')))
 
             # Initialize auto-fix variables
             corrected_codes = []
@@ -357,41 +363,25 @@ def update_case(request: Request, case: CaseUpdate = Body(...)):
             # Update case status if conditions are met (within the same transaction)
             status_update_result = update_case_status(case.case_id, conn)
             
-            # Clear caches BEFORE commit to prevent race conditions
-            # This ensures no stale data gets cached between clear and commit
             logger.info("🚨 FILE VALIDATION CHECKPOINT - We made it to validation logic!")
-            logger.info(f"🔄 STARTING cache invalidation for case update: {case.case_id}")
-            try:
-                # 1. Clear global cases cache (affects admin dashboard) - but don't re-warm yet
-                from endpoints.backoffice.get_cases_by_status import clear_cases_cache
-                clear_cases_cache()  # Clear all cached data
-                logger.info(f"✅ CLEARED global cases cache before commit for case update: {case.case_id}")
-                
-                # 2. Clear user cases cache - but don't re-warm yet
-                from endpoints.case.filter_cases import clear_user_cases_cache
-                
-                # Get user_id from the case data (either provided or from database)
-                target_user_id = case.user_id
-                if not target_user_id:
-                    # Get user_id from database if not provided in update
-                    cursor.execute("SELECT user_id FROM cases WHERE case_id = %s", (case.case_id,))
-                    case_user = cursor.fetchone()
-                    if case_user:
-                        target_user_id = case_user['user_id']
-                
-                if target_user_id:
-                    clear_user_cases_cache(target_user_id)  # Clear all cache entries for this user
-                    logger.info(f"✅ CLEARED user cases cache for user: {target_user_id}")
-                else:
-                    logger.warning(f"⚠️ Could not determine user_id for cache invalidation, case: {case.case_id}")
-                    
-            except Exception as e:
-                # Don't fail the main operation if cache invalidation fails
-                logger.error(f"❌ Failed to invalidate caches before commit for case update {case.case_id}: {str(e)}", exc_info=True)
+            
+            # Determine the case owner for cache maintenance after commit
+            target_user_id = case.user_id
+            if not target_user_id:
+                # Get user_id from database if not provided in update
+                cursor.execute("SELECT user_id FROM cases WHERE case_id = %s", (case.case_id,))
+                case_user = cursor.fetchone()
+                if case_user:
+                    target_user_id = case_user['user_id']
+            if not target_user_id:
+                logger.warning(f"⚠️ Could not determine user_id for cache maintenance, case: {case.case_id}")
             
             # Commit all changes at once
             conn.commit()
             logger.info(f"✅ COMMITTED database changes for case update: {case.case_id}")
+            
+            # Read-your-writes: keep this user's reads on the writer until replicas catch up
+            pin_user_to_writer(target_user_id)
 
             # Record successful case update
             business_metrics.record_case_operation("update", "success", case.case_id)
@@ -446,32 +436,15 @@ def update_case(request: Request, case: CaseUpdate = Body(...)):
                         else:
                             logger.info(f"✅ File validation successful for {field_name}: {filename}")
             
-            # Re-warm caches after successful commit
+            # Patch the updated case into the cached case lists (rebuilt instead if its status changed)
             try:
-                # Re-warm global cases cache in background
-                from endpoints.backoffice.get_cases_by_status import warm_cases_cache
-                import threading
-                threading.Thread(
-                    target=warm_cases_cache,
-                    daemon=True,
-                    name="update_case_cache_rewarm_global"
-                ).start()
-                logger.info(f"🔄 Started background re-warming of global cases cache after case update: {case.case_id}")
-                
-                # Re-warm user cache if we have a user_id
-                if target_user_id:
-                    from endpoints.case.filter_cases import _rewarm_user_cases_cache_background
-                    threading.Thread(
-                        target=_rewarm_user_cases_cache_background,
-                        args=(target_user_id,),
-                        daemon=True,
-                        name=f"update_case_cache_rewarm_user_{target_user_id}"
-                    ).start()
-                    logger.info(f"🔄 Started background re-warming of user cases cache for user: {target_user_id}")
+                from utils.case_cache_events import emit_case_changed
+                cache_outcome = emit_case_changed(case.case_id, target_user_id, old_status=existing_case['case_status'], conn=conn)
+                logger.info(f"🔄 Case caches {cache_outcome} after case update: {case.case_id}")
                 
             except Exception as e:
-                # Don't fail the main operation if cache re-warming fails
-                logger.error(f"❌ Failed to re-warm caches after case update {case.case_id}: {str(e)}", exc_info=True)
+                # Don't fail the main operation if cache maintenance fails
+                logger.error(f"❌ Failed to update caches after case update {case.case_id}: {str(e)}", exc_info=True)
 
         response_body = {
             "message": "Case updated successfully",
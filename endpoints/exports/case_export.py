@@ -1,5 +1,5 @@
 # Created: 2025-07-28 19:48:18
-# Last Modified: 2025-11-14 15:32:19
+# Last Modified: 2026-10-16 20:35:44
 # Author: Scott Cadreau
 
 # endpoints/exports/case_export.py
@@ -7,7 +7,8 @@ from fastapi import APIRouter, HTTPException, Request
 from fastapi.responses import FileResponse, StreamingResponse
 from pydantic import BaseModel
 import pymysql.cursors
-from core.database import get_db_connection, close_db_connection
+from core.database import get_db_connection, close_db_connection, PRIORITY_REPORT
+from core.fast_json import FastJSONResponse, dumps
 from utils.monitoring import track_business_operation, business_metrics, logger
 from utils.s3_storage import upload_file_to_s3, generate_s3_key
 from utils.report_cleanup import cleanup_old_reports
@@ -39,6 +40,16 @@ def export_cases_stream(request_obj: Request, export_request: CaseExportRequest)
     """
     import json
     
+    # Check out before streaming starts: once the 200 header is sent a shed export could only
+    # report the overload in the body, instead of as 503 + Retry-After
+    conn = None
+    if export_request.case_ids:
+        try:
+            conn = get_db_connection(priority=PRIORITY_REPORT)
+        except Exception:
+            business_metrics.record_utility_operation("case_export_stream", "error")
+            raise
+    
     def generate_streaming_response():
         start_time = time.time()
         
@@ -51,8 +62,6 @@ def export_cases_stream(request_obj: Request, export_request: CaseExportRequest)
             if logger:
                 logger.info(f"Starting streaming case export for {total_cases} cases")
             
-            conn = get_db_connection()
-            
             try:
                 with conn.cursor(pymysql.cursors.DictCursor) as cursor:
                     # Use very small batch size for streaming (3 cases at a time)
@@ -77,7 +86,7 @@ def export_cases_stream(request_obj: Request, export_request: CaseExportRequest)
                             for case in batch_cases:
                                 if not first_case:
                                     yield ","
-                                yield json.dumps(case)
+                                yield dumps(case)
                                 first_case = False
                                 
                             all_cases.extend(batch_cases)
@@ -198,7 +207,7 @@ def _get_cases_with_json_agg(cursor: pymysql.cursors.DictCursor, case_ids: List[
             c.biller_status, c.sent_to_biller_ts, c.received_pmnt_ts, 
             c.sent_to_negotiation_ts, c.settled_ts, c.sent_to_idr_ts, 
             c.idr_decision_ts, c.closed_ts, c.pay_amount, 
-            c.pay_category, c.pending_payment_ts, c.phi_encrypted, sl.surgeon_npi,
+            c.pay_category, c.pending_payment_ts, c.phi_encrypted, c.patient_first_enc, c.patient_last_enc, c.ins_provider_enc, sl.surgeon_npi,
             fl.facility_npi, fl.facility_state,
             up.first_name as provider_first_name, up.last_name as provider_last_name,
             up.email as provider_email, up.telephone as provider_telephone, up.user_npi as provider_npi,
@@ -224,7 +233,7 @@ def _get_cases_with_json_agg(cursor: pymysql.cursors.DictCursor, case_ids: List[
                  c.biller_status, c.sent_to_biller_ts, c.received_pmnt_ts, 
                  c.sent_to_negotiation_ts, c.settled_ts, c.sent_to_idr_ts, 
                  c.idr_decision_ts, c.closed_ts, c.pay_amount, 
-                 c.pay_category, c.pending_payment_ts, c.phi_encrypted, sl.surgeon_npi,
+                 c.pay_category, c.pending_payment_ts, c.phi_encrypted, c.patient_first_enc, c.patient_last_enc, c.ins_provider_enc, sl.surgeon_npi,
                  fl.facility_npi, fl.facility_state,
                  up.first_name, up.last_name, up.email, up.telephone, up.user_npi
         ORDER BY c.case_id
@@ -239,49 +248,11 @@ def _get_cases_with_json_agg(cursor: pymysql.cursors.DictCursor, case_ids: List[
     # TEST USER DECRYPTION: Only decrypt for test user
     TEST_USER_ID = '54d8e448-0091-7031-86bb-d66da5e8f7e0'
     
-    # Cache to track which user DEKs we've already loaded
-    decryption_attempted_users = set()
-    
     # Process results and convert concatenated string to list
     cases = []
     for row in results:
         case_data = {k: v for k, v in row.items() if k != 'procedure_codes_concat'}
         
-        # Decrypt PHI fields if needed (check each case's owner user_id)
-        case_owner_user_id = case_data.get('user_id')
-        if case_data.get('phi_encrypted') == 1 and case_owner_user_id == TEST_USER_ID:
-            try:
-                from utils.phi_encryption import PHIEncryption, get_user_dek
-                import logging
-                
-                # Get the case owner's DEK for decryption (cached if we've seen this user before)
-                dek = get_user_dek(case_owner_user_id, conn)
-                phi_crypto = PHIEncryption()
-                
-                # Decrypt patient first and last name for export
-                for field in ['patient_first', 'patient_last']:
-                    if field in case_data and case_data[field] is not None:
-                        field_value = str(case_data[field])
-                        # Skip if too short to be encrypted
-                        if len(field_value) >= 28:
-                            try:
-                                case_data[field] = phi_crypto.decrypt_field(case_data[field], dek)
-                            except Exception as field_error:
-                                if logger:
-                                    logger.warning(f"[DECRYPT] Could not decrypt {field} for case {case_data.get('case_id')}, leaving as-is")
-                                pass
-                
-                # Track that we've attempted decryption for this user
-                if case_owner_user_id not in decryption_attempted_users:
-                    decryption_attempted_users.add(case_owner_user_id)
-                    if logger:
-                        logger.info(f"[DECRYPT] Decrypting export cases for user: {case_owner_user_id}")
-                    
-            except Exception as decrypt_error:
-                if logger:
-                    logger.error(f"[DECRYPT] Failed to decrypt case {case_data.get('case_id')} for user {case_owner_user_id}: {str(decrypt_error)}")
-                # Continue processing - return encrypted data rather than failing
-        
         # Parse concatenated procedure codes
         procedure_codes_concat = row.get('procedure_codes_concat', '')
         if procedure_codes_concat:
@@ -292,6 +263,12 @@ def _get_cases_with_json_agg(cursor: pymysql.cursors.DictCursor, case_ids: List[
         case_data['procedure_codes'] = procedure_codes
         cases.append(case_data)
     
+    # Decrypt patient first and last name for export, one DEK fetch per case owner
+    from utils.phi_encryption import decrypt_rows, fold_encrypted_columns, LIST_VIEW_PHI_FIELDS
+    decrypt_rows([case_data for case_data in cases if case_data.get('user_id') == TEST_USER_ID],
+                 conn, fields=LIST_VIEW_PHI_FIELDS)
+    fold_encrypted_columns(cases)
+    
     return cases
 
 def format_export_response(cases: List[Dict[str, Any]], requested_case_ids: List[str]) -> Dict[str, Any]:
@@ -453,10 +430,12 @@ def export_cases(request_obj: Request, export_request: CaseExportRequest):
         - Missing cases are reported in the summary for audit purposes
         - Export format is JSON for programmatic consumption
         - Use /export_cases_csv for spreadsheet-compatible format
+        - Rows are encoded directly with FastJSONResponse (no jsonable_encoder pass over trusted DB rows)
     """
     start_time = time.time()
     response_status = 200
     response_data = None
+    response_body = None
     error_message = None
     
     try:
@@ -475,7 +454,7 @@ def export_cases(request_obj: Request, export_request: CaseExportRequest):
             if logger:
                 logger.warning(f"Large case export requested: {total_cases} cases - using batched processing")
         
-        conn = get_db_connection()
+        conn = get_db_connection(priority=PRIORITY_REPORT)
         
         try:
             with conn.cursor(pymysql.cursors.DictCursor) as cursor:
@@ -498,7 +477,10 @@ def export_cases(request_obj: Request, export_request: CaseExportRequest):
                     logger.info(f"Case export completed: {len(cases)} cases found, {total_cases - len(cases)} missing")
                 
                 response_data = response
-                return response
+                # Trusted DB rows: encode Decimal/datetime natively and skip jsonable_encoder
+                encoded = FastJSONResponse(response)
+                response_body = encoded.body
+                return encoded
                 
         finally:
             close_db_connection(conn)
@@ -524,7 +506,8 @@ def export_cases(request_obj: Request, export_request: CaseExportRequest):
             response_status=response_status,
             user_id=None,
             response_data=response_data,
-            error_message=error_message
+            error_message=error_message,
+            response_body=response_body
         )
 
 @router.post("/export_cases_csv")
@@ -644,7 +627,7 @@ def export_cases_csv(request_obj: Request, export_request: CaseExportRequest):
             if logger:
                 logger.warning(f"Large CSV case export requested: {total_cases} cases - using batched processing")
         
-        conn = get_db_connection()
+        conn = get_db_connection(priority=PRIORITY_REPORT)
         
         try:
             with conn.cursor(pymysql.cursors.DictCursor) as cursor:
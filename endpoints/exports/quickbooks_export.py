@@ -1,12 +1,12 @@
 # Created: 2025-01-27 15:00:00
-# Last Modified: 2025-08-08 16:10:46
+# Last Modified: 2026-10-16 20:24:06
 # Author: Scott Cadreau
 
 # endpoints/exports/quickbooks_export.py
 from fastapi import APIRouter, HTTPException, Query, Request
 from fastapi.responses import FileResponse
 import pymysql.cursors
-from core.database import get_db_connection, close_db_connection
+from core.database import get_db_connection, close_db_connection, PRIORITY_REPORT
 from utils.monitoring import track_business_operation, business_metrics
 from utils.report_cleanup import cleanup_old_reports
 from utils.s3_storage import upload_file_to_s3, generate_s3_key
@@ -76,6 +76,9 @@ def get_provider_payment_data(
             c.patient_last,
             c.pay_amount,
             c.pay_category,
+            c.phi_encrypted,
+            c.patient_first_enc,
+            c.patient_last_enc,
             up.first_name,
             up.last_name,
             up.user_npi
@@ -103,6 +106,13 @@ def get_provider_payment_data(
     cursor.execute(sql, params)
     cases = cursor.fetchall()
     
+    # Decrypt patient first and last name for the export (multi-user, one DEK fetch per case owner)
+    from utils.phi_encryption import decrypt_rows, fold_encrypted_columns, LIST_VIEW_PHI_FIELDS
+    TEST_USER_ID = '54d8e448-0091-7031-86bb-d66da5e8f7e0'
+    decrypt_rows([case for case in cases if case.get('user_id') == TEST_USER_ID],
+                 cursor.connection, fields=LIST_VIEW_PHI_FIELDS)
+    fold_encrypted_columns(cases, LIST_VIEW_PHI_FIELDS)
+    
     # Get procedure codes for each case
     for case in cases:
         cursor.execute(
@@ -364,7 +374,7 @@ def export_quickbooks_vendors_csv(
     error_message = None
     
     try:
-        conn = get_db_connection()
+        conn = get_db_connection(priority=PRIORITY_REPORT)
         
         try:
             with conn.cursor(pymysql.cursors.DictCursor) as cursor:
@@ -585,7 +595,7 @@ def export_quickbooks_transactions_iif(
     error_message = None
     
     try:
-        conn = get_db_connection()
+        conn = get_db_connection(priority=PRIORITY_REPORT)
         
         try:
             with conn.cursor(pymysql.cursors.DictCursor) as cursor:
@@ -1,9 +1,10 @@
 # Created: 2025-07-15 09:20:13
-# Last Modified: 2025-08-20 09:23:50
+# Last Modified: 2026-10-16 19:11:40
 # Author: Scott Cadreau
 
 # endpoints/health.py
 from fastapi import APIRouter, HTTPException
+from fastapi.responses import JSONResponse
 from core.database import get_db_connection
 from utils.monitoring import track_business_operation, business_metrics
 import boto3
@@ -643,6 +644,24 @@ def readiness_check():
         logger.error(f"Readiness check failed: {str(e)}")
         raise HTTPException(status_code=503, detail="Service not ready")
 
+@router.get("/ready")
+def startup_readiness():
+    """
+    Load balancer readiness check - 200 once the critical startup caches are warm, 503 before.
+    
+    Unlike /health (which probes dependencies) this makes no external calls: it reports
+    the startup orchestrator's phases (secrets, DB pool, cases cache, DEKs, ...) with the
+    status and duration of each, so a restarting worker is only added to rotation when warm.
+    The `import_profile` section lists the slowest modules imported at startup (milliseconds).
+    """
+    from core.startup import startup_orchestrator
+    from core import import_profile
+    status = startup_orchestrator.get_status()
+    status["import_profile"] = import_profile.summary(top=15)
+    if not status["ready"]:
+        return JSONResponse(status_code=503, content=status, headers={"Retry-After": "5"})
+    return status
+
 @router.get("/health/live")
 @track_business_operation("check", "health_live")
 def liveness_check():
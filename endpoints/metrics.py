@@ -1,5 +1,5 @@
 # Created: 2025-01-27
-# Last Modified: 2025-07-29 02:28:35
+# Last Modified: 2026-10-16 18:48:16
 # Author: Scott Cadreau
 
 # endpoints/metrics.py
@@ -133,6 +133,9 @@ def database_metrics():
     try:
         db_stats = db_monitor.get_connection_stats()
         
+        from core.database import get_async_pool_stats
+        db_stats["async_pool"] = get_async_pool_stats()
+        
         logger.debug("database_metrics_accessed", endpoint="/metrics/database")
         
         return {
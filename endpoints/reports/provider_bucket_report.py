@@ -1,12 +1,12 @@
 # Created: 2025-11-14 15:46:34
-# Last Modified: 2025-11-14 15:47:23
+# Last Modified: 2026-10-16 19:04:33
 # Author: Scott Cadreau
 
 # endpoints/reports/provider_bucket_report.py
 from fastapi import APIRouter, HTTPException, Query, Request
 from fastapi.responses import FileResponse
 import pymysql.cursors
-from core.database import get_db_connection, close_db_connection
+from core.database import get_db_connection, close_db_connection, PRIORITY_REPORT
 from utils.monitoring import track_business_operation, business_metrics, logger
 from utils.s3_storage import upload_file_to_s3, generate_s3_key
 from utils.report_cleanup import cleanup_old_reports
@@ -211,7 +211,7 @@ def generate_provider_bucket_report(
         if logger:
             logger.info(f"Starting provider bucket report generation")
         
-        conn = get_db_connection()
+        conn = get_db_connection(readonly=True, priority=PRIORITY_REPORT)
         
         try:
             # INPUT VALIDATION -- Check date format if provided
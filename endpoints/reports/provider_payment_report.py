@@ -1,29 +1,32 @@
 # Created: 2025-01-27 10:00:00
-# Last Modified: 2025-10-20 14:21:48
+# Last Modified: 2026-10-16 20:37:49
 # Author: Scott Cadreau
 
 # endpoints/reports/provider_payment_report.py
 from fastapi import APIRouter, HTTPException, Query, Request
 from fastapi.responses import FileResponse
 import pymysql.cursors
-from core.database import get_db_connection, close_db_connection
+from core.database import get_db_connection, close_db_connection, PRIORITY_REPORT
 from utils.monitoring import track_business_operation, business_metrics
 from utils.report_cleanup import cleanup_old_reports, get_reports_directory_size
 from utils.s3_storage import upload_file_to_s3, generate_s3_key
-from utils.text_formatting import capitalize_name_field
 from utils.email_service import send_provider_payment_report_emails
-from utils.timezone_utils import format_datetime_for_user
-from fpdf import FPDF
 from datetime import datetime, timedelta
 import os
 import tempfile
 import logging
 import time
-from typing import Optional, List, Dict
-from pypdf import PdfReader, PdfWriter
+from typing import Optional
 
 logger = logging.getLogger(__name__)
 
+def __getattr__(name):
+    # ProviderPaymentReportPDF lives in provider_payment_report_pdf (loads fpdf); keep the old import path working
+    if name == "ProviderPaymentReportPDF":
+        from endpoints.reports.provider_payment_report_pdf import ProviderPaymentReportPDF
+        return ProviderPaymentReportPDF
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 router = APIRouter()
 
 def get_upcoming_friday(run_date=None):
@@ -44,174 +47,6 @@ def get_upcoming_friday(run_date=None):
     upcoming_friday = run_date + timedelta(days=days_until_friday)
     return upcoming_friday
 
-class ProviderPaymentReportPDF(FPDF):
-    def __init__(self, user_id: Optional[str] = None):
-        super().__init__()
-        self.user_id = user_id
-    
-    def header(self):
-        self.set_font("Arial", 'B', 13)
-        header_height = self.font_size + 2
-        self.cell(0, header_height, "All-Stars Surgical Assist - Provider Payment Report", ln=True, align="C")
-        self.ln(2)
-        
-        self.set_font("Arial", '', 11)
-        info_height = self.font_size + 1
-        # Use user's timezone for report date
-        report_date = format_datetime_for_user(
-            datetime.utcnow(), 
-            user_id=self.user_id, 
-            format_string='%B %d, %Y'
-        )
-        self.cell(0, info_height, f"Report Date: {report_date}", ln=True, align="L")
-        self.ln(1)
-
-    def footer(self):
-        self.set_y(-20)
-        self.set_font("Arial", 'I', 8)
-        footer_height = self.font_size + 1
-        # Use user's timezone for footer timestamp
-        footer_timestamp = format_datetime_for_user(
-            datetime.utcnow(), 
-            user_id=self.user_id, 
-            format_string='%Y-%m-%d %H:%M:%S %Z'
-        )
-        self.cell(0, footer_height, f"Report generated on: {footer_timestamp}", align="L")
-        self.cell(0, footer_height, f"Page {self.page_no()} of {{nb}}", align="R")
-
-    def add_provider_section(self, provider_data, cases_data, is_first_provider=False):
-        """Add a section for each provider with their cases"""
-        # Start new page for each provider (except the first one)
-        if not is_first_provider:
-            self.add_page()
-        
-        # Provider header
-        self.set_font("Arial", '', 11)
-        provider_height = self.font_size + 2
-        first_name = provider_data.get('first_name', '') or ''
-        last_name = provider_data.get('last_name', '') or ''
-        # Apply proper capitalization to provider names
-        if first_name:
-            first_name = capitalize_name_field(first_name)
-        if last_name:
-            last_name = capitalize_name_field(last_name)
-        provider_name = f"Provider: {first_name} {last_name}".strip()
-        if provider_data.get('user_npi'):
-            provider_name += f" (NPI: {provider_data['user_npi']})"
-        
-        self.cell(0, provider_height, provider_name, ln=True, align="L")
-        
-        # Add projected pay date line below provider name
-        projected_pay_date = get_upcoming_friday()
-        projected_pay_text = f"Projected Pay Date: {projected_pay_date.strftime('%B %d, %Y')}"
-        self.cell(0, provider_height, projected_pay_text, ln=True, align="L")
-        self.ln(2)
-
-        # Table header
-        self.set_font("Arial", 'B', 10)
-        header_height = self.font_size + 2
-        self.cell(25, header_height, "Date", border=1)
-        self.cell(50, header_height, "Patient Name", border=1)
-        self.cell(55, header_height, "Procedure(s)", border=1)
-        self.cell(30, header_height, "Category", border=1)
-        self.cell(20, header_height, "Amount", border=1, ln=True, align="R")
-
-        # Table data
-        self.set_font("Arial", '', 10)
-        data_height = self.font_size + 2
-        provider_total = 0
-        
-        for case in cases_data:
-            # Format date
-            case_date = case['case_date']
-            if hasattr(case_date, 'strftime'):
-                formatted_date = case_date.strftime('%Y-%m-%d')
-            else:
-                formatted_date = str(case_date)[:10]  # Take first 10 chars if it's a string
-            
-            # Format patient name
-            patient_first = case.get('patient_first', '') or ''
-            patient_last = case.get('patient_last', '') or ''
-            # Apply proper capitalization to patient names
-            if patient_first:
-                patient_first = capitalize_name_field(patient_first)
-            if patient_last:
-                patient_last = capitalize_name_field(patient_last)
-            patient_name = f"{patient_first} {patient_last}".strip()
-            
-            # Format procedures - show first 4 codes, then +X for additional
-            procedures_list = case.get('procedures', [])
-            if not isinstance(procedures_list, list):
-                procedures_list = []
-            
-            if len(procedures_list) <= 4:
-                # Show all procedures if 4 or fewer
-                procedures_display = ', '.join(procedures_list) if procedures_list else ''
-            else:
-                # Show first 4 procedures + count of additional
-                first_four = ', '.join(procedures_list[:4])
-                additional_count = len(procedures_list) - 4
-                procedures_display = f"{first_four} +{additional_count}"
-            
-            # Format amount
-            amount = case.get('pay_amount', 0) or 0
-            
-            self.cell(25, data_height, formatted_date, border=1)
-            self.cell(50, data_height, patient_name, border=1)
-            self.cell(55, data_height, procedures_display, border=1)
-            self.cell(30, data_height, case.get('pay_category', '') or '', border=1)
-            self.cell(20, data_height, f"${amount:.2f}", border=1, ln=True, align="R")
-            provider_total += amount
-
-        # Provider subtotal
-        self.set_font("Arial", 'B', 10)
-        total_height = self.font_size + 3
-        self.cell(160, total_height, f"Provider Total:", align="R")
-        self.cell(20, total_height, f"${provider_total:.2f}", border=1, ln=True, align="R")
-        self.ln(5)
-        
-        return provider_total
-
-    def add_summary(self, total_amount, provider_count, case_count):
-        """Add summary section at the end"""
-        self.add_page()
-        
-        self.set_font("Arial", 'B', 14)
-        self.cell(0, 10, "Report Summary", ln=True, align="C")
-        self.ln(5)
-        
-        self.set_font("Arial", '', 12)
-        self.cell(0, 8, f"Total Providers: {provider_count}", ln=True)
-        self.cell(0, 8, f"Total Cases: {case_count}", ln=True)
-        self.cell(0, 8, f"Total Amount: ${total_amount:.2f}", ln=True)
-
-    def add_pay_category_summary(self, category_data: List[Dict]):
-        """Add pay category summary section at the end"""
-        # Add some blank lines before the category summary
-        self.ln(8)
-        self.ln(8)
-        
-        # Category summary header
-        self.set_font("Arial", 'B', 12)
-        self.cell(0, 8, "Payment Summary by Category", ln=True, align="L")
-        self.ln(3)
-        
-        # Only show summary if we have category data
-        if category_data:
-            self.set_font("Arial", '', 11)
-            
-            for category in category_data:
-                pay_category = category.get('pay_category') or 'Unspecified'
-                case_count = category.get('case_count', 0) or 0
-                total_amount = category.get('total_amount', 0) or 0
-                
-                # Format the line: "Category - X cases - $X.XX"
-                category_line = f"{pay_category} - {case_count} cases - ${total_amount:.2f}"
-                self.cell(0, 6, category_line, ln=True)
-        else:
-            self.set_font("Arial", 'I', 10)
-            self.cell(0, 6, "No payment category data available", ln=True)
-
 def password_protect_pdf(input_path: str, output_path: str, password: str) -> bool:
     """
     Password protect a PDF file using pypdf
@@ -224,6 +59,9 @@ def password_protect_pdf(input_path: str, output_path: str, password: str) -> bo
     Returns:
         True if successful, False otherwise
     """
+    # pypdf is only needed when a report is password protected - load it on first use
+    from pypdf import PdfReader, PdfWriter
+    
     try:
         reader = PdfReader(input_path)
         writer = PdfWriter()
@@ -448,7 +286,7 @@ def generate_provider_payment_report(
     error_message = None
     
     try:
-        conn = get_db_connection()
+        conn = get_db_connection(readonly=True, priority=PRIORITY_REPORT)
         
         try:
             with conn.cursor(pymysql.cursors.DictCursor) as cursor:
@@ -463,6 +301,8 @@ def generate_provider_payment_report(
                         c.pay_amount,
                         c.pay_category,
                         c.phi_encrypted,
+                        c.patient_first_enc,
+                        c.patient_last_enc,
                         up.first_name,
                         up.last_name,
                         up.user_npi
@@ -502,40 +342,12 @@ def generate_provider_payment_report(
                         detail="No cases found matching the criteria"
                     )
                 
-                # Decrypt PHI fields if needed (multi-user report)
+                # Decrypt patient first and last name for PDF report (multi-user report)
+                from utils.phi_encryption import decrypt_rows, fold_encrypted_columns, LIST_VIEW_PHI_FIELDS
                 TEST_USER_ID = '54d8e448-0091-7031-86bb-d66da5e8f7e0'
-                decryption_attempted_users = set()
-                
-                for case in cases:
-                    case_owner_user_id = case.get('user_id')
-                    if case.get('phi_encrypted') == 1 and case_owner_user_id == TEST_USER_ID:
-                        try:
-                            from utils.phi_encryption import PHIEncryption, get_user_dek
-                            
-                            # Get the case owner's DEK for decryption (cached if we've seen this user before)
-                            dek = get_user_dek(case_owner_user_id, conn)
-                            phi_crypto = PHIEncryption()
-                            
-                            # Decrypt patient first and last name for PDF report
-                            for field in ['patient_first', 'patient_last']:
-                                if field in case and case[field] is not None:
-                                    field_value = str(case[field])
-                                    # Skip if too short to be encrypted
-                                    if len(field_value) >= 28:
-                                        try:
-                                            case[field] = phi_crypto.decrypt_field(case[field], dek)
-                                        except Exception as field_error:
-                                            logger.warning(f"[DECRYPT] Could not decrypt {field} for case {case.get('case_id')}, leaving as-is")
-                                            pass
-                            
-                            # Track that we've attempted decryption for this user
-                            if case_owner_user_id not in decryption_attempted_users:
-                                decryption_attempted_users.add(case_owner_user_id)
-                                logger.info(f"[DECRYPT] Decrypting payment report for user: {case_owner_user_id}")
-                                
-                        except Exception as decrypt_error:
-                            logger.error(f"[DECRYPT] Failed to decrypt case {case.get('case_id')} for user {case_owner_user_id}: {str(decrypt_error)}")
-                            # Continue processing - use encrypted names in report rather than failing
+                decrypt_rows([case for case in cases if case.get('user_id') == TEST_USER_ID],
+                             conn, fields=LIST_VIEW_PHI_FIELDS)
+                fold_encrypted_columns(cases, LIST_VIEW_PHI_FIELDS)
                 
                 # Get procedure codes for each case
                 for case in cases:
@@ -595,7 +407,8 @@ def generate_provider_payment_report(
                         }
                     providers[user_id]['cases'].append(case)
                 
-                # Generate PDF
+                # Generate PDF (fpdf is loaded on first report, not at startup)
+                from endpoints.reports.provider_payment_report_pdf import ProviderPaymentReportPDF
                 pdf = ProviderPaymentReportPDF(user_id=user_id)
                 pdf.alias_nb_pages()
                 pdf.add_page()
@@ -875,7 +688,7 @@ def generate_individual_provider_reports(
         Dictionary with generation results
     """
     try:
-        conn = get_db_connection()
+        conn = get_db_connection(readonly=True, priority=PRIORITY_REPORT)
         results = {
             "success": True,
             "message": "Individual provider reports generated successfully",
@@ -1017,7 +830,7 @@ def generate_single_provider_report(
         Dictionary with generation results
     """
     try:
-        conn = get_db_connection()
+        conn = get_db_connection(readonly=True, priority=PRIORITY_REPORT)
         
         try:
             with conn.cursor(pymysql.cursors.DictCursor) as cursor:
@@ -1032,6 +845,8 @@ def generate_single_provider_report(
                         c.pay_amount,
                         c.pay_category,
                         c.phi_encrypted,
+                        c.patient_first_enc,
+                        c.patient_last_enc,
                         up.first_name,
                         up.last_name,
                         up.user_npi
@@ -1067,41 +882,12 @@ def generate_single_provider_report(
                         "email_sent": False
                     }
                 
-                # Decrypt PHI fields if needed (single provider report)
+                # Decrypt patient first and last name for PDF report (single provider, so one DEK for all cases)
+                from utils.phi_encryption import decrypt_rows, fold_encrypted_columns, LIST_VIEW_PHI_FIELDS
                 TEST_USER_ID = '54d8e448-0091-7031-86bb-d66da5e8f7e0'
-                needs_decryption = (user_id == TEST_USER_ID)
-                
-                if needs_decryption:
-                    # Check if any case has encrypted data
-                    has_encrypted = any(case.get('phi_encrypted') == 1 for case in cases)
-                    
-                    if has_encrypted:
-                        try:
-                            from utils.phi_encryption import PHIEncryption, get_user_dek
-                            
-                            # Get user's DEK for decryption (single provider, so same DEK for all cases)
-                            dek = get_user_dek(user_id, conn)
-                            phi_crypto = PHIEncryption()
-                            
-                            logger.info(f"[DECRYPT] Decrypting individual payment report for user: {user_id}")
-                            
-                            for case in cases:
-                                if case.get('phi_encrypted') == 1:
-                                    # Decrypt patient first and last name for PDF report
-                                    for field in ['patient_first', 'patient_last']:
-                                        if field in case and case[field] is not None:
-                                            field_value = str(case[field])
-                                            # Skip if too short to be encrypted
-                                            if len(field_value) >= 28:
-                                                try:
-                                                    case[field] = phi_crypto.decrypt_field(case[field], dek)
-                                                except Exception as field_error:
-                                                    logger.warning(f"[DECRYPT] Could not decrypt {field} for case {case.get('case_id')}, leaving as-is")
-                                                    pass
-                                
-                        except Exception as decrypt_error:
-                            logger.error(f"[DECRYPT] Failed to decrypt cases for user {user_id}: {str(decrypt_error)}")
-                            # Continue processing - use encrypted names in report rather than failing
+                if user_id == TEST_USER_ID:
+                    decrypt_rows(cases, conn, fields=LIST_VIEW_PHI_FIELDS, user_id=user_id)
+                fold_encrypted_columns(cases, LIST_VIEW_PHI_FIELDS)
                 
                 # Get procedure codes for each case
                 for case in cases:
@@ -1123,6 +909,7 @@ def generate_single_provider_report(
                 }
                 
                 # Create PDF
+                from endpoints.reports.provider_payment_report_pdf import ProviderPaymentReportPDF
                 pdf = ProviderPaymentReportPDF(user_id=user_id)
                 pdf.add_page()
                 
@@ -0,0 +1,183 @@
+# Created: 2026-10-16 19:52:30
+# Last Modified: 2026-10-16 19:52:30
+# Author: Scott Cadreau
+
+# endpoints/reports/provider_payment_report_pdf.py
+"""
+PDF layout for the provider payment report. Kept out of provider_payment_report.py so fpdf
+is only imported when a report is generated, not at application startup.
+"""
+from fpdf import FPDF
+from datetime import datetime
+from typing import Optional, List, Dict
+from utils.text_formatting import capitalize_name_field
+from utils.timezone_utils import format_datetime_for_user
+from endpoints.reports.provider_payment_report import get_upcoming_friday
+
+class ProviderPaymentReportPDF(FPDF):
+    def __init__(self, user_id: Optional[str] = None):
+        super().__init__()
+        self.user_id = user_id
+    
+    def header(self):
+        self.set_font("Arial", 'B', 13)
+        header_height = self.font_size + 2
+        self.cell(0, header_height, "All-Stars Surgical Assist - Provider Payment Report", ln=True, align="C")
+        self.ln(2)
+        
+        self.set_font("Arial", '', 11)
+        info_height = self.font_size + 1
+        # Use user's timezone for report date
+        report_date = format_datetime_for_user(
+            datetime.utcnow(), 
+            user_id=self.user_id, 
+            format_string='%B %d, %Y'
+        )
+        self.cell(0, info_height, f"Report Date: {report_date}", ln=True, align="L")
+        self.ln(1)
+
+    def footer(self):
+        self.set_y(-20)
+        self.set_font("Arial", 'I', 8)
+        footer_height = self.font_size + 1
+        # Use user's timezone for footer timestamp
+        footer_timestamp = format_datetime_for_user(
+            datetime.utcnow(), 
+            user_id=self.user_id, 
+            format_string='%Y-%m-%d %H:%M:%S %Z'
+        )
+        self.cell(0, footer_height, f"Report generated on: {footer_timestamp}", align="L")
+        self.cell(0, footer_height, f"Page {self.page_no()} of {{nb}}", align="R")
+
+    def add_provider_section(self, provider_data, cases_data, is_first_provider=False):
+        """Add a section for each provider with their cases"""
+        # Start new page for each provider (except the first one)
+        if not is_first_provider:
+            self.add_page()
+        
+        # Provider header
+        self.set_font("Arial", '', 11)
+        provider_height = self.font_size + 2
+        first_name = provider_data.get('first_name', '') or ''
+        last_name = provider_data.get('last_name', '') or ''
+        # Apply proper capitalization to provider names
+        if first_name:
+            first_name = capitalize_name_field(first_name)
+        if last_name:
+            last_name = capitalize_name_field(last_name)
+        provider_name = f"Provider: {first_name} {last_name}".strip()
+        if provider_data.get('user_npi'):
+            provider_name += f" (NPI: {provider_data['user_npi']})"
+        
+        self.cell(0, provider_height, provider_name, ln=True, align="L")
+        
+        # Add projected pay date line below provider name
+        projected_pay_date = get_upcoming_friday()
+        projected_pay_text = f"Projected Pay Date: {projected_pay_date.strftime('%B %d, %Y')}"
+        self.cell(0, provider_height, projected_pay_text, ln=True, align="L")
+        self.ln(2)
+
+        # Table header
+        self.set_font("Arial", 'B', 10)
+        header_height = self.font_size + 2
+        self.cell(25, header_height, "Date", border=1)
+        self.cell(50, header_height, "Patient Name", border=1)
+        self.cell(55, header_height, "Procedure(s)", border=1)
+        self.cell(30, header_height, "Category", border=1)
+        self.cell(20, header_height, "Amount", border=1, ln=True, align="R")
+
+        # Table data
+        self.set_font("Arial", '', 10)
+        data_height = self.font_size + 2
+        provider_total = 0
+        
+        for case in cases_data:
+            # Format date
+            case_date = case['case_date']
+            if hasattr(case_date, 'strftime'):
+                formatted_date = case_date.strftime('%Y-%m-%d')
+            else:
+                formatted_date = str(case_date)[:10]  # Take first 10 chars if it's a string
+            
+            # Format patient name
+            patient_first = case.get('patient_first', '') or ''
+            patient_last = case.get('patient_last', '') or ''
+            # Apply proper capitalization to patient names
+            if patient_first:
+                patient_first = capitalize_name_field(patient_first)
+            if patient_last:
+                patient_last = capitalize_name_field(patient_last)
+            patient_name = f"{patient_first} {patient_last}".strip()
+            
+            # Format procedures - show first 4 codes, then +X for additional
+            procedures_list = case.get('procedures', [])
+            if not isinstance(procedures_list, list):
+                procedures_list = []
+            
+            if len(procedures_list) <= 4:
+                # Show all procedures if 4 or fewer
+                procedures_display = ', '.join(procedures_list) if procedures_list else ''
+            else:
+                # Show first 4 procedures + count of additional
+                first_four = ', '.join(procedures_list[:4])
+                additional_count = len(procedures_list) - 4
+                procedures_display = f"{first_four} +{additional_count}"
+            
+            # Format amount
+            amount = case.get('pay_amount', 0) or 0
+            
+            self.cell(25, data_height, formatted_date, border=1)
+            self.cell(50, data_height, patient_name, border=1)
+            self.cell(55, data_height, procedures_display, border=1)
+            self.cell(30, data_height, case.get('pay_category', '') or '', border=1)
+            self.cell(20, data_height, f"${amount:.2f}", border=1, ln=True, align="R")
+            provider_total += amount
+
+        # Provider subtotal
+        self.set_font("Arial", 'B', 10)
+        total_height = self.font_size + 3
+        self.cell(160, total_height, f"Provider Total:", align="R")
+        self.cell(20, total_height, f"${provider_total:.2f}", border=1, ln=True, align="R")
+        self.ln(5)
+        
+        return provider_total
+
+    def add_summary(self, total_amount, provider_count, case_count):
+        """Add summary section at the end"""
+        self.add_page()
+        
+        self.set_font("Arial", 'B', 14)
+        self.cell(0, 10, "Report Summary", ln=True, align="C")
+        self.ln(5)
+        
+        self.set_font("Arial", '', 12)
+        self.cell(0, 8, f"Total Providers: {provider_count}", ln=True)
+        self.cell(0, 8, f"Total Cases: {case_count}", ln=True)
+        self.cell(0, 8, f"Total Amount: ${total_amount:.2f}", ln=True)
+
+    def add_pay_category_summary(self, category_data: List[Dict]):
+        """Add pay category summary section at the end"""
+        # Add some blank lines before the category summary
+        self.ln(8)
+        self.ln(8)
+        
+        # Category summary header
+        self.set_font("Arial", 'B', 12)
+        self.cell(0, 8, "Payment Summary by Category", ln=True, align="L")
+        self.ln(3)
+        
+        # Only show summary if we have category data
+        if category_data:
+            self.set_font("Arial", '', 11)
+            
+            for category in category_data:
+                pay_category = category.get('pay_category') or 'Unspecified'
+                case_count = category.get('case_count', 0) or 0
+                total_amount = category.get('total_amount', 0) or 0
+                
+                # Format the line: "Category - X cases - $X.XX"
+                category_line = f"{pay_category} - {case_count} cases - ${total_amount:.2f}"
+                self.cell(0, 6, category_line, ln=True)
+        else:
+            self.set_font("Arial", 'I', 10)
+            self.cell(0, 6, "No payment category data available", ln=True)
@@ -0,0 +1,149 @@
+# Created: 2026-10-16 19:52:30
+# Last Modified: 2026-10-16 19:52:30
+# Author: Scott Cadreau
+
+# endpoints/reports/provider_payment_summary_report_pdf.py
+"""
+PDF layout for the provider payment summary report, imported on first report generation.
+"""
+from fpdf import FPDF
+from datetime import datetime
+from typing import Optional, List, Dict
+from utils.text_formatting import capitalize_name_field
+from utils.timezone_utils import format_datetime_for_user
+
+class ProviderPaymentSummaryReportPDF(FPDF):
+    def __init__(self, user_id: Optional[str] = None):
+        super().__init__()
+        self.user_id = user_id
+
+    def header(self):
+        self.set_font("Arial", 'B', 13)
+        header_height = self.font_size + 2
+        self.cell(0, header_height, "All-Stars Surgical Assist - Provider Payment Summary Report", ln=True, align="C")
+        self.ln(2)
+        
+        self.set_font("Arial", '', 11)
+        info_height = self.font_size + 1
+        # Use user's timezone for report date
+        report_date = format_datetime_for_user(
+            datetime.utcnow(), 
+            user_id=self.user_id, 
+            format_string='%B %d, %Y'
+        )
+        self.cell(0, info_height, f"Report Date: {report_date}", ln=True, align="L")
+        self.ln(1)
+
+    def footer(self):
+        self.set_y(-20)
+        self.set_font("Arial", 'I', 8)
+        footer_height = self.font_size + 1
+        # Use user's timezone for footer timestamp
+        footer_timestamp = format_datetime_for_user(
+            datetime.utcnow(), 
+            user_id=self.user_id, 
+            format_string='%Y-%m-%d %H:%M:%S %Z'
+        )
+        self.cell(0, footer_height, f"Report generated on: {footer_timestamp}", align="L")
+        self.cell(0, footer_height, f"Page {self.page_no()} of {{nb}}", align="R")
+
+    def add_state_section(self, state_name: str, providers_data: List[Dict], is_first_state=False):
+        """Add a section for each state with their providers"""
+        # Start new page for each state (except the first one)
+        if not is_first_state:
+            self.add_page()
+        
+        # State header
+        self.set_font("Arial", 'B', 14)
+        state_header_height = self.font_size + 4
+        self.cell(0, state_header_height, f"State: {state_name}", ln=True, align="L")
+        self.ln(2)
+
+        # Table header
+        self.set_font("Arial", 'B', 10)
+        header_height = self.font_size + 2
+        self.cell(60, header_height, "Provider Name", border=1)
+        self.cell(30, header_height, "NPI", border=1)
+        self.cell(30, header_height, "Total Cases", border=1, align="C")
+        self.cell(40, header_height, "Total Amount", border=1, ln=True, align="R")
+
+        # Table data
+        self.set_font("Arial", '', 10)
+        data_height = self.font_size + 2
+        state_total = 0
+        
+        for provider in providers_data:
+            # Format provider name
+            first_name = provider.get('first_name', '') or ''
+            last_name = provider.get('last_name', '') or ''
+            # Apply proper capitalization to provider names
+            if first_name:
+                first_name = capitalize_name_field(first_name)
+            if last_name:
+                last_name = capitalize_name_field(last_name)
+            provider_name = f"{first_name} {last_name}".strip()
+            
+            # Format NPI
+            npi = provider.get('user_npi', '') or ''
+            if npi:
+                npi = str(npi)
+            
+            # Format amount and case count
+            total_amount = provider.get('total_amount', 0) or 0
+            case_count = provider.get('case_count', 0) or 0
+            
+            self.cell(60, data_height, provider_name, border=1)
+            self.cell(30, data_height, npi, border=1)
+            self.cell(30, data_height, str(case_count), border=1, align="C")
+            self.cell(40, data_height, f"${total_amount:.2f}", border=1, ln=True, align="R")
+            state_total += total_amount
+
+        # State subtotal
+        self.set_font("Arial", 'B', 10)
+        total_height = self.font_size + 3
+        self.cell(120, total_height, f"State Total:", align="R")
+        self.cell(40, total_height, f"${state_total:.2f}", border=1, ln=True, align="R")
+        self.ln(8)
+        
+        return state_total
+
+    def add_summary(self, total_amount, state_count, provider_count, case_count):
+        """Add summary section at the end"""
+        self.add_page()
+        
+        self.set_font("Arial", 'B', 14)
+        self.cell(0, 10, "Report Summary", ln=True, align="C")
+        self.ln(5)
+        
+        self.set_font("Arial", '', 12)
+        self.cell(0, 8, f"Total States: {state_count}", ln=True)
+        self.cell(0, 8, f"Total Providers: {provider_count}", ln=True)
+        self.cell(0, 8, f"Total Cases: {case_count}", ln=True)
+        self.cell(0, 8, f"Total Amount: ${total_amount:.2f}", ln=True)
+
+    def add_pay_category_summary(self, category_data: List[Dict]):
+        """Add pay category summary section at the end"""
+        # Add some blank lines before the category summary
+        self.ln(8)
+        self.ln(8)
+        
+        # Category summary header
+        self.set_font("Arial", 'B', 12)
+        self.cell(0, 8, "Payment Summary by Category", ln=True, align="L")
+        self.ln(3)
+        
+        # Only show summary if we have category data
+        if category_data:
+            self.set_font("Arial", '', 11)
+            
+            for category in category_data:
+                pay_category = category.get('pay_category') or 'Unspecified'
+                case_count = category.get('case_count', 0) or 0
+                total_amount = category.get('total_amount', 0) or 0
+                
+                # Format the line: "Category - X cases - $X.XX"
+                category_line = f"{pay_category} - {case_count} cases - ${total_amount:.2f}"
+                self.cell(0, 6, category_line, ln=True)
+        else:
+            self.set_font("Arial", 'I', 10)
+            self.cell(0, 6, "No payment category data available", ln=True)
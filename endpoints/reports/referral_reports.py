@@ -1,25 +1,22 @@
 # Created: 2025-08-26 20:11:19
-# Last Modified: 2025-08-26 20:51:11
+# Last Modified: 2026-10-16 20:37:49
 # Author: Scott Cadreau
 
 # endpoints/reports/referral_reports.py
 from fastapi import APIRouter, HTTPException, Request
 from fastapi.responses import FileResponse
 import pymysql.cursors
-from core.database import get_db_connection, close_db_connection
+from core.database import get_db_connection, close_db_connection, PRIORITY_REPORT
 from utils.monitoring import track_business_operation, business_metrics
 from utils.report_cleanup import cleanup_old_reports
 from utils.s3_storage import upload_file_to_s3, generate_s3_key
 from utils.text_formatting import capitalize_name_field
 from utils.email_service import send_referral_report_emails
-from utils.timezone_utils import format_datetime_for_user
-from fpdf import FPDF
 from datetime import datetime
 import os
 import logging
 import time
-from typing import Optional, Dict, List
-from pypdf import PdfReader, PdfWriter
+from typing import Optional
 
 logger = logging.getLogger(__name__)
 
@@ -63,6 +60,9 @@ def password_protect_pdf(input_path: str, output_path: str, password: str) -> bo
     Returns:
         True if successful, False otherwise
     """
+    # pypdf is only needed when a report is password protected - load it on first use
+    from pypdf import PdfReader, PdfWriter
+    
     try:
         reader = PdfReader(input_path)
         writer = PdfWriter()
@@ -85,130 +85,6 @@ def password_protect_pdf(input_path: str, output_path: str, password: str) -> bo
         logger.error(f"Error password protecting PDF: {str(e)}")
         return False
 
-class ReferralReportPDF(FPDF):
-    def __init__(self):
-        super().__init__()
-
-    def header(self):
-        self.set_font("Arial", 'B', 13)
-        header_height = self.font_size + 2
-        self.cell(0, header_height, "All-Stars Surgical Assist - Referral Report", ln=True, align="C")
-        self.ln(2)
-        
-        self.set_font("Arial", '', 11)
-        info_height = self.font_size + 1
-        report_date = format_datetime_for_user(
-            datetime.utcnow(), 
-            user_id=None, 
-            format_string='%B %d, %Y'
-        )
-        self.cell(0, info_height, f"Report Date: {report_date}", ln=True, align="L")
-        self.ln(1)
-
-    def footer(self):
-        self.set_y(-20)
-        self.set_font("Arial", 'I', 8)
-        footer_height = self.font_size + 1
-        footer_timestamp = format_datetime_for_user(
-            datetime.utcnow(), 
-            user_id=None, 
-            format_string='%Y-%m-%d %H:%M:%S %Z'
-        )
-        self.cell(0, footer_height, f"Report generated on: {footer_timestamp}", align="L")
-        self.cell(0, footer_height, f"Page {self.page_no()} of {{nb}}", align="R")
-
-    def add_referral_user_section(self, referral_user_name: str, referred_users_data: List[Dict], is_first_section=False):
-        """Add a section for each referral user with their referred users"""
-        # Start new page for each referral user (except the first one)
-        if not is_first_section:
-            self.add_page()
-        
-        # Referral user header
-        self.set_font("Arial", 'B', 14)
-        referral_header_height = self.font_size + 4
-        self.cell(0, referral_header_height, f"Referral User: {referral_user_name}", ln=True, align="L")
-        self.ln(2)
-
-        # Details subheader
-        self.set_font("Arial", 'B', 12)
-        details_header_height = self.font_size + 2
-        self.cell(0, details_header_height, "Details", ln=True, align="L")
-        self.ln(2)
-
-        # Table header
-        self.set_font("Arial", 'B', 10)
-        header_height = self.font_size + 2
-        self.cell(45, header_height, "Referred User", border=1)
-        self.cell(25, header_height, "Pay Category", border=1)
-        self.cell(25, header_height, "Case Count", border=1, align="C")
-        self.cell(30, header_height, "Pay Amount", border=1, align="R")
-        self.cell(40, header_height, "Referral Fee", border=1, ln=True, align="R")
-
-        # Table data
-        self.set_font("Arial", '', 10)
-        data_height = self.font_size + 2
-        section_total = 0
-        section_referral_total = 0
-        total_cases = 0
-        
-        for user_data in referred_users_data:
-            # Format referred user name
-            first_name = user_data.get('first_name', '') or ''
-            last_name = user_data.get('last_name', '') or ''
-            # Apply proper capitalization to user names
-            if first_name:
-                first_name = capitalize_name_field(first_name)
-            if last_name:
-                last_name = capitalize_name_field(last_name)
-            referred_user_name = f"{first_name} {last_name}".strip()
-            
-            # Format pay category, case count, and amount
-            pay_category = user_data.get('pay_category', '') or ''
-            case_count = user_data.get('case_count', 0) or 0
-            pay_amount = user_data.get('total_pay_amount', 0) or 0
-            
-            # Calculate referral fee
-            payment_type = user_data.get('payment_type')
-            referral_payment_amount = user_data.get('referral_payment_amount')
-            referral_fee_amount, referral_fee_display = calculate_referral_fee(
-                case_count, pay_amount, payment_type, referral_payment_amount
-            )
-            
-            self.cell(45, data_height, referred_user_name, border=1)
-            self.cell(25, data_height, pay_category, border=1)
-            self.cell(25, data_height, str(case_count), border=1, align="C")
-            self.cell(30, data_height, f"${pay_amount:.2f}", border=1, align="R")
-            self.cell(40, data_height, referral_fee_display, border=1, ln=True, align="R")
-            
-            section_total += pay_amount
-            section_referral_total += referral_fee_amount
-            total_cases += case_count
-
-        # Section subtotal
-        self.set_font("Arial", 'B', 10)
-        total_height = self.font_size + 3
-        self.cell(95, total_height, f"Referral User Total:", align="R")
-        self.cell(30, total_height, f"${section_total:.2f}", border=1, align="R")
-        self.cell(40, total_height, f"${section_referral_total:.2f}", border=1, ln=True, align="R")
-        self.ln(8)
-        
-        return section_total, section_referral_total, total_cases
-
-    def add_summary(self, total_amount, total_referral_fees, referral_user_count, total_referred_users, total_cases):
-        """Add summary section at the end"""
-        self.add_page()
-        
-        self.set_font("Arial", 'B', 14)
-        self.cell(0, 10, "Report Summary", ln=True, align="C")
-        self.ln(5)
-        
-        self.set_font("Arial", '', 12)
-        self.cell(0, 8, f"Total Referral Users: {referral_user_count}", ln=True)
-        self.cell(0, 8, f"Total Referred Users: {total_referred_users}", ln=True)
-        self.cell(0, 8, f"Total Cases: {total_cases}", ln=True)
-        self.cell(0, 8, f"Total Amount: ${total_amount:.2f}", ln=True)
-        self.cell(0, 8, f"Total Referral Fees: ${total_referral_fees:.2f}", ln=True)
-
 @router.get("/referral_report")
 @track_business_operation("generate", "referral_report")
 def generate_referral_report(request: Request):
@@ -378,7 +254,7 @@ def generate_referral_report(request: Request):
     error_message = None
     
     try:
-        conn = get_db_connection()
+        conn = get_db_connection(readonly=True, priority=PRIORITY_REPORT)
         
         try:
             with conn.cursor(pymysql.cursors.DictCursor) as cursor:
@@ -438,7 +314,8 @@ def generate_referral_report(request: Request):
                     
                     referral_users[referral_user_name].append(row)
                 
-                # Generate PDF
+                # Generate PDF (fpdf is loaded on first report, not at startup)
+                from endpoints.reports.referral_reports_pdf import ReferralReportPDF
                 pdf = ReferralReportPDF()
                 pdf.alias_nb_pages()
                 pdf.add_page()
@@ -1,11 +1,12 @@
 # Created: 2025-08-12 17:16:24
-# Last Modified: 2025-10-18 17:53:11
+# Last Modified: 2026-10-16 19:36:36
 # Author: Scott Cadreau
 
 # endpoints/utility/add_to_lists.py
 from fastapi import APIRouter, HTTPException, Request
 import pymysql.cursors
 from core.database import get_db_connection, close_db_connection
+from core.reference_data import reference_data
 from core.models import UserTypeCreate, CaseStatusCreate, UserDocTypeCreate, FaqCreate, PayTierCreate
 from utils.monitoring import track_business_operation, business_metrics
 import time
@@ -177,6 +178,8 @@ def add_user_type(request: Request, user_type_data: UserTypeCreate):
                 # Record successful user type creation
                 business_metrics.record_utility_operation("add_user_type", "success")
                 conn.commit()
+                # New version for list readers on every node (core/reference_data.py)
+                reference_data.record_change("user_types")
         finally:
             close_db_connection(conn)
             
@@ -352,6 +355,8 @@ def add_case_status(request: Request, case_status_data: CaseStatusCreate):
                     (case_status_data.case_status, case_status_data.case_status_desc)
                 )
                 conn.commit()
+                # New version for list readers on every node (core/reference_data.py)
+                reference_data.record_change("case_statuses")
                 
                 # Record successful case status creation
                 business_metrics.record_utility_operation("add_case_status", "success")
@@ -531,6 +536,8 @@ def add_user_doc_type(request: Request, user_doc_type_data: UserDocTypeCreate):
                     (user_doc_type_data.doc_type, user_doc_type_data.doc_prefix)
                 )
                 conn.commit()
+                # New version for list readers on every node (core/reference_data.py)
+                reference_data.record_change("user_doc_types")
 
                 # Record successful user doc type creation
                 business_metrics.record_utility_operation("add_user_doc_type", "success")
@@ -694,6 +701,8 @@ def add_faq(request: Request, faq_data: FaqCreate):
                     (faq_data.user_type, faq_data.faq_header, faq_data.faq_text, faq_data.display_order)
                 )
                 conn.commit()
+                # New version for list readers on every node (core/reference_data.py)
+                reference_data.record_change("faqs")
 
                 # Record successful FAQ creation
                 business_metrics.record_utility_operation("add_faq", "success")
@@ -875,6 +884,8 @@ def add_pay_tier(request: Request, pay_tier_data: PayTierCreate):
                 
                 # Commit all changes
                 conn.commit()
+                # New version for list readers on every node (core/reference_data.py)
+                reference_data.record_change("pay_tiers")
 
                 # Record successful payment tier creation
                 business_metrics.record_utility_operation("add_pay_tier", "success")
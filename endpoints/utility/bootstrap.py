@@ -0,0 +1,315 @@
+# Created: 2026-10-16 19:39:12
+# Last Modified: 2026-10-16 19:42:44
+# Author: Scott Cadreau
+
+# endpoints/utility/bootstrap.py
+from fastapi import APIRouter, HTTPException, Request, Query, Response
+import pymysql.cursors
+from typing import Dict, List, Optional, Tuple
+from core.database import get_db_connection, close_db_connection
+from core.reference_data import reference_data
+from core.response_cache import EncodedBody, encode_response, etag_matches, make_etag, CACHE_CONTROL
+from core.fast_json import dumps
+from endpoints.utility.get_user_environment import (
+    _generate_user_environment_cache_key, _get_user_environment_or_stale, _cache_user_environment_data,
+    _build_user_environment_data, get_user_profile_info, update_user_last_login
+)
+from utils.monitoring import track_business_operation, business_metrics
+import time
+import logging
+
+router = APIRouter()
+
+# Sections in response order; each mirrors the payload of the endpoint with the same name
+BOOTSTRAP_SECTIONS = (
+    "user_environment", "case_statuses", "user_types", "user_doc_types",
+    "faqs", "pay_tiers", "cpt_codes", "timezones"
+)
+
+# Same user_type requirements as the standalone list endpoints (validate_user_access in get_lists.py)
+SECTION_MIN_USER_TYPE = {"case_statuses": 100, "user_types": 100, "pay_tiers": 100}
+
+# Sections that carry their reference data version like /cpt_codes and /timezones
+VERSIONED_SECTIONS = ("cpt_codes", "timezones")
+
+
+def _parse_sections(sections: Optional[str]) -> List[str]:
+    """Requested sections in response order (all of them when sections is empty)"""
+    if not sections:
+        return list(BOOTSTRAP_SECTIONS)
+    requested = {name.strip() for name in sections.split(",") if name.strip()}
+    unknown = requested - set(BOOTSTRAP_SECTIONS)
+    if unknown:
+        raise HTTPException(status_code=400, detail={"error": f"Unknown bootstrap sections: {', '.join(sorted(unknown))}"})
+    return [name for name in BOOTSTRAP_SECTIONS if name in requested]
+
+
+def _encode_user_environment(user_id: str, login_updated: bool, conn) -> EncodedBody:
+    """
+    User environment section, shared with /user_environment: same cache entry and the same
+    stored body, so the section ETag matches the one /user_environment returns.
+    """
+    cache_key = _generate_user_environment_cache_key(user_id)
+    body_key = f"user_environment:{cache_key}"
+    body_tags = ["user_environment", f"user_environment:user:{user_id}"]
+
+    environment = _get_user_environment_or_stale(user_id, cache_key)
+    if environment is not None:
+        return encode_response(environment, cache_key=body_key, tags=body_tags)
+
+    logging.info(f"Cache miss for user environment in bootstrap: {cache_key}")
+    user_profile = get_user_profile_info(user_id, conn)
+    if not user_profile:
+        raise HTTPException(status_code=404, detail={"error": "User not found or inactive"})
+    environment = _build_user_environment_data(user_id, user_profile, login_updated, conn)
+    cache_success = _cache_user_environment_data(cache_key, environment, user_id)
+    return encode_response(environment, cache_key=body_key if cache_success else None, tags=body_tags)
+
+
+def _encode_reference_section(name: str, user_type: int) -> EncodedBody:
+    """
+    Reference data section, encoded once per snapshot: the stored body is reused until the
+    registry installs a new version of the table (core/reference_data.py).
+    """
+    snapshot = reference_data.snapshot(name)
+    cache_key = f"bootstrap:{name}"
+    if name == "faqs":
+        # FAQs are filtered by the user's type, so the body is stored per user_type
+        cache_key = f"bootstrap:faqs:{user_type}"
+        content = {
+            "faqs": [
+                {"faq_header": faq["faq_header"], "faq_text": faq["faq_text"]}
+                for faq in snapshot.rows if faq["user_type"] == user_type
+            ],
+            "user_type": user_type
+        }
+    elif name in VERSIONED_SECTIONS:
+        content = {name: snapshot.rows, "version": snapshot.version}
+    else:
+        content = {name: snapshot.rows}
+    return encode_response(content, cache_key=cache_key, source=snapshot, tags=["bootstrap"])
+
+
+def assemble_bootstrap(user_id: str, user_type: int, requested: List[str], encoded: Dict[str, EncodedBody],
+                       if_none_match: Optional[str] = None) -> Tuple[bytes, str, bool]:
+    """
+    Assemble the bootstrap body from already-encoded sections without re-serializing them.
+
+    Each section is {"status": 200, "etag", "data"}, {"status": 304, "etag"} when the client sent
+    its ETag in If-None-Match, or {"status": 403, "error"} when the user's type is too low for it.
+
+    Returns:
+        (body, etag, not_modified): not_modified is True when the client already has every
+        section (or sent the bundle ETag), in which case the caller answers with an empty 304
+    """
+    parts = []
+    etag_parts = []
+    matched = 0
+    changed = 0
+    for name in requested:
+        min_user_type = SECTION_MIN_USER_TYPE.get(name)
+        if min_user_type is not None and user_type < min_user_type:
+            error = f"Insufficient privileges. User type must be >= {min_user_type}"
+            parts.append(dumps(name) + b':{"status":403,"error":' + dumps(error) + b"}")
+            etag_parts.append(f"{name}:403")
+            continue
+
+        section = encoded[name]
+        etag_parts.append(f"{name}:{section.etag}")
+        if etag_matches(if_none_match, section.etag):
+            matched += 1
+            parts.append(dumps(name) + b':{"status":304,"etag":' + dumps(section.etag) + b"}")
+        else:
+            changed += 1
+            parts.append(dumps(name) + b':{"status":200,"etag":' + dumps(section.etag) + b',"data":' + section.body + b"}")
+
+    etag = make_etag("|".join(etag_parts).encode("utf-8"))
+    not_modified = (matched > 0 and changed == 0) or etag_matches(if_none_match, etag)
+    body = (b'{"user_id":' + dumps(user_id) + b',"etag":' + dumps(etag) + b',"sections":{'
+            + b",".join(parts) + b"}}")
+    return body, etag, not_modified
+
+
+@router.get("/bootstrap")
+@track_business_operation("get", "bootstrap")
+def get_bootstrap(
+    request: Request,
+    user_id: str = Query(..., description="User ID for authorization"),
+    sections: Optional[str] = Query(None, description="Comma-separated sections to include (default: all)")
+):
+    """
+    Retrieve everything the frontend loads at login in a single response.
+
+    This endpoint replaces the login sequence of /user_environment, /case_statuses, /user_types,
+    /user_doc_types, /faqs, /pay_tiers, /cpt_codes and /timezones. Those calls each validated the
+    user against user_profile and borrowed a pool connection; /bootstrap validates the user once,
+    serves the lists from the in-memory reference data registry and the user environment from its
+    cache, and returns every section with its own ETag so clients re-download only what changed.
+
+    Args:
+        request (Request): FastAPI request object for logging, monitoring and If-None-Match
+        user_id (str): User ID for authorization. Must be an active user in user_profile.
+        sections (str, optional): Comma-separated subset of sections to return, e.g.
+                                  "cpt_codes,timezones". Defaults to all sections.
+
+    Returns:
+        Response: JSON object containing:
+            - user_id (str): The requesting user
+            - etag (str): ETag of the whole bundle (also sent as the ETag header)
+            - sections (dict): One entry per requested section, in this order:
+                user_environment, case_statuses, user_types, user_doc_types, faqs,
+                pay_tiers, cpt_codes, timezones. Each entry is one of:
+                - {"status": 200, "etag": str, "data": dict}: data is exactly the payload of
+                  the standalone endpoint with the same name
+                - {"status": 304, "etag": str}: the client already has this version
+                - {"status": 403, "error": str}: the user's type is too low for this list
+
+    Raises:
+        HTTPException:
+            - 400 Bad Request: Unknown section name in sections
+            - 404 Not Found: User not found or inactive in user_profile table
+            - 500 Internal Server Error: Database connection or query execution errors
+
+    Conditional Requests:
+        - Clients send the ETags of the sections they hold in If-None-Match
+          (e.g. If-None-Match: "a1b2...", "c3d4..."); matching sections come back as status 304
+          without data, changed sections come back in full
+        - If every requested section matches, or If-None-Match holds the bundle ETag, the
+          response is an empty 304 Not Modified
+        - The user_environment section ETag is the same one /user_environment returns
+
+    Authorization:
+        - One user_profile lookup (active users only) for the whole bundle
+        - case_statuses, user_types and pay_tiers require user_type >= 100, as their standalone
+          endpoints do; for other users those sections are returned with status 403
+        - faqs are filtered to the user's own user_type, like /faqs
+
+    Database Operations:
+        - Single pooled connection for the whole request:
+          - Reads user_type from 'user_profile' for authorization
+          - Updates last_login_dt in 'user_profile' (the frontend calls this at login)
+          - On a user environment cache miss, builds the environment on the same connection
+        - All list sections are served from the in-memory reference data snapshots
+          (core/reference_data.py) - no query per list
+
+    Performance Features:
+        - Each section is encoded once and its bytes reused (core/response_cache.py) until its
+          reference data version or cached user environment changes
+        - The bundle is assembled by concatenating the encoded sections - nothing is serialized
+          twice, and unchanged sections cost only their ETag
+        - Replaces eight requests, eight authorization queries and eight pool checkouts with one
+
+    Monitoring & Logging:
+        - Business metrics tracking for bootstrap operations:
+          - "success": Bundle returned (200 or 304)
+          - "user_not_found": User validation failed
+          - "error": Database or processing errors
+        - Prometheus monitoring via @track_business_operation decorator
+        - Request logging with the encoded body (no payload for 304)
+
+    Example Usage:
+        GET /bootstrap?user_id=USER123
+        GET /bootstrap?user_id=USER123&sections=cpt_codes,timezones
+        GET /bootstrap?user_id=USER123  (If-None-Match: "<cpt_codes etag>", "<timezones etag>")
+
+    Example Response:
+        {
+            "user_id": "USER123",
+            "etag": "\"9f2c...\"",
+            "sections": {
+                "user_environment": {"status": 200, "etag": "\"51ab...\"", "data": {"user_profile": {...}, ...}},
+                "case_statuses": {"status": 403, "error": "Insufficient privileges. User type must be >= 100"},
+                "cpt_codes": {"status": 304, "etag": "\"0c7e...\""},
+                "timezones": {"status": 200, "etag": "\"e410...\"", "data": {"timezones": [...], "version": 4}}
+            }
+        }
+
+    Notes:
+        - The standalone list endpoints are unchanged and remain available
+        - ETags are content hashes, so they stay valid across workers and restarts
+        - Section payloads are served as-is from the caches; ETag checks are per section, not per row
+    """
+    conn = None
+    start_time = time.time()
+    response_status = 200
+    response_body = None
+    error_message = None
+
+    try:
+        requested = _parse_sections(sections)
+
+        conn = get_db_connection()
+
+        # One authorization check for every section
+        with conn.cursor(pymysql.cursors.DictCursor) as cursor:
+            cursor.execute(
+                "SELECT user_type FROM user_profile WHERE user_id = %s AND active = 1",
+                (user_id,)
+            )
+            user = cursor.fetchone()
+
+        if not user:
+            business_metrics.record_utility_operation("bootstrap", "user_not_found")
+            raise HTTPException(status_code=404, detail={"error": "User not found or inactive"})
+        user_type = user["user_type"]
+
+        # Bootstrap is the login call, so it keeps last_login_dt current like /user_environment
+        login_updated = update_user_last_login(user_id, conn)
+        if login_updated:
+            conn.commit()
+
+        encoded = {}
+        if "user_environment" in requested:
+            encoded["user_environment"] = _encode_user_environment(user_id, login_updated, conn)
+
+        close_db_connection(conn)
+        conn = None
+
+        for name in requested:
+            if name != "user_environment" and user_type >= SECTION_MIN_USER_TYPE.get(name, 0):
+                encoded[name] = _encode_reference_section(name, user_type)
+
+        body, etag, not_modified = assemble_bootstrap(
+            user_id, user_type, requested, encoded, request.headers.get("if-none-match")
+        )
+
+        business_metrics.record_utility_operation("bootstrap", "success")
+
+        headers = {"ETag": etag, "Cache-Control": CACHE_CONTROL}
+        if not_modified:
+            response_status = 304
+            response_body = b""
+            return Response(status_code=304, headers=headers)
+        response_body = body
+        return Response(content=body, media_type="application/json", headers=headers)
+
+    except HTTPException as http_error:
+        # Re-raise HTTP exceptions and capture error details
+        response_status = http_error.status_code
+        error_message = str(http_error.detail)
+        raise
+    except Exception as e:
+        # Record failed bootstrap retrieval
+        response_status = 500
+        error_message = str(e)
+        business_metrics.record_utility_operation("bootstrap", "error")
+        raise HTTPException(status_code=500, detail={"error": str(e)})
+
+    finally:
+        if conn:
+            close_db_connection(conn)
+
+        # Calculate execution time
+        execution_time_ms = int((time.time() - start_time) * 1000)
+
+        # Log request details for monitoring using the utility function
+        from endpoints.utility.log_request import log_request_from_endpoint
+        log_request_from_endpoint(
+            request=request,
+            execution_time_ms=execution_time_ms,
+            response_status=response_status,
+            user_id=user_id,
+            response_data=None,
+            error_message=error_message,
+            response_body=response_body
+        )
@@ -7,10 +7,7 @@ from typing import Dict, Any, Optional
 import time
 from endpoints.utility.get_user_environment import (
     _user_environment_cache,
-    _user_environment_cache_lock,
-    _user_environment_cache_keys,
-    _generate_user_environment_cache_key,
-    _is_user_environment_cache_valid
+    _generate_user_environment_cache_key
 )
 
 router = APIRouter()
@@ -32,74 +29,71 @@ def get_cache_diagnostics(user_id: Optional[str] = Query(None, description="Opti
     Returns:
         dict: Cache diagnostic information
     """
-    with _user_environment_cache_lock:
-        # Basic cache statistics
-        total_entries = len(_user_environment_cache)
-        data_entries = total_entries // 2  # Divide by 2 because we store data + time keys
-        
-        diagnostics = {
-            "cache_stats": {
-                "total_cache_entries": total_entries,
-                "estimated_data_entries": data_entries,
-                "tracked_users": len(_user_environment_cache_keys),
-                "timestamp": time.time()
-            },
-            "cache_health": {
-                "valid_entries": 0,
-                "invalid_entries": 0,
-                "null_entries": 0,
-                "malformed_entries": 0
-            }
+    cache_stats = _user_environment_cache.stats()
+    diagnostics = {
+        "cache_stats": {
+            "total_cache_entries": cache_stats["entries"],
+            "estimated_data_entries": cache_stats["entries"],
+            "tracked_users": cache_stats["tags"],
+            "cache_bytes": cache_stats["bytes"],
+            "max_cache_bytes": cache_stats["max_bytes"],
+            "hit_rate_percent": cache_stats["hit_rate_percent"],
+            "evictions": cache_stats["evictions"],
+            "timestamp": time.time()
+        },
+        "cache_health": {
+            "valid_entries": 0,
+            "invalid_entries": 0,
+            "null_entries": 0,
+            "malformed_entries": 0
         }
-        
-        # Check cache health
-        checked_keys = set()
-        for key in _user_environment_cache.keys():
-            if key.endswith("_time") or key in checked_keys:
-                continue
-                
-            checked_keys.add(key)
-            data = _user_environment_cache.get(key)
-            
-            if data is None:
-                diagnostics["cache_health"]["null_entries"] += 1
-            elif not isinstance(data, dict):
-                diagnostics["cache_health"]["malformed_entries"] += 1
-            elif (data.get("user_profile") is None or 
-                  data.get("case_statuses") is None):
-                diagnostics["cache_health"]["invalid_entries"] += 1
-            else:
-                diagnostics["cache_health"]["valid_entries"] += 1
-        
-        # If specific user requested, provide detailed info
-        if user_id:
-            cache_key = _generate_user_environment_cache_key(user_id)
-            user_info = {
-                "user_id": user_id,
-                "cache_key": cache_key,
-                "has_cache_entry": cache_key in _user_environment_cache,
-                "has_time_entry": f"{cache_key}_time" in _user_environment_cache,
-                "is_cache_valid": _is_user_environment_cache_valid(cache_key),
-                "data_type": None,
-                "data_structure": None
-            }
-            
-            if cache_key in _user_environment_cache:
-                cached_data = _user_environment_cache[cache_key]
-                user_info["data_type"] = str(type(cached_data))
-                
-                if isinstance(cached_data, dict):
-                    user_info["data_structure"] = {
-                        "keys": list(cached_data.keys()),
-                        "user_profile_exists": "user_profile" in cached_data,
-                        "case_statuses_exists": "case_statuses" in cached_data,
-                        "user_profile_is_null": cached_data.get("user_profile") is None,
-                        "case_statuses_is_null": cached_data.get("case_statuses") is None
-                    }
-            
-            diagnostics["user_specific"] = user_info
-        
-        return diagnostics
+    }
+
+    # Check cache health
+    for key in _user_environment_cache.keys():
+        entry = _user_environment_cache.get_entry(key)
+        data = entry.value if entry else None
+
+        if data is None:
+            diagnostics["cache_health"]["null_entries"] += 1
+        elif not isinstance(data, dict):
+            diagnostics["cache_health"]["malformed_entries"] += 1
+        elif (data.get("user_profile") is None or
+              data.get("case_statuses") is None):
+            diagnostics["cache_health"]["invalid_entries"] += 1
+        else:
+            diagnostics["cache_health"]["valid_entries"] += 1
+
+    # If specific user requested, provide detailed info
+    if user_id:
+        cache_key = _generate_user_environment_cache_key(user_id)
+        entry = _user_environment_cache.get_entry(cache_key)
+        user_info = {
+            "user_id": user_id,
+            "cache_key": cache_key,
+            "has_cache_entry": entry is not None,
+            "cache_age_seconds": round(entry.age, 1) if entry else None,
+            "is_cache_valid": entry is not None and entry.age < _user_environment_cache.ttl,
+            "data_type": None,
+            "data_structure": None
+        }
+
+        if entry is not None:
+            cached_data = entry.value
+            user_info["data_type"] = str(type(cached_data))
+
+            if isinstance(cached_data, dict):
+                user_info["data_structure"] = {
+                    "keys": list(cached_data.keys()),
+                    "user_profile_exists": "user_profile" in cached_data,
+                    "case_statuses_exists": "case_statuses" in cached_data,
+                    "user_profile_is_null": cached_data.get("user_profile") is None,
+                    "case_statuses_is_null": cached_data.get("case_statuses") is None
+                }
+
+        diagnostics["user_specific"] = user_info
+
+    return diagnostics
 
 @router.post("/clear_cache")
 def clear_cache_endpoint(user_id: Optional[str] = Query(None, description="Optional user ID to clear specific cache, or leave empty to clear all")):
@@ -1,11 +1,11 @@
 # Created: 2025-07-15 09:20:13
-# Last Modified: 2025-08-22 08:04:57
+# Last Modified: 2026-10-16 19:36:36
 # Author: Scott Cadreau
 
 # endpoints/utility/get_cpt_codes.py
-from fastapi import APIRouter, HTTPException, Request
-import pymysql.cursors
-from core.database import get_db_connection, close_db_connection
+from fastapi import APIRouter, HTTPException, Request, Query
+from typing import Optional
+from core.reference_data import reference_data
 from utils.monitoring import track_business_operation, business_metrics
 import time
 
@@ -13,7 +13,7 @@ router = APIRouter()
 
 @router.get("/cpt_codes")
 @track_business_operation("get", "cpt_codes")
-def get_cpt_codes(request: Request):
+def get_cpt_codes(request: Request, since_version: Optional[int] = Query(None, description="Only return changes since this version of the list")):
     """
     Retrieve all available CPT (Current Procedural Terminology) codes from the database.
     
@@ -23,20 +23,26 @@ def get_cpt_codes(request: Request):
     
     Args:
         request (Request): FastAPI request object for logging and monitoring
+        since_version (int, optional): The version of the list the client already has.
+            When given, only codes added or changed since then are returned
     
     Returns:
         dict: Response containing:
-            - cpt_codes (List[dict]): Array of CPT code objects, each containing:
+            - cpt_codes (List[dict]): Array of CPT code objects (only changed ones for a delta), each containing:
                 - cpt_code (str): The standardized CPT code identifier
                 - cpt_description (str): Human-readable description of the procedure
+            - version (int): Current version of the CPT code list
+            - delta (bool): Only with since_version - true if cpt_codes holds just the changes,
+              false if the full list was returned (version history not available on this server)
+            - removed (List[dict]): Only for deltas - {"cpt_code": ...} for codes removed since since_version
     
     Raises:
         HTTPException: 
             - 500 Internal Server Error: Database connection or query execution errors
     
     Database Operations:
-        - Queries 'cpt_codes' table for all available codes and descriptions
-        - Read-only operation with automatic connection management
+        - Served from the in-memory reference data snapshot of the 'cpt_codes' table
+          (core/reference_data.py) - no query per request
     
     Monitoring & Logging:
         - Business metrics tracking for CPT code retrieval operations
@@ -55,40 +61,40 @@ def get_cpt_codes(request: Request):
                     "cpt_code": "00102", 
                     "cpt_description": "Anesthesia for procedures involving plastic repair"
                 }
-            ]
+            ],
+            "version": 12
         }
     
     Usage:
         GET /cpt_codes
+        GET /cpt_codes?since_version=12   # {"cpt_codes": [], "removed": [], "version": 12, "delta": true} if unchanged
         
     Notes:
         - No authentication required for this utility endpoint
-        - Results are sorted by database default ordering
+        - Results are sorted by cpt_code
         - Used primarily for populating dropdown lists in frontend forms
+        - Clients should keep the returned version and send it as since_version to skip re-downloading the list
     """
-    conn = None
     start_time = time.time()
     response_status = 200
     response_data = None
     error_message = None
     
     try:
-        conn = get_db_connection()
-        
-        try:
-            with conn.cursor(pymysql.cursors.DictCursor) as cursor:
-                cursor.execute("""SELECT cpt_code, cpt_description FROM cpt_codes""")
-                cpt_codes = cursor.fetchall()
+        # Served from the in-memory reference data snapshot (core/reference_data.py)
+        changes = reference_data.changes_since("cpt_codes", since_version)
 
-                # Record successful CPT codes retrieval
-                business_metrics.record_utility_operation("get_cpt_codes", "success")
-                
-        finally:
-            close_db_connection(conn)
+        # Record successful CPT codes retrieval
+        business_metrics.record_utility_operation("get_cpt_codes", "success")
             
         response_data = {
-            "cpt_codes": cpt_codes
+            "cpt_codes": changes["rows"],
+            "version": changes["version"]
         }
+        if since_version is not None:
+            response_data["delta"] = changes["delta"]
+            if changes["delta"]:
+                response_data["removed"] = changes["removed"]
         return response_data
         
     except HTTPException as http_error:
@@ -101,9 +107,6 @@ def get_cpt_codes(request: Request):
         response_status = 500
         error_message = str(e)
         business_metrics.record_utility_operation("get_cpt_codes", "error")
-        
-        if 'conn' in locals():
-            close_db_connection(conn)
         raise HTTPException(status_code=500, detail={"error": str(e)})
         
     finally:
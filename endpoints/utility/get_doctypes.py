@@ -1,11 +1,10 @@
 # Created: 2025-07-15 09:20:13
-# Last Modified: 2025-08-06 15:42:36
+# Last Modified: 2026-10-16 19:36:36
 # Author: Scott Cadreau
 
 # endpoints/utility/get_doctypes.py
 from fastapi import APIRouter, HTTPException, Request
-import pymysql.cursors
-from core.database import get_db_connection, close_db_connection
+from core.reference_data import reference_data
 from utils.monitoring import track_business_operation, business_metrics
 import time
 
@@ -35,8 +34,8 @@ def get_doc_types(request: Request):
             - 500 Internal Server Error: Database connection or query execution errors
     
     Database Operations:
-        - Queries 'user_doc_type_list' table for all available document types
-        - Read-only operation with automatic connection management
+        - Served from the in-memory reference data snapshot of the 'user_doc_type_list' table
+          (core/reference_data.py) - no query per request
     
     Monitoring & Logging:
         - Business metrics tracking for document type retrieval operations
@@ -59,31 +58,21 @@ def get_doc_types(request: Request):
         
     Notes:
         - No authentication required for this utility endpoint
-        - Results are sorted by database default ordering
+        - Results are sorted by doc_type
         - Used primarily for populating dropdown lists in document upload forms
         - Document types define valid categories for user document classification
     """
-    conn = None
     start_time = time.time()
     response_status = 200
     response_data = None
     error_message = None
     
     try:
-        conn = get_db_connection()
-        
-        try:
-            with conn.cursor(pymysql.cursors.DictCursor) as cursor:
-                cursor.execute(
-                    "SELECT doc_type FROM user_doc_type_list"
-                )
-                doc_types = cursor.fetchall()
+        # Served from the in-memory reference data snapshot (core/reference_data.py)
+        doc_types = [{"doc_type": row["doc_type"]} for row in reference_data.get("user_doc_types")]
 
-                # Record successful document types retrieval
-                business_metrics.record_utility_operation("get_doctypes", "success")
-                
-        finally:
-            close_db_connection(conn)
+        # Record successful document types retrieval
+        business_metrics.record_utility_operation("get_doctypes", "success")
             
         response_data = {
             "document_types": doc_types
@@ -100,9 +89,6 @@ def get_doc_types(request: Request):
         response_status = 500
         error_message = str(e)
         business_metrics.record_utility_operation("get_doctypes", "error")
-        
-        if 'conn' in locals():
-            close_db_connection(conn)
         raise HTTPException(status_code=500, detail={"error": str(e)})
         
     finally:
@@ -1,11 +1,12 @@
 # Created: 2025-08-05 22:15:27
-# Last Modified: 2025-11-01 02:52:38
+# Last Modified: 2026-10-16 19:36:36
 # Author: Scott Cadreau
 
 # endpoints/utility/get_lists.py
 from fastapi import APIRouter, HTTPException, Request, Query
 import pymysql.cursors
 from core.database import get_db_connection, close_db_connection
+from core.reference_data import reference_data
 from utils.monitoring import track_business_operation, business_metrics
 import time
 
@@ -119,7 +120,7 @@ def get_user_types(request: Request, user_id: str = Query(..., description="User
         - Validates user exists and is active in user_profile table
     
     Database Operations:
-        - Queries 'user_type_list' table for types where user_type < 1000
+        - Reads 'user_type_list' (types where user_type < 1000) from the in-memory reference data snapshot
         - Filters out high-level administrative roles (>= 1000)
         - Returns role hierarchy information for permission calculations
         - Read-only operation with automatic connection management
@@ -175,10 +176,8 @@ def get_user_types(request: Request, user_id: str = Query(..., description="User
         
         try:
             with conn.cursor(pymysql.cursors.DictCursor) as cursor:
-                cursor.execute(
-                    "SELECT user_type, user_type_desc, user_max_case_status FROM user_type_list WHERE user_type < 1000"
-                )
-                user_types = cursor.fetchall()
+                # Served from the in-memory reference data snapshot (core/reference_data.py)
+                user_types = reference_data.get("user_types")
 
                 # Record successful user types retrieval
                 business_metrics.record_utility_operation("get_user_types", "success")
@@ -255,10 +254,10 @@ def get_case_statuses(request: Request, user_id: str = Query(..., description="U
         - Validates user exists and is active in user_profile table
     
     Database Operations:
-        - Queries 'case_status_list' table for all available case statuses
+        - Reads 'case_status_list' from the in-memory reference data snapshot (reloaded when statuses are added)
         - Returns complete status hierarchy for workflow management
         - Read-only operation with automatic connection management
-        - Results may be ordered by case_status value (database default)
+        - Results are ordered by case_status value
     
     Monitoring & Logging:
         - Business metrics tracking for case status retrieval operations
@@ -316,10 +315,8 @@ def get_case_statuses(request: Request, user_id: str = Query(..., description="U
         
         try:
             with conn.cursor(pymysql.cursors.DictCursor) as cursor:
-                cursor.execute(
-                    "SELECT case_status, case_status_desc FROM case_status_list"
-                )
-                case_statuses = cursor.fetchall()
+                # Served from the in-memory reference data snapshot (core/reference_data.py)
+                case_statuses = reference_data.get("case_statuses")
 
                 # Record successful case statuses retrieval
                 business_metrics.record_utility_operation("get_case_statuses", "success")
@@ -395,10 +392,10 @@ def get_user_doc_types(request: Request, user_id: str = Query(..., description="
         - Validates user exists and is active in user_profile table
     
     Database Operations:
-        - Queries 'user_doc_type_list' table for all available document types
+        - Reads 'user_doc_type_list' from the in-memory reference data snapshot
         - Returns document categorization and file naming information
         - Read-only operation with automatic connection management
-        - Results may be ordered by doc_type (database default)
+        - Results are ordered by doc_type
     
     Monitoring & Logging:
         - Business metrics tracking for user document type retrieval operations
@@ -451,10 +448,8 @@ def get_user_doc_types(request: Request, user_id: str = Query(..., description="
         
         try:
             with conn.cursor(pymysql.cursors.DictCursor) as cursor:
-                cursor.execute(
-                    "SELECT doc_type, doc_prefix FROM user_doc_type_list"
-                )
-                user_doc_types = cursor.fetchall()
+                # Served from the in-memory reference data snapshot (core/reference_data.py)
+                user_doc_types = reference_data.get("user_doc_types")
 
                 # Record successful user doc types retrieval
                 business_metrics.record_utility_operation("get_user_doc_types", "success")
@@ -532,7 +527,7 @@ def get_faqs(request: Request, user_id: str = Query(..., description="User ID fo
     
     Database Operations:
         - First queries 'user_profile' table to determine user's type and validate existence
-        - Then queries 'faq_list' table for FAQs matching the user's user_type
+        - Then filters the in-memory 'faq_list' snapshot for FAQs matching the user's user_type
         - Results ordered by display_order for optimal presentation sequence
         - Read-only operations with automatic connection management
     
@@ -600,12 +595,11 @@ def get_faqs(request: Request, user_id: str = Query(..., description="User ID fo
                 
                 user_type = user['user_type']
                 
-                # Query FAQ list for the user's type, sorted by display_order
-                cursor.execute(
-                    "SELECT faq_header, faq_text FROM faq_list WHERE user_type = %s ORDER BY display_order",
-                    (user_type,)
-                )
-                faqs = cursor.fetchall()
+                # FAQ list for the user's type from the reference data snapshot (already sorted by display_order)
+                faqs = [
+                    {"faq_header": faq["faq_header"], "faq_text": faq["faq_text"]}
+                    for faq in reference_data.get("faqs") if faq["user_type"] == user_type
+                ]
 
                 # Record successful FAQs retrieval
                 business_metrics.record_utility_operation("get_faqs", "success")
@@ -686,7 +680,7 @@ def get_pay_tiers(request: Request, user_id: str = Query(..., description="User
         - Validates user exists and is active in user_profile table
     
     Database Operations:
-        - Queries 'procedure_code_buckets' table for all payment tier configurations
+        - Reads 'procedure_code_buckets2' from the in-memory reference data snapshot
         - Results ordered by tier, code_bucket, code_category for logical presentation
         - Returns complete payment structure for billing system integration
         - Read-only operation with automatic connection management
@@ -753,10 +747,8 @@ def get_pay_tiers(request: Request, user_id: str = Query(..., description="User
         
         try:
             with conn.cursor(pymysql.cursors.DictCursor) as cursor:
-                cursor.execute(
-                    "SELECT code_bucket, tier, pay_amount FROM procedure_code_buckets2 ORDER BY tier, pay_amount"
-                )
-                pay_tiers = cursor.fetchall()
+                # Served from the in-memory reference data snapshot (core/reference_data.py)
+                pay_tiers = reference_data.get("pay_tiers")
 
                 # Record successful pay tiers retrieval
                 business_metrics.record_utility_operation("get_pay_tiers", "success")
@@ -1,11 +1,11 @@
 # Created: 2025-07-31 02:14:20
-# Last Modified: 2025-08-06 15:42:39
+# Last Modified: 2026-10-16 19:36:36
 # Author: Scott Cadreau
 
 # endpoints/utility/get_timezones.py
-from fastapi import APIRouter, HTTPException, Request
-import pymysql.cursors
-from core.database import get_db_connection, close_db_connection
+from fastapi import APIRouter, HTTPException, Request, Query
+from typing import Optional
+from core.reference_data import reference_data
 from utils.monitoring import track_business_operation, business_metrics
 import time
 
@@ -13,7 +13,7 @@ router = APIRouter()
 
 @router.get("/timezones")
 @track_business_operation("get", "timezones")
-def get_timezones(request: Request):
+def get_timezones(request: Request, since_version: Optional[int] = Query(None, description="Only return changes since this version of the list")):
     """
     Retrieve all available timezones with their identifiers and UTC offsets.
     
@@ -24,21 +24,27 @@ def get_timezones(request: Request):
     
     Args:
         request (Request): FastAPI request object for logging and monitoring
+        since_version (int, optional): The version of the list the client already has.
+            When given, only timezones added or changed since then are returned
     
     Returns:
         dict: Response containing:
-            - timezones (List[dict]): Array of timezone objects, each containing:
+            - timezones (List[dict]): Array of timezone objects (only changed ones for a delta), each containing:
                 - tz_identifier (str): Standard timezone identifier (e.g., "America/New_York")
                 - utc_offset (str): UTC offset in standard format (e.g., "-05:00")
+            - version (int): Current version of the timezone list
+            - delta (bool): Only with since_version - true if timezones holds just the changes,
+              false if the full list was returned (version history not available on this server)
+            - removed (List[dict]): Only for deltas - {"tz_identifier": ...} for timezones removed since since_version
     
     Raises:
         HTTPException: 
             - 500 Internal Server Error: Database connection or query execution errors
     
     Database Operations:
-        - Queries 'user_timezones' table for all available timezone data
+        - Served from the in-memory reference data snapshot of the 'user_timezones' table
+          (core/reference_data.py) - no query per request
         - Results ordered alphabetically by timezone identifier
-        - Read-only operation with automatic connection management
     
     Monitoring & Logging:
         - Business metrics tracking for timezone retrieval operations
@@ -61,11 +67,13 @@ def get_timezones(request: Request):
                     "tz_identifier": "UTC",
                     "utc_offset": "+00:00"
                 }
-            ]
+            ],
+            "version": 3
         }
     
     Usage:
         GET /timezones
+        GET /timezones?since_version=3   # {"timezones": [], "removed": [], "version": 3, "delta": true} if unchanged
         
     Notes:
         - No authentication required for this utility endpoint
@@ -73,32 +81,28 @@ def get_timezones(request: Request):
         - Used primarily for populating timezone dropdown lists in user profile and scheduling forms
         - Timezone data supports proper datetime handling across different geographical regions
         - UTC offsets may change due to daylight saving time transitions in some regions
+        - Clients should keep the returned version and send it as since_version to skip re-downloading the list
     """
-    conn = None
     start_time = time.time()
     response_status = 200
     response_data = None
     error_message = None
     
     try:
-        conn = get_db_connection()
-        
-        try:
-            with conn.cursor(pymysql.cursors.DictCursor) as cursor:
-                cursor.execute(
-                    "SELECT tz_identifier, utc_offset FROM user_timezones ORDER BY tz_identifier"
-                )
-                timezones = cursor.fetchall()
+        # Served from the in-memory reference data snapshot (core/reference_data.py)
+        changes = reference_data.changes_since("timezones", since_version)
 
-                # Record successful timezones retrieval
-                business_metrics.record_utility_operation("get_timezones", "success")
-                
-        finally:
-            close_db_connection(conn)
+        # Record successful timezones retrieval
+        business_metrics.record_utility_operation("get_timezones", "success")
             
         response_data = {
-            "timezones": timezones
+            "timezones": changes["rows"],
+            "version": changes["version"]
         }
+        if since_version is not None:
+            response_data["delta"] = changes["delta"]
+            if changes["delta"]:
+                response_data["removed"] = changes["removed"]
         return response_data
         
     except HTTPException as http_error:
@@ -111,9 +115,6 @@ def get_timezones(request: Request):
         response_status = 500
         error_message = str(e)
         business_metrics.record_utility_operation("get_timezones", "error")
-        
-        if 'conn' in locals():
-            close_db_connection(conn)
         raise HTTPException(status_code=500, detail={"error": str(e)})
         
     finally:
@@ -1,12 +1,19 @@
 # Created: 2025-07-24 17:54:30
-# Last Modified: 2025-11-14 17:21:44
+# Last Modified: 2026-10-16 19:45:37
 # Author: Scott Cadreau
 
 # endpoints/utility/get_user_environment.py
 from fastapi import APIRouter, HTTPException, Query, Request
 import pymysql.cursors
 from core.database import get_db_connection, close_db_connection
+from core.cache import get_cache
+from core.access_tracker import get_access_tracker
+from core.invalidation_bus import invalidation_bus
+from core.response_cache import json_response, drop_response_bodies
+from core.reference_data import reference_data
+from core.rewarm import rewarm_scheduler
 from utils.monitoring import track_business_operation, business_metrics
+import os
 import time
 import json
 import logging
@@ -16,11 +23,19 @@ from datetime import datetime
 
 router = APIRouter()
 
-# Global cache for user environment data following established patterns
-_user_environment_cache = {}
-_user_environment_cache_lock = threading.Lock()
-# Track which cache keys belong to which users for efficient invalidation
-_user_environment_cache_keys = {}  # user_id -> set of cache_keys
+# Bounded user environment cache (core/cache.py): 12 hour TTL, entries tagged "user:<id>"
+# Shared across uvicorn workers through the L2 store when one is configured (core/l2_cache.py)
+USER_ENVIRONMENT_CACHE_TTL = 43200
+# Stale-while-revalidate: for this long past the TTL an entry is still served while one background refresh runs
+USER_ENVIRONMENT_STALE_TTL = int(os.environ.get("USER_ENVIRONMENT_STALE_TTL", "21600"))
+# The scheduled refresh only covers users who logged in within this window; everyone else loads on demand
+USER_ENVIRONMENT_ACTIVE_HOURS = int(os.environ.get("USER_ENVIRONMENT_ACTIVE_HOURS", "24"))
+_user_environment_cache = get_cache("user_environment", ttl=USER_ENVIRONMENT_CACHE_TTL, max_bytes=64 * 1024 * 1024,
+                                    l2=True, stale_ttl=USER_ENVIRONMENT_STALE_TTL)
+# Which users actually load their environment (core/access_tracker.py) - the scheduled refresh covers the most frequent
+_user_environment_access = get_access_tracker("user_environment")
+USER_ENVIRONMENT_WARM_TOP_N = int(os.environ.get("USER_ENVIRONMENT_WARM_TOP_N", "500"))
+USER_ENVIRONMENT_WARM_TIME_BUDGET = float(os.environ.get("USER_ENVIRONMENT_WARM_TIME_BUDGET", "300"))
 
 def _generate_user_environment_cache_key(user_id: str) -> str:
     """Generate a consistent cache key for user environment data"""
@@ -99,94 +114,86 @@ def _get_group_users_for_admin(user_id: str, conn) -> list:
         logging.error(f"Error fetching group users for admin {user_id}: {str(e)}")
         return []
 
-def _is_user_environment_cache_valid(cache_key: str, cache_ttl: int = 43200) -> bool:
-    """Check if cached user environment data is still valid (12 hours = 43200 seconds)"""
-    time_key = f"{cache_key}_time"
-    
-    if cache_key not in _user_environment_cache or time_key not in _user_environment_cache:
-        return False
-    
-    return time.time() - _user_environment_cache[time_key] < cache_ttl
+def _is_valid_user_environment(data) -> bool:
+    """Check that user environment data is complete enough to cache or serve"""
+    return (data is not None and
+            isinstance(data, dict) and
+            data.get("user_profile") is not None and
+            data.get("case_statuses") is not None)
 
 def _get_cached_user_environment(cache_key: str):
     """Get cached user environment data if valid"""
-    with _user_environment_cache_lock:
-        if _is_user_environment_cache_valid(cache_key):
-            cached_data = _user_environment_cache[cache_key]
-            
-            # Validate that cached data is actually usable
-            if (cached_data is not None and 
-                isinstance(cached_data, dict) and 
-                cached_data.get("user_profile") is not None and
-                cached_data.get("case_statuses") is not None):
-                
-                logging.debug(f"Returning valid cached user environment data: {cache_key}")
-                return cached_data
-            else:
-                # Cache contains invalid data - remove it
-                logging.warning(f"Removing invalid cached data for key: {cache_key}, data type: {type(cached_data)}")
-                _user_environment_cache.pop(cache_key, None)
-                _user_environment_cache.pop(f"{cache_key}_time", None)
-                
+    cached_data = _user_environment_cache.get(cache_key)
+    if cached_data is None:
+        return None
+
+    # Validate that cached data is actually usable
+    if _is_valid_user_environment(cached_data):
+        logging.debug(f"Returning valid cached user environment data: {cache_key}")
+        return cached_data
+
+    # Cache contains invalid data - remove it
+    logging.warning(f"Removing invalid cached data for key: {cache_key}, data type: {type(cached_data)}")
+    _user_environment_cache.delete(cache_key)
     return None
 
+def _get_user_environment_or_stale(user_id: str, cache_key: str):
+    """
+    Get cached user environment data, serving an expired entry within the stale window.
+    A stale entry is returned as-is and a single background refresh is queued for the user.
+    """
+    cached_data, stale = _user_environment_cache.get_or_stale(cache_key)
+    _user_environment_access.record(user_id, hit=cached_data is not None)
+    if cached_data is None:
+        return None
+
+    if not _is_valid_user_environment(cached_data):
+        logging.warning(f"Removing invalid cached data for key: {cache_key}, data type: {type(cached_data)}")
+        _user_environment_cache.delete(cache_key)
+        return None
+
+    if stale:
+        # Keyed per user, so concurrent stale hits collapse into one refresh (core/rewarm.py)
+        outcome = rewarm_scheduler.schedule(
+            f"user_environment:{user_id}", _warm_single_user_environment_cache, user_id, kind="user_environment"
+        )
+        logging.debug(f"Serving stale user environment for user {user_id}, refresh {outcome}")
+    return cached_data
+
 def _cache_user_environment_data(cache_key: str, data, user_id: str = None):
-    """Cache the user environment data with timestamp and track user association"""
+    """Cache the user environment data, tagged with the user for efficient invalidation"""
     # Validate data before caching to prevent storing invalid/null data
-    if (data is None or 
-        not isinstance(data, dict) or 
-        data.get("user_profile") is None or
-        data.get("case_statuses") is None):
-        
+    if not _is_valid_user_environment(data):
         logging.error(f"Refusing to cache invalid data for key: {cache_key}, data type: {type(data)}")
         return False
-    
-    with _user_environment_cache_lock:
-        time_key = f"{cache_key}_time"
-        _user_environment_cache[cache_key] = data
-        _user_environment_cache[time_key] = time.time()
-        
-        # Track which user this cache key belongs to for efficient invalidation
-        if user_id:
-            if user_id not in _user_environment_cache_keys:
-                _user_environment_cache_keys[user_id] = set()
-            _user_environment_cache_keys[user_id].add(cache_key)
-        
-        logging.debug(f"Successfully cached user environment data: {cache_key}")
-        return True
 
-def clear_user_environment_cache(user_id: str = None) -> None:
-    """Clear cached user environment data - for future invalidation use"""
-    with _user_environment_cache_lock:
-        if user_id:
-            # Use the user cache key tracking for efficient invalidation
-            if user_id in _user_environment_cache_keys:
-                keys_to_remove = list(_user_environment_cache_keys[user_id])
-                removed_count = 0
-                
-                # Remove all cache keys and their corresponding time keys
-                for cache_key in keys_to_remove:
-                    time_key = f"{cache_key}_time"
-                    
-                    # Remove data key
-                    if _user_environment_cache.pop(cache_key, None) is not None:
-                        removed_count += 1
-                    
-                    # Remove time key
-                    if _user_environment_cache.pop(time_key, None) is not None:
-                        removed_count += 1
-                
-                # Clear the user's key tracking
-                del _user_environment_cache_keys[user_id]
-                
-                logging.info(f"Cleared {removed_count} cache entries for user environment: {user_id}")
-            else:
-                logging.info(f"No cache entries found for user environment: {user_id}")
+    tags = [f"user:{user_id}"] if user_id else None
+    if not _user_environment_cache.set(cache_key, data, tags=tags):
+        return False
+    logging.debug(f"Successfully cached user environment data: {cache_key}")
+    return True
+
+def clear_user_environment_cache(user_id: str = None, broadcast: bool = True) -> None:
+    """
+    Clear cached user environment data for one user, or all users.
+    broadcast publishes the invalidation so the other API nodes evict too (core/invalidation_bus.py).
+    """
+    if user_id:
+        removed_count = _user_environment_cache.invalidate_tag(f"user:{user_id}")
+        drop_response_bodies(f"user_environment:user:{user_id}")
+        if removed_count:
+            logging.info(f"Cleared {removed_count} cache entries for user environment: {user_id}")
         else:
-            cache_count = len(_user_environment_cache)
-            _user_environment_cache.clear()
-            _user_environment_cache_keys.clear()
-            logging.info(f"Cleared all cached user environment data ({cache_count} entries)")
+            logging.info(f"No cache entries found for user environment: {user_id}")
+    else:
+        cache_count = _user_environment_cache.clear()
+        drop_response_bodies("user_environment")
+        logging.info(f"Cleared all cached user environment data ({cache_count} entries)")
+    if broadcast:
+        invalidation_bus.publish("user_environment", user_id or "*")
+
+# Invalidations published by other nodes evict this node's copies (without re-publishing)
+invalidation_bus.subscribe("user_environment", lambda scope: clear_user_environment_cache(None if scope == "*" else scope, broadcast=False))
 
 def invalidate_and_rewarm_user_environment_cache(user_id: str):
     """
@@ -198,6 +205,76 @@ def invalidate_and_rewarm_user_environment_cache(user_id: str):
     
     logging.info(f"Initiated cache invalidation for user environment: {user_id}")
 
+def _build_user_environment_data(user_id: str, user_profile: dict, login_updated: bool, conn) -> dict:
+    """
+    Build the user environment payload for an active user (shared by the endpoint, cache warming and /bootstrap).
+    
+    Args:
+        user_id: The user ID
+        user_profile: Result of get_user_profile_info() for the user
+        login_updated: Whether last_login_dt was updated by this request
+        conn: Database connection
+        
+    Returns:
+        dict: The /user_environment response payload
+    """
+    user_type = user_profile.get("user_type", 0)
+    max_case_status = user_profile.get("max_case_status", 20)
+    
+    # Get case statuses based on user permissions
+    case_status_info = get_case_statuses_for_user(user_id, user_type, max_case_status, conn)
+    
+    # Get surgeon and facility lists for the user
+    surgeons = get_user_surgeons(user_id, conn)
+    facilities = get_user_facilities(user_id, conn)
+    
+    # Get available user types for the user
+    available_user_types = get_available_user_types(user_type, conn)
+    
+    # Check if user is a group admin
+    is_group_admin = _check_user_group_admin(user_id, conn)
+    
+    # Find max_case_status_desc from the case_statuses array
+    max_case_status_desc = None
+    for case_status in case_status_info["case_statuses"]:
+        if case_status["case_status"] == max_case_status:
+            max_case_status_desc = case_status["case_status_desc"]
+            break
+    
+    response_data = {
+        "user_profile": user_profile,
+        "case_statuses": case_status_info["case_statuses"],
+        "surgeons": surgeons,
+        "facilities": facilities,
+        "user_types": available_user_types,
+        "permissions": {
+            "user_type": user_type,
+            "user_type_desc": user_profile.get("user_type_desc"),
+            "case_status_access_level": case_status_info["access_level"],
+            "max_case_status": user_profile.get("max_case_status", 20),
+            "max_case_status_desc": max_case_status_desc,
+            "can_access_all_cases": user_type >= 10,
+            "can_access_backoffice": user_type >= 10,
+            "group_admin": is_group_admin
+        },
+        "environment_info": {
+            "user_id": user_id,
+            "case_statuses_count": case_status_info["total_count"],
+            "has_documents": len(user_profile.get("documents", [])) > 0,
+            "document_count": len(user_profile.get("documents", [])),
+            "surgeon_count": len(surgeons),
+            "facility_count": len(facilities),
+            "user_types_count": len(available_user_types),
+            "last_login_updated": login_updated
+        }
+    }
+    
+    # Include group users if admin
+    if is_group_admin:
+        response_data["group_users"] = _get_group_users_for_admin(user_id, conn)
+    
+    return response_data
+
 def _warm_single_user_environment_cache(user_id: str) -> bool:
     """
     Warm cache for a single user by fetching their environment data.
@@ -208,6 +285,12 @@ def _warm_single_user_environment_cache(user_id: str) -> bool:
     Returns:
         bool: True if successful, False if failed
     """
+    # With a shared L2 store, another worker may already have loaded this user - fill L1 from it
+    cache_key = _generate_user_environment_cache_key(user_id)
+    if _user_environment_cache.l2 is not None and _get_cached_user_environment(cache_key) is not None:
+        logging.debug(f"Warmed cache for user from L2: {user_id}")
+        return True
+    
     try:
         conn = get_db_connection()
         
@@ -219,68 +302,15 @@ def _warm_single_user_environment_cache(user_id: str) -> bool:
                 logging.debug(f"Skipping cache warming for inactive user: {user_id}")
                 return False
 
-            user_type = user_profile.get("user_type", 0)
-            max_case_status = user_profile.get("max_case_status", 20)
-            
-            # Get case statuses based on user permissions
-            case_status_info = get_case_statuses_for_user(user_id, user_type, max_case_status, conn)
-            
-            # Get surgeon and facility lists for the user
-            surgeons = get_user_surgeons(user_id, conn)
-            facilities = get_user_facilities(user_id, conn)
-            
-            # Get available user types for the user
-            available_user_types = get_available_user_types(user_type, conn)
-            
-            # Check if user is a group admin
-            is_group_admin = _check_user_group_admin(user_id, conn)
-            
-            # Find max_case_status_desc from the case_statuses array
-            max_case_status_desc = None
-            for case_status in case_status_info["case_statuses"]:
-                if case_status["case_status"] == max_case_status:
-                    max_case_status_desc = case_status["case_status_desc"]
-                    break
-            
-            # Build response data (same structure as main endpoint)
-            response_data = {
-                "user_profile": user_profile,
-                "case_statuses": case_status_info["case_statuses"],
-                "surgeons": surgeons,
-                "facilities": facilities,
-                "user_types": available_user_types,
-                "permissions": {
-                    "user_type": user_type,
-                    "user_type_desc": user_profile.get("user_type_desc"),
-                    "case_status_access_level": case_status_info["access_level"],
-                    "max_case_status": user_profile.get("max_case_status", 20),
-                    "max_case_status_desc": max_case_status_desc,
-                    "can_access_all_cases": user_type >= 10,
-                    "can_access_backoffice": user_type >= 10,
-                    "group_admin": is_group_admin
-                },
-                "environment_info": {
-                    "user_id": user_id,
-                    "case_statuses_count": case_status_info["total_count"],
-                    "has_documents": len(user_profile.get("documents", [])) > 0,
-                    "document_count": len(user_profile.get("documents", [])),
-                    "surgeon_count": len(surgeons),
-                    "facility_count": len(facilities),
-                    "user_types_count": len(available_user_types),
-                    "last_login_updated": False  # Don't update login time during warming
-                }
-            }
-
-            # Include group users if admin
-            if is_group_admin:
-                response_data["group_users"] = _get_group_users_for_admin(user_id, conn)
+            # Don't update login time during warming
+            response_data = _build_user_environment_data(user_id, user_profile, False, conn)
             
             # Cache the result
-            cache_key = _generate_user_environment_cache_key(user_id)
             cache_success = _cache_user_environment_data(cache_key, response_data, user_id)
             if not cache_success:
                 logging.error(f"Failed to cache data during warming for user: {user_id}")
             
+            _user_environment_access.mark_warmed(user_id)
             logging.debug(f"Successfully warmed cache for user: {user_id}")
             return True
             
@@ -349,7 +379,7 @@ def warm_all_user_environment_caches() -> dict:
                 "successful_warms": successful_warms,
                 "failed_warms": failed_warms,
                 "execution_time_seconds": round(execution_time, 2),
-                "cache_entries": len(_user_environment_cache) // 2  # Divide by 2 because we store data + time keys
+                "cache_entries": len(_user_environment_cache)
             }
             
             logging.info(
@@ -375,6 +405,111 @@ def warm_all_user_environment_caches() -> dict:
             "error": str(e)
         }
 
+def refresh_active_user_environment_caches(top_n: int = USER_ENVIRONMENT_WARM_TOP_N,
+                                           time_budget: float = USER_ENVIRONMENT_WARM_TIME_BUDGET,
+                                           active_hours: int = USER_ENVIRONMENT_ACTIVE_HOURS,
+                                           refresh_after: float = USER_ENVIRONMENT_CACHE_TTL / 2) -> dict:
+    """
+    Refresh the cached environment of the most active users before it expires.
+    
+    Replaces the scheduled re-warm of every active user. Candidates are the top_n users by
+    decayed request frequency (core/access_tracker.py), topped up with users who logged in
+    within active_hours while few requests have been observed. Each is refreshed, most
+    frequent first, only if their entry is missing or older than refresh_after seconds, and
+    the run stops after time_budget seconds. Anyone else is built on demand, and an entry
+    that expires anyway is still served from the stale window while it refreshes
+    (_get_user_environment_or_stale).
+    
+    Args:
+        top_n: Maximum number of users to consider
+        time_budget: Seconds the refresh may run before leaving the rest to load on demand
+        active_hours: Recent-login window for the fallback candidates
+        refresh_after: Entries younger than this are left alone
+        
+    Returns:
+        dict: Summary of the refresh including refreshed/skipped/failed counts
+    """
+    start_time = time.time()
+    logging.info(f"🔥 Refreshing user environment cache for the {top_n} most active users")
+    
+    try:
+        conn = get_db_connection()
+        
+        try:
+            with conn.cursor(pymysql.cursors.DictCursor) as cursor:
+                cursor.execute("""
+                    SELECT user_id FROM user_profile 
+                    WHERE active = 1 AND last_login_dt >= NOW() - INTERVAL %s HOUR
+                    ORDER BY last_login_dt DESC, user_id
+                    LIMIT %s
+                """, (active_hours, top_n))
+                recent_users = cursor.fetchall()
+        finally:
+            close_db_connection(conn)
+        
+        candidates = _user_environment_access.candidates(
+            top_n, seeds=[(user["user_id"], None) for user in recent_users]
+        )
+        
+        refreshed = 0
+        skipped_fresh = 0
+        skipped_time_budget = 0
+        failed = 0
+        
+        for i, (user_id, _params, origin) in enumerate(candidates):
+            if time.time() - start_time >= time_budget:
+                skipped_time_budget = len(candidates) - i
+                logging.warning(f"⚠️ User environment refresh hit its {time_budget}s budget, {skipped_time_budget} users left to load on demand")
+                break
+            
+            entry = _user_environment_cache.get_entry(_generate_user_environment_cache_key(user_id))
+            if entry is not None and entry.age < refresh_after:
+                skipped_fresh += 1
+                continue
+            
+            # Same rate limit as the full warm (15 users/second)
+            if refreshed or failed:
+                time.sleep(1.0 / 15.0)
+            
+            if _warm_single_user_environment_cache(user_id):
+                refreshed += 1
+            else:
+                failed += 1
+        
+        execution_time = time.time() - start_time
+        result = {
+            "candidates": len(candidates),
+            "observed": sum(1 for _user_id, _params, origin in candidates if origin == "observed"),
+            "refreshed": refreshed,
+            "skipped_fresh": skipped_fresh,
+            "skipped_time_budget": skipped_time_budget,
+            "failed": failed,
+            "execution_time_seconds": round(execution_time, 2),
+            "cache_entries": len(_user_environment_cache),
+            "hit_rates": _user_environment_access.stats()
+        }
+        
+        logging.info(
+            f"🔥 User environment refresh completed: {refreshed}/{len(candidates)} users refreshed "
+            f"({result['observed']} by observed frequency), {skipped_fresh} still fresh, {failed} failures "
+            f"in {result['execution_time_seconds']}s"
+        )
+        return result
+        
+    except Exception as e:
+        execution_time = time.time() - start_time
+        logging.error(f"User environment refresh failed after {execution_time:.2f}s: {str(e)}")
+        return {
+            "candidates": 0,
+            "observed": 0,
+            "refreshed": 0,
+            "skipped_fresh": 0,
+            "skipped_time_budget": 0,
+            "failed": 0,
+            "execution_time_seconds": round(execution_time, 2),
+            "error": str(e)
+        }
+
 def warm_user_environment_cache_background():
     """
     Background thread function to warm user environment cache without blocking server startup.
@@ -511,38 +646,27 @@ def get_case_statuses_for_user(user_id: str, user_type: int, max_case_status: in
         user_id: The user ID
         user_type: The user's type level
         max_case_status: The user's maximum case status level
-        conn: Database connection
+        conn: Database connection (unused - statuses come from the reference data snapshot)
         
     Returns:
         dict: Case statuses with access information
     """
-    with conn.cursor(pymysql.cursors.DictCursor) as cursor:
-        # Build query based on user_type
-        if user_type < 10:
-            # User type < 10: return only case_status <= max_case_status
-            cursor.execute("""
-                SELECT case_status, case_status_desc 
-                FROM case_status_list 
-                WHERE case_status <= %s 
-                ORDER BY case_status
-            """, (max_case_status,))
-            access_level = "limited"
-        else:
-            # User type >= 10: return all case_status rows
-            cursor.execute("""
-                SELECT case_status, case_status_desc 
-                FROM case_status_list 
-                ORDER BY case_status
-            """)
-            access_level = "full"
-        
-        case_statuses = cursor.fetchall()
-        
-        return {
-            "case_statuses": case_statuses,
-            "access_level": access_level,
-            "total_count": len(case_statuses)
-        }
+    # Served from the in-memory reference data snapshot (core/reference_data.py), ordered by case_status
+    all_statuses = reference_data.get("case_statuses")
+    if user_type < 10:
+        # User type < 10: return only case_status <= max_case_status
+        case_statuses = [row for row in all_statuses if row["case_status"] <= max_case_status]
+        access_level = "limited"
+    else:
+        # User type >= 10: return all case_status rows
+        case_statuses = list(all_statuses)
+        access_level = "full"
+    
+    return {
+        "case_statuses": case_statuses,
+        "access_level": access_level,
+        "total_count": len(case_statuses)
+    }
 
 def get_user_surgeons(user_id: str, conn) -> list:
     """
@@ -725,6 +849,9 @@ def get_user_environment(request: Request, user_id: str = Query(..., description
         - Efficient data aggregation for complete user context
         - Intelligent caching with 12-hour TTL reduces database load
         - Thread-safe cache implementation with user-specific invalidation
+        - Cached environments are served as pre-encoded JSON with an ETag; If-None-Match gets 304 Not Modified
+        - Stale-while-revalidate: for USER_ENVIRONMENT_STALE_TTL past the TTL the expired entry is served
+          immediately and one background refresh is queued, so users never wait on the full rebuild
     
     Security Features:
         - Permission-based data filtering throughout all queries
@@ -743,6 +870,7 @@ def get_user_environment(request: Request, user_id: str = Query(..., description
     start_time = time.time()
     response_status = 200
     response_data = None
+    response_body = None
     error_message = None
     logged_already = False  # Track if we've already logged this request
     
@@ -755,8 +883,12 @@ def get_user_environment(request: Request, user_id: str = Query(..., description
         # Generate cache key for this user environment request
         cache_key = _generate_user_environment_cache_key(user_id)
         
-        # Check cache first
-        cached_result = _get_cached_user_environment(cache_key)
+        # Encoded bodies are reused while the cached environment is unchanged; tagged so clears drop them
+        body_key = f"user_environment:{cache_key}"
+        body_tags = ["user_environment", f"user_environment:user:{user_id}"]
+        
+        # Check cache first (a stale entry within the grace window is served while it refreshes)
+        cached_result = _get_user_environment_or_stale(user_id, cache_key)
         if cached_result is not None:
             logging.debug(f"Returning cached user environment data for user: {user_id}")
             # Ensure last_login_dt is updated even on cache hits
@@ -771,6 +903,9 @@ def get_user_environment(request: Request, user_id: str = Query(..., description
             except Exception as e:
                 logging.error(f"Failed to update last_login_dt on cache hit for user {user_id}: {str(e)}")
             
+            # Reuse the encoded body; a matching If-None-Match gets an empty 304
+            response = json_response(request, cached_result, cache_key=body_key, tags=body_tags)
+            
             # Calculate execution time for cache hit with better precision
             execution_time_seconds = time.time() - start_time
             # Use round() instead of int() to get more accurate timing, and ensure minimum 1ms
@@ -781,16 +916,17 @@ def get_user_environment(request: Request, user_id: str = Query(..., description
             log_request_from_endpoint(
                 request=request,
                 execution_time_ms=execution_time_ms,
-                response_status=200,
+                response_status=response.status_code,
                 user_id=user_id,
                 response_data=cached_result,
-                error_message=None
+                error_message=None,
+                response_body=response.body
             )
             
             # Mark as already logged to prevent duplicate logging in finally block
             logged_already = True
             
-            return cached_result
+            return response
 
         # Cache miss - proceed with database queries
         logging.info(f"Cache miss for user environment query: {cache_key}")
@@ -814,76 +950,26 @@ def get_user_environment(request: Request, user_id: str = Query(..., description
             error_message = "User not found or inactive"
             raise HTTPException(status_code=404, detail="User not found or inactive")
 
-        user_type = user_profile.get("user_type", 0)
-        max_case_status = user_profile.get("max_case_status", 20)
-        
         # Update last login datetime
         login_updated = update_user_last_login(user_id, conn)
         # Commit the login timestamp update
         if login_updated:
             conn.commit()
         
-        # Get case statuses based on user permissions
-        case_status_info = get_case_statuses_for_user(user_id, user_type, max_case_status, conn)
-        
-        # Get surgeon and facility lists for the user
-        surgeons = get_user_surgeons(user_id, conn)
-        facilities = get_user_facilities(user_id, conn)
-        
-        # Get available user types for the user
-        available_user_types = get_available_user_types(user_type, conn)
-        
-        # Check if user is a group admin
-        is_group_admin = _check_user_group_admin(user_id, conn)
-        
-        # Find max_case_status_desc from the case_statuses array
-        max_case_status_desc = None
-        for case_status in case_status_info["case_statuses"]:
-            if case_status["case_status"] == max_case_status:
-                max_case_status_desc = case_status["case_status_desc"]
-                break
+        response_data = _build_user_environment_data(user_id, user_profile, login_updated, conn)
         
         # Record successful user environment retrieval
         business_metrics.record_utility_operation("get_user_environment", "success")
-            
-        response_data = {
-            "user_profile": user_profile,
-            "case_statuses": case_status_info["case_statuses"],
-            "surgeons": surgeons,
-            "facilities": facilities,
-            "user_types": available_user_types,
-            "permissions": {
-                "user_type": user_type,
-                "user_type_desc": user_profile.get("user_type_desc"),
-                "case_status_access_level": case_status_info["access_level"],
-                "max_case_status": user_profile.get("max_case_status", 20),
-                "max_case_status_desc": max_case_status_desc,
-                "can_access_all_cases": user_type >= 10,
-                "can_access_backoffice": user_type >= 10,
-                "group_admin": is_group_admin
-            },
-            "environment_info": {
-                "user_id": user_id,
-                "case_statuses_count": case_status_info["total_count"],
-                "has_documents": len(user_profile.get("documents", [])) > 0,
-                "document_count": len(user_profile.get("documents", [])),
-                "surgeon_count": len(surgeons),
-                "facility_count": len(facilities),
-                "user_types_count": len(available_user_types),
-                "last_login_updated": login_updated
-            }
-        }
-
-        # Include group users if admin
-        if is_group_admin:
-            response_data["group_users"] = _get_group_users_for_admin(user_id, conn)
         
         # Cache the result before returning
         cache_success = _cache_user_environment_data(cache_key, response_data, user_id)
         if not cache_success:
             logging.error(f"Failed to cache response data for user: {user_id}")
         
-        return response_data
+        response = json_response(request, response_data, cache_key=body_key if cache_success else None, tags=body_tags)
+        response_status = response.status_code
+        response_body = response.body
+        return response
         
     except HTTPException as http_error:
         # Re-raise HTTP exceptions and capture error details
@@ -919,6 +1005,7 @@ def get_user_environment(request: Request, user_id: str = Query(..., description
                 response_status=response_status,
                 user_id=user_id,
                 response_data=response_data,
-                error_message=error_message
+                error_message=error_message,
+                response_body=response_body
             )
  
\ No newline at end of file
@@ -1,5 +1,5 @@
 # Created: 2025-07-15 09:20:13
-# Last Modified: 2025-08-08 22:37:13
+# Last Modified: 2026-10-16 19:30:49
 # Author: Scott Cadreau
 
 # endpoints/utility/log_request.py
@@ -14,7 +14,7 @@ from utils.monitoring import track_business_operation, business_metrics
 
 router = APIRouter()
 
-def log_request_from_endpoint(request: Request, execution_time_ms: int, response_status: int, user_id: str = None, response_data: dict = None, error_message: str = None):
+def log_request_from_endpoint(request: Request, execution_time_ms: int, response_status: int, user_id: str = None, response_data: dict = None, error_message: str = None, response_body: bytes = None):
     """
     Comprehensive utility function for logging request details from any application endpoint.
     
@@ -39,6 +39,9 @@ def log_request_from_endpoint(request: Request, execution_time_ms: int, response
                                        Useful for debugging and request replay scenarios.
         error_message (str, optional): Error message if the request failed.
                                       Critical for error tracking and debugging.
+        response_body (bytes, optional): Already-encoded JSON response body. When given it is
+                                        logged as-is instead of serializing response_data again
+                                        (empty for 304 Not Modified, which logs no payload).
     
     Data Extraction:
         - Client IP Address: Extracted from multiple sources with priority:
@@ -102,6 +105,12 @@ def log_request_from_endpoint(request: Request, execution_time_ms: int, response
         # Get query parameters
         query_params = dict(request.query_params) if request.query_params else None
         
+        # Pre-encoded bodies (core/response_cache.py) are logged without re-serializing the payload
+        if response_body is not None:
+            response_payload = response_body.decode('utf-8') if response_body else None
+        else:
+            response_payload = json.dumps(response_data, default=str, indent=2) if response_data else None
+        
         # Create log entry
         log_entry = LogRequestModel(
             timestamp=datetime.now(),
@@ -111,7 +120,7 @@ def log_request_from_endpoint(request: Request, execution_time_ms: int, response
             request_payload=request_payload,
             query_params=json.dumps(query_params, indent=2) if query_params else None,
             response_status=response_status,
-            response_payload=json.dumps(response_data, default=str, indent=2) if response_data else None,
+            response_payload=response_payload,
             execution_time_ms=execution_time_ms,
             error_message=error_message,
             client_ip=client_ip
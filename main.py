@@ -1,8 +1,12 @@
 # Created: 2025-07-15 09:20:13
-# Last Modified: 2025-11-14 17:36:35
+# Last Modified: 2026-10-16 19:50:18
 # Author: Scott Cadreau
 
 # main.py
+# Time every module imported during startup (reported in /ready, CLI: python -m core.import_profile)
+from core import import_profile
+import_profile.start()
+
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from prometheus_fastapi_instrumentator import Instrumentator
@@ -41,9 +45,11 @@ from endpoints.utility.get_lists import router as get_lists_router
 from endpoints.utility.add_to_lists import router as add_to_lists_router
 from endpoints.utility.bugs import router as bugs_router
 from endpoints.utility.cache_diagnostics import router as cache_diagnostics_router
+from endpoints.utility.bootstrap import router as bootstrap_router
 
 from endpoints.admin.cache_management import router as cache_management_router
 from endpoints.admin.encryption_key_management import router as encryption_key_management_router
+from endpoints.admin.query_telemetry import router as query_telemetry_router
 
 from endpoints.health import router as health_router
 from endpoints.metrics import router as metrics_router
@@ -52,6 +58,7 @@ from endpoints.backoffice.get_cases_by_status import router as get_cases_by_stat
 
 # Import scheduler functionality
 import os
+import time
 import logging
 from endpoints.backoffice.get_users import router as get_users_router
 from endpoints.backoffice.case_dashboard_data import router as case_dashboard_data_router
@@ -69,6 +76,7 @@ from endpoints.exports.case_export import router as case_export_router
 
 # Import monitoring utilities
 from utils.monitoring import monitor_request, system_monitor, db_monitor, logger
+from core.startup import startup_orchestrator
 import requests
 
 def get_ec2_instance_id() -> str:
@@ -160,6 +168,7 @@ app.add_middleware(
         # Expose custom headers for file downloads
         "Content-Disposition",
         "Content-Length", 
+        "ETag",
         "X-Downloaded-Files",
         "X-Download-Errors",
         "X-Cases-Processed",
@@ -181,6 +190,27 @@ def monitoring_middleware(request: Request, call_next):
 # Prometheus monitoring setup
 Instrumentator().instrument(app).expose(app)
 
+# Async database pool lifecycle
+# The aiomysql pool is bound to the serving event loop, so it is opened on startup and closed on shutdown
+@app.on_event("startup")
+async def open_async_db_pool():
+    started_at = time.time()
+    try:
+        from core.database import get_async_db_pool, get_async_pool_stats
+        await get_async_db_pool()
+        stats = get_async_pool_stats()
+        logger.info(f"🔥 Async database pool ready: {stats.get('free', 0)}/{stats.get('maxsize', 0)} connections open")
+        startup_orchestrator.record_phase("async_db_pool", started_at, detail={"open": stats.get("free", 0), "maxsize": stats.get("maxsize", 0)})
+    except Exception as e:
+        logger.error(f"Failed to open async database pool: {str(e)}")
+        logger.warning("Application will continue with on-demand async pool creation")
+        startup_orchestrator.record_phase("async_db_pool", started_at, status="failed", error=str(e))
+
+@app.on_event("shutdown")
+async def shutdown_async_db_pool():
+    from core.database import close_async_db_pool
+    await close_async_db_pool()
+
 # Include all routers
 # Case endpoints
 app.include_router(get_case_router, tags=["cases"])
@@ -220,6 +250,7 @@ app.include_router(get_lists_router, tags=["utility"])
 app.include_router(add_to_lists_router, tags=["utility"])
 app.include_router(bugs_router, tags=["utility"])
 app.include_router(cache_diagnostics_router, tags=["utility"])
+app.include_router(bootstrap_router, tags=["utility"])
 
 # Health check
 app.include_router(health_router, tags=["health"])
@@ -245,6 +276,7 @@ app.include_router(groups_router, tags=["backoffice"])
 # Admin endpoints
 app.include_router(cache_management_router, tags=["admin"])
 app.include_router(encryption_key_management_router, tags=["admin"])
+app.include_router(query_telemetry_router, tags=["admin"])
 
 # Report endpoints
 app.include_router(provider_payment_report_router, tags=["reports"])
@@ -256,30 +288,32 @@ app.include_router(provider_bucket_report_router, tags=["reports"])
 app.include_router(quickbooks_export_router, tags=["exports"])
 app.include_router(case_export_router, tags=["exports"])
 
-# Warm secrets cache on startup for optimal performance
-# Pre-loads all application secrets to eliminate cold start latency
-try:
+import_profile.stop()
+logger.info(f"📦 Startup imports took {import_profile.summary(top=0)['wall_ms']} ms")
+
+# Startup warmers
+# Each warmer is a phase in the startup orchestrator (core/startup.py): independent phases run
+# concurrently in background threads with timeouts, so the worker starts serving immediately.
+# /ready returns 503 until the critical phases (secrets, DB pool, cases cache, DEKs) are warm.
+
+def warm_secrets_phase() -> dict:
+    """Pre-load all application secrets to eliminate cold start latency"""
     from utils.secrets_manager import warm_all_secrets
     warming_results = warm_all_secrets()
     logger.info(f"Secrets cache warming completed: {warming_results['successful']}/{warming_results['total_secrets']} secrets loaded")
-except Exception as e:
-    logger.error(f"Failed to warm secrets cache: {str(e)}")
-    logger.warning("Application will continue with on-demand secret loading")
-
-# Warm user environment cache on startup for optimal performance (non-blocking)
-# Starts background thread to pre-load all active users' environment data
-# Server becomes available immediately while cache warming happens in background
-try:
+    if warming_results["successful"] == 0 and warming_results["total_secrets"] > 0:
+        raise RuntimeError("No secrets could be loaded")
+    return {"loaded": warming_results["successful"], "total": warming_results["total_secrets"]}
+
+def warm_user_environment_phase() -> dict:
+    """Start background thread to pre-load all active users' environment data (non-blocking)"""
     from endpoints.utility.get_user_environment import start_background_cache_warming
-    warming_thread = start_background_cache_warming()
+    start_background_cache_warming()
     logger.info("🔥 User environment cache warming started in background thread (non-blocking)")
-except Exception as e:
-    logger.error(f"Failed to start user environment cache warming: {str(e)}")
-    logger.warning("Application will continue with on-demand user environment loading")
+    return {"background": True}
 
-# Warm database connection pool on startup for optimal performance
-# Pre-creates database connections to eliminate first-request latency
-try:
+def warm_connection_pool_phase() -> dict:
+    """Pre-create database connections to eliminate first-request latency"""
     from core.database import prewarm_connection_pool
     pool_results = prewarm_connection_pool(target_connections=50)
     if pool_results["status"] == "success":
@@ -288,13 +322,11 @@ try:
         logger.info(f"✅ Database pool already warm: {pool_results['current_size']}/{pool_results['target_size']} connections ready")
     else:
         logger.warning(f"⚠️ Database pool warming status: {pool_results['status']}")
-except Exception as e:
-    logger.error(f"Failed to warm database connection pool: {str(e)}")
-    logger.warning("Application will continue with on-demand connection creation")
+        raise RuntimeError(f"Database pool warming status: {pool_results['status']}")
+    return {"ready": pool_results["current_size"], "target": pool_results["target_size"]}
 
-# Warm cases cache on startup for optimal performance
-# Pre-loads common admin queries to eliminate cold start latency
-try:
+def warm_cases_cache_phase() -> dict:
+    """Pre-load common admin queries to eliminate cold start latency"""
     from endpoints.backoffice.get_cases_by_status import warm_cases_cache
     cache_results = warm_cases_cache()
     if cache_results["failed"] == 0:
@@ -302,56 +334,70 @@ try:
         logger.info(f"🔥 Cases cache warming completed: {cache_results['successful']} queries warmed ({total_cases} total cases) in {cache_results['duration_seconds']:.2f}s")
     else:
         logger.warning(f"⚠️ Cases cache warming partial: {cache_results['successful']}/{cache_results['total_queries']} queries warmed in {cache_results['duration_seconds']:.2f}s")
-except Exception as e:
-    logger.error(f"Failed to warm cases cache: {str(e)}")
-    logger.warning("Application will continue with on-demand cache population")
+    return {"warmed": cache_results["successful"], "failed": cache_results["failed"]}
 
-# Warm DEK (Data Encryption Keys) cache on startup for optimal decryption performance
-# Pre-loads all user encryption keys to eliminate cold start latency and reduce KMS API calls
-try:
+def warm_dek_cache_phase() -> dict:
+    """Pre-load all user encryption keys to eliminate cold start latency and reduce KMS API calls"""
     from utils.phi_encryption import warm_all_user_deks
     dek_results = warm_all_user_deks()
     if dek_results["failed"] == 0 and dek_results["successful"] > 0:
-        logger.info(f"🔐 DEK cache warming completed: {dek_results['successful']} user keys loaded in {dek_results['duration_seconds']}s")
+        logger.info(f"🔐 DEK cache warming completed: {dek_results['successful']} user keys loaded in {dek_results['duration_seconds']}s ({dek_results['keys_per_second']} keys/s)")
     elif dek_results["successful"] > 0:
         logger.warning(f"⚠️ DEK cache warming partial: {dek_results['successful']}/{dek_results['total_users']} keys loaded in {dek_results['duration_seconds']}s")
     else:
         logger.info("ℹ️ No encryption keys found - DEK cache warming skipped")
-except Exception as e:
-    logger.error(f"Failed to warm DEK cache: {str(e)}")
-    logger.warning("Application will continue with on-demand DEK loading")
-
-# Start the scheduler service in background
-# Handles: Case status updates (Mon/Thu), NPI data updates (Tue), Pool/Cache maintenance
-# Configuration stored in AWS Secrets Manager: surgicase/main
-try:
-    main_config = get_main_config()
-    enable_scheduler = main_config.get("ENABLE_SCHEDULER", "true").lower() == "true"
-    
-    # Get instance-specific scheduler role
-    instance_id = get_ec2_instance_id()
-    if instance_id:
-        # Look for instance-specific configuration: SCHEDULER_ROLE_<instanceid>
-        instance_key = f"SCHEDULER_ROLE_{instance_id}"
-        scheduler_role = main_config.get(instance_key, "worker").lower()  # Default to "worker"
-        logger.info(f"Using instance-specific scheduler role from key: {instance_key}")
-    else:
-        # Fallback to general SCHEDULER_ROLE if instance ID unavailable, default to "worker"
-        scheduler_role = main_config.get("SCHEDULER_ROLE", "worker").lower()
-        logger.info("Using general SCHEDULER_ROLE (instance ID unavailable)")
-    
-    if enable_scheduler:
-        from utils.scheduler import run_scheduler_in_background
-        run_scheduler_in_background(scheduler_role=scheduler_role)
-        logger.info(f"Scheduler enabled in {scheduler_role.upper()} mode via AWS Secrets Manager configuration")
-    else:
-        logger.info("Scheduler disabled via AWS Secrets Manager configuration")
-except Exception as e:
-    logger.error(f"Failed to initialize scheduler: {str(e)}")
-    # Fallback: enable scheduler in worker mode if configuration cannot be retrieved
+    return {"loaded": dek_results["successful"], "failed": dek_results["failed"], "keys_per_second": dek_results["keys_per_second"]}
+
+def start_invalidation_bus_phase() -> dict:
+    """Start polling for cache invalidations published by the other API nodes (core/invalidation_bus.py)"""
+    from core.invalidation_bus import invalidation_bus
+    started = invalidation_bus.start()
+    return {"started": started, "node_id": invalidation_bus.node_id}
+
+def start_scheduler_phase() -> dict:
+    """
+    Start the scheduler service in background
+    Handles: Case status updates (Mon/Thu), NPI data updates (Tue), Pool/Cache maintenance
+    Configuration stored in AWS Secrets Manager: surgicase/main
+    """
     from utils.scheduler import run_scheduler_in_background
-    run_scheduler_in_background(scheduler_role="worker")
-    logger.warning("Scheduler enabled in WORKER mode as fallback due to configuration error")
+    try:
+        main_config = get_main_config()
+        enable_scheduler = main_config.get("ENABLE_SCHEDULER", "true").lower() == "true"
+        
+        # Get instance-specific scheduler role
+        instance_id = get_ec2_instance_id()
+        if instance_id:
+            # Look for instance-specific configuration: SCHEDULER_ROLE_<instanceid>
+            instance_key = f"SCHEDULER_ROLE_{instance_id}"
+            scheduler_role = main_config.get(instance_key, "worker").lower()  # Default to "worker"
+            logger.info(f"Using instance-specific scheduler role from key: {instance_key}")
+        else:
+            # Fallback to general SCHEDULER_ROLE if instance ID unavailable, default to "worker"
+            scheduler_role = main_config.get("SCHEDULER_ROLE", "worker").lower()
+            logger.info("Using general SCHEDULER_ROLE (instance ID unavailable)")
+        
+        if enable_scheduler:
+            run_scheduler_in_background(scheduler_role=scheduler_role)
+            logger.info(f"Scheduler enabled in {scheduler_role.upper()} mode via AWS Secrets Manager configuration")
+        else:
+            logger.info("Scheduler disabled via AWS Secrets Manager configuration")
+        return {"enabled": enable_scheduler, "role": scheduler_role}
+    except Exception as e:
+        logger.error(f"Failed to initialize scheduler: {str(e)}")
+        # Fallback: enable scheduler in worker mode if configuration cannot be retrieved
+        run_scheduler_in_background(scheduler_role="worker")
+        logger.warning("Scheduler enabled in WORKER mode as fallback due to configuration error")
+        return {"enabled": True, "role": "worker", "fallback": True}
+
+startup_orchestrator.add_phase("secrets", warm_secrets_phase, timeout=30, critical=True)
+startup_orchestrator.add_phase("db_pool", warm_connection_pool_phase, timeout=30, critical=True, depends_on=["secrets"])
+startup_orchestrator.add_phase("cases_cache", warm_cases_cache_phase, timeout=90, critical=True, depends_on=["secrets"])
+startup_orchestrator.add_phase("dek_cache", warm_dek_cache_phase, timeout=90, critical=True, depends_on=["secrets"])
+startup_orchestrator.add_phase("user_environment", warm_user_environment_phase, timeout=10, depends_on=["secrets"])
+startup_orchestrator.add_phase("invalidation_bus", start_invalidation_bus_phase, timeout=30, critical=True, depends_on=["secrets"])
+startup_orchestrator.add_phase("scheduler", start_scheduler_phase, timeout=30, depends_on=["secrets"])
+startup_orchestrator.start()
 
 if __name__ == "__main__":
     import uvicorn
@@ -1,6 +1,6 @@
 #!/usr/bin/env python3
 # Created: 2025-09-15 01:59:45
-# Last Modified: 2025-09-15 02:04:20
+# Last Modified: 2026-10-16 20:24:06
 # Author: Scott Cadreau
 
 """
@@ -35,6 +35,7 @@ sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 from core.database import get_db_connection, close_db_connection
 from utils.case_status import update_case_status
+from utils.phi_encryption import fold_encrypted_columns, LIST_VIEW_PHI_FIELDS
 
 def load_relegated_cases(json_file_path: str) -> List[Dict[str, Any]]:
     """
@@ -85,11 +86,15 @@ def get_current_case_status(conn, case_ids: List[str]) -> Dict[str, Dict[str, An
             for case_id in case_ids:
                 # Get case status
                 cursor.execute("""
-                    SELECT case_id, case_status, patient_first, patient_last, case_date
+                    SELECT case_id, case_status, patient_first, patient_last,
+                           patient_first_enc, patient_last_enc, case_date
                     FROM cases 
                     WHERE case_id = %s AND active = 1
                 """, (case_id,))
                 case_data = cursor.fetchone()
+                if case_data:
+                    # Names are reported as stored; binary ciphertext comes back as legacy base64 text
+                    fold_encrypted_columns([case_data], LIST_VIEW_PHI_FIELDS)
                 
                 if case_data:
                     # Get procedure codes and their asst_surg values
@@ -1,6 +1,6 @@
 #!/usr/bin/env python3
 # Created: 2025-09-14 09:39:53
-# Last Modified: 2025-09-14 09:40:30
+# Last Modified: 2026-10-16 20:24:06
 # Author: Scott Cadreau
 
 """
@@ -35,6 +35,7 @@ from typing import List, Dict, Any
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 from core.database import get_db_connection, close_db_connection
+from utils.phi_encryption import fold_encrypted_columns, LIST_VIEW_PHI_FIELDS
 
 def analyze_status_10_cases(conn) -> Dict[str, Any]:
     """
@@ -56,6 +57,8 @@ def analyze_status_10_cases(conn) -> Dict[str, Any]:
                     c.case_date,
                     c.patient_first,
                     c.patient_last,
+                    c.patient_first_enc,
+                    c.patient_last_enc,
                     COALESCE(billable.billable_count, 0) as billable_procedures
                 FROM cases c
                 LEFT JOIN (
@@ -71,6 +74,8 @@ def analyze_status_10_cases(conn) -> Dict[str, Any]:
             """)
             
             all_cases = cursor.fetchall()
+            # Names are reported as stored; binary ciphertext comes back as legacy base64 text
+            fold_encrypted_columns(all_cases, LIST_VIEW_PHI_FIELDS)
             
             # Separate cases into those that stay vs. those that get relegated
             cases_staying_10 = []
@@ -4,8 +4,9 @@ sys.path.insert(0, '/home/scadreau/surgicase')
 
 from core.database import get_db_connection, close_db_connection
 
-# Read SQL file
-with open('database_phi_encryption_schema.sql', 'r') as f:
+# Read SQL file (default: PHI encryption schema; pass another file, e.g. database_phi_blind_index_schema.sql)
+schema_file = sys.argv[1] if len(sys.argv) > 1 else 'database_phi_encryption_schema.sql'
+with open(schema_file, 'r') as f:
     sql_content = f.read()
 
 # Connect
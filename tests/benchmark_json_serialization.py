@@ -0,0 +1,95 @@
+# Created: 2026-10-16 19:33:40
+# Last Modified: 2026-10-16 19:33:40
+# Author: Scott Cadreau
+
+"""
+Benchmark FastAPI's default response encoding against FastJSONResponse (core/fast_json.py)
+for large case-list payloads shaped like /export_cases and /cases_by_status rows.
+
+Usage:
+    python tests/benchmark_json_serialization.py                 # 10,000 cases, 5 rounds
+    python tests/benchmark_json_serialization.py --cases 50000 --rounds 3
+"""
+
+import argparse
+import os
+import sys
+import time
+from decimal import Decimal
+from datetime import date, datetime, timedelta
+# Add parent directory to path so we can import from core and utils
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from core import fast_json
+from core.fast_json import FastJSONResponse
+
+
+def build_payload(case_count: int) -> dict:
+    """Export-style payload: one dict per case with dates, Decimals and nested procedure codes"""
+    base = datetime(2026, 1, 1, 7, 30)
+    cases = []
+    for i in range(case_count):
+        cases.append({
+            "case_id": f"USER{i % 400:04d}_{1700000000000 + i}",
+            "user_id": f"USER{i % 400:04d}",
+            "case_date": (base + timedelta(days=i % 365)).date(),
+            "patient_first": "Jordan",
+            "patient_last": "Alvarez",
+            "ins_provider": "Blue Cross Blue Shield",
+            "surgeon_id": i % 900,
+            "facility_id": i % 120,
+            "case_status": (i % 6) * 10,
+            "case_status_desc": "Submitted",
+            "demo_file": f"demo_{i}.pdf",
+            "note_file": None,
+            "misc_file": None,
+            "pay_amount": Decimal("1250.75") + i % 100,
+            "pay_category": "Orthopedic",
+            "create_ts": base + timedelta(minutes=i),
+            "last_updated_ts": base + timedelta(minutes=i, seconds=42),
+            "procedure_codes": [
+                {"procedure_code": str(27447 + j), "procedure_desc": "Arthroplasty, knee, condyle and plateau"}
+                for j in range(1 + i % 3)
+            ]
+        })
+    return {"cases": cases, "summary": {"total_requested": case_count, "total_found": case_count}}
+
+
+def time_encoder(encode, payload, rounds: int):
+    """Best and mean wall time in milliseconds over rounds, plus the body size"""
+    timings = []
+    body = b""
+    for _ in range(rounds):
+        start = time.perf_counter()
+        body = encode(payload)
+        timings.append((time.perf_counter() - start) * 1000)
+    return min(timings), sum(timings) / len(timings), len(body)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark default vs fast JSON response encoding")
+    parser.add_argument("--cases", type=int, default=10000, help="Cases in the payload (default 10000)")
+    parser.add_argument("--rounds", type=int, default=5, help="Timed rounds per encoder (default 5)")
+    args = parser.parse_args()
+
+    payload = build_payload(args.cases)
+    encoders = [
+        ("FastAPI default (jsonable_encoder + JSONResponse)", lambda content: JSONResponse(jsonable_encoder(content)).body),
+        (f"FastJSONResponse ({'orjson' if fast_json.orjson else 'stdlib json'})", lambda content: FastJSONResponse(content).body),
+    ]
+
+    print(f"📊 Encoding {args.cases:,} cases, {args.rounds} rounds each\n")
+    results = []
+    for name, encode in encoders:
+        best, mean, size = time_encoder(encode, payload, args.rounds)
+        results.append(best)
+        print(f"   {name:<55} best {best:8.1f} ms   mean {mean:8.1f} ms   {size / 1024 / 1024:6.2f} MB")
+
+    print(f"\n✅ FastJSONResponse is {results[0] / results[1]:.1f}x faster (best of {args.rounds})")
+
+
+if __name__ == "__main__":
+    main()
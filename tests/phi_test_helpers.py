@@ -0,0 +1,97 @@
+"""
+Shared fixtures for the PHI encryption tests: DEK seeding and an in-memory fake database
+Nothing here needs KMS or MySQL
+"""
+
+import os
+import time
+import base64
+
+from utils import phi_encryption
+
+def seed_dek(user_id, dek=None):
+    """Put a DEK (and the blind index key of a never-rotated user) straight into the module caches; returns the DEK"""
+    dek = dek or os.urandom(32)
+    with phi_encryption._cache_lock:
+        phi_encryption._dek_cache[user_id] = (dek, time.time() + 3600)
+        phi_encryption._blind_index_key_cache[user_id] = (phi_encryption._blind_index_key_for(dek), time.time() + 3600)
+    return dek
+
+class StubKMS:
+    """KMS stand-in: data keys are wrapped as b'wrapped:' + dek"""
+    def generate_data_key(self, **kwargs):
+        dek = os.urandom(32)
+        return {"Plaintext": dek, "CiphertextBlob": b"wrapped:" + dek}
+
+    def decrypt(self, CiphertextBlob, **kwargs):
+        return {"Plaintext": CiphertextBlob[len(b"wrapped:"):]}
+
+def wrap_dek(dek):
+    """encrypted_dek column value StubKMS unwraps to dek"""
+    return base64.b64encode(b"wrapped:" + dek).decode()
+
+def unwrap_dek(encrypted_dek):
+    return base64.b64decode(encrypted_dek)[len(b"wrapped:"):]
+
+def reset_dek_cache():
+    """Drop every cached DEK on this process only (nothing is published to other nodes)"""
+    phi_encryption.clear_dek_cache(broadcast=False)
+
+class FakeCursor:
+    """Fake DictCursor: every statement is handed to its FakeConnection with whitespace collapsed"""
+    def __init__(self, db):
+        self.db = db
+        self.result = []
+        self.rowcount = 0
+
+    def execute(self, sql, params=None):
+        self.db.executed.append(sql)
+        self.rowcount = 0
+        self.result = self.db.query(self, " ".join(sql.split()), list(params or []))
+
+    def executemany(self, sql, rows):
+        self.db.executed.append(sql)
+        return self.db.write(" ".join(sql.split()), list(rows))
+
+    def fetchone(self):
+        return self.result[0] if self.result else None
+
+    def fetchall(self):
+        return self.result
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        return False
+
+class FakeConnection:
+    """
+    In-memory stand-in for a pymysql connection over a list of case rows.
+    Tests subclass it and answer their statements in query() and write().
+    """
+    def __init__(self, rows=None):
+        self.rows = rows if rows is not None else []
+        self.executed = []
+        self.commits = 0
+        self.rollbacks = 0
+
+    def cursor(self, *args):
+        return FakeCursor(self)
+
+    def commit(self):
+        self.commits += 1
+
+    def rollback(self):
+        self.rollbacks += 1
+
+    def row(self, case_id):
+        return next(row for row in self.rows if row["case_id"] == case_id)
+
+    def query(self, cursor, sql, params):
+        """Rows for a SELECT (other statements may set cursor.rowcount); unknown statements return nothing"""
+        return []
+
+    def write(self, sql, rows):
+        """Apply an executemany and return the number of rows written"""
+        raise AssertionError(f"Unexpected write: {sql}")
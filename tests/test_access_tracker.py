@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Test script for decaying-LFU access tracking and frequency-driven warming (core/access_tracker.py)
+Uses fake cursors - no database needed
+"""
+
+import sys
+import os
+import time
+# Add parent directory to path so we can import from core and utils
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.access_tracker import AccessTracker
+
+def test_scores_decay_and_rank():
+    """Recent accesses outrank old ones once they have decayed; top() can filter by group"""
+    print("\n1. Decaying scores:")
+    tracker = AccessTracker("test_decay", half_life=0.2, capacity=100)
+    for _ in range(4):
+        tracker.record("old", {"status_list": ["all"]}, group="u1")
+    time.sleep(0.6)  # Three half-lives: 4 accesses now count ~0.5
+    tracker.record("new", {"status_list": [1]}, group="u2")
+    tracker.record("new", group="u2")
+
+    top = tracker.top(2)
+    print(f"   top={[(key, round(score, 2)) for key, _params, score in top]}")
+    assert [key for key, _params, _score in top] == ["new", "old"]
+    assert top[0][1] == {"status_list": [1]}, "params are kept when later accesses omit them"
+    assert 0.4 < tracker.score("old") < 0.6
+    assert [key for key, _params, _score in tracker.top(5, group="u1")] == ["old"]
+    print("   ✅ Frequency decays with age")
+
+def test_capacity_drops_coldest_keys():
+    """The table stays bounded by dropping the lowest scores"""
+    print("\n2. Bounded table:")
+    tracker = AccessTracker("test_capacity", half_life=3600, capacity=10)
+    for _ in range(3):
+        tracker.record("hot")
+    for i in range(20):
+        tracker.record(f"cold-{i}")
+    stats = tracker.stats()
+    print(f"   tracked={stats['tracked_keys']}/{stats['capacity']}")
+    assert stats["tracked_keys"] <= 10
+    assert tracker.top(1)[0][0] == "hot"
+    print("   ✅ Hot keys survive pruning")
+
+def test_candidates_and_warm_hit_rates():
+    """Observed keys come first, seeds fill in, and hits on warmed keys are counted separately"""
+    print("\n3. Candidates and hit rates:")
+    tracker = AccessTracker("test_candidates", half_life=3600, capacity=100)
+    tracker.record("k-open", {"status_list": [1, 2]}, hit=False)
+    tracker.record("k-open", hit=False)
+    candidates = tracker.candidates(3, seeds=[("k-all", {"status_list": ["all"]}), ("k-open", {}), ("k-paid", {})])
+    print(f"   candidates={[(key, origin) for key, _params, origin in candidates]}")
+    assert candidates == [
+        ("k-open", {"status_list": [1, 2]}, "observed"),
+        ("k-all", {"status_list": ["all"]}, "seed"),
+        ("k-paid", {}, "seed"),
+    ]
+
+    tracker.mark_warmed("k-open")
+    tracker.record("k-open", hit=True)
+    tracker.record("k-open", hit=True)
+    tracker.record("k-other", hit=True)
+    stats = tracker.stats()
+    print(f"   warmed={stats['warmed']} on_demand={stats['on_demand']}")
+    assert stats["warmed"] == {"hits": 2, "misses": 0, "hit_rate_percent": 100.0}
+    assert stats["on_demand"] == {"hits": 1, "misses": 2, "hit_rate_percent": 33.3}
+    assert stats["warm_hit_share_percent"] == 66.7
+
+    # A miss means the warmed copy is gone - the key counts as on demand until warmed again
+    tracker.record("k-open", hit=False)
+    tracker.record("k-open", hit=True)
+    assert tracker.stats()["on_demand"]["hits"] == 2
+    print("   ✅ Warmed vs on-demand hit rates tracked")
+
+class _Cursor:
+    """Sync cursor stand-in returning no rows and recording the filters queried"""
+    def __init__(self):
+        self.executed = []
+        self.connection = None
+
+    def execute(self, sql, params=None):
+        self.executed.append(params)
+
+    def fetchall(self):
+        return []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        return False
+
+class _Connection:
+    def __init__(self):
+        self.cursor_obj = _Cursor()
+
+    def cursor(self, *args):
+        return self.cursor_obj
+
+def test_warm_cases_cache_prefers_observed_filters():
+    """warm_cases_cache loads the most requested filter first and fills up with seed filters"""
+    print("\n4. Cases cache warming:")
+    from endpoints.backoffice import get_cases_by_status as cases
+
+    cases.clear_cases_cache(broadcast=False)
+    observed_key = cases._generate_cache_key([4, 5], None, None)
+    for _ in range(3):
+        cases._cases_access.record(observed_key, {"status_list": [4, 5], "start_date": None, "end_date": None}, hit=False)
+
+    connection = _Connection()
+    original_get, original_close = cases.get_db_connection, cases.close_db_connection
+    cases.get_db_connection, cases.close_db_connection = lambda: connection, lambda conn: None
+    try:
+        results = cases.warm_cases_cache(top_n=3)
+    finally:
+        cases.get_db_connection, cases.close_db_connection = original_get, original_close
+        cases.clear_cases_cache(broadcast=False)
+
+    print(f"   warmed={[(d['filter']['status_list'], d['origin']) for d in results['details']]}")
+    assert results["successful"] == 3 and results["observed"] == 1
+    assert results["details"][0]["filter"]["status_list"] == [4, 5] and results["details"][0]["origin"] == "observed"
+    assert [d["origin"] for d in results["details"][1:]] == ["seed", "seed"]
+
+    # An exhausted budget leaves the rest to load on demand
+    cases.get_db_connection, cases.close_db_connection = lambda: _Connection(), lambda conn: None
+    try:
+        results = cases.warm_cases_cache(top_n=3, time_budget=0)
+    finally:
+        cases.get_db_connection, cases.close_db_connection = original_get, original_close
+        cases.clear_cases_cache(broadcast=False)
+    assert results["successful"] == 0 and results["skipped_time_budget"] == 3
+    print("   ✅ Observed filters first, within the time budget")
+
+def main():
+    """Run all access tracker tests"""
+    print("🧪 Testing access-frequency driven warming")
+    test_scores_decay_and_rank()
+    test_capacity_drops_coldest_keys()
+    test_candidates_and_warm_hit_rates()
+    test_warm_cases_cache_prefers_observed_filters()
+    print("\n✅ All access tracker tests passed")
+
+if __name__ == "__main__":
+    main()
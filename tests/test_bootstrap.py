@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Test script for the /bootstrap login bundle (endpoints/utility/bootstrap.py)
+Sections come from seeded reference data and a cached user environment - no database needed
+"""
+
+import sys
+import os
+import json
+# Add parent directory to path so we can import from core and utils
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.reference_data import reference_data
+from endpoints.utility import bootstrap
+from endpoints.utility import get_user_environment
+
+# Other test modules seed reference data at import - put their snapshots back afterwards
+_saved_snapshots = {}
+
+def setup_module(module=None):
+    _saved_snapshots.update(reference_data._snapshots)
+
+def teardown_module(module=None):
+    reference_data._snapshots.clear()
+    reference_data._snapshots.update(_saved_snapshots)
+
+def _seed():
+    reference_data.set_rows("case_statuses", [{"case_status": 10, "case_status_desc": "New"}])
+    reference_data.set_rows("user_types", [{"user_type": 100, "user_type_desc": "Backoffice", "user_max_case_status": 20}])
+    reference_data.set_rows("user_doc_types", [{"doc_type": "license", "doc_prefix": "LIC"}])
+    reference_data.set_rows("faqs", [
+        {"user_type": 1, "faq_header": "Surgeon FAQ", "faq_text": "A", "display_order": 1},
+        {"user_type": 100, "faq_header": "Backoffice FAQ", "faq_text": "B", "display_order": 1},
+    ])
+    reference_data.set_rows("pay_tiers", [{"bucket": 1, "code": "99213"}])
+    reference_data.set_rows("cpt_codes", [{"cpt_code": "99213", "cpt_description": "Office visit"}], version=3)
+    reference_data.set_rows("timezones", [{"timezone_id": 1, "timezone_name": "America/Chicago"}], version=1)
+
+def _encode_all(user_id, user_type, requested):
+    encoded = {}
+    for name in requested:
+        if name == "user_environment":
+            encoded[name] = bootstrap._encode_user_environment(user_id, False, conn=None)
+        elif user_type >= bootstrap.SECTION_MIN_USER_TYPE.get(name, 0):
+            encoded[name] = bootstrap._encode_reference_section(name, user_type)
+    return encoded
+
+def test_sections_match_standalone_payloads():
+    """Every section carries the same payload its standalone endpoint returns"""
+    print("\n1. Section payloads:")
+    _seed()
+    environment = {"user_profile": {"user_id": "boot-1", "user_type": 100}, "case_statuses": []}
+    key = get_user_environment._generate_user_environment_cache_key("boot-1")
+    get_user_environment._cache_user_environment_data(key, environment, "boot-1")
+
+    requested = bootstrap._parse_sections(None)
+    body, etag, not_modified = bootstrap.assemble_bootstrap("boot-1", 100, requested, _encode_all("boot-1", 100, requested))
+    bundle = json.loads(body)
+    assert not not_modified and bundle["etag"] == etag and list(bundle["sections"]) == list(bootstrap.BOOTSTRAP_SECTIONS)
+    sections = bundle["sections"]
+    assert all(section["status"] == 200 for section in sections.values())
+    assert sections["user_environment"]["data"] == environment
+    assert sections["faqs"]["data"] == {"faqs": [{"faq_header": "Backoffice FAQ", "faq_text": "B"}], "user_type": 100}
+    assert sections["cpt_codes"]["data"]["version"] == 3
+    assert sections["case_statuses"]["data"] == {"case_statuses": [{"case_status": 10, "case_status_desc": "New"}]}
+    print(f"   {len(sections)} sections, bundle etag {etag}")
+    print("   ✅ Sections mirror the standalone endpoints")
+
+def test_access_rules_per_section():
+    """Users below type 100 get 403 entries for the restricted lists and their own FAQs"""
+    print("\n2. Access rules:")
+    _seed()
+    requested = bootstrap._parse_sections("case_statuses,user_types,pay_tiers,faqs,timezones")
+    body, _, _ = bootstrap.assemble_bootstrap("boot-2", 1, requested, _encode_all("boot-2", 1, requested))
+    sections = json.loads(body)["sections"]
+    for name in ("case_statuses", "user_types", "pay_tiers"):
+        assert sections[name]["status"] == 403 and "data" not in sections[name], name
+    assert sections["faqs"]["data"]["faqs"] == [{"faq_header": "Surgeon FAQ", "faq_text": "A"}]
+    assert sections["timezones"]["status"] == 200
+
+    try:
+        bootstrap._parse_sections("cpt_codes,passwords")
+        assert False, "unknown sections are rejected"
+    except Exception as e:
+        assert getattr(e, "status_code", None) == 400
+    print("   ✅ Restricted sections return 403, unknown sections 400")
+
+def test_per_section_etags():
+    """Sections the client already has come back as 304 stubs; only changed sections are re-sent"""
+    print("\n3. Per-section ETags:")
+    _seed()
+    requested = bootstrap._parse_sections("cpt_codes,timezones")
+    first, etag, _ = bootstrap.assemble_bootstrap("boot-3", 100, requested, _encode_all("boot-3", 100, requested))
+    sections = json.loads(first)["sections"]
+    known = ", ".join(section["etag"] for section in sections.values())
+
+    # Nothing changed: the client has every section
+    _, same_etag, not_modified = bootstrap.assemble_bootstrap("boot-3", 100, requested, _encode_all("boot-3", 100, requested), known)
+    assert not_modified and same_etag == etag
+    assert bootstrap.assemble_bootstrap("boot-3", 100, requested, _encode_all("boot-3", 100, requested), etag)[2]
+
+    # A new timezones version: only that section is re-sent
+    reference_data.set_rows("timezones", [{"timezone_id": 1, "timezone_name": "America/New_York"}], version=2)
+    body, new_etag, not_modified = bootstrap.assemble_bootstrap("boot-3", 100, requested, _encode_all("boot-3", 100, requested), known)
+    sections = json.loads(body)["sections"]
+    assert not not_modified and new_etag != etag
+    assert sections["cpt_codes"] == {"status": 304, "etag": json.loads(first)["sections"]["cpt_codes"]["etag"]}
+    assert sections["timezones"]["status"] == 200 and sections["timezones"]["data"]["version"] == 2
+    print(f"   bundle etag {etag} -> {new_etag}")
+    print("   ✅ Unchanged sections cost only their ETag")
+
+def main():
+    """Run all bootstrap tests"""
+    print("🧪 Testing /bootstrap bundle")
+    setup_module()
+    test_sections_match_standalone_payloads()
+    test_access_rules_per_section()
+    test_per_section_etags()
+    teardown_module()
+    print("\n✅ All bootstrap tests passed")
+
+if __name__ == "__main__":
+    main()
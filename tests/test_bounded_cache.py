@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Test script for the bounded TTL/LRU cache (core/cache.py)
+and the caches migrated onto it - no database or AWS needed
+"""
+
+import sys
+import os
+import time
+# Add parent directory to path so we can import from core and utils
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.cache import BoundedCache, estimate_size, get_cache, get_all_cache_stats
+
+def test_ttl_and_stale_entries():
+    """Reads respect the namespace TTL (or a per-call TTL); stale entries stay readable via get_entry"""
+    print("\n1. TTL expiry:")
+    cache = BoundedCache("test_ttl", ttl=0.2, max_bytes=1024 * 1024)
+    cache.set("a", {"value": 1})
+    assert cache.get("a") == {"value": 1}
+    assert cache.get("a", ttl=0) is None, "per-call TTL overrides the namespace TTL"
+    time.sleep(0.25)
+    assert cache.get("a") is None
+    entry = cache.get_entry("a")
+    assert entry is not None and entry.value == {"value": 1} and entry.age >= 0.2
+    stats = cache.stats()
+    print(f"   hits={stats['hits']} misses={stats['misses']} expired={stats['expired_entries']}")
+    assert stats["hits"] == 1 and stats["misses"] == 2 and stats["expired_entries"] == 1
+    print("   ✅ Expired entries miss but remain available for stale fallback")
+
+def test_byte_budget_lru_eviction():
+    """Least recently used entries are evicted once the byte budget is exceeded"""
+    print("\n2. Byte budget and LRU eviction:")
+    value = ["x" * 1000]
+    size = estimate_size(list(value))
+    cache = BoundedCache("test_lru", ttl=60, max_bytes=size * 3)
+    for key in ("a", "b", "c"):
+        cache.set(key, list(value))
+    cache.get("a")  # a becomes most recently used
+    cache.set("d", list(value))
+
+    stats = cache.stats()
+    print(f"   keys={cache.keys()} bytes={stats['bytes']}/{stats['max_bytes']} evictions={stats['evictions']}")
+    assert "b" not in cache, "b was least recently used"
+    assert all(key in cache for key in ("a", "c", "d"))
+    assert stats["bytes"] <= stats["max_bytes"]
+    assert stats["evictions"] == {"size": 1}
+
+    assert not cache.set("huge", ["x" * 100000]), "values larger than the budget are not cached"
+    assert cache.stats()["evictions"]["oversize"] == 1
+    print("   ✅ Budget enforced with LRU eviction")
+
+def test_tag_invalidation():
+    """Tagged entries for one user are dropped together"""
+    print("\n3. Tag invalidation:")
+    cache = BoundedCache("test_tags", ttl=60, max_bytes=1024 * 1024)
+    cache.set("u1:all", [1], tags=["user:1"])
+    cache.set("u1:open", [2], tags=["user:1"])
+    cache.set("u2:all", [3], tags=["user:2"])
+    removed = cache.invalidate_tag("user:1")
+    print(f"   removed={removed} remaining={cache.keys()}")
+    assert removed == 2 and cache.keys() == ["u2:all"]
+    assert cache.invalidate_tag("user:1") == 0
+    assert cache.stats()["tags"] == 1
+    print("   ✅ Per-user invalidation")
+
+def test_large_list_size_estimate():
+    """Large case lists are sized from a sample, close to the full estimate"""
+    print("\n4. Sampled size estimate:")
+    cases = [{"case_id": f"CASE-{i}", "patient_first": "x" * (i % 20), "procedure_codes": [{"procedure_code": "12345"}]} for i in range(5000)]
+    sampled = estimate_size(cases)
+    exact = sys.getsizeof(cases) + sum(estimate_size(case) for case in cases)
+    print(f"   sampled={sampled} exact={exact}")
+    assert abs(sampled - exact) / exact < 0.1
+    print("   ✅ Estimate within 10%")
+
+def test_migrated_caches_registered():
+    """The endpoint caches share the registry and user invalidation goes through tags"""
+    print("\n5. Migrated caches:")
+    from endpoints.case import filter_cases
+    from endpoints.utility import get_user_environment
+
+    filter_cases._cache_user_cases_data("k1", [{"case_id": "A"}], "user-1")
+    filter_cases._cache_user_cases_data("k2", [{"case_id": "B"}], "user-1")
+    assert filter_cases._get_cached_user_cases("k1") == [{"case_id": "A"}]
+    filter_cases.clear_user_cases_cache("user-1")
+    assert filter_cases._get_cached_user_cases("k1") is None
+
+    assert not get_user_environment._cache_user_environment_data("k", {"user_profile": None}, "user-1")
+
+    namespaces = get_all_cache_stats()["namespaces"]
+    print(f"   namespaces: {sorted(namespaces)}")
+    assert {"user_cases", "user_environment"} <= set(namespaces)
+    assert get_cache("user_cases", ttl=1, max_bytes=1) is filter_cases._user_cases_cache
+    print("   ✅ Caches registered and invalidated by user tag")
+
+def test_stale_while_revalidate_window():
+    """get_or_stale() serves expired entries within stale_ttl, flagged stale, then misses"""
+    print("\n6. Stale-while-revalidate window:")
+    cache = BoundedCache("test_swr", ttl=0.2, max_bytes=1024 * 1024, stale_ttl=0.3)
+    cache.set("a", {"value": 1})
+    assert cache.get_or_stale("a") == ({"value": 1}, False)
+    time.sleep(0.25)
+    assert cache.get("a") is None, "plain reads still respect the TTL"
+    assert cache.get_or_stale("a") == ({"value": 1}, True)
+    time.sleep(0.3)
+    assert cache.get_or_stale("a") == (None, False)
+    stats = cache.stats()
+    print(f"   hits={stats['hits']} stale_hits={stats['stale_hits']} misses={stats['misses']}")
+    assert stats["stale_hits"] == 1 and stats["stale_ttl_seconds"] == 0.3
+    print("   ✅ Stale entries served only within the grace window")
+
+def test_user_environment_stale_hit_queues_one_refresh():
+    """A stale user environment is served immediately and concurrent stale hits queue one refresh"""
+    print("\n7. User environment stale hits:")
+    from core.rewarm import rewarm_scheduler
+    from endpoints.utility import get_user_environment as env
+
+    data = {"user_profile": {"user_id": "swr-1"}, "case_statuses": []}
+    key = env._generate_user_environment_cache_key("swr-1")
+    assert env._cache_user_environment_data(key, data, "swr-1")
+    assert env._get_user_environment_or_stale("swr-1", key) is data
+
+    # Age the entry past the TTL but inside the stale window
+    env._user_environment_cache.get_entry(key).stored_at -= env.USER_ENVIRONMENT_CACHE_TTL + 1
+    before = rewarm_scheduler.get_stats()
+    try:
+        assert env._get_user_environment_or_stale("swr-1", key) is data
+        assert env._get_user_environment_or_stale("swr-1", key) is data
+        after = rewarm_scheduler.get_stats()
+        print(f"   scheduled={after['scheduled'] - before['scheduled']} collapsed={after['collapsed'] - before['collapsed']}")
+        assert after["scheduled"] - before["scheduled"] == 1 and after["collapsed"] - before["collapsed"] == 1
+    finally:
+        # Don't let the queued refresh reach the database
+        with rewarm_scheduler._cond:
+            rewarm_scheduler._pending.pop("user_environment:swr-1", None)
+        env.clear_user_environment_cache("swr-1", broadcast=False)
+    print("   ✅ Stale entry served, one background refresh queued")
+
+def main():
+    """Run all bounded cache tests"""
+    print("🧪 Testing bounded cache")
+    test_ttl_and_stale_entries()
+    test_byte_budget_lru_eviction()
+    test_tag_invalidation()
+    test_large_list_size_estimate()
+    test_migrated_caches_registered()
+    test_stale_while_revalidate_window()
+    test_user_environment_stale_hit_queues_one_refresh()
+    print("\n✅ All bounded cache tests passed")
+
+if __name__ == "__main__":
+    main()
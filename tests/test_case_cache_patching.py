@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Test script for in-place patching of cached case lists on case writes
+(patch_user_cases_cache / patch_cases_cache) - uses a fake cursor, no database needed
+"""
+
+import sys
+import os
+from datetime import date
+# Add parent directory to path so we can import from core and utils
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.reference_data import reference_data
+from endpoints.case import filter_cases
+from endpoints.backoffice import get_cases_by_status
+
+STATUS_DESCRIPTIONS = [
+    {"case_status": 0, "case_status_desc": "Incomplete"},
+    {"case_status": 10, "case_status_desc": "Billable"},
+    {"case_status": 20, "case_status_desc": "Submitted"},
+]
+# Status descriptions are read from the reference data registry, not the cursor
+reference_data.set_rows("case_statuses", STATUS_DESCRIPTIONS)
+
+class _RowCursor:
+    """Cursor stand-in returning one case row for the single-case query"""
+    def __init__(self, row):
+        self.row = row
+        self.executed = []
+        self.connection = None
+
+    def execute(self, sql, params=None):
+        self.executed.append((sql, params))
+
+    def fetchone(self):
+        return dict(self.row) if self.row is not None else None
+
+    def fetchall(self):
+        return []
+
+def _user_row(case_id, status):
+    return {
+        "user_id": "user-p", "case_id": case_id, "case_date": date(2026, 10, 1), "patient_first": "Pat",
+        "patient_last": "Smith", "ins_provider": None, "surgeon_id": None, "facility_id": None,
+        "case_status": status, "case_status_desc": "raw", "demo_file": None, "note_file": None,
+        "misc_file": None, "pay_amount": None, "paid_to_provider_ts": None, "phi_encrypted": 0,
+        "procedure_codes_json": '[{"procedure_code": "12345", "procedure_desc": ""}]'
+    }
+
+def _admin_row(case_id, status, case_date):
+    row = _user_row(case_id, status)
+    row.pop("paid_to_provider_ts")
+    row.update({"case_date": case_date, "provider_first_name": "ann", "provider_last_name": "lee",
+                "facility_state": "TX", "pay_category": None})
+    return row
+
+def test_user_status_predicate():
+    """The Python filter mirrors the SQL status filter including max_case_status and >= 400"""
+    print("\n1. User status predicate:")
+    match = filter_cases._user_case_matches
+    assert match(5, ["all"], 20) and match(5, [], 20)
+    assert match(10, [0, 10], 20) and not match(5, [0, 10], 20)
+    assert match(30, [20], 20), "max_case_status in the filter means it and above"
+    assert not match(30, [10], 20)
+    assert match(400, [0], 20), "status >= 400 is always included"
+    print("   ✅ Predicate matches the query semantics")
+
+def test_user_lists_upsert_and_remove():
+    """A changed case is inserted in order into matching lists, capped, and removed from the rest"""
+    print("\n2. User list patching:")
+    filter_cases.clear_user_cases_cache()
+    existing = [{"case_id": "C3", "case_status": 10}, {"case_id": "C1", "case_status": 10}]
+    filter_cases._cache_user_cases_data("all", list(existing), "user-p", {"status_list": ["all"], "max_case_status": 10})
+    filter_cases._cache_user_cases_data("open", list(existing), "user-p", {"status_list": [0], "max_case_status": 10})
+    filter_cases._cache_user_cases_data("legacy", list(existing), "user-p")  # cached without its filter
+
+    cursor = _RowCursor(_user_row("C2", 20))
+    patched = filter_cases.patch_user_cases_cache(cursor, "user-p", "C2")
+    all_cases = filter_cases._get_cached_user_cases("all")
+    print(f"   patched={patched} all={[c['case_id'] for c in all_cases]}")
+    assert patched == 2
+    assert [c["case_id"] for c in all_cases] == ["C3", "C2", "C1"]
+    assert all_cases[1]["case_status"] == 10 and all_cases[1]["case_status_desc"] == "Billable", "status capped at max_case_status"
+    assert all_cases[1]["case_date"] == "2026-10-01" and all_cases[1]["procedure_codes"][0]["procedure_code"] == "12345"
+    assert [c["case_id"] for c in filter_cases._get_cached_user_cases("open")] == ["C3", "C1"]
+    assert filter_cases._get_cached_user_cases("legacy") is None, "lists without a filter are dropped"
+    assert existing[0] is filter_cases._get_cached_user_cases("open")[0], "unchanged rows are shared, not copied"
+
+    # Deleted case: the single-case query returns nothing
+    filter_cases.patch_user_cases_cache(_RowCursor(None), "user-p", "C3")
+    assert [c["case_id"] for c in filter_cases._get_cached_user_cases("all")] == ["C2", "C1"]
+    print("   ✅ Upserted in case_id order, capped, and removed on delete")
+
+def test_admin_lists_respect_status_and_dates():
+    """Admin lists are patched by status and date range and keep case_date DESC order"""
+    print("\n3. Admin list patching:")
+    get_cases_by_status.clear_cases_cache()
+    cached = [{"case_id": "A", "case_date": "2026-10-05", "provider_name": "Bob Ray"},
+              {"case_id": "B", "case_date": "2026-09-01", "provider_name": "Bob Ray"}]
+    get_cases_by_status._cache_cases_data("all", list(cached), {"status_list": "all", "start_date": None, "end_date": None})
+    get_cases_by_status._cache_cases_data("billable", list(cached), {"status_list": [10], "start_date": None, "end_date": None})
+    get_cases_by_status._cache_cases_data("october", list(cached), {"status_list": "all", "start_date": date(2026, 10, 1), "end_date": None})
+
+    cursor = _RowCursor(_admin_row("N", 0, date(2026, 9, 15)))
+    patched = get_cases_by_status.patch_cases_cache(cursor, "N")
+    all_ids = [c["case_id"] for c in get_cases_by_status._get_cached_cases("all")]
+    print(f"   patched={patched} all={all_ids}")
+    assert patched == 3
+    assert all_ids == ["A", "N", "B"]
+    assert get_cases_by_status._get_cached_cases("all")[1]["provider_name"] == "Ann Lee"
+    assert "N" not in [c["case_id"] for c in get_cases_by_status._get_cached_cases("billable")]
+    assert "N" not in [c["case_id"] for c in get_cases_by_status._get_cached_cases("october")]
+    assert "AND c.case_id = %s" in cursor.executed[0][0] and cursor.executed[0][1] == ["N"]
+    print("   ✅ Only lists whose filter matches receive the case")
+
+def main():
+    """Run all case cache patching tests"""
+    print("🧪 Testing case list cache patching")
+    test_user_status_predicate()
+    test_user_lists_upsert_and_remove()
+    test_admin_lists_respect_status_and_dates()
+    print("\n✅ All case cache patching tests passed")
+
+if __name__ == "__main__":
+    main()
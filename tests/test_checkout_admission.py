@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Test script for database checkout admission control (core/database.py)
+Saturates the admission counters directly - no database needed
+"""
+
+import sys
+import os
+import time
+import threading
+# Add parent directory to path so we can import from core and utils
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+import core.database as database
+from core.database import get_db_connection, DatabaseOverloaded, PRIORITY_INTERACTIVE, PRIORITY_REPORT
+
+def _fill_writer_pool(in_use: int):
+    """Pretend in_use writer checkouts are outstanding"""
+    with database._admission_cond:
+        database._admission_in_use["writer"] = in_use
+
+def test_reports_shed_before_interactive():
+    """Reports are shed once they reach their share; interactive requests still get in"""
+    print("\n1. Priority classes:")
+    capacity = database._pool_capacity("writer")
+    report_limit = int(capacity * database._ADMISSION_CLASSES[PRIORITY_REPORT]["capacity_share"])
+    try:
+        _fill_writer_pool(report_limit)
+
+        start = time.time()
+        try:
+            get_db_connection(priority=PRIORITY_REPORT)
+            assert False, "report checkout should be shed at its share of the pool"
+        except DatabaseOverloaded as e:
+            waited = time.time() - start
+            print(f"   Report shed after {waited:.2f}s: {e.detail}")
+            assert e.status_code == 503
+            assert waited < database._ADMISSION_CLASSES[PRIORITY_REPORT]["max_wait"] + 0.5
+
+        assert database._admit_checkout("writer", PRIORITY_INTERACTIVE, wait=False)
+        database._release_checkout("writer")
+        print("   ✅ Interactive checkout admitted while reports are shed")
+    finally:
+        _fill_writer_pool(0)
+
+def test_waiter_admitted_when_slot_frees():
+    """A bounded wait succeeds if a connection is returned before it expires"""
+    print("\n2. Bounded wait:")
+    try:
+        _fill_writer_pool(database._pool_capacity("writer"))
+        threading.Timer(0.2, database._release_checkout, args=("writer",)).start()
+        assert database._admit_checkout("writer", PRIORITY_INTERACTIVE)
+        print("   ✅ Waiting checkout admitted once a slot was released")
+    finally:
+        _fill_writer_pool(0)
+
+def test_shed_returns_503_with_retry_after():
+    """Shed checkouts surface as 503 + Retry-After through FastAPI"""
+    print("\n3. HTTP response:")
+    app = FastAPI()
+
+    @app.get("/report")
+    def report():
+        conn = get_db_connection(priority=PRIORITY_REPORT)
+        database.close_db_connection(conn)
+        return {"ok": True}
+
+    try:
+        _fill_writer_pool(database._pool_capacity("writer"))
+        response = TestClient(app).get("/report")
+        print(f"   Status: {response.status_code}, Retry-After: {response.headers.get('retry-after')}")
+        assert response.status_code == 503
+        assert response.headers.get("retry-after") == str(database.CHECKOUT_RETRY_AFTER)
+        print("   ✅ 503 with Retry-After returned")
+    finally:
+        _fill_writer_pool(0)
+
+def main():
+    """Run all admission control tests"""
+    print("🧪 Testing database checkout admission control")
+    test_reports_shed_before_interactive()
+    test_waiter_admitted_when_slot_frees()
+    test_shed_returns_503_with_retry_after()
+    print("\n✅ All admission control tests passed")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+Test script for the host-wide connection budget (core/connection_budget.py)
+Runs several worker processes against a temporary budget directory - no database needed
+"""
+
+import sys
+import os
+import tempfile
+import multiprocessing
+# Add parent directory to path so we can import from core and utils
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.connection_budget import ConnectionBudget, ConnectionBudgetExceeded
+
+def _hold_slots(budget_dir: str, count: int, ready, done):
+    """Worker process: take count slots, signal, then hold them until told to exit"""
+    budget = ConnectionBudget("writer", 10, budget_dir=budget_dir, min_worker_share=1, borrow_headroom=0.0)
+    for _ in range(count):
+        budget.acquire(timeout=1)
+    ready.set()
+    done.wait(10)
+
+def test_budget_limits_slots_across_processes():
+    """Slots held by another process count against this process's budget"""
+    print("\n1. Slots shared across processes:")
+    with tempfile.TemporaryDirectory() as budget_dir:
+        ready, done = multiprocessing.Event(), multiprocessing.Event()
+        worker = multiprocessing.Process(target=_hold_slots, args=(budget_dir, 8, ready, done))
+        worker.start()
+        try:
+            assert ready.wait(5), "worker process never acquired its slots"
+            budget = ConnectionBudget("writer", 10, budget_dir=budget_dir, min_worker_share=1, borrow_headroom=0.0)
+            slots = [budget.acquire(timeout=0.5) for _ in range(2)]
+            print(f"   Acquired remaining slots {slots}, free now: {budget.free_slots()}")
+            assert budget.free_slots() == 0
+
+            try:
+                budget.acquire(timeout=0.2)
+                assert False, "acquire should time out when the host budget is used up"
+            except ConnectionBudgetExceeded:
+                print("   ✅ ConnectionBudgetExceeded raised when budget exhausted")
+
+            for slot in slots:
+                budget.release(slot)
+        finally:
+            done.set()
+            worker.join(5)
+
+def test_slots_released_when_process_exits():
+    """A worker that exits (or crashes) gives its slots back"""
+    print("\n2. Slots released on process exit:")
+    with tempfile.TemporaryDirectory() as budget_dir:
+        ready, done = multiprocessing.Event(), multiprocessing.Event()
+        worker = multiprocessing.Process(target=_hold_slots, args=(budget_dir, 10, ready, done))
+        worker.start()
+        assert ready.wait(5), "worker process never acquired its slots"
+
+        budget = ConnectionBudget("writer", 10, budget_dir=budget_dir, min_worker_share=1, borrow_headroom=0.0)
+        assert budget.free_slots() == 0
+        done.set()
+        worker.join(5)
+
+        slot = budget.acquire(timeout=1)
+        print(f"   Acquired slot {slot} after worker exit, free: {budget.free_slots()}")
+        assert budget.free_slots() == 9
+        budget.release(slot)
+        print("   ✅ Kernel released the exited worker's slots")
+
+def test_worker_share_adapts_to_live_workers():
+    """Each worker's share is total // live workers, and waiters get a slot once one frees up"""
+    print("\n3. Adaptive worker share and waiting:")
+    with tempfile.TemporaryDirectory() as budget_dir:
+        budget = ConnectionBudget("reader", 12, budget_dir=budget_dir, min_worker_share=1,
+                                  borrow_headroom=0.5, worker_refresh_interval=0, expected_workers=1)
+        slot = budget.acquire(timeout=1)
+        assert budget.worker_share() == 12
+
+        ready, done = multiprocessing.Event(), multiprocessing.Event()
+        other = multiprocessing.Process(target=_register_reader, args=(budget_dir, ready, done))
+        other.start()
+        try:
+            assert ready.wait(5), "second worker never registered"
+            share = budget.worker_share()
+            print(f"   Live workers: {budget.live_workers()}, share: {share}")
+            assert share == 6
+
+            # Past its share with little headroom left, the worker must wait
+            slots = [budget.acquire(timeout=0.5) for _ in range(5)]
+            try:
+                budget.acquire(timeout=0.2)
+                assert False, "worker past its share should not borrow below the headroom"
+            except ConnectionBudgetExceeded:
+                print("   ✅ Worker held to its share while headroom is low")
+
+            budget.release(slots.pop())
+            assert budget.acquire(timeout=0.5) is not None
+            print("   ✅ Waiting request got the released slot")
+        finally:
+            done.set()
+            other.join(5)
+        budget.release(slot)
+
+def _register_reader(budget_dir: str, ready, done):
+    """Worker process: register against the reader budget without holding slots"""
+    budget = ConnectionBudget("reader", 12, budget_dir=budget_dir, min_worker_share=1)
+    budget.release(budget.acquire(timeout=1))
+    ready.set()
+    done.wait(10)
+
+def _start_app_worker(budget_dir: str, workers: int, results, ready, done):
+    """Worker process: pre-warm the sync pool and reserve the async pool the way core/database.py does"""
+    from core import database
+    budget = ConnectionBudget("writer", 150, budget_dir=budget_dir, expected_workers=workers)
+    database._connection_budgets["writer"] = budget
+    prewarmed = 0
+    for _ in range(min(50, database._sync_budget_share(budget))):
+        budget.acquire(timeout=0)
+        prewarmed += 1
+    try:
+        _, slots = database._reserve_async_budget(database._DB_HOST, database._async_pool_config["maxsize"])
+        results.put((prewarmed, len(slots)))
+    except ConnectionBudgetExceeded:
+        results.put((prewarmed, 0))
+    ready.set()
+    done.wait(20)
+
+def test_async_pools_fit_every_configured_worker():
+    """Workers started one after another each get an async pool; the first does not take the whole host"""
+    print("\n4. Async pool reservations across staggered workers:")
+    workers = 4
+    with tempfile.TemporaryDirectory() as budget_dir:
+        results, done = multiprocessing.Queue(), multiprocessing.Event()
+        processes = []
+        try:
+            for _ in range(workers):
+                ready = multiprocessing.Event()
+                process = multiprocessing.Process(target=_start_app_worker, args=(budget_dir, workers, results, ready, done))
+                process.start()
+                processes.append(process)
+                assert ready.wait(10), "worker never finished starting"
+            reservations = [results.get(timeout=5) for _ in range(workers)]
+            print(f"   (prewarmed, async slots) per worker: {reservations}")
+            assert all(async_slots > 0 for _, async_slots in reservations), "every worker can open its async pool"
+            assert len(set(reservations)) == 1, "later workers get the same share as the first"
+            assert sum(prewarmed + async_slots for prewarmed, async_slots in reservations) <= 150
+            print("   ✅ Each worker's async pool and pre-warmed sync pool fit the host budget")
+        finally:
+            done.set()
+            for process in processes:
+                process.join(5)
+
+def main():
+    """Run all connection budget tests"""
+    print("🧪 Testing host-wide connection budget")
+    test_budget_limits_slots_across_processes()
+    test_slots_released_when_process_exits()
+    test_worker_share_adapts_to_live_workers()
+    test_async_pools_fit_every_configured_worker()
+    print("\n✅ All connection budget tests passed")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Test script for the shared KMS client and parallel DEK warm-up (utils/phi_encryption.py)
+Runs against a local KMS stub with per-call latency and throttling - no AWS or database needed
+"""
+
+import sys
+import os
+import time
+import base64
+import threading
+# Add parent directory to path so we can import from core and utils
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from botocore.exceptions import ClientError
+from utils import phi_encryption
+from tests.phi_test_helpers import FakeConnection, reset_dek_cache
+
+class _StubKMS:
+    """KMS stand-in: Decrypt unwraps b'wrapped:' + dek after `latency` seconds, throttling every Nth call"""
+    def __init__(self, latency=0.01, throttle_every=0):
+        self.latency = latency
+        self.throttle_every = throttle_every
+        self.calls = 0
+        self.throttled = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+
+    def decrypt(self, CiphertextBlob):
+        with self._lock:
+            self.calls += 1
+            call = self.calls
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            time.sleep(self.latency)
+            if self.throttle_every and call % self.throttle_every == 0:
+                with self._lock:
+                    self.throttled += 1
+                raise ClientError({"Error": {"Code": "ThrottlingException", "Message": "Rate exceeded"}}, "Decrypt")
+            return {"Plaintext": CiphertextBlob[len(b"wrapped:"):]}
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+
+class _KeysDB(FakeConnection):
+    """user_encryption_keys rows for warm_all_user_deks"""
+    def query(self, cursor, sql, params):
+        return self.rows
+
+def _user_keys(count):
+    deks = {f"warm-{i}": os.urandom(32) for i in range(count)}
+    rows = [{"user_id": user_id, "encrypted_dek": base64.b64encode(b"wrapped:" + dek).decode(), "is_active": 1}
+            for user_id, dek in deks.items()]
+    return deks, rows
+
+_saved = {}
+
+def setup_module(module=None):
+    _saved["clients"] = dict(phi_encryption._kms_clients)
+    _saved["base_delay"] = phi_encryption.KMS_RETRY_BASE_DELAY
+
+def teardown_module(module=None):
+    phi_encryption._kms_clients.clear()
+    phi_encryption._kms_clients.update(_saved["clients"])
+    phi_encryption.KMS_RETRY_BASE_DELAY = _saved["base_delay"]
+    reset_dek_cache()
+
+def test_kms_client_is_shared():
+    """Every PHIEncryption instance and thread gets the same client"""
+    print("\n1. Shared KMS client:")
+    phi_encryption._kms_clients.clear()
+    clients = []
+    threads = [threading.Thread(target=lambda: clients.append(phi_encryption.get_kms_client())) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len({id(client) for client in clients}) == 1
+    assert phi_encryption.PHIEncryption().kms_client is clients[0]
+    print("   ✅ One client per process")
+
+def test_parallel_warmup_with_throttling():
+    """2,000 keys at 10ms each warm in well under the 20s a sequential loop needs, surviving throttling"""
+    print("\n2. Parallel warm-up:")
+    reset_dek_cache()
+    phi_encryption.KMS_RETRY_BASE_DELAY = 0.001
+    stub = _StubKMS(latency=0.01, throttle_every=50)
+    phi_encryption._kms_clients[phi_encryption.KMS_REGION] = stub
+    deks, rows = _user_keys(2000)
+
+    results = phi_encryption.warm_all_user_deks(_KeysDB(rows), concurrency=32)
+    print(f"   {results['successful']} keys in {results['duration_seconds']}s ({results['keys_per_second']} keys/s), "
+          f"{results['throttle_retries']} throttle retries, peak {stub.max_in_flight} in flight")
+    assert results["successful"] == 2000 and results["failed"] == 0
+    assert results["throttle_retries"] == stub.throttled > 0
+    assert stub.max_in_flight <= 32, "concurrency is bounded"
+    assert results["duration_seconds"] < 5
+    assert phi_encryption.get_user_dek("warm-7", conn=None) == deks["warm-7"]
+
+    # A second run finds everything cached and makes no KMS calls
+    calls = stub.calls
+    again = phi_encryption.warm_all_user_deks(_KeysDB(rows), concurrency=32)
+    assert again["already_cached"] == 2000 and stub.calls == calls
+    print("   ✅ Seconds, not minutes")
+
+def test_persistent_throttling_fails_only_that_user():
+    """A key that stays throttled past KMS_MAX_RETRIES is reported failed; the rest still load"""
+    print("\n3. Retry exhaustion:")
+    reset_dek_cache()
+    phi_encryption.KMS_RETRY_BASE_DELAY = 0.001
+    _, rows = _user_keys(3)
+
+    class _AlwaysThrottled(_StubKMS):
+        def decrypt(self, CiphertextBlob):
+            if CiphertextBlob[len(b"wrapped:"):] == base64.b64decode(rows[1]["encrypted_dek"])[len(b"wrapped:"):]:
+                raise ClientError({"Error": {"Code": "ThrottlingException", "Message": "Rate exceeded"}}, "Decrypt")
+            return super().decrypt(CiphertextBlob)
+
+    phi_encryption._kms_clients[phi_encryption.KMS_REGION] = _AlwaysThrottled(latency=0)
+    results = phi_encryption.warm_all_user_deks(_KeysDB(rows), concurrency=4)
+    print(f"   successful={results['successful']} failed={results['failed']}")
+    assert results["successful"] == 2 and results["failed"] == 1
+    assert [d["user_id"] for d in results["details"] if d["status"] == "failed"] == [rows[1]["user_id"]]
+    print("   ✅ Throttling is retried, then reported")
+
+def main():
+    """Run all DEK warm-up tests"""
+    print("🧪 Testing shared KMS client and parallel DEK warm-up")
+    setup_module()
+    test_kms_client_is_shared()
+    test_parallel_warmup_with_throttling()
+    test_persistent_throttling_fails_only_that_user()
+    teardown_module()
+    print("\n✅ All DEK warm-up tests passed")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Test script for the fast JSON response path (core/fast_json.py)
+Checks FastJSONResponse produces the same JSON as FastAPI's default jsonable_encoder + JSONResponse
+"""
+
+import sys
+import os
+import json
+from decimal import Decimal
+from datetime import date, datetime, timezone
+# Add parent directory to path so we can import from core and utils
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from core import fast_json
+from core.fast_json import FastJSONResponse
+
+def _case_row(i):
+    return {
+        "case_id": f"CASE-{i}", "user_id": "USER1", "case_date": date(2026, 10, 1),
+        "create_ts": datetime(2026, 10, 1, 8, 30, 15, 123456), "paid_ts": datetime(2026, 10, 2, tzinfo=timezone.utc),
+        "pay_amount": Decimal("1250.75"), "units": Decimal("3"), "patient_last": "Müller", "demo_file": None,
+        "states_licensed": {"TX"}, "procedure_codes": [{"procedure_code": "12345", "procedure_desc": "Knee"}],
+        "totals": {10: Decimal("0.5")}
+    }
+
+def _default_path(content) -> bytes:
+    """What FastAPI does with a returned dict"""
+    return JSONResponse(jsonable_encoder(content)).body
+
+def test_same_output_as_default_encoder():
+    """Decimal, date, datetime, sets and non-str keys encode exactly as jsonable_encoder would"""
+    print("\n1. Output compatibility:")
+    content = {"cases": [_case_row(i) for i in range(3)], "total_count": 3}
+    fast = FastJSONResponse(content).body
+    print(f"   orjson={'yes' if fast_json.orjson else 'no'} bytes={len(fast)}")
+    assert json.loads(fast) == json.loads(_default_path(content))
+    print("   ✅ Same JSON as the default encoder")
+
+def test_stdlib_fallback():
+    """Without orjson the stdlib path produces the same bytes as FastAPI's default"""
+    print("\n2. Stdlib fallback:")
+    content = {"cases": [_case_row(1)]}
+    saved = fast_json.orjson
+    fast_json.orjson = None
+    try:
+        fallback = fast_json.dumps(content)
+    finally:
+        fast_json.orjson = saved
+    assert fallback == _default_path(content)
+    print("   ✅ Byte-identical without orjson")
+
+def main():
+    """Run all fast JSON tests"""
+    print("🧪 Testing fast JSON responses")
+    test_same_output_as_default_encoder()
+    test_stdlib_fallback()
+    print("\n✅ All fast JSON tests passed")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Test script for the import-time profiler (core/import_profile.py)
+and the lazy loading of heavy report dependencies
+"""
+
+import sys
+import os
+import subprocess
+# Add parent directory to path so we can import from core and utils
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+from core import import_profile
+
+def test_profile_records_modules():
+    """Modules imported while profiling get cumulative and self times"""
+    print("\n1. Profiling an import:")
+    sys.modules.pop("colorsys", None)
+    import_profile.reset()
+    import_profile.start()
+    try:
+        import colorsys  # noqa: F401
+    finally:
+        import_profile.stop()
+
+    report = import_profile.summary(top=10)
+    modules = {record["module"]: record for record in report["slowest_modules"]}
+    print(f"   {report['module_count']} modules, wall {report['wall_ms']} ms")
+    assert "colorsys" in modules
+    assert modules["colorsys"]["self_ms"] <= modules["colorsys"]["cumulative_ms"]
+    assert not report["recording"]
+    assert colorsys.__spec__.loader.__class__.__name__ != "_TimedLoader", "real loader should be restored"
+    assert import_profile._finder is None and all(
+        type(finder).__name__ != "_TimingFinder" for finder in sys.meta_path
+    )
+    print("   ✅ Module timed and finder removed")
+
+def test_reports_do_not_load_pdf_libraries():
+    """Importing the report routers must not pull in fpdf / pypdf"""
+    print("\n2. Report routers load PDF libraries lazily:")
+    code = (
+        "import sys\n"
+        "import endpoints.reports.provider_payment_report, endpoints.reports.provider_payment_summary_report\n"
+        "import endpoints.reports.referral_reports\n"
+        "print(','.join(m for m in ('fpdf', 'pypdf') if m in sys.modules))\n"
+    )
+    result = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, timeout=120)
+    print(f"   loaded heavy modules: {result.stdout.strip() or 'none'}")
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.strip() == ""
+    print("   ✅ fpdf and pypdf deferred until a report is generated")
+
+def test_cli():
+    """python -m core.import_profile prints a per-module table"""
+    print("\n3. CLI:")
+    result = subprocess.run([sys.executable, "-m", "core.import_profile", "json", "--top", "5"],
+                            cwd=ROOT, capture_output=True, text=True, timeout=60)
+    print("   " + result.stdout.splitlines()[0])
+    assert result.returncode == 0, result.stderr
+    assert "cumulative ms" in result.stdout
+    print("   ✅ CLI report printed")
+
+def main():
+    """Run all import profile tests"""
+    print("🧪 Testing import profiler")
+    test_profile_records_modules()
+    test_reports_do_not_load_pdf_libraries()
+    test_cli()
+    print("\n✅ All import profile tests passed")
+
+if __name__ == "__main__":
+    main()
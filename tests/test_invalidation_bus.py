@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Test script for the cluster-wide cache invalidation bus (core/invalidation_bus.py)
+Two buses sharing a LocalTransport stand in for two API nodes - no database needed
+"""
+
+import sys
+import os
+import time
+# Add parent directory to path so we can import from core and utils
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.invalidation_bus import InvalidationBus, LocalTransport
+
+def test_other_node_evicts_within_a_second():
+    """An invalidation published on node A is applied on node B within one second, but not echoed on A"""
+    print("\n1. Cross-node eviction:")
+    transport = LocalTransport()
+    node_a = InvalidationBus(transport, node_id="node-a", poll_interval=0.1)
+    node_b = InvalidationBus(transport, node_id="node-b", poll_interval=0.1)
+    received_a, received_b = [], []
+    node_a.subscribe("user_cases", received_a.append)
+    node_b.subscribe("user_cases", received_b.append)
+
+    assert not node_a.publish("user_cases", "user-1"), "publishing is a no-op until the bus is started"
+    node_a.start()
+    node_b.start()
+    try:
+        published_at = time.time()
+        assert node_a.publish("user_cases", "user-1")
+        while not received_b and time.time() - published_at < 2:
+            time.sleep(0.01)
+        lag = time.time() - published_at
+        print(f"   node B evicted after {lag * 1000:.0f}ms")
+        assert received_b == ["user-1"] and lag < 1.0
+        time.sleep(0.2)
+        assert received_a == [], "a node does not re-apply its own invalidations"
+        assert node_a.get_stats()["published"] == 1 and node_b.get_stats()["received"] == 1
+    finally:
+        node_a.stop()
+        node_b.stop()
+    print("   ✅ Evicted on the other node within a second")
+
+def test_late_committed_sequence_is_not_skipped():
+    """An event whose sequence number shows up after a later one is still delivered once"""
+    print("\n2. Out-of-order commits:")
+
+    class _DelayedTransport(LocalTransport):
+        """Hides seq 1 on the first read, as if its insert committed after seq 2"""
+        def __init__(self):
+            super().__init__()
+            self.hidden = {1}
+
+        def read_since(self, seq, limit):
+            return [event for event in super().read_since(seq, limit) if event[0] not in self.hidden]
+
+    transport = _DelayedTransport()
+    bus = InvalidationBus(transport, node_id="reader")
+    received = []
+    bus.subscribe("cases_by_status", received.append)
+    bus._last_seq = 0
+    transport.append("writer", "cases_by_status", "first")
+    transport.append("writer", "cases_by_status", "second")
+
+    bus.poll_once()
+    assert received == ["second"] and bus.get_stats()["pending_gaps"] == 1
+    transport.hidden.clear()
+    bus.poll_once()
+    bus.poll_once()
+    print(f"   delivered: {received}")
+    assert received == ["second", "first"]
+    assert bus.get_stats()["pending_gaps"] == 0
+    print("   ✅ Skipped sequence numbers are re-read until they commit")
+
+def test_endpoint_caches_subscribe():
+    """filter_cases, get_cases_by_status and get_user_environment evict on remote invalidations without re-publishing"""
+    print("\n3. Endpoint cache subscriptions:")
+    from core.invalidation_bus import invalidation_bus
+    from endpoints.case import filter_cases
+    from endpoints.backoffice import get_cases_by_status
+    from endpoints.utility import get_user_environment
+
+    namespaces = invalidation_bus.get_stats()["subscribed_namespaces"]
+    print(f"   subscribed: {namespaces}")
+    assert {"user_cases", "cases_by_status", "user_environment"} <= set(namespaces)
+
+    filter_cases._cache_user_cases_data("bus-k1", [{"case_id": "A"}], "user-bus")
+    filter_cases._cache_user_cases_data("bus-k2", [{"case_id": "B"}], "user-other")
+    get_cases_by_status._cache_cases_data("bus-all", [{"case_id": "A"}])
+    published_before = invalidation_bus.get_stats()["published"]
+
+    invalidation_bus._deliver("user_cases", "user-bus", time.time())
+    invalidation_bus._deliver("cases_by_status", "*", time.time())
+    assert filter_cases._get_cached_user_cases("bus-k1") is None
+    assert filter_cases._get_cached_user_cases("bus-k2") == [{"case_id": "B"}], "other users keep their lists"
+    assert get_cases_by_status._get_cached_cases("bus-all") is None
+    assert invalidation_bus.get_stats()["published"] == published_before
+    print("   ✅ Remote invalidations evict matching keys only")
+
+def main():
+    """Run all invalidation bus tests"""
+    print("🧪 Testing cache invalidation bus")
+    test_other_node_evicts_within_a_second()
+    test_late_committed_sequence_is_not_skipped()
+    test_endpoint_caches_subscribe()
+    print("\n✅ All invalidation bus tests passed")
+
+if __name__ == "__main__":
+    main()
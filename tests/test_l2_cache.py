@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Test script for the shared second-level cache (core/l2_cache.py) behind BoundedCache
+Two caches sharing one backend stand in for two uvicorn workers - no Redis needed
+"""
+
+import sys
+import os
+import time
+import tempfile
+from decimal import Decimal
+from datetime import date, datetime
+# Add parent directory to path so we can import from core and utils
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.cache import BoundedCache
+from core.l2_cache import LocalL2, SQLiteL2, serialize_entry, deserialize_entry
+
+def test_round_trip_types():
+    """Decimals, dates and datetimes in case lists survive the shared store unchanged"""
+    print("\n1. Serialization round trip:")
+    value = [{"case_id": "C1", "pay_amount": Decimal("125.50"), "case_date": date(2026, 10, 1),
+              "paid_to_provider_ts": datetime(2026, 10, 2, 8, 30), "procedure_codes": []}]
+    meta = {"status_list": [1, 2], "start_date": date(2026, 9, 1)}
+    restored, tags, restored_meta, stored_at = deserialize_entry(serialize_entry(value, {"user:1"}, meta, 1000.0))
+    assert restored == value and restored_meta == meta and tags == ["user:1"] and stored_at == 1000.0
+    print("   ✅ Types preserved")
+
+def _shared_store_checks(backend):
+    worker_a = BoundedCache("test_l2", ttl=60, max_bytes=1024 * 1024, l2=backend)
+    worker_b = BoundedCache("test_l2", ttl=60, max_bytes=1024 * 1024, l2=backend)
+    worker_a.clear()
+
+    worker_a.set("k", [{"case_id": "A"}], tags=["user:1"], meta={"status_list": ["all"]})
+    stored_at = worker_a.get_entry("k").stored_at
+    assert worker_b.get("k") == [{"case_id": "A"}], "cold worker fills L1 from L2"
+    entry = worker_b.get_entry("k")
+    assert entry.stored_at == stored_at and entry.meta == {"status_list": ["all"]} and entry.tags == {"user:1"}
+    assert worker_b.stats()["l2"]["hits"] == 1
+
+    worker_a.update("k", lambda cases, meta: cases + [{"case_id": "B"}])
+    worker_c = BoundedCache("test_l2", ttl=60, max_bytes=1024 * 1024, l2=backend)
+    assert len(worker_c.get("k")) == 2, "in-place patches are written through"
+
+    worker_a.invalidate_tag("user:1")
+    worker_d = BoundedCache("test_l2", ttl=60, max_bytes=1024 * 1024, l2=backend)
+    assert worker_d.get("k") is None, "tag invalidation reaches L2"
+
+def test_workers_share_entries():
+    """Entries written by one worker are served to another from L2 with their original age"""
+    print("\n2. Shared entries (local stand-in):")
+    _shared_store_checks(LocalL2())
+    print("   ✅ Fill, patch and invalidation go through L2")
+
+def test_sqlite_backend():
+    """The on-host SQLite store behaves like the stand-in across separate connections"""
+    print("\n3. SQLite backend:")
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "l2.sqlite3")
+        SQLiteL2(path)
+        _shared_store_checks(SQLiteL2(path))
+        print(f"   file mode: {oct(os.stat(path).st_mode & 0o777)}")
+        assert os.stat(path).st_mode & 0o077 == 0
+
+        # Purging expired entries and invalidating a tag leave no tag rows behind
+        store = SQLiteL2(path)
+        store.set("purge", "old", b"x", ttl=-120, tags=["user:1", "user:2"])
+        store.set("purge", "shared", b"x", ttl=60, tags=["user:3", "user:4"])
+        store.set("purge", "fresh", b"x", ttl=60, tags=["user:1"])
+        store.invalidate_tag("purge", "user:3")
+        tags = store._conn().execute("SELECT tag, key FROM l2_tags WHERE namespace = 'purge'").fetchall()
+        assert tags == [("user:1", "fresh")], tags
+    print("   ✅ SQLite store shared between instances")
+
+def test_l2_outage_is_not_fatal():
+    """A failing backend degrades to L1-only caching"""
+    print("\n4. L2 outage:")
+
+    class _DownL2:
+        name = "down"
+        def __getattr__(self, method):
+            def fail(*args, **kwargs):
+                raise ConnectionError("connection refused")
+            return fail
+
+    cache = BoundedCache("test_l2_down", ttl=60, max_bytes=1024 * 1024, l2=_DownL2())
+    assert cache.set("k", [1]) and cache.get("k") == [1]
+    assert cache.get("missing") is None
+    cache.invalidate_tag("user:1")
+    errors = cache.stats()["l2"]["errors"]
+    print(f"   l2 errors counted: {errors}")
+    assert errors == 3
+    print("   ✅ Requests keep working on L1")
+
+def main():
+    """Run all L2 cache tests"""
+    print("🧪 Testing shared L2 cache")
+    test_round_trip_types()
+    test_workers_share_entries()
+    test_sqlite_backend()
+    test_l2_outage_is_not_fatal()
+    print("\n✅ All L2 cache tests passed")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Test script for batched PHI decryption (utils/phi_encryption.decrypt_rows)
+DEKs are seeded straight into the module cache - no KMS or database needed
+"""
+
+import sys
+import os
+import time
+# Add parent directory to path so we can import from core and utils
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils import phi_encryption
+from utils.phi_encryption import PHIEncryption, decrypt_rows, LIST_VIEW_PHI_FIELDS
+from tests.phi_test_helpers import seed_dek, reset_dek_cache
+
+def _encrypted_case(phi_crypto, dek, user_id, i):
+    return {
+        "case_id": f"case-{i}",
+        "user_id": user_id,
+        "phi_encrypted": 1,
+        "patient_first": phi_crypto.encrypt_field(f"First{i}", dek),
+        "patient_last": phi_crypto.encrypt_field(f"Last{i}", dek),
+        "ins_provider": phi_crypto.encrypt_field("Aetna", dek),
+    }
+
+def teardown_module(module=None):
+    reset_dek_cache()
+
+def test_batch_matches_field_decryption():
+    """decrypt_rows gives the same plaintext as decrypt_field, per owner, and skips unencrypted rows"""
+    print("\n1. Batch vs per-field decryption:")
+    phi_crypto = PHIEncryption()
+    deks = {user_id: seed_dek(user_id) for user_id in ("batch-a", "batch-b")}
+    rows = [_encrypted_case(phi_crypto, deks[user_id], user_id, i) for i, user_id in enumerate(["batch-a", "batch-b"] * 5)]
+    rows.append({"case_id": "plain", "user_id": "batch-a", "phi_encrypted": 0, "patient_first": "Plain", "patient_last": "Text"})
+    expected = [phi_crypto.decrypt_field(row["patient_first"], deks[row["user_id"]]) for row in rows[:-1]]
+
+    stats = decrypt_rows(rows, fields=LIST_VIEW_PHI_FIELDS)
+    print(f"   stats={stats}")
+    assert [row["patient_first"] for row in rows[:-1]] == expected
+    assert rows[0]["patient_last"] == "Last0" and rows[-1]["patient_first"] == "Plain"
+    assert len(rows[0]["ins_provider"]) >= phi_encryption.MIN_ENCRYPTED_LENGTH, "fields not asked for stay encrypted"
+    assert stats["rows"] == 10 and stats["owners"] == 2 and stats["decrypted"] == 20 and stats["failed"] == 0
+    print("   ✅ Same plaintext, one DEK per owner")
+
+def test_failures_leave_values_as_is():
+    """A missing DEK or a corrupt field leaves the value encrypted instead of raising"""
+    print("\n2. Failure handling:")
+    phi_crypto = PHIEncryption()
+    dek = seed_dek("batch-c")
+    good = _encrypted_case(phi_crypto, dek, "batch-c", 1)
+    corrupt = _encrypted_case(phi_crypto, dek, "batch-c", 2)
+    corrupt["patient_first"] = corrupt["patient_first"][:-4] + "AAAA"
+    orphan = _encrypted_case(phi_crypto, os.urandom(32), "batch-missing", 3)
+    orphan_first = orphan["patient_first"]
+
+    class _NoKeyConnection:
+        def cursor(self, *args):
+            raise RuntimeError("no database in tests")
+
+    stats = decrypt_rows([good, corrupt, orphan], _NoKeyConnection(), fields=LIST_VIEW_PHI_FIELDS)
+    print(f"   stats={stats}")
+    assert good["patient_first"] == "First1" and corrupt["patient_last"] == "Last2"
+    assert corrupt["patient_first"].endswith("AAAA") and orphan["patient_first"] == orphan_first
+    assert stats["failed"] == 1 and stats["failed_owners"] == ["batch-missing"]
+    print("   ✅ Bad data stays encrypted, nothing raises")
+
+def test_5000_cases_in_milliseconds():
+    """A 5,000-case list view decrypts in well under a second, single-threaded and with the pool"""
+    print("\n3. 5,000-case list:")
+    phi_crypto = PHIEncryption()
+    dek = seed_dek("batch-big")
+    template = [_encrypted_case(phi_crypto, dek, "batch-big", i) for i in range(5000)]
+
+    for workers in (1, 4):
+        rows = [dict(row) for row in template]
+        start = time.perf_counter()
+        stats = decrypt_rows(rows, fields=LIST_VIEW_PHI_FIELDS, user_id="batch-big", workers=workers)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        print(f"   workers={workers}: {stats['decrypted']} fields in {elapsed_ms:.1f}ms")
+        assert stats["decrypted"] == 10000 and rows[4999]["patient_last"] == "Last4999"
+        assert elapsed_ms < 1000
+    print("   ✅ Milliseconds, not seconds")
+
+def main():
+    """Run all batch decryption tests"""
+    print("🧪 Testing batched PHI decryption")
+    test_batch_matches_field_decryption()
+    test_failures_leave_values_as_is()
+    test_5000_cases_in_milliseconds()
+    teardown_module()
+    print("\n✅ All batch decryption tests passed")
+
+if __name__ == "__main__":
+    main()
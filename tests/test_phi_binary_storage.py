@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+"""
+Test script for binary envelope PHI storage (utils/phi_encryption.py, utils/migrate_phi_binary.py)
+DEKs are seeded into the module cache and the database is a fake cursor - no KMS or MySQL needed
+"""
+
+import sys
+import os
+import time
+# Add parent directory to path so we can import from core and utils
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils import phi_encryption
+from utils.phi_encryption import (
+    PHIEncryption, decrypt_rows, decrypt_patient_data, encrypt_stored_value, envelope_from_legacy,
+    legacy_from_envelope, fold_encrypted_columns, ENVELOPE_AES_GCM_V1
+)
+from tests.phi_test_helpers import seed_dek, reset_dek_cache, FakeConnection
+
+def teardown_module(module=None):
+    reset_dek_cache()
+
+_STORED_COLUMNS = [column for field in phi_encryption.PHI_FIELDS for column in (field, field + "_enc")]
+
+class _CasesDB(FakeConnection):
+    """In-memory cases table answering the migration's batch SELECT and guarded UPDATE"""
+    def query(self, cursor, sql, params):
+        after_case_id, batch_size = params[0], params[-1]
+        pending = sorted((row for row in self.rows
+                          if row["phi_encrypted"] == 1 and row["case_id"] > after_case_id
+                          and any(row[field] is not None and row[field + "_enc"] is None for field in phi_encryption.PHI_FIELDS)),
+                         key=lambda row: row["case_id"])
+        return [dict(row) for row in pending[:batch_size]]
+
+    def write(self, sql, rows):
+        written = 0
+        for params in rows:
+            new_values, case_id, old_values = params[:6], params[6], params[7:]
+            row = self.row(case_id)
+            if tuple(row[column] for column in _STORED_COLUMNS) != tuple(old_values):
+                continue
+            row.update(zip(_STORED_COLUMNS, new_values))
+            written += 1
+        return written
+
+def _legacy_row(phi_crypto, dek, case_id, first, last, ins_provider="Aetna"):
+    row = {"case_id": case_id, "user_id": "bin-a", "phi_encrypted": 1}
+    for field, value in (("patient_first", first), ("patient_last", last), ("ins_provider", ins_provider)):
+        row[field], row[field + "_enc"] = phi_crypto.encrypt_field(value, dek), None
+    return row
+
+def test_envelope_round_trip_and_size():
+    """Envelopes decrypt with the same key, convert losslessly to and from legacy text, and are smaller"""
+    print("\n1. Envelope format:")
+    phi_crypto = PHIEncryption()
+    dek = os.urandom(32)
+    envelope = phi_crypto.encrypt_field_binary("Elizabeth", dek)
+    legacy = phi_crypto.encrypt_field("Elizabeth", dek)
+    print(f"   binary={len(envelope)} bytes, base64 text={len(legacy)} chars")
+    assert envelope[0] == ENVELOPE_AES_GCM_V1 and len(envelope) == 1 + 12 + len("Elizabeth") + 16
+    assert len(envelope) < len(legacy) * 0.8
+    assert phi_crypto.decrypt_field(envelope, dek) == "Elizabeth"
+
+    # Re-encoding is keyless and lossless in both directions
+    assert envelope_from_legacy(legacy_from_envelope(envelope)) == envelope
+    assert phi_crypto.decrypt_field(envelope_from_legacy(legacy), dek) == "Elizabeth"
+    assert phi_crypto.decrypt_field(legacy_from_envelope(envelope), dek) == "Elizabeth"
+
+    # Unknown format bytes are refused rather than misread
+    try:
+        phi_crypto.decrypt_field(b"\x7f" + envelope[1:], dek)
+        raise AssertionError("unknown envelope format must not decrypt")
+    except Exception as e:
+        assert "format" in str(e)
+
+    # Truncated envelopes are refused with a clear error instead of being sliced into garbage
+    for truncated in (envelope[:1], envelope[:1 + 12 + 15]):
+        try:
+            phi_crypto.decrypt_field(truncated, dek)
+            raise AssertionError("truncated envelope must not decrypt")
+        except Exception as e:
+            assert "Truncated" in str(e), str(e)
+
+    text, enc = encrypt_stored_value("Aetna", dek)
+    assert (text is None and enc[0] == ENVELOPE_AES_GCM_V1) if phi_encryption.PHI_BINARY_STORAGE else enc is None
+    assert encrypt_stored_value("", dek) == ("", None) and encrypt_stored_value(None, dek) == (None, None)
+    print("   ✅ Smaller, lossless, versioned")
+
+def test_binary_decrypt_is_faster():
+    """Decrypting a page of binary envelopes costs less CPU than the same page of base64 text"""
+    print("\n2. Decrypt cost:")
+    user_id = "bin-speed"
+    dek = seed_dek(user_id)
+    phi_crypto = PHIEncryption()
+    names = [f"Patient{i}" for i in range(2000)]
+    legacy = [{"user_id": user_id, "phi_encrypted": 1, "patient_last": phi_crypto.encrypt_field(name, dek)} for name in names]
+    binary = [{"user_id": user_id, "phi_encrypted": 1, "patient_last": None,
+               "patient_last_enc": phi_crypto.encrypt_field_binary(name, dek)} for name in names]
+
+    def timed(rows):
+        batch = [dict(row) for row in rows]
+        start = time.perf_counter()
+        decrypt_rows(batch, fields=["patient_last"], workers=1)
+        elapsed = time.perf_counter() - start
+        assert [row["patient_last"] for row in batch] == names
+        return elapsed
+
+    # Alternate the two formats so background load hits both alike; keep the best run of each
+    runs = [(timed(legacy), timed(binary)) for _ in range(9)]
+    legacy_time, binary_time = min(run[0] for run in runs), min(run[1] for run in runs)
+    print(f"   2,000 fields: base64 {legacy_time * 1000:.1f}ms, binary {binary_time * 1000:.1f}ms")
+    assert binary_time < legacy_time
+    print("   ✅ No base64 decode or tag re-assembly on the read path")
+
+def test_dual_read_and_fold():
+    """Readers prefer <field>_enc, fall back to legacy text, and never leak _enc columns or bytes"""
+    print("\n3. Dual read:")
+    user_id = "bin-a"
+    dek = seed_dek(user_id)
+    phi_crypto = PHIEncryption()
+    binary_row = {"case_id": "b", "user_id": user_id, "phi_encrypted": 1,
+                  "patient_first": None, "patient_first_enc": phi_crypto.encrypt_field_binary("Ann", dek),
+                  "patient_last": None, "patient_last_enc": phi_crypto.encrypt_field_binary("Lee", dek),
+                  "ins_provider": None, "ins_provider_enc": phi_crypto.encrypt_field_binary("Aetna", dek)}
+    legacy_row = _legacy_row(phi_crypto, dek, "l", "Bob", "Ray")
+    plain_row = {"case_id": "p", "user_id": "other", "phi_encrypted": 0, "patient_first": "Cy", "patient_first_enc": None,
+                 "patient_last": "Orr", "patient_last_enc": None, "ins_provider": "BCBS", "ins_provider_enc": None}
+    rows = [binary_row, legacy_row, plain_row]
+
+    stats = decrypt_rows(rows, fields=phi_encryption.LIST_VIEW_PHI_FIELDS)
+    assert stats["decrypted"] == 4 and stats["failed"] == 0
+    assert [(row["patient_first"], row["patient_last"]) for row in rows] == [("Ann", "Lee"), ("Bob", "Ray"), ("Cy", "Orr")]
+    assert not any(key.endswith("_enc") for row in rows for key in row), "_enc columns are removed"
+    # ins_provider was not asked for: the envelope is returned as legacy text, as before
+    assert phi_crypto.decrypt_field(binary_row["ins_provider"], dek) == "Aetna"
+
+    # Rows that are never decrypted keep the legacy response shape
+    untouched = [{"patient_first": None, "patient_first_enc": phi_crypto.encrypt_field_binary("Dee", dek),
+                  "patient_last": "Plain", "patient_last_enc": None}]
+    fold_encrypted_columns(untouched)
+    assert set(untouched[0]) == {"patient_first", "patient_last"} and isinstance(untouched[0]["patient_first"], str)
+
+    single = dict(binary_row, patient_first=None, patient_first_enc=phi_crypto.encrypt_field_binary("Eve", dek))
+    decrypt_patient_data(single, user_id, conn=None)
+    assert single["patient_first"] == "Eve" and "patient_first_enc" not in single
+    print("   ✅ Mixed binary, legacy and plaintext rows read the same")
+
+def test_migration_tool():
+    """The migration re-encodes legacy ciphertext without keys, skips plaintext and reports bad values"""
+    print("\n4. Migration:")
+    from utils.migrate_phi_binary import migrate_to_binary
+    phi_crypto = PHIEncryption()
+    dek = seed_dek("bin-a")
+    rows = [_legacy_row(phi_crypto, dek, f"case-{i:03d}", f"First{i}", f"Last{i}") for i in range(7)]
+    rows[2]["ins_provider"] = "BCBS"  # Plaintext left over from a partial encryption
+    rows[4]["patient_last"] = "!" * 40  # Not base64: cannot be re-encoded
+    before = [dict(row) for row in rows]
+    conn = _CasesDB(rows)
+
+    dry = migrate_to_binary(conn, batch_size=3, dry_run=True)
+    assert dry["scanned"] == 7 and dry["updated"] == 0 and conn.commits == 0 and rows == before
+
+    results = migrate_to_binary(conn, batch_size=3)
+    print(f"   batches={results['batches']} updated={results['updated']} failed={results['failed']} "
+          f"values={results['values']} saved={results['bytes_saved']} bytes")
+    assert results["updated"] == 6 and results["failed"] == 1 and results["errors"][0]["case_id"] == "case-004"
+    assert results["values"] == 17 and results["bytes_saved"] > 0 and conn.commits == 3
+
+    for i, row in enumerate(rows):
+        if i == 4:
+            assert row == before[4], "failed case is left untouched"
+            continue
+        assert row["patient_first"] is None and row["patient_last"] is None
+        assert phi_crypto.decrypt_field(row["patient_last_enc"], dek) == f"Last{i}"
+    assert rows[2]["ins_provider"] == "BCBS" and rows[2]["ins_provider_enc"] is None
+
+    # Migrated rows read exactly as before
+    migrated = [dict(rows[0]), dict(rows[2])]
+    decrypt_rows(migrated)
+    assert [(row["patient_first"], row["ins_provider"]) for row in migrated] == [("First0", "Aetna"), ("First2", "BCBS")]
+
+    again = migrate_to_binary(conn, batch_size=3)
+    assert again["updated"] == 0 and again["values"] == 0
+    print("   ✅ Existing ciphertext moves to binary storage")
+
+def main():
+    """Run all binary storage tests"""
+    print("🧪 Testing binary envelope PHI storage")
+    test_envelope_round_trip_and_size()
+    test_binary_decrypt_is_faster()
+    test_dual_read_and_fold()
+    test_migration_tool()
+    teardown_module()
+    print("\n✅ All binary storage tests passed")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+Test script for patient name blind indexes (utils/phi_encryption.py, utils/backfill_phi_blind_index.py)
+DEKs are seeded into the module cache and the database is a fake cursor - no KMS or MySQL needed
+"""
+
+import sys
+import os
+# Add parent directory to path so we can import from core and utils
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils import phi_encryption
+from utils.phi_encryption import PHIEncryption, blind_index, compute_blind_indexes, get_user_blind_index_key
+from tests.phi_test_helpers import seed_dek, reset_dek_cache, FakeConnection, StubKMS, wrap_dek
+
+TEST_USER_ID = '54d8e448-0091-7031-86bb-d66da5e8f7e0'
+
+_saved = {}
+
+def setup_module(module=None):
+    _saved["clients"] = dict(phi_encryption._kms_clients)
+    phi_encryption._kms_clients[phi_encryption.KMS_REGION] = StubKMS()
+
+def teardown_module(module=None):
+    phi_encryption._kms_clients.clear()
+    phi_encryption._kms_clients.update(_saved.get("clients", {}))
+    reset_dek_cache()
+
+class _CasesDB(FakeConnection):
+    """In-memory cases and user_encryption_keys tables answering the blind index, backfill and key queries"""
+    def __init__(self, rows=None):
+        super().__init__(rows)
+        self.keys = {}
+
+    def query(self, cursor, sql, params):
+        if sql.startswith("SELECT encrypted_bidx_key FROM user_encryption_keys"):
+            key = self.keys.get(params[0])
+            return [{"encrypted_bidx_key": key["encrypted_bidx_key"]}] if key else []
+        if "FROM user_encryption_keys" in sql and "encrypted_dek" in sql:
+            key = self.keys.get(params[0])
+            return [dict(key, is_active=1)] if key else []
+        if sql.startswith("INSERT INTO user_encryption_keys"):
+            user_id, encrypted_dek, encrypted_bidx_key = params
+            self.keys[user_id] = {"encrypted_dek": encrypted_dek, "encrypted_bidx_key": encrypted_bidx_key}
+            return []
+        if "patient_last_bidx = %s" in sql:
+            user_id, case_date, last_bidx, first_bidx = params
+            return [dict(row) for row in self.rows
+                    if row["user_id"] == user_id and row["case_date"] == case_date
+                    and row["patient_last_bidx"] == last_bidx and row["patient_first_bidx"] == first_bidx]
+        if "patient_first_bidx IS NULL" in sql:
+            after_case_id, batch_size = params[0], params[-1]
+            pending = sorted((row for row in self.rows
+                              if row["phi_encrypted"] == 1 and row["patient_last_bidx"] is None and row["case_id"] > after_case_id),
+                             key=lambda row: row["case_id"])
+            return [dict(row) for row in pending[:batch_size]]
+        return []
+
+    def write(self, sql, rows):
+        for first_bidx, last_bidx, case_id in rows:
+            row = self.row(case_id)
+            row["patient_first_bidx"], row["patient_last_bidx"] = first_bidx, last_bidx
+        return len(rows)
+
+def _encrypted_row(phi_crypto, dek, case_id, first, last, with_index=True):
+    bidx_key = get_user_blind_index_key(TEST_USER_ID, None)
+    return {
+        "case_id": case_id, "user_id": TEST_USER_ID, "case_date": "2026-01-15", "phi_encrypted": 1, "active": 1,
+        "patient_first": phi_crypto.encrypt_field(first, dek),
+        "patient_last": phi_crypto.encrypt_field(last, dek),
+        "patient_first_bidx": blind_index(first, bidx_key) if with_index else None,
+        "patient_last_bidx": blind_index(last, bidx_key) if with_index else None,
+    }
+
+def test_blind_index_normalization_and_keys():
+    """Case and whitespace variants match; other users' keys give unrelated indexes"""
+    print("\n1. Blind index values:")
+    seed_dek("bidx-a"), seed_dek("bidx-b")
+    key, other_key = get_user_blind_index_key("bidx-a", None), get_user_blind_index_key("bidx-b", None)
+    assert blind_index("O'Brien", key) == blind_index("  o'brien ", key) == blind_index("O'BRIEN", key)
+    assert blind_index("Mary  Ann", key) == blind_index("mary ann", key)
+    assert blind_index("Smith", key) != blind_index("Smith", other_key), "per-user keys"
+    assert blind_index("Smith", key) != blind_index("Smyth", key)
+    assert blind_index(None, key) is None and blind_index("   ", key) is None
+    assert len(blind_index("Smith", key)) == 64
+    assert compute_blind_indexes({"patient_last": "Smith", "ins_provider": "Aetna"}, "bidx-a", conn=None) == {
+        "patient_last_bidx": blind_index("Smith", key)
+    }
+    print("   ✅ Normalized, keyed per user")
+
+def test_duplicate_check_matches_encrypted_case():
+    """check_duplicate_case finds an encrypted duplicate through the blind index columns"""
+    print("\n2. Encrypted duplicate check:")
+    from endpoints.case.create_case import check_duplicate_case
+    phi_crypto = PHIEncryption()
+    dek = seed_dek(TEST_USER_ID)
+    conn = _CasesDB([_encrypted_row(phi_crypto, dek, "case-dupe", "Jane", "Doe")])
+
+    result = check_duplicate_case(TEST_USER_ID, "2026-01-15", "JANE", "doe ", conn)
+    print(f"   result={result}")
+    assert result["is_duplicate"] and result["existing_case_id"] == "case-dupe"
+    assert result["existing_patient_first"] == "Jane", "names are decrypted for the response"
+    assert len(conn.executed) == 1 and "LOWER(TRIM(patient_first))" not in conn.executed[0]
+
+    assert not check_duplicate_case(TEST_USER_ID, "2026-01-15", "John", "Doe", conn)["is_duplicate"]
+    print("   ✅ Ciphertext duplicates are detected by index seek")
+
+def test_duplicate_check_survives_key_rotation():
+    """Rotating the DEK keeps the blind index key, so cases indexed before the rotation are still found"""
+    print("\n3. Duplicate check after key rotation:")
+    from endpoints.case.create_case import check_duplicate_case
+    reset_dek_cache()
+    phi_crypto = PHIEncryption()
+    dek = seed_dek(TEST_USER_ID)
+    conn = _CasesDB([_encrypted_row(phi_crypto, dek, "case-dupe", "Jane", "Doe")])
+    conn.keys[TEST_USER_ID] = {"encrypted_dek": wrap_dek(dek), "encrypted_bidx_key": None}
+
+    for rotation in range(2):
+        phi_encryption.generate_and_store_user_key(TEST_USER_ID, conn, performed_by="test")
+        reset_dek_cache()
+        assert conn.keys[TEST_USER_ID]["encrypted_bidx_key"] is not None
+        result = check_duplicate_case(TEST_USER_ID, "2026-01-15", "Jane", "Doe", conn)
+        assert result["is_duplicate"] and result["existing_case_id"] == "case-dupe", f"rotation {rotation + 1}"
+
+    # A brand new user starts with a random key rather than one derived from the DEK
+    phi_encryption.generate_and_store_user_key("bidx-new", conn, performed_by="test")
+    new_dek = phi_encryption.get_user_dek("bidx-new", conn)
+    assert get_user_blind_index_key("bidx-new", conn) != phi_encryption._blind_index_key_for(new_dek)
+    print("   ✅ Existing indexes stay valid after two rotations")
+
+def test_backfill_fills_missing_indexes():
+    """The backfill computes indexes batch by batch, skipping cases it cannot decrypt"""
+    print("\n4. Backfill:")
+    from utils.backfill_phi_blind_index import backfill_blind_indexes
+    phi_crypto = PHIEncryption()
+    dek = seed_dek(TEST_USER_ID)
+    rows = [_encrypted_row(phi_crypto, dek, f"case-{i:03d}", f"First{i}", f"Last{i}", with_index=False) for i in range(7)]
+    rows[3]["patient_last"] = rows[3]["patient_last"][:-4] + "AAAA"  # Corrupt: cannot be decrypted
+    rows.append(_encrypted_row(phi_crypto, dek, "case-done", "Already", "Indexed"))
+    conn = _CasesDB(rows)
+
+    dry = backfill_blind_indexes(conn, batch_size=3, dry_run=True)
+    assert dry["scanned"] == 7 and dry["updated"] == 0 and conn.commits == 0
+
+    results = backfill_blind_indexes(conn, batch_size=3)
+    print(f"   batches={results['batches']} updated={results['updated']} failed={results['failed']}")
+    assert results["batches"] == 3 and results["updated"] == 6 and results["failed"] == 1
+    assert results["errors"][0]["case_id"] == "case-003" and conn.commits == 3
+    assert rows[0]["patient_last_bidx"] == blind_index("Last0", get_user_blind_index_key(TEST_USER_ID, None)) and rows[3]["patient_last_bidx"] is None
+    print("   ✅ Existing cases become searchable")
+
+def main():
+    """Run all blind index tests"""
+    print("🧪 Testing PHI blind indexes")
+    setup_module()
+    test_blind_index_normalization_and_keys()
+    test_duplicate_check_matches_encrypted_case()
+    test_duplicate_check_survives_key_rotation()
+    test_backfill_fills_missing_indexes()
+    teardown_module()
+    print("\n✅ All blind index tests passed")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Test script for per-SQL-fingerprint query telemetry (core/query_telemetry.py)
+No database needed - statements are recorded directly
+"""
+
+import sys
+import os
+# Add parent directory to path so we can import from core and utils
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pymysql.cursors
+
+from core import query_telemetry
+from core.query_telemetry import fingerprint_sql, record_query, get_query_stats, get_slow_queries, reset_query_stats
+
+def test_fingerprint_normalization():
+    """Literals and parameter placeholders collapse to the same fingerprint"""
+    print("\n1. Fingerprint normalization:")
+    template = "SELECT * FROM cases WHERE user_id = %s AND case_status IN (%s, %s, %s) AND active = 1"
+    literal = "SELECT *  FROM cases\n WHERE user_id = 'abc''d' AND case_status IN (1,2) AND active = 1 -- hot path"
+    print(f"   {fingerprint_sql(template)}")
+    assert fingerprint_sql(template) == fingerprint_sql(literal)
+    assert fingerprint_sql(template) == "SELECT * FROM cases WHERE user_id = ? AND case_status IN (?+) AND active = ?"
+    assert fingerprint_sql("INSERT INTO t (a, b) VALUES (%s, %s), (%s, %s)") == "INSERT INTO t (a, b) VALUES (?+)"
+    print("   ✅ Templates and literal SQL share a fingerprint")
+
+def test_record_and_slow_capture():
+    """Stats aggregate per fingerprint; slow reads are EXPLAINed once per interval"""
+    print("\n2. Recording and slow-query capture:")
+    reset_query_stats()
+    explain_calls = []
+
+    def explain():
+        explain_calls.append(1)
+        return [{"table": "cases", "type": "ALL", "rows": 1000}]
+
+    sql = "SELECT case_id FROM cases WHERE DATE(submitted_ts) = %s"
+    slow = query_telemetry.SLOW_QUERY_THRESHOLD + 0.1
+    record_query(sql, 0.01, 5, explain=explain)
+    record_query(sql, slow, 7, explain=explain)
+    record_query(sql, slow, 7, explain=explain)
+    record_query("UPDATE cases SET active = 0 WHERE case_id = %s", slow, 1, explain=explain)
+
+    stats = {item["fingerprint"]: item for item in get_query_stats()}
+    select_stats = stats[fingerprint_sql(sql)]
+    print(f"   count={select_stats['count']} rows={select_stats['total_rows']} slow={select_stats['slow_count']}")
+    assert select_stats["count"] == 3
+    assert select_stats["total_rows"] == 19
+    assert select_stats["slow_count"] == 2
+
+    slow_queries = get_slow_queries()
+    assert len(explain_calls) == 1, "EXPLAIN should run once per fingerprint per interval, and never for writes"
+    assert len(slow_queries) == 1
+    assert slow_queries[0]["explain"][0]["type"] == "ALL"
+    assert "%s" not in slow_queries[0]["fingerprint"]
+    print("   ✅ Slow read captured with its plan; UPDATE not re-run")
+    reset_query_stats()
+
+def test_cursor_wrapper_installed():
+    """Pooled connections hand out telemetry-wrapped cursors for every cursor class"""
+    print("\n3. Cursor wrapper:")
+    from core.database import _PooledConnection, _TelemetryCursorMixin
+
+    conn = _PooledConnection(host="127.0.0.1", user="x", password="y",
+                             cursorclass=pymysql.cursors.DictCursor, defer_connect=True)
+    for cursor in (conn.cursor(), conn.cursor(pymysql.cursors.Cursor), conn.cursor(pymysql.cursors.SSDictCursor)):
+        print(f"   {type(cursor).__name__}")
+        assert isinstance(cursor, _TelemetryCursorMixin)
+    assert isinstance(conn.cursor(), pymysql.cursors.DictCursor)
+    print("   ✅ Telemetry cursor wraps the requested cursor class")
+
+def main():
+    """Run all query telemetry tests"""
+    print("🧪 Testing query telemetry")
+    test_fingerprint_normalization()
+    test_record_and_slow_capture()
+    test_cursor_wrapper_installed()
+    print("\n✅ All query telemetry tests passed")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Test script for the versioned reference data registry (core/reference_data.py)
+A registry over an in-memory stand-in for the database - no MySQL needed
+"""
+
+import sys
+import os
+# Add parent directory to path so we can import from core and utils
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.reference_data import ReferenceDataRegistry
+
+TABLES = {"cpt_codes": ("SELECT cpt_code, cpt_description FROM cpt_codes ORDER BY cpt_code", ("cpt_code",))}
+
+class _FakeDatabaseRegistry(ReferenceDataRegistry):
+    """Registry whose queries hit dicts instead of MySQL"""
+    def __init__(self, rows, ttl=900):
+        super().__init__(TABLES, ttl=ttl)
+        self.rows = rows
+        self.versions = {}
+        self.queries = 0
+
+    def _run(self, statements, commit=False):
+        results = []
+        for sql, params in statements:
+            self.queries += 1
+            if sql.lstrip().startswith("INSERT INTO reference_data_version"):
+                self.versions[params[0]] = self.versions.get(params[0], 0) + 1
+                results.append([])
+            elif "FROM reference_data_version" in sql:
+                results.append([{"version": self.versions[params[0]]}] if params[0] in self.versions else [])
+            elif "FROM cpt_codes" in sql:
+                results.append([dict(row) for row in self.rows])
+            else:
+                results.append([])
+        return results
+
+def _codes(*pairs):
+    return [{"cpt_code": code, "cpt_description": desc} for code, desc in pairs]
+
+def test_loaded_once_and_served_from_memory():
+    """The table is queried on first use only"""
+    print("\n1. Load once:")
+    registry = _FakeDatabaseRegistry(_codes(("00100", "Salivary"), ("00102", "Plastic repair")))
+    first = registry.get("cpt_codes")
+    queries = registry.queries
+    for _ in range(100):
+        assert registry.get("cpt_codes") is first
+    print(f"   queries after 101 reads: {registry.queries}")
+    assert registry.queries == queries and registry.version("cpt_codes") == 0
+    print("   ✅ Served from memory after the first load")
+
+def test_record_change_and_delta():
+    """record_change bumps the version; changes_since returns only what changed since the client's version"""
+    print("\n2. Versioned deltas:")
+    registry = _FakeDatabaseRegistry(_codes(("00100", "Salivary"), ("00102", "Plastic repair")))
+    assert registry.version("cpt_codes") == 0
+
+    registry.rows = _codes(("00100", "Salivary glands"), ("00104", "Electroconvulsive"))
+    assert registry.record_change("cpt_codes") == 1
+    delta = registry.changes_since("cpt_codes", 0)
+    print(f"   v0 -> v{delta['version']}: rows={[r['cpt_code'] for r in delta['rows']]} removed={delta['removed']}")
+    assert delta["delta"] and delta["version"] == 1
+    assert sorted(r["cpt_code"] for r in delta["rows"]) == ["00100", "00104"]
+    assert delta["removed"] == [{"cpt_code": "00102"}]
+
+    registry.rows = _codes(("00100", "Salivary glands"), ("00102", "Plastic repair"), ("00104", "Electroconvulsive"))
+    registry.record_change("cpt_codes")
+    delta = registry.changes_since("cpt_codes", 0)
+    assert delta["version"] == 2 and delta["removed"] == [], "re-added rows cancel the earlier removal"
+    assert sorted(r["cpt_code"] for r in delta["rows"]) == ["00100", "00102", "00104"]
+
+    assert registry.changes_since("cpt_codes", 2) == {"version": 2, "delta": True, "rows": [], "removed": []}
+    full = registry.changes_since("cpt_codes", 99)
+    assert not full["delta"] and len(full["rows"]) == 3, "unknown versions get the full list"
+    print("   ✅ Deltas since a known version, full list otherwise")
+
+def test_external_change_bumps_version():
+    """A TTL reload that finds changed rows under the same version gives them a new version"""
+    print("\n3. Changes made outside the API:")
+    registry = _FakeDatabaseRegistry(_codes(("00100", "Salivary")), ttl=0)
+    assert registry.version("cpt_codes") == 0
+    registry.rows = _codes(("00100", "Salivary"), ("00120", "Ear"))
+    snapshot = registry.snapshot("cpt_codes")
+    print(f"   version after reload: {snapshot.version}")
+    assert snapshot.version == 1 and len(snapshot.rows) == 2
+    assert [r["cpt_code"] for r in registry.changes_since("cpt_codes", 0)["rows"]] == ["00120"]
+    print("   ✅ Script-loaded changes get a new version")
+
+def test_mapping_index():
+    """mapping() builds the key -> value lookup once per loaded version"""
+    print("\n4. Lookup index:")
+    registry = _FakeDatabaseRegistry(_codes(("00100", "Salivary")))
+    mapping = registry.mapping("cpt_codes", "cpt_code", "cpt_description")
+    assert mapping == {"00100": "Salivary"}
+    assert registry.mapping("cpt_codes", "cpt_code", "cpt_description") is mapping
+    registry.rows = _codes(("00100", "Salivary glands"))
+    registry.record_change("cpt_codes")
+    assert registry.mapping("cpt_codes", "cpt_code", "cpt_description") == {"00100": "Salivary glands"}
+    print("   ✅ Index rebuilt only for a new version")
+
+def main():
+    """Run all reference data tests"""
+    print("🧪 Testing reference data registry")
+    test_loaded_once_and_served_from_memory()
+    test_record_change_and_delta()
+    test_external_change_bumps_version()
+    test_mapping_index()
+    print("\n✅ All reference data tests passed")
+
+if __name__ == "__main__":
+    main()
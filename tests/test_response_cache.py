@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Test script for pre-encoded list responses with ETag / 304 support (core/response_cache.py)
+"""
+
+import sys
+import os
+from decimal import Decimal
+from datetime import date
+# Add parent directory to path so we can import from core and utils
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi import Request
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from core import response_cache
+from endpoints.case import filter_cases
+
+def _request(if_none_match=None):
+    headers = [(b"if-none-match", if_none_match.encode())] if if_none_match else []
+    return Request({"type": "http", "method": "GET", "path": "/case_filter", "headers": headers, "query_string": b""})
+
+def test_encoding_matches_fastapi():
+    """Bodies are byte-identical to what FastAPI's default JSONResponse produced"""
+    print("\n1. Encoding:")
+    content = {"cases": [{"case_id": "C1", "pay_amount": Decimal("125.50"), "case_date": date(2026, 10, 1),
+                          "patient_last": "Müller"}], "user_id": "u1", "filter": ["all"]}
+    # FastAPI runs endpoint return values through jsonable_encoder, then JSONResponse
+    assert response_cache.encode_json(content) == JSONResponse(jsonable_encoder(content)).body
+    print("   ✅ Same bytes as JSONResponse")
+
+def test_body_reused_until_source_replaced():
+    """A cached list is encoded once; patching the cache replaces the list and changes the ETag"""
+    print("\n2. Body reuse:")
+    filter_cases.clear_user_cases_cache()
+    cases = [{"case_id": "C2", "case_status": 10}, {"case_id": "C1", "case_status": 10}]
+    filter_cases._cache_user_cases_data("rc-key", cases, "user-rc", {"status_list": ["all"], "max_case_status": 20})
+    tags = ["user_cases", "user_cases:user:user-rc"]
+
+    def respond(request):
+        result = filter_cases._get_cached_user_cases("rc-key")
+        return response_cache.json_response(request, {"cases": result, "user_id": "user-rc"},
+                                            cache_key="case_filter:rc-key", source=result, tags=tags)
+
+    before = response_cache.get_response_cache_stats()
+    first = respond(_request())
+    second = respond(_request())
+    after = response_cache.get_response_cache_stats()
+    assert first.status_code == 200 and first.body == second.body
+    assert first.headers["etag"] == second.headers["etag"]
+    assert after["encoded"] - before["encoded"] == 1 and after["reused"] - before["reused"] == 1
+
+    filter_cases._user_cases_cache.update("rc-key", lambda value, meta: value + [{"case_id": "C0", "case_status": 0}])
+    third = respond(_request(first.headers["etag"]))
+    print(f"   etag before={first.headers['etag']} after patch={third.headers['etag']}")
+    assert third.status_code == 200 and third.headers["etag"] != first.headers["etag"]
+    assert b'"C0"' in third.body
+
+    filter_cases.clear_user_cases_cache("user-rc")
+    assert response_cache._response_bodies.peek("case_filter:rc-key") is None, "clearing the user drops their bodies"
+    print("   ✅ Encoded once per cached list, re-encoded after a patch")
+
+def test_if_none_match():
+    """A matching If-None-Match (strong, weak or in a list) gets an empty 304 with the ETag"""
+    print("\n3. Conditional requests:")
+    content = {"cases": [], "user_id": "u304"}
+    etag = response_cache.json_response(_request(), content).headers["etag"]
+    for header in (etag, f"W/{etag}", f'"stale", {etag}', "*"):
+        response = response_cache.json_response(_request(header), content)
+        assert response.status_code == 304 and response.body == b"" and response.headers["etag"] == etag, header
+    assert response_cache.json_response(_request('"stale"'), content).status_code == 200
+    print("   ✅ 304 Not Modified only when the client's ETag matches")
+
+def main():
+    """Run all response cache tests"""
+    print("🧪 Testing pre-encoded responses and ETags")
+    test_encoding_matches_fastapi()
+    test_body_reused_until_source_replaced()
+    test_if_none_match()
+    print("\n✅ All response cache tests passed")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Test script for the coalesced cache re-warm queue (core/rewarm.py)
+Uses counting warmers - no database needed
+"""
+
+import sys
+import os
+import time
+import threading
+# Add parent directory to path so we can import from core and utils
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.rewarm import RewarmScheduler
+
+def test_repeated_invalidations_collapse():
+    """A burst of invalidations for the same keys inside the debounce window runs each re-warm once"""
+    print("\n1. Debounce and collapse:")
+    scheduler = RewarmScheduler(workers=4, debounce=0.2)
+    runs = []
+    lock = threading.Lock()
+
+    def warm(key):
+        with lock:
+            runs.append(key)
+
+    # A bulk update touching 200 cases across 20 users, each invalidating the global cache too
+    for i in range(200):
+        scheduler.schedule("cases_by_status", warm, "global", kind="cases_by_status")
+        user = f"user-{i % 20}"
+        scheduler.schedule(f"user_cases:{user}", warm, user, kind="user_cases")
+
+    assert scheduler.wait_idle(5)
+    stats = scheduler.get_stats()
+    print(f"   runs={len(runs)} scheduled={stats['scheduled']} collapsed={stats['collapsed']} threads={len(scheduler._threads)}")
+    assert runs.count("global") == 1
+    assert len(runs) == 21
+    assert stats["collapsed"] == 400 - 21
+    assert len(scheduler._threads) == 4, "bounded worker pool"
+    print("   ✅ 400 invalidations -> 21 re-warms on 4 threads")
+
+def test_write_during_rewarm_queues_another_run():
+    """An invalidation while the key is re-warming runs it again afterwards (never concurrently)"""
+    print("\n2. Invalidation during a running re-warm:")
+    scheduler = RewarmScheduler(workers=2, debounce=0)
+    active = []
+    overlaps = []
+    started = threading.Event()
+
+    def warm():
+        if active:
+            overlaps.append(1)
+        active.append(1)
+        started.set()
+        time.sleep(0.2)
+        active.pop()
+
+    scheduler.schedule("user_cases:u1", warm, kind="user_cases")
+    started.wait(2)
+    assert scheduler.schedule("user_cases:u1", warm, kind="user_cases") == "scheduled"
+    assert scheduler.wait_idle(5)
+    stats = scheduler.get_stats()
+    print(f"   completed={stats['completed']} overlaps={len(overlaps)}")
+    assert stats["completed"] == 2 and not overlaps
+    print("   ✅ Second run queued behind the first")
+
+def test_queue_bound_and_failures():
+    """Full queues drop re-warms; failing warmers are counted and don't kill workers"""
+    print("\n3. Queue bound and failures:")
+    scheduler = RewarmScheduler(workers=1, debounce=0.2, max_pending=2)
+
+    def broken():
+        raise RuntimeError("db down")
+
+    assert scheduler.schedule("a", broken) == "scheduled"
+    assert scheduler.schedule("b", broken) == "scheduled"
+    assert scheduler.schedule("c", broken) == "dropped"
+    assert scheduler.wait_idle(5)
+    assert scheduler.schedule("d", lambda: None) == "scheduled"
+    assert scheduler.wait_idle(5)
+    stats = scheduler.get_stats()
+    print(f"   {stats}")
+    assert stats["dropped"] == 1 and stats["failed"] == 2 and stats["completed"] == 1
+    print("   ✅ Bounded queue, worker survives failures")
+
+def main():
+    """Run all re-warm scheduler tests"""
+    print("🧪 Testing cache re-warm scheduler")
+    test_repeated_invalidations_collapse()
+    test_write_during_rewarm_queues_another_run()
+    test_queue_bound_and_failures()
+    print("\n✅ All re-warm scheduler tests passed")
+
+if __name__ == "__main__":
+    main()
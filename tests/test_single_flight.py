@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+"""
+Test script for single-flight coalescing of cache misses (core/cache.py SingleFlight)
+Uses fake cursors that count queries - no database needed
+"""
+
+import sys
+import os
+import time
+import asyncio
+import threading
+# Add parent directory to path so we can import from core and utils
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.cache import SingleFlight
+
+class _SlowCursor:
+    """Sync cursor stand-in: every execute takes 0.2s and is counted"""
+    def __init__(self):
+        self.executed = []
+        self.connection = None
+        self._lock = threading.Lock()
+
+    def execute(self, sql, params=None):
+        with self._lock:
+            self.executed.append(sql)
+        time.sleep(0.2)
+
+    def fetchall(self):
+        return []
+
+class _SlowAsyncCursor:
+    """aiomysql cursor stand-in"""
+    def __init__(self):
+        self.executed = []
+
+    async def execute(self, sql, params=None):
+        self.executed.append(sql)
+        await asyncio.sleep(0.2)
+
+    async def fetchall(self):
+        return []
+
+def test_concurrent_sync_misses_run_one_query():
+    """Eight threads missing the same user cases key run the query once"""
+    print("\n1. Concurrent sync misses:")
+    from core.reference_data import reference_data
+    from endpoints.case import filter_cases
+    filter_cases.clear_user_cases_cache()
+    reference_data.set_rows("case_statuses", [{"case_status": 20, "case_status_desc": "Submitted"}])
+    cursor = _SlowCursor()
+    barrier = threading.Barrier(8)
+    results = []
+
+    def request():
+        barrier.wait()
+        results.append(filter_cases._get_user_cases_optimized(cursor, "user-sf", ["all"], 20))
+
+    threads = [threading.Thread(target=request) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    print(f"   {len(results)} callers, {len(cursor.executed)} statements executed")
+    assert len(results) == 8 and all(result == [] for result in results)
+    assert len(cursor.executed) == 1, "case list query once (status descriptions come from reference data)"
+    assert filter_cases._get_cached_user_cases(filter_cases._generate_user_cases_cache_key("user-sf", ["all"])) == []
+    print("   ✅ One query served every caller")
+
+def test_concurrent_async_misses_run_one_query():
+    """Concurrent /cases_by_status misses on the event loop share one query"""
+    print("\n2. Concurrent async misses:")
+    from endpoints.backoffice import get_cases_by_status
+    get_cases_by_status.clear_cases_cache()
+    cursor = _SlowAsyncCursor()
+
+    async def run():
+        return await asyncio.gather(*[
+            get_cases_by_status._get_cases_optimized_async(cursor, [1, 2], None, None) for _ in range(6)
+        ])
+
+    results = asyncio.run(run())
+    print(f"   {len(results)} callers, {len(cursor.executed)} statements executed")
+    assert len(cursor.executed) == 1
+    assert get_cases_by_status._cases_flight.stats()["in_flight"] == 0
+    print("   ✅ One query served every coroutine")
+
+def test_errors_and_invalidation():
+    """Followers see the leader's error; a load invalidated mid-flight is not cached"""
+    print("\n3. Errors and invalidation:")
+    flight = SingleFlight("test")
+    started = threading.Event()
+    outcomes = []
+
+    def failing_load():
+        started.set()
+        time.sleep(0.1)
+        raise RuntimeError("database down")
+
+    def call():
+        try:
+            flight.do("k", failing_load)
+        except RuntimeError as e:
+            outcomes.append(str(e))
+
+    leader = threading.Thread(target=call)
+    leader.start()
+    started.wait()
+    follower = threading.Thread(target=call)
+    follower.start()
+    leader.join()
+    follower.join()
+    assert outcomes == ["database down", "database down"]
+    assert flight.stats()["coalesced"] == 1
+
+    stored = []
+    def slow_load():
+        flight.forget("k2")  # a write invalidates the key while the query runs
+        return "pre-write data"
+    assert flight.do("k2", slow_load, store=stored.append) == "pre-write data"
+    assert stored == [], "result of an invalidated load must not be cached"
+    print("   ✅ Errors propagate; invalidated loads are not stored")
+
+def test_cancelled_async_leader_releases_followers():
+    """If the leading request is cancelled, waiting requests load for themselves"""
+    print("\n4. Cancelled leader:")
+    flight = SingleFlight("test_cancel")
+    loads = []
+
+    async def load():
+        loads.append(1)
+        await asyncio.sleep(0.2)
+        return "rows"
+
+    async def run():
+        leader = asyncio.ensure_future(flight.do_async("k", load))
+        await asyncio.sleep(0.05)
+        follower = asyncio.ensure_future(flight.do_async("k", load))
+        await asyncio.sleep(0.05)
+        leader.cancel()
+        return await follower
+
+    assert asyncio.run(run()) == "rows"
+    assert len(loads) == 2
+    print("   ✅ Follower completed after leader cancellation")
+
+def test_forget_by_tag_keeps_other_users_flights():
+    """A write for one user detaches only that user's in-flight loads"""
+    print("\n5. Tag-scoped invalidation:")
+    flight = SingleFlight("test_tags")
+    stored = []
+
+    def load_a():
+        flight.forget(tag="user:b")  # another user's write lands while A's query runs
+        return "a rows"
+    assert flight.do("a", load_a, store=stored.append, tags=["user:a"]) == "a rows"
+    assert stored == ["a rows"], "another user's write must not discard this load"
+
+    def load_b():
+        flight.forget(tag="user:b")  # this user's own write
+        return "b rows"
+    assert flight.do("b", load_b, store=stored.append, tags=["user:b"]) == "b rows"
+    assert stored == ["a rows"], "the user's own write must discard the load"
+    assert flight.stats()["in_flight"] == 0
+    assert flight._flight_tags == {}
+    print("   ✅ Only the written user's loads were detached")
+
+def main():
+    """Run all single-flight tests"""
+    print("🧪 Testing single-flight cache coalescing")
+    test_concurrent_sync_misses_run_one_query()
+    test_concurrent_async_misses_run_one_query()
+    test_errors_and_invalidation()
+    test_cancelled_async_leader_releases_followers()
+    test_forget_by_tag_keeps_other_users_flights()
+    print("\n✅ All single-flight tests passed")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,250 @@
+# Created: 2026-10-16 19:52:21
+# Last Modified: 2026-10-16 20:20:54
+# Author: Scott Cadreau
+
+"""
+Backfill patient name blind indexes for existing encrypted cases.
+
+Cases encrypted before the blind index columns existed (database_phi_blind_index_schema.sql)
+have NULL patient_first_bidx / patient_last_bidx, so duplicate checks cannot match them.
+This script walks those cases in case_id order, one batch at a time: it decrypts the names
+with each owner's DEK (fetched once per owner), computes the blind indexes and writes them
+back, committing after every batch so it can be stopped and re-run safely.
+
+With --recompute every encrypted case is re-indexed, not only those missing an index. Use it
+once after deploying encrypted_bidx_key for users whose key was rotated before then: their
+older cases were indexed with a key derived from an earlier DEK.
+
+Usage:
+    python utils/backfill_phi_blind_index.py [--dry-run] [--batch-size N] [--user-id USER_ID] [--recompute]
+    
+Options:
+    --dry-run: Count the cases that would be backfilled without writing
+    --batch-size: Cases per batch/commit (default: 500)
+    --user-id: Only backfill one user's cases
+    --recompute: Re-index cases that already have blind indexes too
+"""
+
+import sys
+import argparse
+import logging
+import time
+from typing import Dict, List, Any, Optional
+import pymysql.cursors
+
+# Add parent directory to path for imports
+sys.path.insert(0, '/home/scadreau/surgicase')
+
+from utils.phi_encryption import (
+    PHIEncryption,
+    get_user_dek,
+    get_user_blind_index_key,
+    blind_index,
+    blind_index_column,
+    encrypted_column,
+    is_encrypted_value,
+    BLIND_INDEX_FIELDS
+)
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = 500
+
+
+def fetch_backfill_batch(conn, after_case_id: str, batch_size: int, user_id: Optional[str] = None,
+                         recompute: bool = False) -> List[Dict[str, Any]]:
+    """
+    Fetch the next batch of encrypted cases missing a blind index, after after_case_id.
+    
+    Args:
+        conn: Database connection
+        after_case_id: Keyset cursor - only cases with a greater case_id are returned
+        batch_size: Maximum rows to return
+        user_id: Optional owner filter
+        recompute: Return indexed cases too
+        
+    Returns:
+        List of case dicts with case_id, user_id, patient_first, patient_last and their _enc columns
+    """
+    conditions = ["phi_encrypted = 1", "case_id > %s"]
+    if not recompute:
+        conditions.insert(1, "(patient_first_bidx IS NULL OR patient_last_bidx IS NULL)")
+    params: List[Any] = [after_case_id]
+    if user_id:
+        conditions.append("user_id = %s")
+        params.append(user_id)
+    params.append(batch_size)
+    
+    with conn.cursor(pymysql.cursors.DictCursor) as cursor:
+        cursor.execute(f"""
+            SELECT case_id, user_id, patient_first, patient_last, patient_first_enc, patient_last_enc
+            FROM cases
+            WHERE {' AND '.join(conditions)}
+            ORDER BY case_id
+            LIMIT %s
+        """, params)
+        return list(cursor.fetchall())
+
+
+def compute_batch_blind_indexes(cases: List[Dict[str, Any]], conn) -> Dict[str, Any]:
+    """
+    Decrypt names and compute blind indexes for a batch, one DEK and blind index key fetch per owner.
+    
+    Binary <field>_enc values are preferred over the text columns; legacy text shorter than
+    MIN_ENCRYPTED_LENGTH is treated as plaintext (partially encrypted legacy rows). A case
+    whose DEK or names cannot be decrypted is skipped and reported.
+    
+    Returns:
+        Dict with updates (list of (first_bidx, last_bidx, case_id)) and errors
+    """
+    phi_crypto = PHIEncryption()
+    updates = []
+    errors = []
+    keys: Dict[str, Any] = {}
+    
+    for case in cases:
+        owner = case['user_id']
+        try:
+            if owner not in keys:
+                keys[owner] = (get_user_dek(owner, conn), get_user_blind_index_key(owner, conn))
+            dek, bidx_key = keys[owner]
+            
+            indexes = {}
+            for field in BLIND_INDEX_FIELDS:
+                envelope = case.get(encrypted_column(field))
+                value = envelope if envelope is not None else case.get(field)
+                if is_encrypted_value(value):
+                    value = phi_crypto.decrypt_field(value, dek)
+                elif envelope is not None:
+                    raise ValueError(f"Unsupported envelope format in {encrypted_column(field)}")
+                indexes[blind_index_column(field)] = blind_index(value, bidx_key)
+            
+            updates.append((indexes['patient_first_bidx'], indexes['patient_last_bidx'], case['case_id']))
+        except Exception as e:
+            errors.append({'case_id': case['case_id'], 'user_id': owner, 'error': str(e)})
+    
+    return {'updates': updates, 'errors': errors}
+
+
+def backfill_blind_indexes(conn, batch_size: int = DEFAULT_BATCH_SIZE, user_id: Optional[str] = None,
+                           dry_run: bool = False, recompute: bool = False) -> Dict[str, Any]:
+    """
+    Backfill blind indexes for every encrypted case that is missing one.
+    
+    Args:
+        conn: Database connection
+        batch_size: Cases per batch; each batch is committed separately
+        user_id: Optional owner filter
+        dry_run: Only count the cases that would be updated
+        recompute: Re-index cases that already have blind indexes too
+        
+    Returns:
+        Dict with batches, scanned, updated, failed, duration_seconds, cases_per_second and errors
+    """
+    start_time = time.time()
+    results = {
+        'batches': 0,
+        'scanned': 0,
+        'updated': 0,
+        'failed': 0,
+        'errors': [],
+        'duration_seconds': 0,
+        'cases_per_second': 0
+    }
+    
+    # Keyset pagination: failed cases keep a NULL index, so the cursor (not the NULL filter) guarantees progress
+    after_case_id = ''
+    while True:
+        cases = fetch_backfill_batch(conn, after_case_id, batch_size, user_id, recompute)
+        if not cases:
+            break
+        after_case_id = cases[-1]['case_id']
+        results['batches'] += 1
+        results['scanned'] += len(cases)
+        
+        if dry_run:
+            continue
+        
+        batch = compute_batch_blind_indexes(cases, conn)
+        if batch['updates']:
+            with conn.cursor() as cursor:
+                cursor.executemany("""
+                    UPDATE cases
+                    SET patient_first_bidx = %s, patient_last_bidx = %s
+                    WHERE case_id = %s
+                """, batch['updates'])
+            conn.commit()
+        
+        results['updated'] += len(batch['updates'])
+        results['failed'] += len(batch['errors'])
+        results['errors'].extend(batch['errors'])
+        logger.info(f"Batch {results['batches']}: {len(batch['updates'])} updated, {len(batch['errors'])} failed "
+                    f"(through case {after_case_id})")
+    
+    duration = time.time() - start_time
+    results['duration_seconds'] = round(duration, 2)
+    results['cases_per_second'] = round(results['scanned'] / duration, 1) if duration > 0 else 0
+    return results
+
+
+def main():
+    """Main execution function."""
+    parser = argparse.ArgumentParser(description='Backfill patient name blind indexes for encrypted cases')
+    parser.add_argument('--dry-run', action='store_true', help='Count cases that would be backfilled without writing')
+    parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE, help='Cases per batch/commit')
+    parser.add_argument('--user-id', help="Only backfill this user's cases")
+    parser.add_argument('--recompute', action='store_true', help='Re-index cases that already have blind indexes too')
+    args = parser.parse_args()
+    
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+    
+    from core.database import get_db_connection, close_db_connection
+    
+    conn = None
+    
+    try:
+        logger.info("=" * 80)
+        logger.info("PHI BLIND INDEX BACKFILL")
+        logger.info("=" * 80)
+        
+        if args.dry_run:
+            logger.info("*** DRY RUN MODE - No changes will be made ***")
+        
+        conn = get_db_connection()
+        results = backfill_blind_indexes(conn, batch_size=args.batch_size, user_id=args.user_id,
+                                         dry_run=args.dry_run, recompute=args.recompute)
+        
+        logger.info("")
+        logger.info("=" * 80)
+        logger.info("RESULTS")
+        logger.info("=" * 80)
+        logger.info(f"Cases {'found' if args.dry_run else 'scanned'}: {results['scanned']} in {results['batches']} batches")
+        logger.info(f"Updated: {results['updated']}")
+        logger.info(f"Failed: {results['failed']}")
+        logger.info(f"Time elapsed: {results['duration_seconds']:.2f} seconds ({results['cases_per_second']} cases/s)")
+        
+        if results['errors']:
+            logger.info("")
+            logger.info("Errors:")
+            for error in results['errors']:
+                logger.error(f"  - Case {error['case_id']} (user {error['user_id']}): {error['error']}")
+        
+        logger.info("=" * 80)
+        
+        return 0 if results['failed'] == 0 else 1
+        
+    except Exception as e:
+        logger.error(f"Fatal error: {str(e)}")
+        return 1
+        
+    finally:
+        if conn:
+            close_db_connection(conn)
+            logger.info("Database connection closed")
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,106 @@
+# Created: 2026-10-16 19:21:07
+# Last Modified: 2026-10-16 19:24:54
+# Author: Scott Cadreau
+
+# utils/case_cache_events.py
+"""
+Case-changed events for the cached case lists.
+
+A single case write used to clear every cached filter combination for the case owner
+plus the whole global cases cache, then re-query all of it. Write paths now call
+emit_case_changed() after committing: the changed case is re-read once and upserted into
+(or removed from) each cached list whose filter it matches - status lists, date ranges
+and max_case_status capping (see patch_user_cases_cache and patch_cases_cache).
+
+The caches are only cleared and re-warmed when the case's status changed, since that
+moves it between status buckets, or when patching fails.
+
+Patching only updates this node; the other nodes are told to evict the affected lists
+through the invalidation bus (core/invalidation_bus.py) and reload them on demand.
+"""
+import logging
+import pymysql.cursors
+from core.database import get_db_connection, close_db_connection
+from core.invalidation_bus import invalidation_bus
+
+logger = logging.getLogger(__name__)
+
+
+def _rebuild_cases_cache(case_id: str, reason: str):
+    """Clear the global cases cache and queue its re-warm"""
+    from endpoints.backoffice.get_cases_by_status import clear_cases_cache, schedule_cases_cache_rewarm
+    clear_cases_cache()
+    schedule_cases_cache_rewarm()
+    logger.info(f"🔄 Rebuilding global cases cache for case {case_id} ({reason})")
+
+
+def _rebuild_user_cases_cache(case_id: str, user_id: str, reason: str):
+    """Clear a user's cases cache and queue its re-warm"""
+    from endpoints.case.filter_cases import clear_user_cases_cache, schedule_user_cases_rewarm
+    clear_user_cases_cache(user_id)
+    schedule_user_cases_rewarm(user_id)
+    logger.info(f"🔄 Rebuilding user cases cache for user {user_id}, case {case_id} ({reason})")
+
+
+def emit_case_changed(case_id: str, user_id: str = None, old_status: int = None, conn=None) -> str:
+    """
+    Bring the cached case lists up to date after a committed write to one case.
+
+    Args:
+        case_id: The case that was created, updated, deleted or restored
+        user_id: The case owner, whose cached lists are patched too
+        old_status: case_status before the write (None for creates/deletes); if the committed
+            status differs the caches are rebuilt instead of patched
+        conn: Connection to read the committed row with (a pooled connection is borrowed if None)
+
+    Returns:
+        "patched" if every cache was patched in place, otherwise "rebuilt"
+    """
+    from endpoints.backoffice.get_cases_by_status import patch_cases_cache
+    from endpoints.case.filter_cases import patch_user_cases_cache
+
+    owns_connection = conn is None
+    outcome = "patched"
+    try:
+        if owns_connection:
+            conn = get_db_connection()
+
+        with conn.cursor(pymysql.cursors.DictCursor) as cursor:
+            if old_status is not None:
+                cursor.execute("SELECT case_status FROM cases WHERE case_id = %s AND active = 1", (case_id,))
+                current = cursor.fetchone()
+                if current and int(current["case_status"]) != int(old_status):
+                    reason = f"status {old_status} -> {current['case_status']}"
+                    _rebuild_cases_cache(case_id, reason)
+                    if user_id:
+                        _rebuild_user_cases_cache(case_id, user_id, reason)
+                    return "rebuilt"
+
+            try:
+                patch_cases_cache(cursor, case_id)
+                invalidation_bus.publish("cases_by_status", "*")
+            except Exception as e:
+                logger.error(f"❌ Failed to patch global cases cache for case {case_id}: {str(e)}")
+                _rebuild_cases_cache(case_id, "patch failed")
+                outcome = "rebuilt"
+
+            if user_id:
+                try:
+                    patch_user_cases_cache(cursor, user_id, case_id)
+                    invalidation_bus.publish("user_cases", user_id)
+                except Exception as e:
+                    logger.error(f"❌ Failed to patch user cases cache for case {case_id}: {str(e)}")
+                    _rebuild_user_cases_cache(case_id, user_id, "patch failed")
+                    outcome = "rebuilt"
+    except Exception as e:
+        # Couldn't read the committed row at all - fall back to the full rebuild
+        logger.error(f"❌ Case change event failed for case {case_id}: {str(e)}")
+        _rebuild_cases_cache(case_id, "event failed")
+        if user_id:
+            _rebuild_user_cases_cache(case_id, user_id, "event failed")
+        outcome = "rebuilt"
+    finally:
+        if owns_connection and conn:
+            close_db_connection(conn)
+
+    return outcome
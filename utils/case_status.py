@@ -1,5 +1,5 @@
 # Created: 2025-07-15 23:02:51
-# Last Modified: 2025-11-04 19:47:00
+# Last Modified: 2026-10-16 20:09:10
 # Author: Scott Cadreau
 
 # utils/case_status.py
@@ -54,7 +54,7 @@ def update_case_status(case_id: str, conn) -> dict:
         with conn.cursor(pymysql.cursors.DictCursor) as cursor:
             # Check if case exists and get current status with patient DOB, insurance, and user_id for decryption
             cursor.execute("""
-                SELECT case_id, case_status, demo_file, note_file, patient_dob, ins_provider, user_id, phi_encrypted 
+                SELECT case_id, case_status, demo_file, note_file, patient_dob, ins_provider, ins_provider_enc, user_id, phi_encrypted 
                 FROM cases 
                 WHERE case_id = %s AND active = 1
             """, (case_id,))
@@ -68,21 +68,20 @@ def update_case_status(case_id: str, conn) -> dict:
                     "case_id": case_id
                 }
             
-            # Decrypt ins_provider if PHI is encrypted
-            if case_data.get('phi_encrypted') == 1 and case_data.get('ins_provider'):
+            # Decrypt ins_provider if PHI is encrypted (binary envelope column first, then legacy text)
+            from utils.phi_encryption import PHIEncryption, get_user_dek, take_stored_value, is_encrypted_value
+            stored_ins_provider = take_stored_value(case_data, 'ins_provider')
+            if case_data.get('phi_encrypted') == 1 and stored_ins_provider:
                 try:
-                    from utils.phi_encryption import PHIEncryption, get_user_dek
-                    
                     user_id = case_data.get('user_id')
                     if user_id:
                         dek = get_user_dek(user_id, conn)
                         phi_crypto = PHIEncryption()
                         
-                        # Decrypt ins_provider field if it looks encrypted (>= 28 chars)
-                        ins_provider_value = str(case_data['ins_provider'])
-                        if len(ins_provider_value) >= 28:
+                        # Decrypt ins_provider field if it looks encrypted
+                        if is_encrypted_value(stored_ins_provider):
                             try:
-                                case_data['ins_provider'] = phi_crypto.decrypt_field(case_data['ins_provider'], dek)
+                                case_data['ins_provider'] = phi_crypto.decrypt_field(stored_ins_provider, dek)
                                 logger.debug(f"Case {case_id}: Decrypted ins_provider for status check")
                             except Exception as decrypt_error:
                                 logger.warning(f"Case {case_id}: Could not decrypt ins_provider, using encrypted value: {str(decrypt_error)}")
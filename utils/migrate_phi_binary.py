@@ -0,0 +1,263 @@
+# Created: 2026-10-16 20:07:44
+# Last Modified: 2026-10-16 20:07:44
+# Author: Scott Cadreau
+
+"""
+Migrate encrypted PHI from legacy base64 text to the binary envelope columns.
+
+Cases encrypted before database_phi_binary_storage_schema.sql store each PHI field as
+base64(iv + auth_tag + ciphertext) text. This script re-encodes those values as binary
+envelopes in the <field>_enc columns and clears the text columns. No keys are needed:
+the ciphertext itself is unchanged, only its encoding, so the result decrypts with the
+same DEK and key version as before.
+
+Cases are walked in case_id order, one batch at a time, committing after every batch so
+the migration can be stopped and re-run safely. Each UPDATE only applies if the row still
+holds the values that were read, so concurrent application writes are never overwritten.
+
+Usage:
+    python utils/migrate_phi_binary.py [--dry-run] [--batch-size N] [--user-id USER_ID] [--table cases|deleted_cases]
+
+Options:
+    --dry-run: Count the values that would be migrated without writing
+    --batch-size: Cases per batch/commit (default: 500)
+    --user-id: Only migrate one user's cases
+    --table: Table to migrate (default: cases)
+"""
+
+import sys
+import argparse
+import logging
+import time
+from typing import Dict, List, Any, Optional
+import pymysql.cursors
+
+# Add parent directory to path for imports
+sys.path.insert(0, '/home/scadreau/surgicase')
+
+from utils.phi_encryption import (
+    encrypted_column,
+    envelope_from_legacy,
+    is_encrypted_value,
+    PHI_FIELDS
+)
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = 500
+TABLES = ('cases', 'deleted_cases')
+
+
+def fetch_migration_batch(conn, table: str, after_case_id: str, batch_size: int,
+                          user_id: Optional[str] = None) -> List[Dict[str, Any]]:
+    """
+    Fetch the next batch of encrypted cases with a PHI field still in a text column, after after_case_id.
+    
+    Args:
+        conn: Database connection
+        table: cases or deleted_cases
+        after_case_id: Keyset cursor - only cases with a greater case_id are returned
+        batch_size: Maximum rows to return
+        user_id: Optional owner filter
+    
+    Returns:
+        List of case dicts with case_id, user_id and every PHI text and _enc column
+    """
+    pending = " OR ".join(f"({field} IS NOT NULL AND {encrypted_column(field)} IS NULL)" for field in PHI_FIELDS)
+    conditions = ["phi_encrypted = 1", f"({pending})", "case_id > %s"]
+    params: List[Any] = [after_case_id]
+    if user_id:
+        conditions.append("user_id = %s")
+        params.append(user_id)
+    params.append(batch_size)
+    
+    columns = ", ".join(f"{field}, {encrypted_column(field)}" for field in PHI_FIELDS)
+    with conn.cursor(pymysql.cursors.DictCursor) as cursor:
+        cursor.execute(f"""
+            SELECT case_id, user_id, {columns}
+            FROM {table}
+            WHERE {' AND '.join(conditions)}
+            ORDER BY case_id
+            LIMIT %s
+        """, params)
+        return list(cursor.fetchall())
+
+
+def convert_batch(cases: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Re-encode the legacy text ciphertext of a batch as binary envelopes.
+    
+    Text shorter than MIN_ENCRYPTED_LENGTH is plaintext left by a partial encryption and is
+    left for the bulk encryption job; text that is not valid base64 ciphertext is reported.
+    
+    Returns:
+        Dict with updates (list of UPDATE parameter tuples), values, bytes_before, bytes_after and errors
+    """
+    updates = []
+    errors = []
+    values = bytes_before = bytes_after = 0
+    
+    for case in cases:
+        old = [(case.get(field), case.get(encrypted_column(field))) for field in PHI_FIELDS]
+        new = list(old)
+        converted = []
+        try:
+            for i, (text, envelope) in enumerate(old):
+                if envelope is None and is_encrypted_value(text):
+                    new[i] = (None, envelope_from_legacy(text))
+                    converted.append((text, new[i][1]))
+        except Exception as e:
+            # The whole case is left as it is, so a case never ends up half migrated
+            errors.append({'case_id': case['case_id'], 'user_id': case.get('user_id'), 'error': str(e)})
+            continue
+        
+        if converted:
+            values += len(converted)
+            bytes_before += sum(len(text) for text, _ in converted)
+            bytes_after += sum(len(envelope) for _, envelope in converted)
+            updates.append((*(value for pair in new for value in pair), case['case_id'],
+                            *(value for pair in old for value in pair)))
+    
+    return {'updates': updates, 'values': values, 'bytes_before': bytes_before,
+            'bytes_after': bytes_after, 'errors': errors}
+
+
+def _update_sql(table: str) -> str:
+    """Guarded UPDATE writing every PHI text/_enc pair, only if the row still holds the values read"""
+    columns = [column for field in PHI_FIELDS for column in (field, encrypted_column(field))]
+    assignments = ", ".join(f"{column} = %s" for column in columns)
+    guards = " AND ".join(f"{column} <=> %s" for column in columns)
+    return f"UPDATE {table} SET {assignments} WHERE case_id = %s AND {guards}"
+
+
+def migrate_to_binary(conn, table: str = 'cases', batch_size: int = DEFAULT_BATCH_SIZE,
+                      user_id: Optional[str] = None, dry_run: bool = False) -> Dict[str, Any]:
+    """
+    Move every legacy text ciphertext in a table to its binary envelope column.
+    
+    Args:
+        conn: Database connection
+        table: cases or deleted_cases
+        batch_size: Cases per batch; each batch is committed separately
+        user_id: Optional owner filter
+        dry_run: Only count what would be migrated
+    
+    Returns:
+        Dict with batches, scanned, updated, skipped, failed, values, bytes_saved,
+        duration_seconds, cases_per_second and errors
+    """
+    if table not in TABLES:
+        raise ValueError(f"table must be one of {', '.join(TABLES)}")
+    
+    start_time = time.time()
+    results = {
+        'batches': 0,
+        'scanned': 0,
+        'updated': 0,
+        'skipped': 0,
+        'failed': 0,
+        'values': 0,
+        'bytes_saved': 0,
+        'errors': [],
+        'duration_seconds': 0,
+        'cases_per_second': 0
+    }
+    update_sql = _update_sql(table)
+    
+    # Keyset pagination: failed and plaintext cases still match the filter, so the cursor guarantees progress
+    after_case_id = ''
+    while True:
+        cases = fetch_migration_batch(conn, table, after_case_id, batch_size, user_id)
+        if not cases:
+            break
+        after_case_id = cases[-1]['case_id']
+        results['batches'] += 1
+        results['scanned'] += len(cases)
+        
+        batch = convert_batch(cases)
+        results['values'] += batch['values']
+        results['bytes_saved'] += batch['bytes_before'] - batch['bytes_after']
+        results['failed'] += len(batch['errors'])
+        results['errors'].extend(batch['errors'])
+        
+        written = 0
+        if batch['updates'] and not dry_run:
+            with conn.cursor() as cursor:
+                written = cursor.executemany(update_sql, batch['updates']) or 0
+            conn.commit()
+            # Rows changed since they were read are left alone and picked up by a re-run
+            results['skipped'] += len(batch['updates']) - written
+        results['updated'] += written
+        logger.info(f"Batch {results['batches']}: {len(batch['updates'])} to migrate, {written} updated, "
+                    f"{len(batch['errors'])} failed (through case {after_case_id})")
+    
+    duration = time.time() - start_time
+    results['duration_seconds'] = round(duration, 2)
+    results['cases_per_second'] = round(results['scanned'] / duration, 1) if duration > 0 else 0
+    return results
+
+
+def main():
+    """Main execution function."""
+    parser = argparse.ArgumentParser(description='Migrate encrypted PHI from base64 text to binary envelope columns')
+    parser.add_argument('--dry-run', action='store_true', help='Count values that would be migrated without writing')
+    parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE, help='Cases per batch/commit')
+    parser.add_argument('--user-id', help="Only migrate this user's cases")
+    parser.add_argument('--table', choices=TABLES, default='cases', help='Table to migrate')
+    args = parser.parse_args()
+    
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+    
+    from core.database import get_db_connection, close_db_connection
+    
+    conn = None
+    
+    try:
+        logger.info("=" * 80)
+        logger.info(f"PHI BINARY STORAGE MIGRATION ({args.table})")
+        logger.info("=" * 80)
+        
+        if args.dry_run:
+            logger.info("*** DRY RUN MODE - No changes will be made ***")
+        
+        conn = get_db_connection()
+        results = migrate_to_binary(conn, table=args.table, batch_size=args.batch_size,
+                                    user_id=args.user_id, dry_run=args.dry_run)
+        
+        logger.info("")
+        logger.info("=" * 80)
+        logger.info("RESULTS")
+        logger.info("=" * 80)
+        logger.info(f"Cases {'found' if args.dry_run else 'scanned'}: {results['scanned']} in {results['batches']} batches")
+        logger.info(f"Values {'to migrate' if args.dry_run else 'migrated'}: {results['values']} "
+                    f"({results['bytes_saved']:,} bytes smaller)")
+        logger.info(f"Updated: {results['updated']}")
+        logger.info(f"Skipped (changed during run): {results['skipped']}")
+        logger.info(f"Failed: {results['failed']}")
+        logger.info(f"Time elapsed: {results['duration_seconds']:.2f} seconds ({results['cases_per_second']} cases/s)")
+        
+        if results['errors']:
+            logger.info("")
+            logger.info("Errors:")
+            for error in results['errors']:
+                logger.error(f"  - Case {error['case_id']} (user {error['user_id']}): {error['error']}")
+        
+        logger.info("=" * 80)
+        
+        return 0 if results['failed'] == 0 else 1
+    
+    except Exception as e:
+        logger.error(f"Fatal error: {str(e)}")
+        return 1
+    
+    finally:
+        if conn:
+            close_db_connection(conn)
+            logger.info("Database connection closed")
+
+
+if __name__ == '__main__':
+    sys.exit(main())
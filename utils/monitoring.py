@@ -1,9 +1,10 @@
 # Created: 2025-01-27
-# Last Modified: 2025-07-29 02:14:29
+# Last Modified: 2026-10-16 19:45:37
 # Author: Scott Cadreau
 
 # utils/monitoring.py
 import time
+import asyncio
 import functools
 import structlog
 from typing import Dict, Any, Optional, Callable
@@ -95,6 +96,150 @@ DB_CONNECTION_ERRORS = Counter(
     'Total number of database connection errors'
 )
 
+# Host-wide connection budget metrics (shared across uvicorn workers on one node)
+DB_BUDGET_WAIT = Histogram(
+    'database_connection_budget_wait_seconds',
+    'Time spent waiting for a host connection budget slot',
+    ['pool'],
+    buckets=[0.001, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0]
+)
+
+DB_BUDGET_EXHAUSTED = Counter(
+    'database_connection_budget_exhausted_total',
+    'Connection requests that found the budget used up',
+    ['pool', 'outcome']
+)
+
+DB_BUDGET_SLOTS_HELD = Gauge(
+    'database_connection_budget_slots_held',
+    'Connection budget slots held by this worker',
+    ['pool']
+)
+
+DB_BUDGET_WORKER_SHARE = Gauge(
+    'database_connection_budget_worker_share',
+    'Adaptive per-worker share of the host connection budget',
+    ['pool']
+)
+
+# Per-SQL-fingerprint query metrics (see core/query_telemetry.py; label is a 12-char fingerprint id)
+DB_SQL_DURATION = Histogram(
+    'database_sql_duration_seconds',
+    'SQL statement execution time by normalized fingerprint',
+    ['fingerprint'],
+    buckets=[0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0]
+)
+
+DB_SQL_ROWS = Histogram(
+    'database_sql_rows',
+    'Rows returned or affected per SQL statement by normalized fingerprint',
+    ['fingerprint'],
+    buckets=[0, 1, 10, 50, 100, 500, 1000, 5000, 10000, 50000]
+)
+
+# Connection checkout validation metrics
+DB_PING_SKIPPED = Counter(
+    'database_connection_ping_skipped_total',
+    'Pool checkouts that skipped the validation ping (network round trips saved)',
+    ['pool']
+)
+
+DB_DEAD_CONNECTION_RETRIES = Counter(
+    'database_connection_dead_retries_total',
+    'Unpinged connections found dead at first execute and transparently reconnected',
+    ['pool']
+)
+
+# Checkout admission control metrics
+DB_CHECKOUT_WAIT = Histogram(
+    'database_checkout_wait_seconds',
+    'Time a request waited for a connection pool admission slot',
+    ['pool', 'priority'],
+    buckets=[0.001, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.0, 3.0]
+)
+
+DB_CHECKOUT_SHED = Counter(
+    'database_checkout_shed_total',
+    'Checkouts rejected with 503 because the pool stayed saturated',
+    ['pool', 'priority']
+)
+
+# Bounded in-process cache metrics (see core/cache.py)
+CACHE_REQUESTS = Counter(
+    'app_cache_requests_total',
+    'Cache lookups by namespace and result (hit/miss)',
+    ['namespace', 'result']
+)
+
+CACHE_EVICTIONS = Counter(
+    'app_cache_evictions_total',
+    'Entries evicted to stay within the cache byte budget',
+    ['namespace', 'reason']
+)
+
+CACHE_BYTES = Gauge(
+    'app_cache_bytes',
+    'Estimated size of cached values in bytes',
+    ['namespace']
+)
+
+CACHE_ENTRIES = Gauge(
+    'app_cache_entries',
+    'Number of entries in the cache',
+    ['namespace']
+)
+
+CACHE_COALESCED = Counter(
+    'app_cache_coalesced_total',
+    'Cache misses that waited for an identical in-flight load instead of querying',
+    ['namespace']
+)
+
+# Access-frequency driven cache warming metrics (see core/access_tracker.py)
+CACHE_WARM_ACCESSES = Counter(
+    'cache_warm_accesses_total',
+    'Request-path cache lookups by whether a warmer pre-loaded the key (warmed/on_demand) and result (hit/miss)',
+    ['namespace', 'source', 'result']
+)
+
+CACHE_WARM_KEYS = Counter(
+    'cache_warm_keys_total',
+    'Keys pre-loaded by the cache warmers, by where the key came from (observed/seed)',
+    ['namespace', 'origin']
+)
+
+# Background cache re-warm queue metrics (see core/rewarm.py)
+REWARM_REQUESTS = Counter(
+    'cache_rewarm_requests_total',
+    'Cache re-warm requests by outcome (scheduled, collapsed, dropped, completed, failed)',
+    ['kind', 'outcome']
+)
+
+REWARM_QUEUE_DEPTH = Gauge(
+    'cache_rewarm_queue_depth',
+    'Re-warms queued and waiting for a worker'
+)
+
+REWARM_DURATION = Histogram(
+    'cache_rewarm_duration_seconds',
+    'Time to run one cache re-warm',
+    ['kind'],
+    buckets=[0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0]
+)
+
+# Cluster-wide cache invalidation bus metrics (see core/invalidation_bus.py)
+CACHE_INVALIDATIONS = Counter(
+    'cache_invalidations_total',
+    'Cache invalidation events published to or received from other nodes',
+    ['namespace', 'direction']
+)
+
+CACHE_INVALIDATION_LAG = Histogram(
+    'cache_invalidation_lag_seconds',
+    'Time from an invalidation being published to this node evicting the keys',
+    buckets=[0.1, 0.25, 0.5, 0.75, 1.0, 2.0, 5.0, 15.0]
+)
+
 # System metrics
 SYSTEM_CPU_USAGE = Gauge(
     'system_cpu_usage_percent',
@@ -162,9 +307,53 @@ def track_request_metrics(func: Callable) -> Callable:
     
     return wrapper
 
+def _record_business_operation(operation_type: str, entity: str, duration: float, status: str):
+    """Record business metrics and completion log for a tracked operation"""
+    if entity == "case":
+        CASE_OPERATIONS.labels(operation=operation_type, status=status).inc()
+        if operation_type == "create":
+            CASE_CREATION_RATE.observe(duration)
+    elif entity == "user":
+        USER_OPERATIONS.labels(operation=operation_type, status=status).inc()
+    elif entity == "facility":
+        FACILITY_OPERATIONS.labels(operation=operation_type, status=status).inc()
+    elif entity == "surgeon":
+        SURGEON_OPERATIONS.labels(operation=operation_type, status=status).inc()
+    
+    # Log operation
+    logger.info(
+        "business_operation_completed",
+        operation=operation_type,
+        entity=entity,
+        duration=duration,
+        status=status
+    )
+
 def track_business_operation(operation_type: str, entity: str):
-    """Decorator to track business operation metrics"""
+    """Decorator to track business operation metrics (supports sync and async endpoints)"""
     def decorator(func: Callable) -> Callable:
+        if asyncio.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                start_time = time.time()
+                status = "success"
+                
+                try:
+                    return await func(*args, **kwargs)
+                except Exception as e:
+                    status = "error"
+                    logger.error(
+                        "business_operation_failed",
+                        operation=operation_type,
+                        entity=entity,
+                        error=str(e)
+                    )
+                    raise
+                finally:
+                    _record_business_operation(operation_type, entity, time.time() - start_time, status)
+            
+            return async_wrapper
+        
         @functools.wraps(func)
         def wrapper(*args, **kwargs):
             start_time = time.time()
@@ -183,28 +372,7 @@ def track_business_operation(operation_type: str, entity: str):
                 )
                 raise
             finally:
-                duration = time.time() - start_time
-                
-                # Record business metrics
-                if entity == "case":
-                    CASE_OPERATIONS.labels(operation=operation_type, status=status).inc()
-                    if operation_type == "create":
-                        CASE_CREATION_RATE.observe(duration)
-                elif entity == "user":
-                    USER_OPERATIONS.labels(operation=operation_type, status=status).inc()
-                elif entity == "facility":
-                    FACILITY_OPERATIONS.labels(operation=operation_type, status=status).inc()
-                elif entity == "surgeon":
-                    SURGEON_OPERATIONS.labels(operation=operation_type, status=status).inc()
-                
-                # Log operation
-                logger.info(
-                    "business_operation_completed",
-                    operation=operation_type,
-                    entity=entity,
-                    duration=duration,
-                    status=status
-                )
+                _record_business_operation(operation_type, entity, time.time() - start_time, status)
         
         return wrapper
     return decorator
@@ -0,0 +1,808 @@
+# Created: 2026-10-16 19:57:35
+# Last Modified: 2026-10-16 20:35:12
+# Author: Scott Cadreau
+
+"""
+Resumable bulk PHI encryption and key rotation.
+
+A job works through one user's cases and is recorded in phi_encryption_jobs
+(database_phi_key_rotation_schema.sql):
+
+    encrypt    Legacy plaintext cases (phi_encrypted = 0) are encrypted with the user's key
+    reencrypt  Encrypted cases still on an earlier key version are re-encrypted with the
+               current key; with rotate_key the job first generates the new key version
+
+How a job runs (run_job):
+    - Cases are read in case_id order, chunk_size at a time, with keyset pagination and
+      plain consistent reads, so no locks are held while reading
+    - Each chunk is decrypted/encrypted in a small thread pool and written with one
+      executemany UPDATE. The UPDATE repeats the values that were read in its WHERE clause,
+      so a case the application changed in the meantime is skipped, never overwritten
+    - The chunk's writes and the job checkpoint (last_case_id and counters) commit in one
+      short transaction: a stopped or crashed job resumes right after its last chunk
+    - The session runs with a short innodb_lock_wait_timeout; a chunk that hits a lock wait
+      or deadlock is rolled back and retried after a pause, giving way to interactive writes
+    - Progress is paced to the job's rows_per_sec, and the job's connection is taken at
+      report priority so admission control sheds it before interactive requests
+    - A job is started only by atomically claiming its row (claim_job), so two API workers
+      or nodes can never run it at once; pausing is requested on the row (request_pause)
+      and seen by whichever process runs the job after its current chunk
+
+When a reencrypt job completes without failures, every encrypted case of the user is
+rescanned; only if each one opens with the current key alone are the earlier key versions
+marked retired in user_encryption_key_versions, and readers stop loading them. Cases the
+application rewrote behind the checkpoint with a stale key keep the old versions live.
+
+Usage:
+    python utils/phi_bulk_encryption.py --user-id USER_ID --mode reencrypt --rotate
+    python utils/phi_bulk_encryption.py --user-id USER_ID --mode encrypt [--rows-per-sec N]
+    python utils/phi_bulk_encryption.py --resume JOB_ID
+    python utils/phi_bulk_encryption.py --status JOB_ID
+
+Options:
+    --mode: encrypt (plaintext cases) or reencrypt (cases on an earlier key version)
+    --rotate: Generate a new key version before re-encrypting
+    --chunk-size: Cases per chunk/commit (default: 200)
+    --rows-per-sec: Throttle target (default: 500)
+    --workers: Threads encrypting each chunk (default: 2)
+    --resume: Continue a paused, failed or interrupted job from its checkpoint
+    --status: Print a job's progress and exit
+"""
+
+import os
+import sys
+import json
+import time
+import uuid
+import argparse
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Any, Optional, Tuple
+import pymysql
+import pymysql.cursors
+
+# Add parent directory to path for imports
+sys.path.insert(0, '/home/scadreau/surgicase')
+
+from utils.phi_encryption import (
+    get_user_dek,
+    get_previous_user_deks,
+    get_user_blind_index_key,
+    generate_and_store_user_key,
+    clear_dek_cache,
+    decrypt_value_with_keys,
+    encrypt_stored_value,
+    encrypted_column,
+    is_encrypted_value,
+    in_storage_format,
+    blind_index,
+    PHI_FIELDS
+)
+
+logger = logging.getLogger(__name__)
+
+JOB_TYPES = ('encrypt', 'reencrypt')
+
+DEFAULT_CHUNK_SIZE = int(os.environ.get("PHI_BULK_CHUNK_SIZE", "200"))
+DEFAULT_ROWS_PER_SEC = float(os.environ.get("PHI_BULK_ROWS_PER_SEC", "500"))
+DEFAULT_WORKERS = int(os.environ.get("PHI_BULK_WORKERS", "2"))
+
+# Seconds a chunk waits for a row lock before giving up and retrying later (MySQL default is 50)
+LOCK_WAIT_TIMEOUT = int(os.environ.get("PHI_BULK_LOCK_WAIT_TIMEOUT", "2"))
+MAX_CHUNK_ATTEMPTS = 4
+RETRY_BASE_DELAY = 0.5  # Seconds, doubled per attempt
+RETRYABLE_MYSQL_ERRORS = (1205, 1213)  # Lock wait timeout, deadlock
+
+# After a rotation, give other API nodes time to drop their cached DEK before rows move to the new key
+ROTATION_SETTLE_SECONDS = float(os.environ.get("PHI_BULK_ROTATION_SETTLE_SECONDS", "5"))
+
+# A running job that has not checkpointed or sent a heartbeat for this long is treated as abandoned (process died)
+STALE_JOB_SECONDS = 300
+# Longest a throttled job sleeps without touching updated_at, so a slow rows_per_sec never looks stale
+HEARTBEAT_SECONDS = 60
+
+# Stop flags for jobs running in this process, keyed by job_id
+_stop_events: Dict[str, threading.Event] = {}
+_stop_lock = threading.Lock()
+
+UPDATE_CASE_SQL = """
+    UPDATE cases
+    SET patient_first = %s, patient_first_enc = %s,
+        patient_last = %s, patient_last_enc = %s,
+        ins_provider = %s, ins_provider_enc = %s,
+        patient_first_bidx = %s, patient_last_bidx = %s, phi_encrypted = 1
+    WHERE case_id = %s
+    AND phi_encrypted = %s
+    AND patient_first <=> %s AND patient_first_enc <=> %s
+    AND patient_last <=> %s AND patient_last_enc <=> %s
+    AND ins_provider <=> %s AND ins_provider_enc <=> %s
+"""
+
+
+def create_job(conn, user_id: str, job_type: str, rotate_key: bool = False,
+               chunk_size: int = DEFAULT_CHUNK_SIZE, rows_per_sec: float = DEFAULT_ROWS_PER_SEC,
+               created_by: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Record a new bulk encryption job for a user (run it with run_job).
+
+    Args:
+        conn: Database connection
+        user_id: Owner whose cases the job processes
+        job_type: 'encrypt' or 'reencrypt'
+        rotate_key: Generate a new key version first (reencrypt only)
+        chunk_size: Cases per chunk/commit
+        rows_per_sec: Throttle target
+        created_by: Admin user ID or script name, for the audit trail
+
+    Returns:
+        The job row
+
+    Raises:
+        ValueError: Invalid parameters, unknown user, or the user already has an active job
+    """
+    if job_type not in JOB_TYPES:
+        raise ValueError(f"job_type must be one of {', '.join(JOB_TYPES)}")
+    if rotate_key and job_type != 'reencrypt':
+        raise ValueError("rotate_key is only valid for reencrypt jobs")
+    if chunk_size < 1 or rows_per_sec <= 0:
+        raise ValueError("chunk_size and rows_per_sec must be positive")
+
+    try:
+        with conn.cursor(pymysql.cursors.DictCursor) as cursor:
+            # Lock the user's profile row so concurrent requests for the same user check and insert one at a time
+            cursor.execute("SELECT user_id FROM user_profile WHERE user_id = %s FOR UPDATE", (user_id,))
+            if not cursor.fetchone():
+                raise ValueError(f"User not found: {user_id}")
+
+            # Locking read: sees jobs committed by a request that held the lock before us
+            cursor.execute("""
+                SELECT job_id, status, TIMESTAMPDIFF(SECOND, COALESCE(updated_at, created_at), NOW()) AS idle_seconds
+                FROM phi_encryption_jobs
+                WHERE user_id = %s AND status IN ('pending', 'running', 'pausing')
+                FOR UPDATE
+            """, (user_id,))
+            for active in cursor.fetchall():
+                if active['status'] == 'pending' or is_job_live(active):
+                    raise ValueError(f"User {user_id} already has an active job: {active['job_id']}")
+
+            job_id = str(uuid.uuid4())
+            cursor.execute("""
+                INSERT INTO phi_encryption_jobs
+                (job_id, job_type, user_id, status, rotate_key, chunk_size, rows_per_sec, created_by, created_at)
+                VALUES (%s, %s, %s, 'pending', %s, %s, %s, %s, NOW())
+            """, (job_id, job_type, user_id, 1 if rotate_key else 0, chunk_size, rows_per_sec, created_by))
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+
+    logger.info(f"Created {job_type} job {job_id} for user {user_id}")
+    return get_job(conn, job_id)
+
+
+def get_job(conn, job_id: str) -> Optional[Dict[str, Any]]:
+    """
+    Fetch a job row, with idle_seconds since its last checkpoint.
+
+    Returns:
+        Job dict, or None if the job does not exist
+    """
+    with conn.cursor(pymysql.cursors.DictCursor) as cursor:
+        cursor.execute("""
+            SELECT *, TIMESTAMPDIFF(SECOND, COALESCE(updated_at, created_at), NOW()) AS idle_seconds
+            FROM phi_encryption_jobs
+            WHERE job_id = %s
+        """, (job_id,))
+        return cursor.fetchone()
+
+
+def is_job_live(job: Dict[str, Any]) -> bool:
+    """True if a job is running here, or is running elsewhere and checkpointed recently"""
+    if is_job_running_here(job['job_id']):
+        return True
+    return job['status'] in ('running', 'pausing') and (job.get('idle_seconds') or 0) < STALE_JOB_SECONDS
+
+
+def is_job_running_here(job_id: str) -> bool:
+    """True if run_job is executing this job in the current process"""
+    with _stop_lock:
+        return job_id in _stop_events
+
+
+def request_stop(job_id: str) -> bool:
+    """
+    Ask a job running in this process to pause after its current chunk.
+
+    Returns:
+        True if the job was running here
+    """
+    with _stop_lock:
+        event = _stop_events.get(job_id)
+    if event is None:
+        return False
+    event.set()
+    return True
+
+
+def request_pause(conn, job_id: str) -> bool:
+    """
+    Ask a job to pause after its current chunk, wherever it runs.
+
+    The request is recorded on the job row (status 'pausing'); run_job checks it after every
+    chunk and throttle heartbeat. A job that never started, or whose process died, is marked
+    'paused' straight away.
+
+    Returns:
+        True if the job was pending or running
+    """
+    stopped_here = request_stop(job_id)
+    with conn.cursor() as cursor:
+        cursor.execute("""
+            UPDATE phi_encryption_jobs
+            SET status = IF(status = 'pending' OR COALESCE(updated_at, created_at) < NOW() - INTERVAL %s SECOND,
+                            'paused', 'pausing')
+            WHERE job_id = %s AND status IN ('pending', 'running')
+        """, (STALE_JOB_SECONDS, job_id))
+        requested = cursor.rowcount == 1
+    conn.commit()
+    return requested or stopped_here
+
+
+def claim_job(conn, job_id: str) -> bool:
+    """
+    Atomically mark a job running, if nobody else is running it.
+
+    Pending, paused and failed jobs can be claimed, and so can running/pausing jobs whose
+    process stopped checkpointing STALE_JOB_SECONDS ago. Only the caller that gets the row
+    may run the job.
+
+    Returns:
+        True if this caller claimed the job
+    """
+    with conn.cursor() as cursor:
+        cursor.execute("""
+            UPDATE phi_encryption_jobs
+            SET status = 'running', started_at = COALESCE(started_at, NOW()), error = NULL, updated_at = NOW()
+            WHERE job_id = %s
+            AND (status IN ('pending', 'paused', 'failed')
+                 OR (status IN ('running', 'pausing') AND COALESCE(updated_at, created_at) < NOW() - INTERVAL %s SECOND))
+        """, (job_id, STALE_JOB_SECONDS))
+        claimed = cursor.rowcount == 1
+    conn.commit()
+    return claimed
+
+
+def _pause_requested(conn, job_id: str) -> bool:
+    """True if request_pause has been called for the job (from any process)"""
+    with conn.cursor(pymysql.cursors.DictCursor) as cursor:
+        cursor.execute("SELECT status FROM phi_encryption_jobs WHERE job_id = %s", (job_id,))
+        row = cursor.fetchone()
+    conn.commit()  # End the read snapshot
+    return bool(row) and row['status'] == 'pausing'
+
+
+def start_job_thread(job_id: str, workers: int = DEFAULT_WORKERS, claimed: bool = False) -> threading.Thread:
+    """Run a job in a background daemon thread (used by the admin endpoints)"""
+    thread = threading.Thread(
+        target=run_job,
+        args=(job_id,),
+        kwargs={'workers': workers, 'claimed': claimed},
+        name=f"phi-bulk-{job_id[:8]}",
+        daemon=True
+    )
+    thread.start()
+    return thread
+
+
+def _set_job_fields(conn, job_id: str, **fields):
+    """Update job columns (values, or raw SQL given as ('SQL', expression)) and commit"""
+    assignments = []
+    params: List[Any] = []
+    for column, value in fields.items():
+        if isinstance(value, tuple) and value[0] == 'SQL':
+            assignments.append(f"{column} = {value[1]}")
+        else:
+            assignments.append(f"{column} = %s")
+            params.append(value)
+    assignments.append("updated_at = NOW()")
+    params.append(job_id)
+
+    with conn.cursor() as cursor:
+        cursor.execute(f"UPDATE phi_encryption_jobs SET {', '.join(assignments)} WHERE job_id = %s", params)
+    conn.commit()
+
+
+def _throttle(conn, job_id: str, stop_event: threading.Event, seconds: float):
+    """Sleep for seconds (waking early on stop), touching updated_at and checking for a pause every HEARTBEAT_SECONDS"""
+    deadline = time.time() + seconds
+    while not stop_event.wait(min(HEARTBEAT_SECONDS, max(0, deadline - time.time()))):
+        if time.time() >= deadline:
+            return
+        _set_job_fields(conn, job_id)
+        if _pause_requested(conn, job_id):
+            stop_event.set()
+
+
+def _current_key_version(conn, user_id: str) -> int:
+    with conn.cursor(pymysql.cursors.DictCursor) as cursor:
+        cursor.execute("SELECT key_version FROM user_encryption_keys WHERE user_id = %s AND is_active = 1", (user_id,))
+        row = cursor.fetchone()
+    if not row:
+        raise ValueError(f"No active encryption key found for user: {user_id}")
+    return row['key_version']
+
+
+def _set_lock_wait_timeout(conn, seconds: int) -> Optional[int]:
+    """Set the session lock wait timeout, returning the previous value"""
+    with conn.cursor(pymysql.cursors.DictCursor) as cursor:
+        cursor.execute("SELECT @@SESSION.innodb_lock_wait_timeout AS lock_wait_timeout")
+        row = cursor.fetchone()
+        cursor.execute("SET SESSION innodb_lock_wait_timeout = %s", (seconds,))
+    return row['lock_wait_timeout'] if row else None
+
+
+def fetch_chunk(conn, job: Dict[str, Any], after_case_id: str, limit: int) -> List[Dict[str, Any]]:
+    """
+    Read the next chunk of the job's cases after after_case_id (consistent read, no locks).
+
+    Returns:
+        List of case dicts with case_id and the PHI fields (text and <field>_enc) as stored
+    """
+    with conn.cursor(pymysql.cursors.DictCursor) as cursor:
+        cursor.execute("""
+            SELECT case_id, patient_first, patient_first_enc, patient_last, patient_last_enc,
+                   ins_provider, ins_provider_enc
+            FROM cases
+            WHERE user_id = %s
+            AND phi_encrypted = %s
+            AND case_id > %s
+            ORDER BY case_id
+            LIMIT %s
+        """, (job['user_id'], 0 if job['job_type'] == 'encrypt' else 1, after_case_id, limit))
+        return list(cursor.fetchall())
+
+
+def transform_case(case: Dict[str, Any], job_type: str, dek: bytes, previous_deks: List[bytes],
+                   bidx_key: bytes) -> Optional[Tuple]:
+    """
+    Compute the new stored values for one case.
+
+    In reencrypt mode each field (binary envelope or legacy text) is decrypted with the current
+    key or, failing that, the earlier versions; legacy text too short to be ciphertext is
+    plaintext left over from partial encryption and is encrypted too. Values are written in the
+    current storage format (PHI_BINARY_STORAGE), so re-encryption also migrates legacy text.
+
+    Returns:
+        UPDATE_CASE_SQL parameters, or None when the case is already on the current key and format
+
+    Raises:
+        ValueError: If a field cannot be decrypted with any of the user's keys
+    """
+    plaintext: Dict[str, Any] = {}
+    needs_update = job_type == 'encrypt'
+
+    for field in PHI_FIELDS:
+        envelope = case.get(encrypted_column(field))
+        value = envelope if envelope is not None else case.get(field)
+        if job_type == 'encrypt' or not value:
+            plaintext[field] = value
+        elif not is_encrypted_value(value):
+            if envelope is not None:
+                raise ValueError(f"Unsupported envelope format in {encrypted_column(field)}")
+            plaintext[field] = value
+            needs_update = True
+        else:
+            plaintext[field], key_index = decrypt_value_with_keys(value, [dek] + previous_deks)
+            needs_update = needs_update or key_index > 0 or not in_storage_format(value)
+
+    if not needs_update:
+        return None
+
+    stored = []
+    for field in PHI_FIELDS:
+        if plaintext[field]:
+            stored.extend(encrypt_stored_value(plaintext[field], dek))
+        else:
+            stored.extend((case.get(field), case.get(encrypted_column(field))))
+    return (
+        *stored,
+        blind_index(plaintext.get('patient_first'), bidx_key),
+        blind_index(plaintext.get('patient_last'), bidx_key),
+        case['case_id'],
+        0 if job_type == 'encrypt' else 1,
+        *(value for field in PHI_FIELDS for value in (case.get(field), case.get(encrypted_column(field))))
+    )
+
+
+def _transform_cases(cases: List[Dict[str, Any]], job_type: str, dek: bytes, previous_deks: List[bytes],
+                     bidx_key: bytes) -> Tuple[List[Tuple], int, List[Dict[str, Any]]]:
+    """Transform a slice of cases, returning (updates, already current count, errors)"""
+    updates = []
+    current = 0
+    errors = []
+    for case in cases:
+        try:
+            update = transform_case(case, job_type, dek, previous_deks, bidx_key)
+        except Exception as e:
+            errors.append({'case_id': case['case_id'], 'error': str(e)})
+            continue
+        if update is None:
+            current += 1
+        else:
+            updates.append(update)
+    return updates, current, errors
+
+
+def process_chunk(conn, job: Dict[str, Any], after_case_id: str, dek: bytes, previous_deks: List[bytes],
+                  bidx_key: bytes, pool: Optional[ThreadPoolExecutor] = None,
+                  workers: int = 1) -> Optional[Dict[str, Any]]:
+    """
+    Read, transform and write one chunk, committing it together with the job checkpoint.
+
+    Lock waits and deadlocks roll the chunk back and retry it with backoff, so the job
+    yields to interactive transactions instead of holding them up.
+
+    Returns:
+        Dict with last_case_id, scanned, updated, skipped, failed and errors,
+        or None when no cases are left
+    """
+    for attempt in range(1, MAX_CHUNK_ATTEMPTS + 1):
+        try:
+            cases = fetch_chunk(conn, job, after_case_id, job['chunk_size'])
+            if not cases:
+                conn.commit()  # End the read snapshot
+                return None
+
+            if pool is not None and workers > 1 and len(cases) > 1:
+                size = -(-len(cases) // workers)
+                slices = [cases[i:i + size] for i in range(0, len(cases), size)]
+                outcomes = list(pool.map(lambda part: _transform_cases(part, job['job_type'], dek, previous_deks, bidx_key),
+                                         slices))
+            else:
+                outcomes = [_transform_cases(cases, job['job_type'], dek, previous_deks, bidx_key)]
+
+            updates = [update for outcome in outcomes for update in outcome[0]]
+            current = sum(outcome[1] for outcome in outcomes)
+            errors = [error for outcome in outcomes for error in outcome[2]]
+
+            with conn.cursor() as cursor:
+                written = cursor.executemany(UPDATE_CASE_SQL, updates) if updates else 0
+                written = written or 0
+                chunk = {
+                    'last_case_id': cases[-1]['case_id'],
+                    'scanned': len(cases),
+                    'updated': written,
+                    # Already current, or changed by the application since it was read
+                    'skipped': current + len(updates) - written,
+                    'failed': len(errors),
+                    'errors': errors
+                }
+                cursor.execute("""
+                    UPDATE phi_encryption_jobs
+                    SET last_case_id = %s,
+                        rows_scanned = rows_scanned + %s,
+                        rows_updated = rows_updated + %s,
+                        rows_skipped = rows_skipped + %s,
+                        rows_failed = rows_failed + %s,
+                        updated_at = NOW()
+                    WHERE job_id = %s
+                """, (chunk['last_case_id'], chunk['scanned'], chunk['updated'], chunk['skipped'],
+                      chunk['failed'], job['job_id']))
+            conn.commit()
+            return chunk
+
+        except pymysql.err.OperationalError as e:
+            conn.rollback()
+            if e.args[0] not in RETRYABLE_MYSQL_ERRORS or attempt == MAX_CHUNK_ATTEMPTS:
+                raise
+            delay = RETRY_BASE_DELAY * (2 ** (attempt - 1))
+            logger.warning(f"Job {job['job_id']}: chunk after {after_case_id!r} hit MySQL {e.args[0]}, "
+                           f"retrying in {delay:.1f}s (attempt {attempt}/{MAX_CHUNK_ATTEMPTS})")
+            time.sleep(delay)
+
+
+def _prepare_key(conn, job: Dict[str, Any]) -> int:
+    """Fix the key version the job encrypts to, rotating first if the job asks for it"""
+    user_id = job['user_id']
+    if job['key_version'] is None:
+        if job['rotate_key']:
+            result = generate_and_store_user_key(user_id, conn, performed_by=job['created_by'] or 'phi_bulk_encryption')
+            key_version = result['key_version']
+            _set_job_fields(conn, job['job_id'], key_version=key_version)
+            # Other nodes drop the old DEK on the invalidation broadcast; let that land before rows move
+            time.sleep(ROTATION_SETTLE_SECONDS)
+        else:
+            key_version = _current_key_version(conn, user_id)
+            _set_job_fields(conn, job['job_id'], key_version=key_version)
+        return key_version
+
+    key_version = _current_key_version(conn, user_id)
+    if key_version != job['key_version']:
+        raise ValueError(f"Key was rotated again (now version {key_version}, job started with "
+                         f"{job['key_version']}); start a new job")
+    return key_version
+
+
+def find_cases_off_key(conn, job: Dict[str, Any], dek: bytes) -> List[str]:
+    """
+    Rescan all of the job user's encrypted cases for values the current DEK alone cannot open.
+
+    Rows skipped by the compare-and-set were rewritten by the application, possibly by a node
+    still holding the old DEK, and the job never revisits rows behind its checkpoint.
+
+    Returns:
+        case_ids of cases with at least one field on an earlier key (or undecryptable)
+    """
+    scan = dict(job, job_type='reencrypt')
+    off_key = []
+    after_case_id = ''
+    while True:
+        cases = fetch_chunk(conn, scan, after_case_id, job['chunk_size'])
+        if not cases:
+            break
+        after_case_id = cases[-1]['case_id']
+        for case in cases:
+            for field in PHI_FIELDS:
+                envelope = case.get(encrypted_column(field))
+                value = envelope if envelope is not None else case.get(field)
+                if not value or not is_encrypted_value(value):
+                    continue
+                try:
+                    decrypt_value_with_keys(value, [dek])
+                except ValueError:
+                    off_key.append(case['case_id'])
+                    break
+    conn.commit()  # End the read snapshot
+    return off_key
+
+
+def _finish_job(conn, job: Dict[str, Any], key_version: int, dek: bytes):
+    """Mark a job completed; a clean re-encryption retires the earlier key versions once no case needs them"""
+    job = get_job(conn, job['job_id'])
+    retired = 0
+    off_key: List[str] = []
+    if job['job_type'] == 'reencrypt' and job['rows_failed'] == 0:
+        off_key = find_cases_off_key(conn, job, dek)
+        if off_key:
+            logger.warning(f"Job {job['job_id']}: {len(off_key)} cases are not on key version {key_version} "
+                           f"(e.g. {off_key[0]}); earlier key versions kept")
+    with conn.cursor() as cursor:
+        if job['job_type'] == 'reencrypt' and job['rows_failed'] == 0 and not off_key:
+            cursor.execute("""
+                UPDATE user_encryption_key_versions
+                SET retired_at = NOW()
+                WHERE user_id = %s AND key_version < %s AND retired_at IS NULL
+            """, (job['user_id'], key_version))
+            retired = cursor.rowcount or 0
+
+        audit_details = {
+            'operation': f"bulk_{job['job_type']}",
+            'job_id': job['job_id'],
+            'key_version': key_version,
+            'rows_scanned': job['rows_scanned'],
+            'rows_updated': job['rows_updated'],
+            'rows_skipped': job['rows_skipped'],
+            'rows_failed': job['rows_failed'],
+            'rows_off_current_key': len(off_key),
+            'retired_versions': retired
+        }
+        cursor.execute("""
+            INSERT INTO encryption_key_audit
+            (user_id, operation, performed_by, operation_timestamp, details, ip_address)
+            VALUES (%s, %s, %s, NOW(), %s, NULL)
+        """, (job['user_id'], f"bulk_{job['job_type']}", job['created_by'], json.dumps(audit_details)))
+    note = (f"{len(off_key)} cases still on an earlier key version; earlier keys kept - run reencrypt again"
+            if off_key else None)
+    _set_job_fields(conn, job['job_id'], status='completed', finished_at=('SQL', 'NOW()'), error=note)
+
+    if retired:
+        # Every node stops trying the retired keys
+        clear_dek_cache(job['user_id'])
+
+
+class _JobNotClaimed(Exception):
+    """The job is completed, or another process is running it"""
+
+
+def run_job(job_id: str, conn=None, workers: int = DEFAULT_WORKERS, claimed: bool = False) -> Dict[str, Any]:
+    """
+    Run a job, or resume it from its checkpoint, until it completes, is paused or fails.
+
+    Args:
+        job_id: Job to run
+        conn: Database connection (default: a report-priority pool connection, closed afterwards)
+        workers: Threads transforming each chunk
+        claimed: The caller already claimed the job with claim_job
+
+    Returns:
+        The job row after the run; failures are recorded on the job, not raised
+    """
+    with _stop_lock:
+        if job_id in _stop_events:
+            raise ValueError(f"Job {job_id} is already running")
+        stop_event = _stop_events[job_id] = threading.Event()
+
+    owns_connection = conn is None
+    if owns_connection:
+        from core.database import get_db_connection, PRIORITY_REPORT
+        try:
+            conn = get_db_connection(priority=PRIORITY_REPORT)
+        except Exception:
+            with _stop_lock:
+                _stop_events.pop(job_id, None)
+            raise
+
+    saved_lock_wait = None
+    try:
+        job = get_job(conn, job_id)
+        if not job:
+            raise ValueError(f"Job not found: {job_id}")
+        if not claimed and not claim_job(conn, job_id):
+            raise _JobNotClaimed(f"Job {job_id} not started: status {job['status']!r}, it is completed or running elsewhere")
+
+        logger.info(f"🔐 Job {job_id}: {job['job_type']} for user {job['user_id']} "
+                    f"{'resuming after ' + repr(job['last_case_id']) if job['last_case_id'] else 'starting'}")
+
+        key_version = _prepare_key(conn, job)
+
+        # This process always reads the key fresh; other nodes were told by the rotation itself
+        clear_dek_cache(job['user_id'], broadcast=False)
+        dek = get_user_dek(job['user_id'], conn)
+        previous_deks = get_previous_user_deks(job['user_id'], conn) if job['job_type'] == 'reencrypt' else []
+        bidx_key = get_user_blind_index_key(job['user_id'], conn)
+
+        saved_lock_wait = _set_lock_wait_timeout(conn, LOCK_WAIT_TIMEOUT)
+
+        rows_per_sec = float(job['rows_per_sec'])
+        after_case_id = job['last_case_id'] or ''
+        scanned = 0
+        started = time.time()
+
+        with ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="phi-bulk-worker") as pool:
+            while not stop_event.is_set():
+                chunk = process_chunk(conn, job, after_case_id, dek, previous_deks, bidx_key, pool, workers)
+                if chunk is None:
+                    break
+                after_case_id = chunk['last_case_id']
+                for error in chunk['errors']:
+                    logger.error(f"Job {job_id}: case {error['case_id']} not converted: {error['error']}")
+                if _pause_requested(conn, job_id):
+                    stop_event.set()
+                    break
+
+                # Throttle: sleep until the run is back on its rows/sec schedule (wakes early on stop)
+                scanned += chunk['scanned']
+                ahead = scanned / rows_per_sec - (time.time() - started)
+                if ahead > 0:
+                    _throttle(conn, job_id, stop_event, ahead)
+
+        if stop_event.is_set():
+            _set_job_fields(conn, job_id, status='paused')
+            logger.info(f"⏸️ Job {job_id} paused after case {after_case_id!r}")
+        else:
+            _finish_job(conn, job, key_version, dek)
+            logger.info(f"✅ Job {job_id} completed")
+
+    except _JobNotClaimed as e:
+        logger.warning(str(e))
+
+    except Exception as e:
+        logger.error(f"❌ Job {job_id} failed: {str(e)}")
+        try:
+            conn.rollback()
+            _set_job_fields(conn, job_id, status='failed', error=str(e)[:2000])
+        except Exception as record_error:
+            logger.error(f"Job {job_id}: could not record failure: {str(record_error)}")
+
+    finally:
+        with _stop_lock:
+            _stop_events.pop(job_id, None)
+        if saved_lock_wait is not None:
+            try:
+                _set_lock_wait_timeout(conn, saved_lock_wait)
+            except Exception:
+                pass
+
+    try:
+        return get_job(conn, job_id) or {'job_id': job_id, 'status': 'failed'}
+    finally:
+        if owns_connection:
+            from core.database import close_db_connection
+            close_db_connection(conn)
+
+
+def main():
+    """Main execution function."""
+    parser = argparse.ArgumentParser(description='Bulk PHI encryption and key rotation for one user')
+    parser.add_argument('--user-id', help='User whose cases to process (new job)')
+    parser.add_argument('--mode', choices=JOB_TYPES, help='encrypt plaintext cases or reencrypt to the current key')
+    parser.add_argument('--rotate', action='store_true', help='Generate a new key version before re-encrypting')
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE, help='Cases per chunk/commit')
+    parser.add_argument('--rows-per-sec', type=float, default=DEFAULT_ROWS_PER_SEC, help='Throttle target')
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS, help='Threads encrypting each chunk')
+    parser.add_argument('--resume', metavar='JOB_ID', help='Resume a job from its checkpoint')
+    parser.add_argument('--status', metavar='JOB_ID', help="Show a job's progress and exit")
+    args = parser.parse_args()
+
+    if not (args.resume or args.status or (args.user_id and args.mode)):
+        parser.error('either --user-id with --mode, --resume JOB_ID or --status JOB_ID is required')
+
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+
+    from core.database import get_db_connection, close_db_connection, PRIORITY_REPORT
+
+    conn = None
+
+    try:
+        logger.info("=" * 80)
+        logger.info("PHI BULK ENCRYPTION")
+        logger.info("=" * 80)
+
+        conn = get_db_connection(priority=PRIORITY_REPORT)
+
+        if args.status:
+            job = get_job(conn, args.status)
+            if not job:
+                logger.error(f"Job not found: {args.status}")
+                return 1
+        else:
+            if args.resume:
+                job_id = args.resume
+            else:
+                job_id = create_job(conn, args.user_id, args.mode, rotate_key=args.rotate,
+                                    chunk_size=args.chunk_size, rows_per_sec=args.rows_per_sec,
+                                    created_by='phi_bulk_encryption')['job_id']
+
+            # Key rotations and retirements must reach the API nodes' DEK caches
+            try:
+                from core.invalidation_bus import invalidation_bus
+                invalidation_bus.start()
+            except Exception as e:
+                logger.warning(f"Invalidation bus unavailable, API nodes keep cached keys until their TTL: {str(e)}")
+
+            logger.info(f"Job {job_id} - press Ctrl+C to pause; resume with --resume {job_id}")
+            runner = threading.Thread(target=run_job, args=(job_id,), kwargs={'conn': conn, 'workers': args.workers})
+            runner.start()
+            try:
+                while runner.is_alive():
+                    runner.join(0.5)
+            except KeyboardInterrupt:
+                logger.info("Pausing after the current chunk...")
+                request_stop(job_id)
+                runner.join()
+            job = get_job(conn, job_id)
+
+        logger.info("")
+        logger.info("=" * 80)
+        logger.info("RESULTS")
+        logger.info("=" * 80)
+        logger.info(f"Job: {job['job_id']} ({job['job_type']} for user {job['user_id']})")
+        logger.info(f"Status: {job['status']}")
+        logger.info(f"Key version: {job['key_version']}")
+        logger.info(f"Checkpoint: {job['last_case_id'] or '(start)'}")
+        logger.info(f"Scanned: {job['rows_scanned']}")
+        logger.info(f"Updated: {job['rows_updated']}")
+        logger.info(f"Skipped: {job['rows_skipped']}")
+        logger.info(f"Failed: {job['rows_failed']}")
+        if job.get('error'):
+            logger.error(f"Error: {job['error']}")
+        logger.info("=" * 80)
+
+        return 0 if job['status'] in ('completed', 'paused', 'running', 'pending') and not job['rows_failed'] else 1
+
+    except Exception as e:
+        logger.error(f"Fatal error: {str(e)}")
+        return 1
+
+    finally:
+        if conn:
+            close_db_connection(conn)
+            logger.info("Database connection closed")
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,5 +1,5 @@
 # Created: 2025-10-19
-# Last Modified: 2025-11-01 02:47:35
+# Last Modified: 2026-10-16 20:23:08
 # Author: Scott Cadreau
 
 """
@@ -22,14 +22,22 @@ Architecture:
 import os
 import json
 import base64
+import hashlib
+import hmac
 import logging
+import random
 import threading
 import time
-from typing import Dict, Any, Optional, Tuple
+import unicodedata
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import Dict, Any, Iterable, List, Optional, Tuple
 from datetime import datetime, timedelta
-from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
-from cryptography.hazmat.backends import default_backend
+from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+from cryptography.hazmat.primitives.kdf.hkdf import HKDF
 import boto3
+from botocore.config import Config
 from botocore.exceptions import ClientError
 import pymysql.cursors
 
@@ -38,10 +46,22 @@ logger = logging.getLogger(__name__)
 # KMS Master Key Configuration
 KMS_MASTER_KEY_ALIAS = 'alias/surgicase-phi-master'
 KMS_REGION = 'us-east-1'
+KMS_ENDPOINT_URL = os.environ.get("KMS_ENDPOINT_URL")  # Optional override, e.g. a local KMS stub
+
+# KMS throttling: retry with jittered exponential backoff on these error codes
+KMS_THROTTLE_CODES = {'ThrottlingException', 'RequestLimitExceeded', 'TooManyRequestsException', 'LimitExceededException'}
+KMS_MAX_RETRIES = int(os.environ.get("KMS_MAX_RETRIES", "5"))
+KMS_RETRY_BASE_DELAY = float(os.environ.get("KMS_RETRY_BASE_DELAY", "0.1"))  # Seconds, doubled per retry
+
+# Parallel DEK warm-up (warm_all_user_deks)
+DEK_WARM_CONCURRENCY = int(os.environ.get("DEK_WARM_CONCURRENCY", "16"))
 
 # Cache configuration
 DEK_CACHE_TTL_HOURS = 24  # Cache DEKs for 24 hours
 _dek_cache: Dict[str, Tuple[bytes, float]] = {}  # {user_id: (decrypted_dek, expiry_timestamp)}
+_previous_dek_cache: Dict[str, Tuple[List[bytes], float]] = {}  # {user_id: ([earlier unretired DEKs, newest first], expiry)}
+_blind_index_key_cache: Dict[str, Tuple[bytes, float]] = {}  # {user_id: (blind index key, expiry_timestamp)}
+PREVIOUS_DEK_ERROR_TTL = 60  # Seconds to remember a failed lookup of earlier key versions
 _cache_lock = threading.Lock()
 
 # PHI fields to encrypt in cases table
@@ -49,6 +69,118 @@ _cache_lock = threading.Lock()
 # Names are the primary HIPAA identifiers; dob + insurance alone don't identify individuals
 PHI_FIELDS = ['patient_first', 'patient_last', 'ins_provider']
 
+# One KMS client per region for the whole process (boto3 clients are thread-safe, creating them is not cheap)
+_kms_clients: Dict[str, Any] = {}
+_kms_clients_lock = threading.Lock()
+
+# List views only show names
+LIST_VIEW_PHI_FIELDS = ['patient_first', 'patient_last']
+
+# Blind indexes: keyed HMAC of the normalized value, stored in <field>_bidx so encrypted
+# names can be matched with an index seek (duplicate checks, name lookups) without decrypting
+BLIND_INDEX_FIELDS = ['patient_first', 'patient_last']
+BLIND_INDEX_KEY_INFO = b'surgicase-phi-blind-index-v1'
+
+# Legacy stored field format (text columns): base64(iv + auth_tag + ciphertext)
+IV_LENGTH = 12
+TAG_LENGTH = 16
+MIN_ENCRYPTED_LENGTH = 28  # Anything shorter cannot be legacy encrypted data
+
+# Binary stored field format: VARBINARY <field>_enc columns (database_phi_binary_storage_schema.sql)
+# holding a versioned envelope - format byte + iv + ciphertext + auth_tag (AESGCM's own layout).
+# Readers prefer <field>_enc and fall back to the legacy text until utils/migrate_phi_binary.py has run.
+ENVELOPE_AES_GCM_V1 = 0x01
+ENVELOPE_FORMATS = frozenset({ENVELOPE_AES_GCM_V1})
+ENVELOPE_HEADER_LENGTH = 1
+MIN_ENVELOPE_LENGTH = ENVELOPE_HEADER_LENGTH + IV_LENGTH + TAG_LENGTH  # An envelope of empty plaintext
+PHI_BINARY_STORAGE = os.environ.get("PHI_BINARY_STORAGE", "1") != "0"  # 0 = keep writing legacy base64 text
+
+# Batch decryption (decrypt_rows) - thread pool is opt-in; AES-GCM on short names is fast enough single-threaded
+BATCH_DECRYPT_WORKERS = int(os.environ.get("PHI_BATCH_DECRYPT_WORKERS", "1"))
+BATCH_DECRYPT_PARALLEL_ROWS = int(os.environ.get("PHI_BATCH_DECRYPT_PARALLEL_ROWS", "2000"))
+
+
+def get_kms_client(region: str = KMS_REGION):
+    """
+    Get the shared KMS client for region, creating it on first use.
+    
+    The connection pool is sized for the DEK warm-up concurrency so parallel
+    decrypts do not queue for an HTTP connection.
+    """
+    client = _kms_clients.get(region)
+    if client is None:
+        with _kms_clients_lock:
+            client = _kms_clients.get(region)
+            if client is None:
+                config = Config(
+                    max_pool_connections=max(DEK_WARM_CONCURRENCY, 10),
+                    retries={'max_attempts': 3, 'mode': 'standard'}
+                )
+                client = boto3.client('kms', region_name=region, endpoint_url=KMS_ENDPOINT_URL, config=config)
+                _kms_clients[region] = client
+                logger.info(f"Created shared KMS client for region {region}")
+    return client
+
+
+def _kms_decrypt(kms_client, encrypted_dek: bytes) -> Tuple[bytes, int]:
+    """
+    KMS Decrypt with jittered exponential backoff on throttling.
+    
+    Returns:
+        Tuple of (plaintext_dek, throttle_retries)
+    """
+    for attempt in range(KMS_MAX_RETRIES + 1):
+        try:
+            response = kms_client.decrypt(CiphertextBlob=encrypted_dek)
+            return response['Plaintext'], attempt
+        except ClientError as e:
+            code = e.response.get('Error', {}).get('Code')
+            if code not in KMS_THROTTLE_CODES or attempt == KMS_MAX_RETRIES:
+                raise
+            delay = KMS_RETRY_BASE_DELAY * (2 ** attempt) * random.uniform(0.5, 1.0)
+            logger.debug(f"KMS throttled ({code}), retrying in {delay:.2f}s (attempt {attempt + 1}/{KMS_MAX_RETRIES})")
+            time.sleep(delay)
+
+
+@lru_cache(maxsize=1024)
+def _aead_for(dek: bytes) -> AESGCM:
+    """One AESGCM object per DEK, so key setup happens once rather than once per field"""
+    return AESGCM(dek)
+
+
+def _seal_envelope(aead: AESGCM, plaintext: str) -> bytes:
+    """Encrypt a value into the binary envelope (format byte + iv + ciphertext + auth_tag)"""
+    iv = os.urandom(IV_LENGTH)
+    return bytes((ENVELOPE_AES_GCM_V1,)) + iv + aead.encrypt(iv, plaintext.encode('utf-8'), None)
+
+
+def _split_envelope(envelope: bytes, kind: str = "PHI envelope") -> Tuple[bytes, bytes]:
+    """Split a binary envelope into (iv, ciphertext + tag), rejecting unknown formats and truncated values"""
+    if not envelope or envelope[0] != ENVELOPE_AES_GCM_V1:
+        raise ValueError(f"Unsupported {kind} format: {envelope[:1].hex() or 'empty'}")
+    if len(envelope) < MIN_ENVELOPE_LENGTH:
+        raise ValueError(f"Truncated {kind}: {len(envelope)} bytes, at least {MIN_ENVELOPE_LENGTH} expected")
+    iv_end = ENVELOPE_HEADER_LENGTH + IV_LENGTH
+    return envelope[ENVELOPE_HEADER_LENGTH:iv_end], envelope[iv_end:]
+
+
+def _open_envelope(aead: AESGCM, envelope: bytes) -> str:
+    """Decrypt a binary envelope - no base64 decoding and no re-assembly of ciphertext and tag"""
+    iv, ciphertext = _split_envelope(envelope)
+    return aead.decrypt(iv, ciphertext, None).decode('utf-8')
+
+
+def _decrypt_value(aead: AESGCM, stored_value) -> str:
+    """Decrypt one stored field value (binary envelope or legacy base64 text) with a prepared AESGCM object"""
+    if isinstance(stored_value, (bytes, bytearray)):
+        return _open_envelope(aead, bytes(stored_value))
+    combined = base64.b64decode(stored_value)
+    iv = combined[:IV_LENGTH]
+    auth_tag = combined[IV_LENGTH:IV_LENGTH + TAG_LENGTH]
+    ciphertext = combined[IV_LENGTH + TAG_LENGTH:]
+    # AESGCM expects the tag appended to the ciphertext
+    return aead.decrypt(iv, ciphertext + auth_tag, None).decode('utf-8')
+
 
 class PHIEncryption:
     """
@@ -63,7 +195,7 @@ class PHIEncryption:
             kms_key_alias: AWS KMS key alias (default: alias/surgicase-phi-master)
             region: AWS region for KMS (default: us-east-1)
         """
-        self.kms_client = boto3.client('kms', region_name=region)
+        self.kms_client = get_kms_client(region)
         self.kms_key_alias = kms_key_alias
         self.region = region
     
@@ -118,8 +250,8 @@ class PHIEncryption:
             # Decode from base64
             encrypted_dek = base64.b64decode(encrypted_dek_base64)
             
-            response = self.kms_client.decrypt(CiphertextBlob=encrypted_dek)
-            return response['Plaintext']
+            plaintext_dek, _ = _kms_decrypt(self.kms_client, encrypted_dek)
+            return plaintext_dek
             
         except Exception as e:
             logger.error(f"Error decrypting DEK: {str(e)}")
@@ -144,19 +276,12 @@ class PHIEncryption:
             
         try:
             # Generate random IV (12 bytes for GCM)
-            iv = os.urandom(12)
-            
-            # Create cipher
-            cipher = Cipher(
-                algorithms.AES(dek),
-                modes.GCM(iv),
-                backend=default_backend()
-            )
-            encryptor = cipher.encryptor()
+            iv = os.urandom(IV_LENGTH)
             
-            # Encrypt
-            ciphertext = encryptor.update(plaintext.encode('utf-8')) + encryptor.finalize()
-            auth_tag = encryptor.tag
+            # Encrypt - AESGCM returns ciphertext with the auth tag appended
+            sealed = _aead_for(dek).encrypt(iv, plaintext.encode('utf-8'), None)
+            ciphertext = sealed[:-TAG_LENGTH]
+            auth_tag = sealed[-TAG_LENGTH:]
             
             # Combine: iv (12 bytes) + auth_tag (16 bytes) + ciphertext
             combined = iv + auth_tag + ciphertext
@@ -168,12 +293,28 @@ class PHIEncryption:
             logger.error(f"Error encrypting field: {str(e)}")
             raise
     
-    def decrypt_field(self, encrypted_base64: str, dek: bytes) -> Optional[str]:
+    def encrypt_field_binary(self, plaintext: str, dek: bytes) -> Optional[bytes]:
+        """
+        Encrypt a single field value into the binary envelope stored in <field>_enc columns.
+        
+        Args:
+            plaintext: The field value to encrypt
+            dek: Data encryption key (plaintext)
+            
+        Returns:
+            Envelope bytes: format byte + iv + ciphertext + auth_tag (29 bytes + value length),
+            or None if plaintext is None or empty
+        """
+        if plaintext is None or plaintext == '':
+            return None
+        return _seal_envelope(_aead_for(dek), plaintext)
+    
+    def decrypt_field(self, encrypted_base64, dek: bytes) -> Optional[str]:
         """
         Decrypt a single field value using AES-256-GCM.
         
         Args:
-            encrypted_base64: Base64-encoded encrypted field (iv + auth_tag + ciphertext)
+            encrypted_base64: Binary envelope (bytes) or legacy base64-encoded field (iv + auth_tag + ciphertext)
             dek: Data encryption key (plaintext)
             
         Returns:
@@ -186,26 +327,8 @@ class PHIEncryption:
             return None
             
         try:
-            # Decode from base64
-            combined = base64.b64decode(encrypted_base64)
-            
-            # Extract components
-            iv = combined[:12]
-            auth_tag = combined[12:28]
-            ciphertext = combined[28:]
-            
-            # Create cipher
-            cipher = Cipher(
-                algorithms.AES(dek),
-                modes.GCM(iv, auth_tag),
-                backend=default_backend()
-            )
-            decryptor = cipher.decryptor()
-            
             # Decrypt and verify
-            plaintext = decryptor.update(ciphertext) + decryptor.finalize()
-            
-            return plaintext.decode('utf-8')
+            return _decrypt_value(_aead_for(dek), encrypted_base64)
             
         except Exception as e:
             logger.error(f"Error decrypting field: {str(e)}")
@@ -228,20 +351,11 @@ def get_user_dek(user_id: str, conn, cache: bool = True) -> bytes:
         ValueError: If user has no encryption key
         Exception: If database or KMS operation fails
     """
-    global _dek_cache
-    
     # Check cache first
     if cache:
-        with _cache_lock:
-            if user_id in _dek_cache:
-                dek, expiry = _dek_cache[user_id]
-                if time.time() < expiry:
-                    logger.debug(f"DEK cache hit for user: {user_id}")
-                    return dek
-                else:
-                    # Expired, remove from cache
-                    logger.debug(f"DEK cache expired for user: {user_id}")
-                    del _dek_cache[user_id]
+        dek = _get_cached_dek(user_id)
+        if dek is not None:
+            return dek
     
     # Cache miss or cache disabled, fetch from database
     logger.debug(f"DEK cache miss for user: {user_id}, fetching from database")
@@ -270,10 +384,7 @@ def get_user_dek(user_id: str, conn, cache: bool = True) -> bytes:
         
         # Cache it
         if cache:
-            expiry = time.time() + (DEK_CACHE_TTL_HOURS * 3600)
-            with _cache_lock:
-                _dek_cache[user_id] = (decrypted_dek, expiry)
-            logger.debug(f"Cached DEK for user: {user_id} (expires in {DEK_CACHE_TTL_HOURS} hours)")
+            _cache_dek(user_id, decrypted_dek)
         
         return decrypted_dek
         
@@ -282,23 +393,369 @@ def get_user_dek(user_id: str, conn, cache: bool = True) -> bytes:
         raise
 
 
-def clear_dek_cache(user_id: Optional[str] = None):
+def _get_cached_dek(user_id: str) -> Optional[bytes]:
+    """Return the cached DEK for user_id, or None on a miss (expired entries are dropped)"""
+    with _cache_lock:
+        if user_id in _dek_cache:
+            dek, expiry = _dek_cache[user_id]
+            if time.time() < expiry:
+                logger.debug(f"DEK cache hit for user: {user_id}")
+                return dek
+            # Expired, remove from cache
+            logger.debug(f"DEK cache expired for user: {user_id}")
+            del _dek_cache[user_id]
+    return None
+
+
+def _cache_dek(user_id: str, dek: bytes):
+    """Store a decrypted DEK in the cache for DEK_CACHE_TTL_HOURS"""
+    expiry = time.time() + (DEK_CACHE_TTL_HOURS * 3600)
+    with _cache_lock:
+        _dek_cache[user_id] = (dek, expiry)
+    logger.debug(f"Cached DEK for user: {user_id} (expires in {DEK_CACHE_TTL_HOURS} hours)")
+
+
+def clear_dek_cache(user_id: Optional[str] = None, broadcast: bool = True):
     """
     Clear DEK cache for a specific user or all users.
     
     Args:
         user_id: User ID to clear cache for (None = clear all)
+        broadcast: Publish the invalidation so the other API nodes drop the key too
+                   (core/invalidation_bus.py) - required after a key rotation
     """
     global _dek_cache
     
     with _cache_lock:
         if user_id:
+            _previous_dek_cache.pop(user_id, None)
+            _blind_index_key_cache.pop(user_id, None)
             if user_id in _dek_cache:
                 del _dek_cache[user_id]
                 logger.info(f"Cleared DEK cache for user: {user_id}")
         else:
             _dek_cache.clear()
+            _previous_dek_cache.clear()
+            _blind_index_key_cache.clear()
             logger.info("Cleared all DEK cache")
+    
+    # Drop prepared AESGCM objects and blind index keys too, so a rotated key does not linger in memory
+    _aead_for.cache_clear()
+    _blind_index_key_for.cache_clear()
+    
+    if broadcast:
+        try:
+            from core.invalidation_bus import invalidation_bus
+            invalidation_bus.publish("phi_dek", user_id or "*")
+        except Exception as e:
+            logger.warning(f"Could not broadcast DEK cache invalidation: {str(e)}")
+
+
+def get_previous_user_deks(user_id: str, conn) -> List[bytes]:
+    """
+    DEKs of a user's earlier key versions that may still encrypt some cases, newest first.
+    
+    After a rotation, cases keep their old ciphertext until the re-encryption job
+    (utils/phi_bulk_encryption.py) rewrites them; readers fall back to these keys when
+    the current DEK fails authentication. Versions the job has finished with are marked
+    retired and no longer loaded.
+    
+    Args:
+        user_id: User ID to get earlier DEKs for
+        conn: Database connection
+        
+    Returns:
+        List of decrypted DEK bytes (empty when the user has never rotated)
+    """
+    with _cache_lock:
+        cached = _previous_dek_cache.get(user_id)
+        if cached and time.time() < cached[1]:
+            return cached[0]
+    
+    try:
+        with conn.cursor(pymysql.cursors.DictCursor) as cursor:
+            cursor.execute("""
+                SELECT v.key_version, v.encrypted_dek
+                FROM user_encryption_key_versions v
+                JOIN user_encryption_keys k ON k.user_id = v.user_id
+                WHERE v.user_id = %s
+                AND v.key_version < k.key_version
+                AND v.retired_at IS NULL
+                ORDER BY v.key_version DESC
+            """, (user_id,))
+            versions = cursor.fetchall()
+        kms_client = get_kms_client()
+        deks = [_kms_decrypt(kms_client, base64.b64decode(version['encrypted_dek']))[0] for version in versions]
+        ttl = DEK_CACHE_TTL_HOURS * 3600
+    except Exception as e:
+        logger.warning(f"Could not load earlier key versions for user {user_id}: {str(e)}")
+        deks = []
+        ttl = PREVIOUS_DEK_ERROR_TTL
+    
+    with _cache_lock:
+        _previous_dek_cache[user_id] = (deks, time.time() + ttl)
+    return deks
+
+
+def decrypt_value_with_keys(encrypted_base64: str, deks: List[bytes]) -> Tuple[str, int]:
+    """
+    Decrypt a stored value with the first of several DEKs that authenticates it.
+    
+    Returns:
+        Tuple of (plaintext, index of the DEK that worked)
+        
+    Raises:
+        ValueError: If no key decrypts the value
+    """
+    for index, dek in enumerate(deks):
+        try:
+            return _decrypt_value(_aead_for(dek), encrypted_base64), index
+        except Exception:
+            continue
+    raise ValueError("Value could not be decrypted with any of the user's keys")
+
+
+def _decrypt_with_previous_keys(user_id: str, encrypted_base64: str, conn) -> Optional[str]:
+    """Try a user's earlier key versions on a value the current DEK could not decrypt (rows awaiting re-encryption)"""
+    previous = get_previous_user_deks(user_id, conn)
+    if not previous:
+        return None
+    try:
+        return decrypt_value_with_keys(encrypted_base64, previous)[0]
+    except ValueError:
+        return None
+
+
+def encrypted_column(field: str) -> str:
+    """Name of the VARBINARY column holding a PHI field's binary envelope"""
+    return f"{field}_enc"
+
+
+def is_encrypted_value(value) -> bool:
+    """True for a binary envelope of a known format, or text long enough to be legacy ciphertext"""
+    if isinstance(value, (bytes, bytearray)):
+        return len(value) >= MIN_ENVELOPE_LENGTH and value[0] in ENVELOPE_FORMATS
+    return value is not None and len(str(value)) >= MIN_ENCRYPTED_LENGTH
+
+
+def take_stored_value(row: Dict[str, Any], field: str):
+    """
+    Pop a field's <field>_enc column from a row and return the value to decrypt:
+    the binary envelope when present, otherwise the (legacy) text column.
+    """
+    envelope = row.pop(encrypted_column(field), None)
+    return envelope if envelope is not None else row.get(field)
+
+
+def envelope_from_legacy(encrypted_base64: str) -> bytes:
+    """
+    Re-encode legacy base64(iv + auth_tag + ciphertext) as a binary envelope - no key needed.
+    
+    Raises:
+        ValueError: If the value is not valid base64 of at least iv + auth_tag
+    """
+    combined = base64.b64decode(encrypted_base64, validate=True)
+    if len(combined) < IV_LENGTH + TAG_LENGTH:
+        raise ValueError("Too short to be encrypted data")
+    iv = combined[:IV_LENGTH]
+    auth_tag = combined[IV_LENGTH:IV_LENGTH + TAG_LENGTH]
+    return bytes((ENVELOPE_AES_GCM_V1,)) + iv + combined[IV_LENGTH + TAG_LENGTH:] + auth_tag
+
+
+def legacy_from_envelope(envelope: bytes) -> str:
+    """Legacy base64 text for a binary envelope (how undecrypted values are returned to API callers)"""
+    envelope = bytes(envelope)
+    if len(envelope) < MIN_ENVELOPE_LENGTH or envelope[0] != ENVELOPE_AES_GCM_V1:
+        return base64.b64encode(envelope).decode('utf-8')
+    iv_end = ENVELOPE_HEADER_LENGTH + IV_LENGTH
+    return base64.b64encode(envelope[ENVELOPE_HEADER_LENGTH:iv_end] + envelope[-TAG_LENGTH:] + envelope[iv_end:-TAG_LENGTH]).decode('utf-8')
+
+
+def fold_encrypted_columns(rows: Iterable[Dict[str, Any]], fields: List[str] = PHI_FIELDS):
+    """
+    Drop <field>_enc columns from rows that are not being decrypted, so API responses keep
+    their shape: an envelope is returned as legacy base64 text in its field, as before.
+    """
+    for row in rows:
+        for field in fields:
+            envelope = row.pop(encrypted_column(field), None)
+            if envelope is not None:
+                row[field] = legacy_from_envelope(envelope)
+
+
+def in_storage_format(value) -> bool:
+    """True if an encrypted value is already stored the way new writes are (binary or legacy text, per PHI_BINARY_STORAGE)"""
+    return isinstance(value, (bytes, bytearray)) == PHI_BINARY_STORAGE
+
+
+def encrypt_stored_value(plaintext: Optional[str], dek: bytes) -> Tuple[Optional[str], Optional[bytes]]:
+    """
+    Encrypt a value for storage, honouring PHI_BINARY_STORAGE.
+    
+    Returns:
+        Tuple of (text column value, <field>_enc column value) - one of them is None
+    """
+    if plaintext is None or plaintext == '':
+        return plaintext, None
+    aead = _aead_for(dek)
+    if PHI_BINARY_STORAGE:
+        return None, _seal_envelope(aead, plaintext)
+    return PHIEncryption().encrypt_field(plaintext, dek), None
+
+
+def blind_index_column(field: str) -> str:
+    """Column holding the blind index for a PHI field (e.g. patient_last -> patient_last_bidx)"""
+    return f"{field}_bidx"
+
+
+def normalize_blind_index_value(value: str) -> str:
+    """Normalize a name for matching: Unicode NFKC, case-folded, whitespace trimmed and collapsed"""
+    return ' '.join(unicodedata.normalize('NFKC', str(value)).casefold().split())
+
+
+@lru_cache(maxsize=1024)
+def _blind_index_key_for(dek: bytes) -> bytes:
+    """Blind index key derived from a DEK with HKDF - used for users whose key was never rotated"""
+    return HKDF(algorithm=hashes.SHA256(), length=32, salt=None, info=BLIND_INDEX_KEY_INFO).derive(dek)
+
+
+def _wrap_blind_index_key(bidx_key: bytes, dek: bytes, user_id: str) -> bytes:
+    """Seal a blind index key under the user's current DEK (format | iv | ciphertext | tag, bound to user_id)"""
+    iv = os.urandom(IV_LENGTH)
+    return bytes((ENVELOPE_AES_GCM_V1,)) + iv + _aead_for(dek).encrypt(iv, bidx_key, user_id.encode('utf-8'))
+
+
+def _unwrap_blind_index_key(wrapped: bytes, dek: bytes, user_id: str) -> bytes:
+    """Open a blind index key sealed by _wrap_blind_index_key"""
+    iv, ciphertext = _split_envelope(bytes(wrapped), "blind index key")
+    return _aead_for(dek).decrypt(iv, ciphertext, user_id.encode('utf-8'))
+
+
+def _load_blind_index_key(user_id: str, dek: bytes, wrapped: Optional[bytes]) -> bytes:
+    """A user's blind index key: the stored one, or for a never-rotated user the HKDF derivation of its DEK"""
+    if wrapped:
+        return _unwrap_blind_index_key(wrapped, dek, user_id)
+    return _blind_index_key_for(dek)
+
+
+def get_user_blind_index_key(user_id: str, conn) -> bytes:
+    """
+    Get the key a user's blind indexes are computed with.
+    
+    The key must not change when the DEK is rotated, or stored patient_first_bidx /
+    patient_last_bidx values would stop matching. Until a user's first rotation it is
+    derived from the DEK (HKDF); generate_and_store_user_key then stores that same key in
+    user_encryption_keys.encrypted_bidx_key, sealed under each new DEK, so it carries over.
+    
+    Args:
+        user_id: User ID to get the blind index key for
+        conn: Database connection
+        
+    Returns:
+        32-byte blind index key (cached like the DEK)
+    """
+    with _cache_lock:
+        cached = _blind_index_key_cache.get(user_id)
+        if cached and time.time() < cached[1]:
+            return cached[0]
+    
+    with conn.cursor(pymysql.cursors.DictCursor) as cursor:
+        cursor.execute("SELECT encrypted_bidx_key FROM user_encryption_keys WHERE user_id = %s", (user_id,))
+        row = cursor.fetchone()
+    wrapped = row['encrypted_bidx_key'] if row else None
+    
+    try:
+        bidx_key = _load_blind_index_key(user_id, get_user_dek(user_id, conn), wrapped)
+    except Exception:
+        if not wrapped:
+            raise
+        # The cached DEK may predate a rotation on another node - retry with the stored one
+        bidx_key = _load_blind_index_key(user_id, get_user_dek(user_id, conn, cache=False), wrapped)
+    
+    with _cache_lock:
+        _blind_index_key_cache[user_id] = (bidx_key, time.time() + DEK_CACHE_TTL_HOURS * 3600)
+    return bidx_key
+
+
+def blind_index(value: Optional[str], bidx_key: bytes) -> Optional[str]:
+    """
+    Compute the blind index for one PHI value.
+    
+    Args:
+        value: Plaintext value (e.g. patient last name)
+        bidx_key: Owner's blind index key (get_user_blind_index_key)
+        
+    Returns:
+        64-character hex HMAC-SHA256 of the normalized value, or None if value is None/blank
+    """
+    if value is None:
+        return None
+    normalized = normalize_blind_index_value(value)
+    if not normalized:
+        return None
+    return hmac.new(bidx_key, normalized.encode('utf-8'), hashlib.sha256).hexdigest()
+
+
+def compute_blind_indexes(data: Dict[str, Any], user_id: str, conn) -> Dict[str, Optional[str]]:
+    """
+    Compute blind index columns for the BLIND_INDEX_FIELDS present in a plaintext data dictionary.
+    
+    Args:
+        data: Dictionary with plaintext PHI values (call before encrypt_patient_data)
+        user_id: User ID who owns this data
+        conn: Database connection
+        
+    Returns:
+        Dict of {column: blind_index}, e.g. {'patient_last_bidx': '3f9a...'}
+    """
+    bidx_key = get_user_blind_index_key(user_id, conn)
+    return {
+        blind_index_column(field): blind_index(data[field], bidx_key)
+        for field in BLIND_INDEX_FIELDS
+        if field in data
+    }
+
+
+def find_cases_by_patient_name(user_id: str, conn, patient_last: str, patient_first: Optional[str] = None,
+                               case_date: Optional[str] = None) -> List[Dict[str, Any]]:
+    """
+    Find a user's active encrypted cases by patient name without decrypting anything.
+    
+    Matches on the blind index columns, so the lookup is a seek on
+    idx_cases_user_last_bidx / idx_cases_user_date_bidx.
+    
+    Args:
+        user_id: Case owner
+        conn: Database connection
+        patient_last: Patient last name (plaintext)
+        patient_first: Optional patient first name (plaintext)
+        case_date: Optional case date to narrow to
+        
+    Returns:
+        List of dicts with case_id, case_date, patient_first, patient_last and their _enc columns
+        (still encrypted - pass them to decrypt_rows), user_id, phi_encrypted
+    """
+    bidx_key = get_user_blind_index_key(user_id, conn)
+    conditions = ["user_id = %s", "patient_last_bidx = %s"]
+    params: List[Any] = [user_id, blind_index(patient_last, bidx_key)]
+    if patient_first is not None:
+        conditions.append("patient_first_bidx = %s")
+        params.append(blind_index(patient_first, bidx_key))
+    if case_date is not None:
+        conditions.append("case_date = %s")
+        params.append(case_date)
+    
+    with conn.cursor(pymysql.cursors.DictCursor) as cursor:
+        cursor.execute(f"""
+            SELECT case_id, case_date, patient_first, patient_last, patient_first_enc, patient_last_enc,
+                   user_id, phi_encrypted
+            FROM cases
+            WHERE {' AND '.join(conditions)}
+            AND phi_encrypted = 1
+            AND active = 1
+            ORDER BY case_date DESC
+        """, params)
+        return list(cursor.fetchall())
 
 
 def encrypt_patient_data(data: Dict[str, Any], user_id: str, conn) -> Dict[str, Any]:
@@ -311,7 +768,9 @@ def encrypt_patient_data(data: Dict[str, Any], user_id: str, conn) -> Dict[str,
         conn: Database connection
         
     Returns:
-        Dictionary with PHI fields encrypted
+        Dictionary with PHI fields encrypted. With binary storage (PHI_BINARY_STORAGE, the
+        default) each field's envelope is set in <field>_enc and the text field becomes None;
+        callers write both columns.
         
     Note:
         Modifies the input dictionary in place and returns it
@@ -321,11 +780,9 @@ def encrypt_patient_data(data: Dict[str, Any], user_id: str, conn) -> Dict[str,
         dek = get_user_dek(user_id, conn)
         
         # Encrypt each PHI field if present
-        phi_crypto = PHIEncryption()
-        
         for field in PHI_FIELDS:
             if field in data and data[field] is not None:
-                data[field] = phi_crypto.encrypt_field(data[field], dek)
+                data[field], data[encrypted_column(field)] = encrypt_stored_value(data[field], dek)
         
         logger.debug(f"Encrypted patient data for user: {user_id}")
         return data
@@ -340,12 +797,12 @@ def decrypt_patient_data(data: Dict[str, Any], user_id: str, conn) -> Dict[str,
     Decrypt all PHI fields in a patient data dictionary.
     
     Args:
-        data: Dictionary containing encrypted patient data
+        data: Dictionary containing encrypted patient data (text fields and/or <field>_enc columns)
         user_id: User ID who owns this data
         conn: Database connection
         
     Returns:
-        Dictionary with PHI fields decrypted
+        Dictionary with PHI fields decrypted and the <field>_enc columns removed
         
     Note:
         Modifies the input dictionary in place and returns it
@@ -358,22 +815,31 @@ def decrypt_patient_data(data: Dict[str, Any], user_id: str, conn) -> Dict[str,
         phi_crypto = PHIEncryption()
         
         for field in PHI_FIELDS:
-            if field in data and data[field] is not None:
-                # Check if field looks like encrypted data (should be at least 28 bytes after base64 decode)
-                # Minimum: 12 bytes IV + 16 bytes auth_tag + at least some ciphertext
-                field_value = str(data[field])
-                
-                # Skip fields that are clearly not encrypted (too short or look like plain dates)
-                if len(field_value) < 28:  # Minimum base64 length for encrypted data
-                    logger.info(f"[DECRYPT] Skipping field '{field}' - too short to be encrypted data (length: {len(field_value)})")
+            value = take_stored_value(data, field)
+            if value is None:
+                continue
+            
+            # Binary envelopes carry a format byte; legacy text is recognised by length
+            if not is_encrypted_value(value):
+                if isinstance(value, (bytes, bytearray)):
+                    logger.warning(f"[DECRYPT] Field '{field}' has an unknown envelope format, leaving as-is")
+                    data[field] = legacy_from_envelope(value)
+                else:
+                    logger.info(f"[DECRYPT] Skipping field '{field}' - too short to be encrypted data (length: {len(str(value))})")
+                continue
+            
+            try:
+                data[field] = phi_crypto.decrypt_field(value, dek)
+            except Exception as field_error:
+                # Cases not yet re-encrypted after a key rotation still use an earlier key
+                recovered = _decrypt_with_previous_keys(user_id, value, conn)
+                if recovered is not None:
+                    data[field] = recovered
                     continue
-                
-                try:
-                    data[field] = phi_crypto.decrypt_field(data[field], dek)
-                except Exception as field_error:
-                    logger.warning(f"[DECRYPT] Could not decrypt field '{field}', leaving as-is. Error: {str(field_error)}")
-                    # Leave the field as-is if decryption fails
-                    pass
+                logger.warning(f"[DECRYPT] Could not decrypt field '{field}', leaving as-is. Error: {str(field_error)}")
+                # Leave the field encrypted if decryption fails
+                if isinstance(value, (bytes, bytearray)):
+                    data[field] = legacy_from_envelope(value)
         
         logger.debug(f"Decrypted patient data for user: {user_id}")
         return data
@@ -383,11 +849,140 @@ def decrypt_patient_data(data: Dict[str, Any], user_id: str, conn) -> Dict[str,
         raise
 
 
+def decrypt_rows(rows: Iterable[Dict[str, Any]], conn=None, fields: List[str] = PHI_FIELDS,
+                 user_id: Optional[str] = None, owner_key: str = 'user_id',
+                 workers: int = BATCH_DECRYPT_WORKERS,
+                 parallel_rows: int = BATCH_DECRYPT_PARALLEL_ROWS) -> Dict[str, Any]:
+    """
+    Decrypt PHI fields across a list of rows in place - the batch path for list views.
+    
+    Rows with phi_encrypted == 1 are grouped by owner, each owner's DEK is fetched once and
+    one AESGCM object per DEK decrypts every field in a single pass. Binary <field>_enc
+    columns are preferred over the legacy text and removed from every row. With workers > 1 and at
+    least parallel_rows rows, the field decryption is split across a thread pool (DEKs are
+    always fetched first, on the calling thread, so the connection is never shared).
+    
+    Args:
+        rows: Row dictionaries (e.g. DictCursor results), modified in place
+        conn: Database connection for DEK cache misses (borrowed from the pool only if needed)
+        fields: PHI fields to decrypt (default: PHI_FIELDS)
+        user_id: Owner of every row; when None each row's owner_key column is used
+        owner_key: Column holding the row owner's user_id
+        workers: Thread pool size for large batches (1 = single-threaded)
+        parallel_rows: Minimum rows before the thread pool is used
+        
+    Returns:
+        Dict with rows, owners, decrypted and failed field counts and failed_owners
+        
+    Note:
+        Never raises for bad data: rows whose DEK cannot be loaded and fields that fail to
+        decrypt are left encrypted (envelopes as legacy base64 text), matching the per-row
+        decryption it replaces.
+    """
+    rows = rows if isinstance(rows, list) else list(rows)
+    by_owner: Dict[str, List[Dict[str, Any]]] = {}
+    for row in rows:
+        if row.get('phi_encrypted') != 1:
+            continue
+        owner = user_id or row.get(owner_key)
+        if owner:
+            by_owner.setdefault(owner, []).append(row)
+    
+    stats = {"rows": 0, "owners": len(by_owner), "decrypted": 0, "failed": 0, "failed_owners": []}
+    if not by_owner:
+        fold_encrypted_columns(rows)
+        return stats
+    
+    # Borrowed from the pool only if a DEK is not cached
+    owns_connection = False
+    
+    def connection():
+        nonlocal conn, owns_connection
+        if conn is None:
+            from core.database import get_db_connection
+            conn = get_db_connection()
+            owns_connection = True
+        return conn
+    
+    def decrypt_chunk(chunk: List[Tuple[str, AESGCM, Dict[str, Any]]]) -> Tuple[int, List[Tuple[str, Dict[str, Any], str, Any]]]:
+        decrypted = 0
+        failures = []
+        for owner, aead, row in chunk:
+            for field in fields:
+                value = take_stored_value(row, field)
+                # Skip fields that are clearly not encrypted
+                if not is_encrypted_value(value):
+                    if isinstance(value, (bytes, bytearray)):
+                        failures.append((owner, row, field, value))
+                    continue
+                try:
+                    row[field] = _decrypt_value(aead, value)
+                    decrypted += 1
+                except Exception:
+                    failures.append((owner, row, field, value))
+        return decrypted, failures
+    
+    try:
+        # Resolve one AESGCM per owner before touching any field
+        work: List[Tuple[str, AESGCM, Dict[str, Any]]] = []
+        for owner, owner_rows in by_owner.items():
+            try:
+                dek = _get_cached_dek(owner)
+                if dek is None:
+                    dek = get_user_dek(owner, connection())
+            except Exception as e:
+                logger.error(f"[DECRYPT] Could not load DEK for user {owner}, leaving {len(owner_rows)} rows encrypted: {str(e)}")
+                stats["failed_owners"].append(owner)
+                continue
+            aead = _aead_for(dek)
+            work.extend((owner, aead, row) for row in owner_rows)
+        
+        if workers > 1 and len(work) >= parallel_rows:
+            chunk_size = -(-len(work) // workers)
+            chunks = [work[i:i + chunk_size] for i in range(0, len(work), chunk_size)]
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="phi-decrypt") as pool:
+                results = list(pool.map(decrypt_chunk, chunks))
+        else:
+            results = [decrypt_chunk(work)]
+        
+        stats["rows"] = len(work)
+        stats["decrypted"] = sum(decrypted for decrypted, _ in results)
+        failures = [failure for _, chunk_failures in results for failure in chunk_failures]
+        
+        # Values the current DEK cannot open may predate a key rotation
+        for owner, row, field, value in failures:
+            recovered = _decrypt_with_previous_keys(owner, value, connection()) if is_encrypted_value(value) else None
+            if recovered is None:
+                stats["failed"] += 1
+                if isinstance(value, (bytes, bytearray)):
+                    row[field] = legacy_from_envelope(value)
+            else:
+                row[field] = recovered
+                stats["decrypted"] += 1
+    finally:
+        # Fields not asked for, rows of owners without a DEK and unencrypted rows
+        fold_encrypted_columns(rows)
+        if owns_connection:
+            from core.database import close_db_connection
+            close_db_connection(conn)
+    
+    if stats["failed"]:
+        logger.warning(f"[DECRYPT] Could not decrypt {stats['failed']} fields across {len(work)} rows, leaving as-is")
+    logger.debug(f"[DECRYPT] Batch decrypted {stats['decrypted']} fields in {len(work)} rows for {len(by_owner)} users")
+    return stats
+
+
 def generate_and_store_user_key(user_id: str, conn, performed_by: Optional[str] = None, 
                                  ip_address: Optional[str] = None) -> Dict[str, Any]:
     """
     Generate a new encryption key for a user and store it in the database.
     
+    For a user who already has a key this is a rotation: the key version is incremented
+    and every version is kept in user_encryption_key_versions, so existing cases remain
+    readable until utils/phi_bulk_encryption.py re-encrypts them with the new key. The
+    user's blind index key is carried over (sealed under the new DEK), so stored blind
+    indexes keep matching.
+    
     Args:
         user_id: User ID to generate key for
         conn: Database connection
@@ -403,47 +998,78 @@ def generate_and_store_user_key(user_id: str, conn, performed_by: Optional[str]
     try:
         logger.info(f"Generating encryption key for user: {user_id}")
         
-        # Generate DEK
+        # The blind index key outlives DEK versions: keep the current one, or start a new user with a random one
         phi_crypto = PHIEncryption()
+        with conn.cursor(pymysql.cursors.DictCursor) as cursor:
+            cursor.execute("SELECT encrypted_dek, encrypted_bidx_key FROM user_encryption_keys WHERE user_id = %s", (user_id,))
+            current = cursor.fetchone()
+        if current:
+            current_dek = phi_crypto.decrypt_user_dek(current['encrypted_dek'])
+            bidx_key = _load_blind_index_key(user_id, current_dek, current['encrypted_bidx_key'])
+        else:
+            bidx_key = os.urandom(32)
+        
+        # Generate DEK
         plaintext_dek, encrypted_dek_base64 = phi_crypto.generate_user_dek(user_id)
+        encrypted_bidx_key = _wrap_blind_index_key(bidx_key, plaintext_dek, user_id)
         
         # Store in database
         with conn.cursor() as cursor:
+            # Keep the outgoing key (if any): its cases stay readable until they are re-encrypted
+            cursor.execute("""
+                INSERT IGNORE INTO user_encryption_key_versions 
+                (user_id, key_version, encrypted_dek, created_at)
+                SELECT user_id, key_version, encrypted_dek, COALESCE(rotated_at, created_at)
+                FROM user_encryption_keys
+                WHERE user_id = %s
+            """, (user_id,))
+            
             cursor.execute("""
                 INSERT INTO user_encryption_keys 
-                (user_id, encrypted_dek, key_version, created_at, is_active)
-                VALUES (%s, %s, 1, NOW(), 1)
+                (user_id, encrypted_dek, encrypted_bidx_key, key_version, created_at, is_active)
+                VALUES (%s, %s, %s, 1, NOW(), 1)
                 ON DUPLICATE KEY UPDATE 
                     encrypted_dek = VALUES(encrypted_dek),
+                    encrypted_bidx_key = VALUES(encrypted_bidx_key),
                     key_version = key_version + 1,
                     rotated_at = NOW()
-            """, (user_id, encrypted_dek_base64))
+            """, (user_id, encrypted_dek_base64, encrypted_bidx_key))
+            
+            cursor.execute("SELECT key_version FROM user_encryption_keys WHERE user_id = %s", (user_id,))
+            row = cursor.fetchone()
+            key_version = (row['key_version'] if isinstance(row, dict) else row[0]) if row else 1
+            
+            cursor.execute("""
+                INSERT INTO user_encryption_key_versions 
+                (user_id, key_version, encrypted_dek, created_at)
+                VALUES (%s, %s, %s, NOW())
+            """, (user_id, key_version, encrypted_dek_base64))
             
             # Log audit entry
             audit_details = {
-                'operation': 'generate_key',
-                'key_version': 1,
+                'operation': 'rotate_key' if key_version > 1 else 'generate_key',
+                'key_version': key_version,
                 'timestamp': datetime.now().isoformat()
             }
             
             cursor.execute("""
                 INSERT INTO encryption_key_audit 
                 (user_id, operation, performed_by, operation_timestamp, details, ip_address)
-                VALUES (%s, 'generate', %s, NOW(), %s, %s)
-            """, (user_id, performed_by, json.dumps(audit_details), ip_address))
+                VALUES (%s, %s, %s, NOW(), %s, %s)
+            """, (user_id, 'rotate' if key_version > 1 else 'generate', performed_by, json.dumps(audit_details), ip_address))
         
         conn.commit()
         
-        # Clear cache for this user to ensure fresh key is loaded
+        # Clear cache for this user (on every node) to ensure fresh key is loaded
         clear_dek_cache(user_id)
         
-        logger.info(f"Successfully generated and stored encryption key for user: {user_id}")
+        logger.info(f"Successfully generated and stored encryption key version {key_version} for user: {user_id}")
         
         return {
             'success': True,
             'user_id': user_id,
-            'key_version': 1,
-            'message': 'Encryption key generated successfully'
+            'key_version': key_version,
+            'message': 'Encryption key rotated successfully' if key_version > 1 else 'Encryption key generated successfully'
         }
         
     except Exception as e:
@@ -489,7 +1115,7 @@ def get_cache_stats() -> Dict[str, Any]:
         }
 
 
-def warm_all_user_deks(conn=None) -> Dict[str, Any]:
+def warm_all_user_deks(conn=None, concurrency: int = DEK_WARM_CONCURRENCY) -> Dict[str, Any]:
     """
     Warm DEK cache by pre-loading all user encryption keys on server startup.
     
@@ -497,15 +1123,24 @@ def warm_all_user_deks(conn=None) -> Dict[str, Any]:
     With 128GB RAM available, pre-loading all DEKs is memory-efficient (<5MB)
     and provides consistent fast decryption performance for all users.
     
+    The encrypted DEKs are read in one query, then unwrapped through the shared
+    KMS client by a pool of `concurrency` threads; throttled calls back off and
+    retry (KMS_MAX_RETRIES). Users whose DEK is already cached are skipped.
+    
     Args:
         conn: Optional database connection (creates new one if not provided)
+        concurrency: Maximum concurrent KMS Decrypt calls (default: DEK_WARM_CONCURRENCY)
         
     Returns:
         Dict with warming results including:
             - total_users: Total users with encryption keys
-            - successful: Number successfully loaded
+            - successful: Number successfully loaded (including already cached)
             - failed: Number that failed to load
+            - already_cached: Number skipped because their DEK was cached
+            - throttle_retries: KMS calls retried after throttling
+            - concurrency: Worker threads used
             - duration_seconds: Time taken to warm cache
+            - keys_per_second: Warm-up throughput
             - details: List of per-user results
     """
     start_time = time.time()
@@ -515,8 +1150,12 @@ def warm_all_user_deks(conn=None) -> Dict[str, Any]:
         "total_users": 0,
         "successful": 0,
         "failed": 0,
+        "already_cached": 0,
+        "throttle_retries": 0,
+        "concurrency": max(1, concurrency),
         "details": [],
-        "duration_seconds": 0
+        "duration_seconds": 0,
+        "keys_per_second": 0
     }
     
     # Track whether we need to close connection
@@ -542,53 +1181,67 @@ def warm_all_user_deks(conn=None) -> Dict[str, Any]:
             
             user_keys = cursor.fetchall()
             results["total_users"] = len(user_keys)
-            
-            logger.info(f"Found {results['total_users']} users with encryption keys to warm")
-            
-            # Pre-load each user's DEK
-            for i, user_key in enumerate(user_keys, 1):
-                user_id = user_key['user_id']
-                
-                try:
-                    user_start = time.time()
-                    
-                    # This will decrypt and cache the DEK
-                    get_user_dek(user_id, conn, cache=True)
-                    
-                    user_duration = time.time() - user_start
-                    results["successful"] += 1
-                    results["details"].append({
-                        "user_id": user_id,
-                        "status": "success",
-                        "duration_ms": round(user_duration * 1000, 2)
-                    })
-                    
-                    # Log progress every 100 users
-                    if i % 100 == 0:
-                        logger.info(f"DEK cache warming progress: {i}/{results['total_users']} users")
-                    
-                except Exception as e:
-                    results["failed"] += 1
-                    results["details"].append({
-                        "user_id": user_id,
-                        "status": "failed",
-                        "error": str(e)
-                    })
-                    logger.error(f"Failed to warm DEK for user {user_id}: {str(e)}")
         
     except Exception as e:
         logger.error(f"Failed to establish database connection for DEK cache warming: {str(e)}")
         results["failed"] = results.get("total_users", 0)
+        user_keys = []
         
     finally:
+        # KMS calls below do not need the database
         if should_close_conn and conn:
             close_db_connection(conn)
     
-    results["duration_seconds"] = round(time.time() - start_time, 2)
+    logger.info(f"Found {results['total_users']} users with encryption keys to warm ({results['concurrency']} concurrent)")
+    
+    to_load = []
+    for user_key in user_keys:
+        if _get_cached_dek(user_key['user_id']) is not None:
+            results["already_cached"] += 1
+            results["successful"] += 1
+            results["details"].append({"user_id": user_key['user_id'], "status": "cached"})
+        else:
+            to_load.append(user_key)
+    
+    if to_load:
+        kms_client = get_kms_client()
+        
+        def load(user_key: Dict[str, Any]) -> Dict[str, Any]:
+            user_start = time.time()
+            try:
+                dek, retries = _kms_decrypt(kms_client, base64.b64decode(user_key['encrypted_dek']))
+                _cache_dek(user_key['user_id'], dek)
+                return {
+                    "user_id": user_key['user_id'],
+                    "status": "success",
+                    "retries": retries,
+                    "duration_ms": round((time.time() - user_start) * 1000, 2)
+                }
+            except Exception as e:
+                return {"user_id": user_key['user_id'], "status": "failed", "error": str(e)}
+        
+        with ThreadPoolExecutor(max_workers=min(results["concurrency"], len(to_load)), thread_name_prefix="dek-warm") as pool:
+            for i, detail in enumerate(pool.map(load, to_load), 1):
+                results["details"].append(detail)
+                if detail["status"] == "success":
+                    results["successful"] += 1
+                    results["throttle_retries"] += detail["retries"]
+                else:
+                    results["failed"] += 1
+                    logger.error(f"Failed to warm DEK for user {detail['user_id']}: {detail['error']}")
+                
+                # Log progress every 500 users
+                if i % 500 == 0:
+                    logger.info(f"DEK cache warming progress: {i}/{len(to_load)} users")
+    
+    duration = time.time() - start_time
+    results["duration_seconds"] = round(duration, 2)
+    results["keys_per_second"] = round(len(to_load) / duration, 1) if to_load and duration > 0 else 0
     
     # Log warming summary
     if results["failed"] == 0 and results["successful"] > 0:
-        logger.info(f"✅ DEK cache warming successful: {results['successful']} user keys loaded in {results['duration_seconds']}s")
+        logger.info(f"✅ DEK cache warming successful: {results['successful']} user keys loaded in {results['duration_seconds']}s "
+                    f"({results['keys_per_second']} keys/s, {results['throttle_retries']} throttle retries)")
     elif results["successful"] > 0:
         logger.warning(f"⚠️ DEK cache warming partial: {results['successful']}/{results['total_users']} keys loaded in {results['duration_seconds']}s")
     else:
@@ -596,3 +1249,10 @@ def warm_all_user_deks(conn=None) -> Dict[str, Any]:
     
     return results
 
+
+# DEK invalidations published by other nodes (e.g. after a key rotation) evict this node's keys (without re-publishing)
+try:
+    from core.invalidation_bus import invalidation_bus
+    invalidation_bus.subscribe("phi_dek", lambda scope: clear_dek_cache(None if scope == "*" else scope, broadcast=False))
+except ImportError:
+    pass
@@ -1,5 +1,5 @@
 # Created: 2025-09-15 02:15:20
-# Last Modified: 2025-09-15 02:22:29
+# Last Modified: 2026-10-16 19:14:41
 # Author: Scott Cadreau
 
 """
@@ -22,19 +22,20 @@ Usage:
 """
 
 import logging
-import time
 import threading
-from typing import List, Dict, Tuple, Optional
+from typing import List, Dict, Tuple
+from core.cache import get_cache
 
 logger = logging.getLogger(__name__)
 
-# Global cache for auto-fix rules
-_auto_fix_cache: Dict[str, Dict] = {}
-_cache_last_updated: Optional[float] = None
-_cache_lock = threading.RLock()
 CACHE_TTL_SECONDS = 6 * 60 * 60  # 6 hours
 CACHE_REFRESH_INTERVAL = 5.5 * 60 * 60  # 5.5 hours (refresh before TTL expires)
 
+# Auto-fix rules are cached as a single entry in a bounded cache namespace (core/cache.py)
+_RULES_KEY = "rules"
+_auto_fix_cache = get_cache("procedure_code_auto_fix", ttl=CACHE_TTL_SECONDS, max_bytes=2 * 1024 * 1024)
+_cache_lock = threading.RLock()
+
 def _load_auto_fix_rules_from_db(conn) -> Dict[str, Dict]:
     """
     Load auto-fix rules from database and return as dictionary
@@ -81,13 +82,10 @@ def _refresh_auto_fix_cache(conn) -> bool:
     Returns:
         bool: True if cache was successfully refreshed
     """
-    global _auto_fix_cache, _cache_last_updated
-    
     try:
         with _cache_lock:
             new_rules = _load_auto_fix_rules_from_db(conn)
-            _auto_fix_cache = new_rules
-            _cache_last_updated = time.time()
+            _auto_fix_cache.set(_RULES_KEY, new_rules)
             
             logger.info(f"Auto-fix cache refreshed with {len(new_rules)} rules")
             return True
@@ -106,24 +104,24 @@ def _get_cached_auto_fix_rules(conn) -> Dict[str, Dict]:
     Returns:
         Dict mapping entered_code to fix rule data
     """
-    global _auto_fix_cache, _cache_last_updated
-    
     with _cache_lock:
-        # Check if cache needs refresh
-        current_time = time.time()
-        cache_age = current_time - (_cache_last_updated or 0)
-        
-        if _cache_last_updated is None or cache_age > CACHE_TTL_SECONDS:
+        rules = _auto_fix_cache.get(_RULES_KEY)
+        if rules is None:
+            # Check if cache needs refresh
+            entry = _auto_fix_cache.get_entry(_RULES_KEY)
+            cache_age = entry.age if entry else 0
             logger.info(f"Auto-fix cache expired (age: {cache_age:.1f}s), refreshing...")
             if not _refresh_auto_fix_cache(conn):
                 # If refresh failed and we have stale cache, use it with warning
-                if _auto_fix_cache:
+                if entry is not None and entry.value:
                     logger.warning("Using stale auto-fix cache due to refresh failure")
                 else:
                     logger.error("No auto-fix cache available and refresh failed")
                     return {}
+            entry = _auto_fix_cache.get_entry(_RULES_KEY)
+            rules = entry.value if entry else {}
         
-        return _auto_fix_cache.copy()  # Return copy to prevent external modification
+        return rules.copy()  # Return copy to prevent external modification
 
 def warm_auto_fix_cache(conn) -> bool:
     """
@@ -150,15 +148,13 @@ def get_cache_stats() -> Dict[str, any]:
     Returns:
         Dict with cache statistics
     """
-    global _auto_fix_cache, _cache_last_updated
-    
     with _cache_lock:
-        current_time = time.time()
-        cache_age = current_time - (_cache_last_updated or 0) if _cache_last_updated else None
+        entry = _auto_fix_cache.get_entry(_RULES_KEY)
+        cache_age = entry.age if entry else None
         
         return {
-            'rules_count': len(_auto_fix_cache),
-            'last_updated': _cache_last_updated,
+            'rules_count': len(entry.value) if entry else 0,
+            'last_updated': entry.stored_at if entry else None,
             'cache_age_seconds': cache_age,
             'cache_age_hours': cache_age / 3600 if cache_age else None,
             'is_expired': cache_age > CACHE_TTL_SECONDS if cache_age else True,
@@ -1,5 +1,5 @@
 # Created: 2025-01-15
-# Last Modified: 2025-10-20 13:01:00
+# Last Modified: 2026-10-16 19:45:37
 # Author: Scott Cadreau
 
 import schedule
@@ -16,7 +16,6 @@ from core.models import BulkCaseStatusUpdate
 from endpoints.backoffice.bulk_update_case_status import bulk_update_case_status
 from fastapi import Request
 from unittest.mock import Mock
-from utils.extract_npi_data import weekly_npi_data_update
 from utils.db_backup import perform_database_backup, cleanup_old_backups
 
 logger = logging.getLogger(__name__)
@@ -180,6 +179,9 @@ def weekly_npi_update():
     logger.info("Starting weekly NPI data update job...")
     
     try:
+        # pandas / bs4 are only loaded when the weekly job actually runs
+        from utils.extract_npi_data import weekly_npi_data_update
+
         # Call the NPI update function with duplicate prevention
         result = weekly_npi_data_update()
         
@@ -717,31 +719,43 @@ def secrets_warming_job():
 
 def user_environment_cache_warming_job():
     """
-    Scheduled function to refresh the user environment cache.
+    Scheduled function to refresh the user environment cache for the most active users.
     
     This function:
-    1. Pre-loads all active users' environment data to prevent cache misses
-    2. Refreshes user caches before they expire (proactive warming)
-    3. Eliminates database query latency during normal operations
-    4. Logs warming statistics and any failures
+    1. Picks the top-N users by observed request frequency (decaying LFU, core/access_tracker.py),
+       topped up with recent logins (USER_ENVIRONMENT_ACTIVE_HOURS) while little has been observed
+    2. Refreshes their entries before they expire, most frequent first, within a time budget
+    3. Leaves everyone else to load on demand; expired entries are served stale while they refresh
+    4. Logs refresh statistics, warm vs on-demand hit rates and any failures
     """
-    logger.info("🔥 Starting scheduled user environment cache warming...")
+    logger.info("🔥 Starting scheduled user environment cache refresh for the most active users...")
     
     try:
-        from endpoints.utility.get_user_environment import warm_all_user_environment_caches
+        from endpoints.utility.get_user_environment import refresh_active_user_environment_caches
         
-        results = warm_all_user_environment_caches()
+        results = refresh_active_user_environment_caches()
         
         if results.get("error"):
-            logger.error(f"❌ User environment cache warming failed: {results['error']}")
-        elif results["failed_warms"] == 0:
-            logger.info(f"✅ User environment cache warming completed: {results['successful_warms']} users refreshed in {results['execution_time_seconds']}s")
+            logger.error(f"❌ User environment cache refresh failed: {results['error']}")
+            return
+        
+        hit_rates = results["hit_rates"]
+        if results["failed"] == 0:
+            logger.info(
+                f"✅ User environment cache refresh completed: {results['refreshed']} users refreshed "
+                f"({results['observed']} by observed frequency), {results['skipped_fresh']} still fresh "
+                f"in {results['execution_time_seconds']}s"
+            )
         else:
-            logger.warning(f"⚠️ User environment cache warming partial: {results['successful_warms']}/{results['total_users']} users refreshed")
-            logger.warning(f"   Duration: {results['execution_time_seconds']}s, Failed: {results['failed_warms']}")
+            logger.warning(f"⚠️ User environment cache refresh partial: {results['refreshed']}/{results['candidates']} users refreshed")
+            logger.warning(f"   Duration: {results['execution_time_seconds']}s, Failed: {results['failed']}")
+        logger.info(
+            f"📊 User environment hit rate: warmed {hit_rates['warmed']['hit_rate_percent']}%, "
+            f"on demand {hit_rates['on_demand']['hit_rate_percent']}%"
+        )
                     
     except Exception as e:
-        logger.error(f"❌ Error in user environment cache warming job: {str(e)}")
+        logger.error(f"❌ Error in user environment cache refresh job: {str(e)}")
 
 def setup_weekly_scheduler(scheduler_role: str = "leader"):
     """
@@ -780,7 +794,7 @@ def setup_weekly_scheduler(scheduler_role: str = "leader"):
     schedule.every().day.at("10:30").do(pool_prewarm_job)  # Pre-warm pool before business hours
     schedule.every().day.at("17:00").do(pool_stats_job)  # Log pool stats
     schedule.every(30).minutes.do(secrets_warming_job)  # Refresh secrets cache every 30 minutes
-    schedule.every(6).hours.do(user_environment_cache_warming_job)  # Refresh user environment cache every 6 hours
+    schedule.every(6).hours.do(user_environment_cache_warming_job)  # Refresh the most active users' environment cache every 6 hours
     
     # Schedule business operations only on leader server
     if scheduler_role.lower() == "leader":
@@ -1,5 +1,5 @@
 # Created: 2025-08-08 15:34:05
-# Last Modified: 2025-10-20 12:55:41
+# Last Modified: 2026-10-16 19:14:41
 # Author: Scott Cadreau
 
 # utils/secrets_manager.py
@@ -10,6 +10,7 @@ import threading
 import logging
 from typing import Dict, Any, Optional
 from botocore.exceptions import ClientError
+from core.cache import get_cache
 
 logger = logging.getLogger(__name__)
 
@@ -31,7 +32,8 @@ class SecretsManager:
             region: AWS region for Secrets Manager client
         """
         self._client = boto3.client("secretsmanager", region_name=region)
-        self._cache: Dict[str, Dict] = {}
+        # Bounded cache (core/cache.py); TTL is checked per call so each secret can use its own
+        self._cache = get_cache("secrets", ttl=3600, max_bytes=4 * 1024 * 1024)
         self._lock = threading.Lock()
         self._region = region
         
@@ -52,18 +54,14 @@ class SecretsManager:
             json.JSONDecodeError: If the secret value is not valid JSON
         """
         with self._lock:
-            cache_key = f"{secret_name}_data"
-            time_key = f"{secret_name}_time"
-            
             # Check cache first (within TTL)
-            if (cache_key in self._cache and 
-                time_key in self._cache and
-                time.time() - self._cache[time_key] < cache_ttl):
+            cached = self._cache.get(secret_name, ttl=cache_ttl)
+            if cached is not None:
                 logger.debug(f"Returning cached secret: {secret_name}")
-                return self._cache[cache_key]
+                return cached
             
             # Check if we have stale cache (for graceful degradation)
-            has_stale_cache = cache_key in self._cache
+            stale_entry = self._cache.get_entry(secret_name)
             
             # Fetch from AWS if not cached or expired
             logger.info(f"Fetching secret from AWS: {secret_name}")
@@ -72,8 +70,7 @@ class SecretsManager:
                 secret_data = json.loads(response["SecretString"])
                 
                 # Update cache
-                self._cache[cache_key] = secret_data
-                self._cache[time_key] = time.time()
+                self._cache.set(secret_name, secret_data)
                 
                 logger.debug(f"Successfully cached secret: {secret_name}")
                 return secret_data
@@ -82,10 +79,9 @@ class SecretsManager:
                 error_code = e.response['Error']['Code']
                 
                 # Check if this is an AWS service error and we can use stale cache
-                if allow_stale and has_stale_cache and error_code in ['InternalServiceError', 'ServiceUnavailable', 'ThrottlingException']:
-                    cache_age = time.time() - self._cache[time_key]
-                    logger.warning(f"⚠️ AWS Secrets Manager error ({error_code}) for {secret_name} - using stale cache (age: {cache_age:.0f}s)")
-                    return self._cache[cache_key]
+                if allow_stale and stale_entry is not None and error_code in ['InternalServiceError', 'ServiceUnavailable', 'ThrottlingException']:
+                    logger.warning(f"⚠️ AWS Secrets Manager error ({error_code}) for {secret_name} - using stale cache (age: {stale_entry.age:.0f}s)")
+                    return stale_entry.value
                 
                 # Otherwise, log and raise
                 if error_code == 'ResourceNotFoundException':
@@ -103,10 +99,9 @@ class SecretsManager:
                 raise
             except Exception as e:
                 # For unexpected errors, also try stale cache
-                if allow_stale and has_stale_cache:
-                    cache_age = time.time() - self._cache[time_key]
-                    logger.warning(f"⚠️ Unexpected error fetching {secret_name} - using stale cache (age: {cache_age:.0f}s): {str(e)}")
-                    return self._cache[cache_key]
+                if allow_stale and stale_entry is not None:
+                    logger.warning(f"⚠️ Unexpected error fetching {secret_name} - using stale cache (age: {stale_entry.age:.0f}s): {str(e)}")
+                    return stale_entry.value
                     
                 logger.error(f"Unexpected error retrieving secret {secret_name}: {e}")
                 raise
@@ -139,10 +134,7 @@ class SecretsManager:
         """
         with self._lock:
             if secret_name:
-                cache_key = f"{secret_name}_data"
-                time_key = f"{secret_name}_time"
-                self._cache.pop(cache_key, None)
-                self._cache.pop(time_key, None)
+                self._cache.delete(secret_name)
                 logger.info(f"Cleared cache for secret: {secret_name}")
             else:
                 self._cache.clear()
@@ -210,24 +202,17 @@ class SecretsManager:
         Returns:
             Dictionary with cache statistics
         """
-        with self._lock:
-            # Count cached secrets (each secret has _data and _time keys)
-            secret_count = len([k for k in self._cache.keys() if k.endswith('_data')])
-            
-            # Get cache ages
-            cache_ages = []
-            current_time = time.time()
-            for key, timestamp in self._cache.items():
-                if key.endswith('_time'):
-                    cache_ages.append(current_time - timestamp)
-            
-            return {
-                "cached_secrets_count": secret_count,
-                "total_cache_entries": len(self._cache),
-                "oldest_cache_age_seconds": max(cache_ages) if cache_ages else 0,
-                "newest_cache_age_seconds": min(cache_ages) if cache_ages else 0,
-                "region": self._region
-            }
+        cache_stats = self._cache.stats()
+        return {
+            "cached_secrets_count": cache_stats["entries"],
+            "total_cache_entries": cache_stats["entries"],
+            "cache_bytes": cache_stats["bytes"],
+            "hits": cache_stats["hits"],
+            "misses": cache_stats["misses"],
+            "oldest_cache_age_seconds": cache_stats["oldest_age_seconds"],
+            "newest_cache_age_seconds": cache_stats["newest_age_seconds"],
+            "region": self._region
+        }
 
 # Global instance for application-wide use
 secrets_manager = SecretsManager()